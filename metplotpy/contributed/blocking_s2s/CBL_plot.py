@@ -9,6 +9,8 @@
  
  
  
+import matplotlib
+matplotlib.use('agg')
 import matplotlib.pyplot as plt
 import matplotlib.colors as colors
 from matplotlib import MatplotlibDeprecationWarning
@@ -19,8 +21,10 @@ from cartopy.util import add_cyclic_point
 import numpy as np
 import warnings
 import metcalcpy.util.utils as utils
+from metplotpy.contributed.output_policy import save_figure
 
-def create_cbl_plot(lons, lats, cblf, mhweight, month_str, output_plotname, do_averaging=True, lon_0_to_360=True):
+def create_cbl_plot(lons, lats, cblf, mhweight, month_str, output_plotname, do_averaging=True, lon_0_to_360=True,
+                    policy=None):
     """
         Create the map plot of the mean CBL values
 
@@ -35,9 +39,11 @@ def create_cbl_plot(lons, lats, cblf, mhweight, month_str, output_plotname, do_a
          @params lon_0_to_360: True by default. If false, assumes longitude grid points span from
                                 -180 to 180. If true, make the necessary conversion to -180 to 180 in
                                 the longitude and reorder the corresponding CBLm numpy array.
+         @params policy: OutputPolicy of the output files (formats, dpi), see metplotpy.contributed.output_policy.
+                         None by default: pdf and png files at 400 dpi, unless set in the environment.
 
         Returns:
-             Generates an output file in pdf format, with name and location as specified in the
+             Generates output files in pdf and png formats, with name and location as specified in the
              output_plotname input argument.
     """
     # Ignore the MatplotlibDeprecationWarning.  draw() isn't being used and is
@@ -101,20 +107,4 @@ def create_cbl_plot(lons, lats, cblf, mhweight, month_str, output_plotname, do_a
     maxlon = max(lons)
     ax.set_extent([minlon, maxlon, 0, 90], ccrs.PlateCarree())
     plt.plot(lons, CBLm, 'k', linewidth=1.0)
-    fmt = 'pdf'
-    full_output_plot = output_plotname + "." + fmt
-    # plt.savefig("./CBL_" + str(month_str) + "." + fmt, format=fmt, dpi=400, bbox_inches='tight')
-    plt.savefig(full_output_plot, format=fmt, dpi=400, bbox_inches='tight')
-    plt.pause(1e-13)
-    fmt2 = 'png'
-    full_output_plot2 = output_plotname + "." + fmt2
-    plt.savefig(full_output_plot2, format=fmt2, dpi=400, bbox_inches='tight')
-
-    # plt.show()
-
-
-
-
-
-
-
+    save_figure(fig, output_plotname, formats=('pdf', 'png'), policy=policy)
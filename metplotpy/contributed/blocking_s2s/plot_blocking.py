@@ -17,6 +17,7 @@ import numpy as np
 import sys
 sys.path.insert(0, "/glade/u/home/kalb/UIUC/METcalcpy/")
 import metcalcpy.util.utils as util
+from metplotpy.contributed.output_policy import save_figure
 import warnings
 
 warnings.filterwarnings("ignore",category=UserWarning)
@@ -28,6 +29,7 @@ def plot_ibls(blonlong,lons,plot_title,output_plotname,**kwargs):
     lon2 = kwargs.get('lon2',None)
     label1 = kwargs.get('label1',None)
     label2 = kwargs.get('label2',None)
+    policy = kwargs.get('policy',None)
 
     #calculating long-term mean IBL for figure
     # Average across all days
@@ -39,7 +41,7 @@ def plot_ibls(blonlong,lons,plot_title,output_plotname,**kwargs):
     a = blonlongmean[lonsortlocs]
 
     #Plot LTM IBL
-    plt.figure()
+    fig = plt.figure()
 
     plt.plot(lonplot,a,linewidth = 2,label=label1)
 
@@ -72,16 +74,10 @@ def plot_ibls(blonlong,lons,plot_title,output_plotname,**kwargs):
     if label1:
         plt.legend()
 
-    fmt = 'pdf'
-    full_output_plot = output_plotname + "." + fmt
-    plt.savefig(full_output_plot,format=fmt,dpi=400, bbox_inches='tight')
-    plt.pause(1e-13)
-    fmt2 = 'png'
-    full_output_plot2 = output_plotname + "." + fmt2
-    plt.savefig(full_output_plot2,format=fmt2,dpi=400, bbox_inches='tight')
+    save_figure(fig, output_plotname, formats=('pdf', 'png'), policy=policy)
 
 
-def plot_blocks(blockfreq,GIBL,ibl,lons,plot_title,output_plotname):
+def plot_blocks(blockfreq,GIBL,ibl,lons,plot_title,output_plotname,policy=None):
 
     lonplot,lonsortlocs = util.convert_lons_indices(lons,-90,360)
 
@@ -93,7 +89,7 @@ def plot_blocks(blockfreq,GIBL,ibl,lons,plot_title,output_plotname):
     ibl_mean = np.mean(ibl,axis=(1,0))
     ibl_mean = ibl_mean[lonsortlocs]
 
-    plt.figure()
+    fig = plt.figure()
 
     lw = 2
     plt.plot(lonplot,ibl_mean,'k',linewidth = lw)
@@ -113,10 +109,4 @@ def plot_blocks(blockfreq,GIBL,ibl,lons,plot_title,output_plotname):
     ax.grid(True, which='major',axis='y',linewidth=1.5)
     ax.grid(True, which='major',axis='x',linewidth=1.5)
 
-    fmt = 'pdf'
-    full_output_plot = output_plotname + "." + fmt
-    plt.savefig(full_output_plot,format=fmt,dpi=400, bbox_inches='tight')
-    plt.pause(1e-13)
-    fmt2 = 'png'
-    full_output_plot2 = output_plotname + "." + fmt2
-    plt.savefig(full_output_plot2,format=fmt2,dpi=400, bbox_inches='tight')
+    save_figure(fig, output_plotname, formats=('pdf', 'png'), policy=policy)
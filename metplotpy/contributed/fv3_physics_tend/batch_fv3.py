@@ -0,0 +1,132 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import datetime
+import logging
+import matplotlib
+matplotlib.use("Agg") # figures are only saved to files, some from worker processes
+from metpy.units import units
+import os
+import pandas as pd
+from . import cross_section_vert, physics_tend, planview_fv3, vert_profile_fv3
+import yaml
+
+"""
+Plan views, vertical profiles and vertical cross sections of the tendencies of several state variables
+from one FV3 history file. The grid spec and history files are opened once, only the requested state
+variables and their tendencies are read, and the time-window averages are computed once per state variable.
+The figures are drawn in parallel by a pool of worker processes.
+"""
+
+PLOTS = ["planview", "vert_profile", "cross_section"]
+
+def parse_args():
+
+    # =============Arguments===================
+    parser = argparse.ArgumentParser(description = "Batch of FV3 diagnostic tendency plots", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    # ==========Mandatory Arguments===================
+    parser.add_argument("config", type=argparse.FileType('r'), help="yaml configuration file")
+    parser.add_argument("historyfile", type=argparse.FileType("r"), help="FV3 history file")
+    parser.add_argument("gridfile", type=argparse.FileType("r"), help="FV3 grid spec file")
+    # ==========Optional Arguments===================
+    parser.add_argument("--statevariables", nargs='+', type=str, default=None, help="moisture, temperature, or wind component variable names. Default is all state variables in config file")
+    parser.add_argument("--plots", nargs='+', choices=PLOTS, default=PLOTS, help="kinds of plots")
+    parser.add_argument("-d", "--debug", action='store_true')
+    parser.add_argument("--fill", nargs='+', type=str, default=["resid"], help='planview types of tendency (tendency name, resid, d<statevariable> or empty string for the state variable). Types that do not apply to a state variable are skipped. ignored if pfull is a single level')
+    parser.add_argument("--method", type=str, choices=["nearest", "linear","loglinear"], default="nearest", help="planview vertical interpolation method")
+    parser.add_argument("--ncols", type=int, default=None, help="number of columns")
+    parser.add_argument("--nofineprint", action='store_true', help="Don't add metadata and created by date (for comparing images)")
+    parser.add_argument("--nprocs", type=int, default=os.cpu_count(), help="number of worker processes drawing the plots")
+    parser.add_argument("--odir", type=str, default=".", help="output directory")
+    parser.add_argument("-p", "--pfull", nargs='+', type=float, default=[1000,925,850,700,500,300,200,100,0], help="planview pressure level(s) in hPa to plot. If only one pressure level is provided, the fill argument will be ignored and all tendencies will be plotted.")
+    parser.add_argument("-s", "--shp", type=str, default=None, help="planview and vert_profile shape file directory for mask")
+    parser.add_argument("--maskcache", type=str, default=os.path.join(os.path.expanduser("~"), ".cache", "metplotpy", "fv3_masks"), help="directory of cached shape file masks. Empty string to not cache")
+    parser.add_argument("--start", nargs=2, type=float, default=(28, -115), help="cross_section start point")
+    parser.add_argument("--end", nargs=2, type=float, default=(30, -82), help="cross_section end point")
+    parser.add_argument("--dindex", type=int, default=20, help="cross_section tick and gridline interval along cross section")
+    parser.add_argument("--subtract", type=argparse.FileType("r"), help="FV3 history file to subtract")
+    parser.add_argument("-t", "--twindow", type=int, default=3, help="time window in hours")
+    parser.add_argument("-v", "--validtime", type=lambda x:pd.to_datetime(x), help="valid time")
+
+    args = parser.parse_args()
+    return args
+
+def planview_fills(variable, fv3):
+    """ Valid fill arguments of planview of state variable. See planview_fv3.plot. """
+    # tendency names without characters up to and including 1st underscore (e.g. dt3dt_pbl -> pbl)
+    tendencies = ["_".join(x.split("_")[1:]) for x in fv3["tendency_varnames"][variable]]
+    return ["resid", "", "d"+variable] + tendencies
+
+def main():
+    args = parse_args()
+    gfile      = args.gridfile
+    ifile      = args.historyfile
+    config     = args.config
+    debug      = args.debug
+    odir       = os.path.realpath(args.odir)
+    pfull      = args.pfull * units.hPa
+    shp        = args.shp
+    maskcache  = args.maskcache
+    subtract   = args.subtract.name if args.subtract else None
+    twindow    = datetime.timedelta(hours = args.twindow)
+
+    level = logging.INFO
+    if debug: level = logging.DEBUG
+    logging.basicConfig(format='%(asctime)s - %(message)s', level=level) # prepend log message with time
+    logging.debug(args)
+
+    if not os.path.exists(odir):
+        logging.info(f"output directory {odir} does not exist. Creating it")
+        os.makedirs(odir)
+
+    # Reload fv3 in case user specifies a custom --config file
+    fv3 = yaml.load(open(config.name), Loader=yaml.FullLoader)
+    variables = args.statevariables or list(fv3["tendency_varnames"])
+
+    fv3ds, gds = physics_tend.open_history(ifile.name, gfile.name, fv3, variables, subtract=subtract)
+    # Grid is small and needed by every plot, so read it now instead of in each worker.
+    gds = gds[[fv3["lon_name"], fv3["lat_name"], "area"]].load()
+
+    # Mask is the same for every variable and plot.
+    mask = None
+    if shp and ("planview" in args.plots or "vert_profile" in args.plots):
+        mask = physics_tend.pts_in_shp(gds[fv3["lat_name"]].values, gds[fv3["lon_name"]].values, shp, debug=debug, cache_dir=maskcache)
+
+    sources = physics_tend.fineprint_sources(ifile.name, gfile.name, subtract=subtract)
+    fills = args.fill if len(pfull) > 1 else args.fill[:1] # fill is ignored for a single level
+
+    ofiles = []
+    with ProcessPoolExecutor(max_workers=args.nprocs) as executor:
+        futures = []
+        for variable in variables:
+            budget = physics_tend.tendency_budget(fv3ds, variable, fv3, twindow, validtime=args.validtime)
+            if "planview" in args.plots:
+                for fill in fills:
+                    if fill not in planview_fills(variable, fv3):
+                        logging.warning(f"skipping planview of {variable} {fill}. fill is not a tendency of {variable}")
+                        continue
+                    ofile = os.path.join(odir, planview_fv3.default_ofile(variable, fill, pfull, shp))
+                    futures.append(executor.submit(planview_fv3.plot, budget, gds, fv3, ofile, fill, pfull,
+                                                   method=args.method, ncols=args.ncols, shp=shp, mask=mask,
+                                                   sources=sources, nofineprint=args.nofineprint, debug=debug))
+                    ofiles.append(ofile)
+            if "vert_profile" in args.plots:
+                ofile = os.path.join(odir, vert_profile_fv3.default_ofile(variable, shp))
+                futures.append(executor.submit(vert_profile_fv3.plot, budget, gds, fv3, ofile, shp=shp, mask=mask,
+                                               sources=sources, nofineprint=args.nofineprint, debug=debug))
+                ofiles.append(ofile)
+            if "cross_section" in args.plots:
+                ofile = os.path.join(odir, cross_section_vert.default_ofile(variable, args.start, args.end))
+                futures.append(executor.submit(cross_section_vert.plot, budget, fv3, ofile, args.start, args.end,
+                                               dindex=args.dindex, ncols=args.ncols, sources=sources,
+                                               nofineprint=args.nofineprint))
+                ofiles.append(ofile)
+        # Raise the first exception of a worker, if any.
+        for future in futures:
+            future.result()
+
+    logging.info(f"created {len(ofiles)} plots in {odir}")
+    return ofiles
+
+
+if __name__ == "__main__":
+    main()
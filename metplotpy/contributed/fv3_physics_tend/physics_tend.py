@@ -1,12 +1,16 @@
 import cartopy.io.shapereader as shpreader
 import cartopy.feature as cfeature
+from collections import namedtuple
 import datetime
+import hashlib
 import logging
 import matplotlib.path
+from metpy.units import units
 import numpy as np
 import os
 import pandas as pd
 from shapely.geometry import Point, multipolygon
+import sys
 #from tqdm import tqdm # progress bar
 import xarray
 import yaml
@@ -59,16 +63,200 @@ def add_time0(ds, variable, fv3, interval=np.timedelta64(1,'h')):
         ds0[da].attrs = ds[da].attrs
     return ds0
 
-def pts_in_shp(lats, lons, shp, debug=False):
-    # Map longitude to -180 to +180 range
-    lons = np.where(lons > 180, lons-360, lons)
-    # If shp is a directory, point to .shp file of same name in it.
+# Time-window average of the tendencies of one state variable and the actual change of the
+# state variable. Shared by the plan view, vertical profile and cross section plots.
+TendencyBudget = namedtuple("TendencyBudget", ["variable", "tendency_dim", "tendencies_avg", "state_variable",
+                                               "dstate_variable", "total", "resid", "time0", "validtime",
+                                               "twindow_quantity"])
+
+
+def history_varnames(variables, fv3):
+    """ Names of the state variables, their time0 variables and their tendencies in the history file. """
+    varnames = []
+    for variable in variables:
+        varnames.append(variable)
+        varnames.append(fv3["time0_varname"][variable])
+        varnames.extend(fv3["tendency_varnames"][variable])
+    return list(dict.fromkeys(varnames))
+
+
+def open_history(historyfile, gridfile, fv3, variables, subtract=None):
+    """
+    Open grid spec file and history file once for all the state variables in list variables.
+    The history file is opened lazily and subset to the state variables, their time0 variables
+    and their tendencies before anything is read, so other variables in the file are never loaded.
+    If subtract is given, the same variables in that history file are subtracted.
+    Return history Dataset (with lont and latt coordinates) and grid spec Dataset.
+    """
+    # Read lat/lon/area from gridfile
+    logging.debug(f"read lat/lon/area from {gridfile}")
+    gds = xarray.open_dataset(gridfile)
+
+    # Open input file
+    logging.debug(f"About to open {historyfile}")
+    varnames = history_varnames(variables, fv3)
+    fv3ds = xarray.open_dataset(historyfile)[varnames]
+    datetimeindex = fv3ds.indexes['time']
+    if hasattr(datetimeindex, "to_datetimeindex"):
+        # Convert from CFTime to pandas datetime. I get a warning CFTimeIndex from non-standard calendar 'julian'. Maybe history file should be saved with standard calendar.
+        # To turn off warning, set unsafe=True.
+        datetimeindex = datetimeindex.to_datetimeindex(unsafe=True)
+    fv3ds['time'] = datetimeindex
+    if subtract:
+        logging.debug(f"subtracting {subtract}")
+        with xarray.set_options(keep_attrs=True):
+            fv3ds -= xarray.open_dataset(subtract)[varnames]
+
+    fv3ds = fv3ds.assign_coords(lont=gds[fv3["lon_name"]], latt=gds[fv3["lat_name"]]) # lont and latt used by pcolorfill()
+    return fv3ds, gds
+
+
+def tendency_budget(fv3ds, variable, fv3, twindow, validtime=None):
+    """
+    Average tendencies of state variable over time window twindow (datetime.timedelta) ending at validtime
+    (latest time in fv3ds if None), actual change in state variable, sum of tendencies and residual.
+    fv3ds is the Dataset returned by open_history(). Return TendencyBudget.
+    """
+    tendency_vars = fv3["tendency_varnames"][variable] # list of tendency variable names for requested state variable
+    fv3ds = add_time0(fv3ds, variable, fv3)
+    tendencies = fv3ds[tendency_vars] # subset of original Dataset
+
+    if validtime is None:
+        logging.debug("validtime not provided on command line, so use latest time in history file.")
+        validtime = fv3ds.time.values[-1]
+        validtime = pd.to_datetime(validtime)
+    time0 = validtime - twindow
+    time1 = time0 + datetime.timedelta(hours=1)
+    logging.info(f"Sum tendencies {time1}-{validtime}")
+    tindex = dict(time=slice(time1, validtime)) # slice of time from hour after time0 through validtime
+    tendencies_avg = tendencies.sel(tindex).mean(dim="time") # average tendencies in time
+
+    # Dynamics (nophys) tendency is not reset every hour. Just calculate change from time0 to validtime.
+    nophys_var = [x for x in tendency_vars if x.endswith("_nophys")]
+    assert len(nophys_var) == 1
+    nophys_var = nophys_var[0] # we don't want a 1-element list; we want a string. So that tendencies[nophys_var] is a DataArray, not a Dataset.
+    logging.info(f"Subtract nophys tendency at {time0} from {validtime}")
+    nophys_delta = tendencies[nophys_var].sel(time=validtime) - tendencies[nophys_var].sel(time=time0)
+    tendencies_avg[nophys_var] = nophys_delta / (twindow.total_seconds() / 3600)
+
+    # Restore units after .mean() removed them. Copy units from 1st tendency variable.
+    tendency_units = units.parse_expression(fv3ds[tendency_vars[0]].units)
+    logging.debug(f"restoring {tendency_units} units after .mean() method removed them.")
+    tendencies_avg *= tendency_units
+    for da in tendencies_avg:
+        tendencies_avg[da] = tendencies_avg[da].metpy.convert_units("K/hour")
+    long_names = [fv3ds[da].attrs["long_name"] for da in tendencies_avg] # Make list of long_names before .to_array() loses them.
+
+    # Remove characters up to and including 1st underscore (e.g. du3dt_) in DataArray name.
+    # for example dt3dt_pbl -> pbl
+    name_dict = {da : "_".join(da.split("_")[1:]) for da in tendencies_avg.data_vars}
+    tendencies_avg = tendencies_avg.rename(name_dict)
+
+    # Stack variables along new tendency dimension of new DataArray.
+    tendency_dim = f"{variable} tendency"
+    tendencies_avg = tendencies_avg.to_array(dim=tendency_dim)
+    # Assign long_names to a new DataArray coordinate. It will have the same shape as tendency dimension.
+    tendencies_avg = tendencies_avg.assign_coords({"long_name":(tendency_dim,long_names)})
+
+    logging.info(f"calculate actual change in {variable}")
+    state_variable = fv3ds[variable].metpy.quantify() # Tried metpy.quantify() with open_dataset, but pint.errors.UndefinedUnitError: 'dBz' is not defined in the unit registry
+    dstate_variable = state_variable.sel(time = validtime) - state_variable.sel(time = time0)
+    dstate_variable = dstate_variable.assign_coords(time=validtime)
+    dstate_variable.attrs["long_name"] = f"actual change in {state_variable.attrs['long_name']}"
+
+    # Add all tendencies together and subtract actual rate of change in state variable.
+    # This is residual.
+    total = tendencies_avg.sum(dim=tendency_dim)
+    twindow_quantity = twindow.total_seconds() * units.seconds
+    resid = total - dstate_variable/twindow_quantity
+
+    return TendencyBudget(variable, tendency_dim, tendencies_avg, state_variable, dstate_variable,
+                          total, resid, time0, validtime, twindow_quantity)
+
+
+def all_tendencies(budget):
+    """ Tendencies of budget with total and residual appended along the tendency dimension. """
+    tendency_dim = budget.tendency_dim
+    total = budget.total.expand_dims({tendency_dim:["total"]}).assign_coords(long_name="sum of tendencies")
+    resid = budget.resid.expand_dims({tendency_dim:["resid"]}).assign_coords(long_name=f"sum of tendencies - actual rate of change of {budget.variable} (residual)")
+    return xarray.concat([budget.tendencies_avg, total, resid], dim=tendency_dim)
+
+
+def fineprint_sources(historyfile, gridfile, subtract=None):
+    """ First lines of the fine print: input history, subtracted history and grid spec files. """
+    fineprint  = f"history: {os.path.realpath(historyfile)}"
+    if subtract:
+        fineprint  += f"\nsubtract: {os.path.realpath(subtract)}"
+    fineprint += f"\ngrid_spec: {os.path.realpath(gridfile)}"
+    return fineprint
+
+
+def shp_file(shp):
+    """ If shp is a directory, point to .shp file of same name in it. """
     shp = shp.rstrip("/")
     if os.path.isdir(shp):
         shp = shp + "/" + os.path.basename(shp) + ".shp"
+    return shp
+
+
+def mask_cache_key(lats, lons, shp):
+    """
+    Key of the mask of lat/lon grid points inside shape file shp.
+    Hash of the grid coordinates and hash of the shape file (.shp and .shx).
+    """
+    grid_hash = hashlib.sha1()
+    for coord in (lats, lons):
+        coord = np.ascontiguousarray(coord, dtype=np.float64)
+        grid_hash.update(str(coord.shape).encode())
+        grid_hash.update(coord.tobytes())
+    shp_hash = hashlib.sha1()
+    root, _ = os.path.splitext(shp_file(shp))
+    for ext in (".shp", ".shx"):
+        if os.path.exists(root + ext):
+            with open(root + ext, "rb") as f:
+                shp_hash.update(f.read())
+    return f"{grid_hash.hexdigest()[:20]}_{shp_hash.hexdigest()[:20]}"
+
+
+def read_cached_mask(cache_file):
+    """ Boolean mask from compressed, bit-packed cache file """
+    with np.load(cache_file) as npz:
+        shape = tuple(npz["shape"])
+        mask = np.unpackbits(npz["packed"], count=int(np.prod(shape)))
+    return mask.astype(bool).reshape(shape)
+
+
+def write_cached_mask(cache_file, mask):
+    """ Save boolean mask bit-packed in compressed .npz file """
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    # Write to temporary file and rename so concurrent plots never read a partial file.
+    tmp_file = f"{cache_file}.{os.getpid()}.npz"
+    np.savez_compressed(tmp_file, packed=np.packbits(mask.ravel()), shape=np.array(mask.shape))
+    os.replace(tmp_file, cache_file)
+
+
+def pts_in_shp(lats, lons, shp, debug=False, cache_dir=None):
+    """
+    Boolean mask of lat/lon points inside shape file shp.
+    If cache_dir is given, the mask is saved there, keyed by hash of the grid
+    coordinates and of the shape file, and reused by later calls with the same
+    grid and shape file instead of testing every point again.
+    """
+    cache_file = None
+    if cache_dir:
+        cache_file = os.path.join(cache_dir, f"mask_{mask_cache_key(lats, lons, shp)}.npz")
+        if os.path.exists(cache_file):
+            logging.debug(f"pts_in_shp: read cached mask {cache_file}")
+            return read_cached_mask(cache_file)
+
+    # Map longitude to -180 to +180 range
+    lons = np.where(lons > 180, lons-360, lons)
+    shp = shp_file(shp)
     shape = shpreader.Reader(shp)
-    ll_array = np.hstack((lons.flatten()[:,np.newaxis],lats.flatten()[:,np.newaxis]))
-    mask = np.full(lats.flatten().shape, False)
+    lons_flat = lons.flatten()
+    lats_flat = lats.flatten()
+    ll_array = np.hstack((lons_flat[:,np.newaxis],lats_flat[:,np.newaxis]))
+    mask = np.full(lats_flat.shape, False)
     # How to make shapefile for EAST_CONUS (CONUS east of 105W)
     # import shapefile
     # import geopandas
@@ -88,11 +276,19 @@ def pts_in_shp(lats, lons, shp, debug=False):
             logging.error(f"Uh oh. shape geometry has z-coordinate in {shp}")
             logging.error("I don't know how to process 3-D polygons (i.e. POLYGON Z).")
             sys.exit(1)
-        if isinstance(g, multipolygon.MultiPolygon):
-            for mp in g.geoms:
-                mask = mask | matplotlib.path.Path(mp.exterior.coords).contains_points(ll_array)
-        else:
-            mask = mask | matplotlib.path.Path(g.exterior.coords).contains_points(ll_array)
+        polygons = g.geoms if isinstance(g, multipolygon.MultiPolygon) else [g]
+        for polygon in polygons:
+            # Only test points inside polygon bounding box and not already in mask.
+            minx, miny, maxx, maxy = polygon.bounds
+            candidates = np.flatnonzero(~mask & (lons_flat >= minx) & (lons_flat <= maxx) &
+                                        (lats_flat >= miny) & (lats_flat <= maxy))
+            if candidates.size:
+                inside = matplotlib.path.Path(polygon.exterior.coords).contains_points(ll_array[candidates])
+                mask[candidates[inside]] = True
         logging.debug(f"pts_in_shp: {mask.sum()} points")
     shape.close()
-    return np.reshape(mask, lats.shape)
+    mask = np.reshape(mask, lats.shape)
+    if cache_file:
+        write_cached_mask(cache_file, mask)
+        logging.debug(f"pts_in_shp: saved mask to {cache_file}")
+    return mask
@@ -4,7 +4,6 @@ import datetime
 import logging
 import matplotlib.pyplot as plt
 from matplotlib.ticker import MultipleLocator
-from metpy.units import units
 import numpy as np
 import os
 import pandas as pd
@@ -33,8 +32,9 @@ def parse_args():
     parser.add_argument("-d", "--debug", action='store_true')
     parser.add_argument("--nofineprint", action='store_true', help="Don't add metadata and created by date (for comparing images)")
     parser.add_argument("-o", "--ofile", type=str, help="name of output image file")
-    parser.add_argument("--resid", action="store_true", help="calculate residual")
+    parser.add_argument("--resid", action="store_true", help="ignored, the residual is always plotted")
     parser.add_argument("-s", "--shp", type=str, default=None, help="shape file directory for mask")
+    parser.add_argument("--maskcache", type=str, default=os.path.join(os.path.expanduser("~"), ".cache", "metplotpy", "fv3_masks"), help="directory of cached shape file masks. Empty string to not cache")
     parser.add_argument("--subtract", type=argparse.FileType("r"), help="FV3 history file to subtract")
     parser.add_argument("-t", "--twindow", type=int, default=3, help="time window in hours")
     parser.add_argument("-v", "--validtime", type=lambda x:pd.to_datetime(x), help="valid time")
@@ -49,10 +49,10 @@ def main():
     variable   = args.statevariable
     config     = args.config
     debug      = args.debug
-    resid      = args.resid
     nofineprint= args.nofineprint
     ofile      = args.ofile
     shp        = args.shp
+    maskcache  = args.maskcache
     subtract   = args.subtract
     twindow    = datetime.timedelta(hours = args.twindow)
     validtime  = args.validtime
@@ -64,13 +64,7 @@ def main():
 
     # Output filename.
     if ofile is None:
-        ofile = f"{variable}.vert_profile.png"
-        if shp:
-            shp = shp.rstrip("/")
-            # Add shapefile name to output filename
-            shapename = os.path.basename(shp)
-            root, ext = os.path.splitext(ofile)
-            ofile = root + f".{shapename}" + ext
+        ofile = default_ofile(variable, shp)
     else:
         ofile = os.path.realpath(args.ofile)
         odir = os.path.dirname(ofile)
@@ -83,95 +77,36 @@ def main():
     # Reload fv3 in case user specifies a custom --config file
     fv3 = yaml.load(open(config.name), Loader=yaml.FullLoader)
 
-    # Read lat/lon/area from gfile
-    logging.debug(f"read lat/lon/area from {gfile}")
-    gds  = xarray.open_dataset(gfile.name)
+    subtract = subtract.name if subtract else None
+    fv3ds, gds = physics_tend.open_history(ifile.name, gfile.name, fv3, [variable], subtract=subtract)
+    budget = physics_tend.tendency_budget(fv3ds, variable, fv3, twindow, validtime=validtime)
+
+    sources = physics_tend.fineprint_sources(ifile.name, gfile.name, subtract=subtract)
+    plot(budget, gds, fv3, ofile, shp=shp, maskcache=maskcache, sources=sources, nofineprint=nofineprint, debug=debug)
+
+
+def plot(budget, gds, fv3, ofile, shp=None, maskcache=None, mask=None, sources="", nofineprint=False, debug=False):
+    """
+    Vertical profile of area-weighted spatial average of TendencyBudget budget saved to ofile.
+    gds is the grid spec Dataset. mask is the precomputed pts_in_shp() mask of shp, computed here if None.
+    sources is the start of the fine print (see physics_tend.fineprint_sources).
+    """
+    tendency_dim     = budget.tendency_dim
+    time0            = budget.time0
+    validtime        = budget.validtime
+    twindow_quantity = budget.twindow_quantity
     lont = gds[fv3["lon_name"]]
     latt = gds[fv3["lat_name"]]
     area = gds["area"]
 
-    # Open input file
-    logging.debug(f"About to open {ifile}")
-    fv3ds = xarray.open_dataset(ifile.name)
-    datetimeindex = fv3ds.indexes['time']
-    if hasattr(datetimeindex, "to_datetimeindex"):
-        # Convert from CFTime to pandas datetime. I get a warning CFTimeIndex from non-standard calendar 'julian'. Maybe history file should be saved with standard calendar.
-        # To turn off warning, set unsafe=True.
-        datetimeindex = datetimeindex.to_datetimeindex(unsafe=True)
-    fv3ds['time'] = datetimeindex
-    if subtract:
-        logging.debug(f"subtracting {subtract.name}")
-        with xarray.set_options(keep_attrs=True):
-            fv3ds -= xarray.open_dataset(subtract.name)
-
-    fv3ds = fv3ds.assign_coords(lont=lont, latt=latt) # lont and latt used by pcolorfill()
-    tendency_vars = fv3["tendency_varnames"][variable] # list of tendency variable names for requested state variable
-    fv3ds = physics_tend.add_time0(fv3ds, variable, fv3)
-    tendencies = fv3ds[tendency_vars] # subset of original Dataset
-
-    if validtime is None:
-        logging.debug("validtime not provided on command line, so use latest time in history file.")
-        validtime = fv3ds.time.values[-1]
-        validtime = pd.to_datetime(validtime)
-    time0 = validtime - twindow
-    time1 = time0 + datetime.timedelta(hours=1)
-    logging.info(f"Sum tendencies {time1}-{validtime}")
-    tindex = dict(time=slice(time1, validtime)) # slice of time from hour after time0 through validtime
-    tendencies_avg = tendencies.sel(tindex).mean(dim="time") # average tendencies in time 
-
-    # Dynamics (nophys) tendency is not reset every hour. Just calculate change from time0 to validtime.
-    nophys_var = [x for x in tendency_vars if x.endswith("_nophys")]
-    assert len(nophys_var) == 1
-    nophys_var = nophys_var[0] # we don't want a 1-element list; we want a string. So that tendencies[nophys_var] is a DataArray, not a Dataset.
-    logging.info(f"Subtract nophys tendency at {time0} from {validtime}")
-    nophys_delta = tendencies[nophys_var].sel(time=validtime) - tendencies[nophys_var].sel(time=time0)
-    tendencies_avg[nophys_var] = nophys_delta / args.twindow 
-
-
-    # Restore units after .mean() removed them. Copy units from 1st tendency variable.
-    tendency_units = units.parse_expression(fv3ds[tendency_vars[0]].units)
-    logging.debug(f"restoring {tendency_units} units after .mean() method removed them.")
-    tendencies_avg *= tendency_units
-    for da in tendencies_avg:
-        tendencies_avg[da] = tendencies_avg[da].metpy.convert_units("K/hour")
-    long_names = [fv3ds[da].attrs["long_name"] for da in tendencies_avg] # Make list of long_names before .to_array() loses them.
-
-    # Remove characters up to and including 1st underscore (e.g. du3dt_) in DataArray name.
-    # for example dt3dt_pbl -> pbl
-    name_dict = {da : "_".join(da.split("_")[1:]) for da in tendencies_avg.data_vars} 
-    tendencies_avg = tendencies_avg.rename(name_dict)
-
-    # Stack variables along new tendency dimension of new DataArray.
-    tendency_dim = f"{variable} tendency"
-    tendencies_avg = tendencies_avg.to_array(dim=tendency_dim)
-    # Assign long_names to a new DataArray coordinate. It will have the same shape as tendency dimension. 
-    tendencies_avg = tendencies_avg.assign_coords({"long_name":(tendency_dim,long_names)})
-
-    logging.info(f"calculate actual change in {variable}")
-    state_variable = fv3ds[variable].metpy.quantify() # Tried metpy.quantify() with open_dataset, but pint.errors.UndefinedUnitError: 'dBz' is not defined in the unit registry
-    dstate_variable = state_variable.sel(time = validtime) - state_variable.sel(time = time0)
-    dstate_variable = dstate_variable.assign_coords(time=validtime)
-    dstate_variable.attrs["long_name"] = f"actual change in {state_variable.attrs['long_name']}"
-
-    # Add all tendencies together and subtract actual rate of change in state variable.
-    # This is residual.
-    total = tendencies_avg.sum(dim=tendency_dim)
-    twindow_quantity = twindow.total_seconds() * units.seconds 
-    resid = total - dstate_variable/twindow_quantity
-
-    da2plot = tendencies_avg
-    if resid is not None:
-        # Add total and resid DataArrays to tendency_dim.
-        total = total.expand_dims({tendency_dim:["total"]}).assign_coords(long_name="sum of tendencies")
-        resid = resid.expand_dims({tendency_dim:["resid"]}).assign_coords(long_name=f"sum of tendencies - actual rate of change of {variable} (residual)")
-        da2plot = xarray.concat([da2plot, total, resid], dim=tendency_dim)
-
-
+    # Add total and resid DataArrays to tendency_dim.
+    da2plot = physics_tend.all_tendencies(budget)
 
     # Mask points outside shape.
     if shp:
         # mask points outside shape
-        mask = physics_tend.pts_in_shp(latt.values, lont.values, shp, debug=debug) # Use .values to avoid AttributeError: 'DataArray' object has no attribute 'flatten'
+        if mask is None:
+            mask = physics_tend.pts_in_shp(latt.values, lont.values, shp, debug=debug, cache_dir=maskcache) # Use .values to avoid AttributeError: 'DataArray' object has no attribute 'flatten'
         mask = xarray.DataArray(mask, coords=[da2plot.grid_yt, da2plot.grid_xt])
         da2plot = da2plot.where(mask, drop=True)
         area     = area.where(mask).fillna(0)
@@ -198,20 +133,19 @@ def main():
     logging.info("plot area-weighted spatial average...")
     lines = da2plot.plot.line(y="pfull", ax=ax, hue=tendency_dim)
 
-    if resid is not None: # resid might have been turned from a Boolean scalar variable to a DataArray.
-        # Add special marker to dstate_variable and residual lines.
-        # DataArray plot legend handles differ from the plot lines, for some reason. So if you 
-        # change the style of a line later, it is not automatically changed in the legend.
-        # zip d{variable}, resid line and their respective legend handles together and change their style together.
-        # [-2:] means take last two elements of da2plot.
-        special_lines = list(zip(lines, ax.get_legend().legendHandles))[-2:]
-        special_marker = 'o'
-        special_marker_size = 3
-        for line, leghandle in special_lines:
-            line.set_marker(special_marker)
-            line.set_markersize(special_marker_size)
-            leghandle.set_marker(special_marker)
-            leghandle.set_markersize(special_marker_size)
+    # Add special marker to dstate_variable and residual lines.
+    # DataArray plot legend handles differ from the plot lines, for some reason. So if you 
+    # change the style of a line later, it is not automatically changed in the legend.
+    # zip d{variable}, resid line and their respective legend handles together and change their style together.
+    # [-2:] means take last two elements of da2plot.
+    special_lines = list(zip(lines, ax.get_legend().legendHandles))[-2:]
+    special_marker = 'o'
+    special_marker_size = 3
+    for line, leghandle in special_lines:
+        line.set_marker(special_marker)
+        line.set_markersize(special_marker_size)
+        leghandle.set_marker(special_marker)
+        leghandle.set_markersize(special_marker_size)
 
     # Add time to title
     title = f'{time0}-{validtime} ({twindow_quantity.to("hours"):~} time window)'
@@ -232,10 +166,7 @@ def main():
         ax_inset.set_extent(extent)
 
     # Annotate figure with details about figure creation. 
-    fineprint  = f"history: {os.path.realpath(ifile.name)}"
-    if subtract:
-        fineprint  += f"\nsubtract: {os.path.realpath(subtract.name)}"
-    fineprint += f"\ngrid_spec: {os.path.realpath(gfile.name)}"
+    fineprint  = sources
     if shp: fineprint += f"\nmask: {shp}"
     fineprint += f"\ntotal area: {totalarea.data:~.0f}"
     fineprint += f"\ncreated {datetime.datetime.now(tz=None)}"
@@ -246,7 +177,18 @@ def main():
 
 
     plt.savefig(ofile, dpi=fv3["dpi"])
+    plt.close()
     logging.info(f'created {os.path.realpath(ofile)}')
 
+def default_ofile(variable, shp=None):
+    ofile = f"{variable}.vert_profile.png"
+    if shp:
+        shp = shp.rstrip("/")
+        # Add shapefile name to output filename
+        shapename = os.path.basename(shp)
+        root, ext = os.path.splitext(ofile)
+        ofile = root + f".{shapename}" + ext
+    return ofile
+
 if __name__ == "__main__":
     main()
@@ -18,13 +18,13 @@ import errno, warnings
 import yaml
 from matplotlib import cm
 import matplotlib.cbook
-import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
 from cartopy.util import add_cyclic_point
 #pylint: disable=import-error
 from netCDF4 import Dataset
 sys.path.append("../..")
 import metplotpy.plots.util as util
+from metplotpy.plots.map_template import get_map_template
 # ignore the MatplotlibFutureDeprecation warning which does not affect this code
 # since changes must be made in Cartopy code
 warnings.simplefilter(action='ignore', category=matplotlib.cbook.mplDeprecation)
@@ -90,17 +90,15 @@ class PlotGridToGrid():
             # Use the reversed Spectral colormap to reflect temperatures.
             cmap = cm.get_cmap('Spectral_r')
 
-            # generate a contour map of the variable of interest
-            plt.figure(figsize=(13, 6.2))
-            geo_ax = plt.axes(projection=ccrs.PlateCarree())
-
-            # Only plot the coastlines if the background map is requested
-            if background_on:
-                geo_ax.coastlines()
+            # The figure, map axes, coastlines (only plotted if the background map is
+            # requested) and colorbar are built once and reused for every file,
+            # only the contours are redrawn.
+            map_template = get_map_template(ccrs.PlateCarree(), figsize=(13, 6.2),
+                                            coastlines=background_on, cmap='Spectral_r')
 
             # Figure out the minimum and maximum values of the OBAR/FBAR temperature
             # and use these values in the
-            # plt.Normalize() call.
+            # colorbar normalization.
             minimum = variable.min()
             maximum = variable.max()
             # print(variable)
@@ -111,24 +109,16 @@ class PlotGridToGrid():
             # print("variable cyc: ", variable_cyc)
             # print("lon cyc: ", lon_cyc)
 
+            # generate a contour map of the variable of interest, the colorbar is
+            # normalized to the minimum and maximum values found in the variable.
             # set number of contour levels to 65, higher number results in more smoothing.
-            plt.contourf(lons, lats, variable, 65, transform=ccrs.PlateCarree(), cmap=cmap)
-
-            # Adding a legend from Stack Overflow.  Create your own mappable object
-            # (scalar mappable) that can be passed to colorbar.  Normalize values
-            # are the min and max values normalized to 0, 1 in the
-            # solution, here we use the minimum and maximum values found in the FBAR/OBAR array.
-
-            scalar_mappable = plt.cm.ScalarMappable(cmap=cmap, norm=plt.Normalize(minimum, maximum))
-            # pylint: disable=protected-access
-            scalar_mappable._A = []
-            plt.colorbar(scalar_mappable, ax=geo_ax)
-            plt.title(title)
+            map_template.contourf(lons, lats, variable, 65, cmap=cmap, vmin=minimum, vmax=maximum)
+            map_template.set_title(title)
 
             # output file will be saved as png
             output_png_file = variable_name + "_" + nc_flag_type + "_" + \
                               os.path.splitext(nc_file)[0] + ".png"
-            plt.savefig(os.path.join(output_dir, output_png_file))
+            map_template.savefig(os.path.join(output_dir, output_png_file))
 
 
 def main():
@@ -9,6 +9,7 @@
  
  
 import numpy as np
+import xarray as xr
 
 """
 Routines used to compute Hovmoeller diagrams and pattern correlation.
@@ -18,10 +19,28 @@ Included:
 lat_avg:
 
 pattern_corr:
+
+pattern_corr_leads:
 """
 
 
-def lat_avg(data, latmin, latmax):
+def _lat_mean(data, latmin, latmax, weighted=False):
+    """
+    Average of data over the latitudes between latmin and latmax, weighted by
+    the cosine of the latitude if weighted is True
+    """
+    data = data.sel(lat=slice(latmin, latmax))
+    units = data.attrs.get('units')
+    if weighted:
+        data = data.weighted(np.cos(np.deg2rad(data['lat']))).mean(dim='lat')
+    else:
+        data = data.mean(dim='lat')
+    if units is not None:
+        data.attrs['units'] = units
+    return data
+
+
+def lat_avg(data, latmin, latmax, weighted=False):
     """
     Compute latitudinal average for hovmoeller diagram.
     :param data: input data (time, lat, lon)
@@ -30,13 +49,12 @@ def lat_avg(data, latmin, latmax):
     :type latmin: float
     :param latmax: northern latitude for averaging
     :type latmax: float
+    :param weighted: weight the latitudes by their cosine
+    :type weighted: bool
     :return: data (time, lon)
     :rtype: xarray.Dataarray
     """
-    data = data.sel(lat=slice(latmin, latmax))
-    units = data.attrs['units']
-    data = data.mean(dim='lat')
-    data.attrs['units'] = units
+    data = _lat_mean(data, latmin, latmax, weighted)
     data = data.squeeze()
 
     return data
@@ -59,3 +77,42 @@ def pattern_corr(a, b):
     corr = corr[0, 1]
 
     return corr
+
+
+def pattern_corr_leads(fcst, obs, latmin=None, latmax=None):
+    """
+    Compute the pattern correlations between the (time, lon) fields of all the
+    forecasts in fcst and the observed field, at once.
+    The forecasts are stacked along the other dimensions of fcst, for example
+    (fchrs, time, lon) for the lead times or (fchrs, model, time, lon) for the
+    lead times of several models; the result has these other dimensions and is
+    the same as calling pattern_corr for each forecast.
+    If latmin and latmax are set, fcst and obs have a lat dimension and are first
+    averaged over these latitudes with cosine latitude weights, once for all the
+    forecasts.
+    The correlations of a (fchrs, model) forecast can be plotted with plot_pattcorr.
+    :param fcst: (..., time, lon) or (..., time, lat, lon) data array
+    :type fcst: xarray.Dataarray
+    :param obs: (time, lon) or (time, lat, lon) data array
+    :type obs: xarray.Dataarray
+    :param latmin: southern latitude for averaging
+    :type latmin: float
+    :param latmax: northern latitude for averaging
+    :type latmax: float
+    :return: correlations (...)
+    :rtype: xarray.Dataarray
+    """
+    if latmin is not None and latmax is not None:
+        fcst = _lat_mean(fcst, latmin, latmax, weighted=True)
+        obs = _lat_mean(obs, latmin, latmax, weighted=True)
+
+    # the forecasts and observations have the same times and longitudes
+    dims = ('time', 'lon')
+    with xr.set_options(arithmetic_join='exact'):
+        fcst_anom = fcst - fcst.mean(dim=dims)
+        obs_anom = obs - obs.mean(dim=dims)
+        obs_anom = obs_anom / np.sqrt(xr.dot(obs_anom, obs_anom, dims=dims))
+        corr = xr.dot(fcst_anom, obs_anom, dims=dims) / np.sqrt(xr.dot(fcst_anom, fcst_anom, dims=dims))
+    corr.name = 'pattern_corr'
+
+    return corr
@@ -275,8 +275,8 @@ def hovmoeller(data, lon, time, datestrt, datelast, plotpath, lats, latn, spd, s
 def plot_pattcorr(PC, labels, plotpath, lats, latn):
     """
     Plot pattern correlation curves as a function of lead time.
-    :param PC:
-    :type PC:
+    :param PC: (fchrs, line) or (fchrs) correlations, see pattern_corr_leads
+    :type PC: xarray.Dataarray
     :param labels:
     :type labels:
     :param plotpath:
@@ -292,6 +292,8 @@ def plot_pattcorr(PC, labels, plotpath, lats, latn):
     plttype = "png"
     plotname = plotpath + "PatternCorrelationHovmoeller." + plttype
     nlines = len(labels)
+    if PC.ndim == 1:
+        PC = PC.expand_dims('line', axis=1)
 
     fig = go.Figure()
     for ll in np.arange(0, nlines):
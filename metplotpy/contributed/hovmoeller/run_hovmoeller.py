@@ -58,3 +58,9 @@ hovmoeller(A, lonA, timeA, datestrt, datelast, plotpath, latMin, latMax, spd, so
 # plot using default contour levels for this variable
 # hovmoeller(A, lonA, timeA, datestrt, datelast, plotpath, latMin, latMax, spd, source, var, lev)
 
+# pattern correlation of forecasts stacked as (fchrs, model, time, lat, lon) with the
+# observations (time, lat, lon), for all lead times and models at once
+# from metplotpy.contributed.hovmoeller.hovmoeller_calc import pattern_corr_leads
+# from metplotpy.contributed.hovmoeller.hovmoeller_plotly import plot_pattcorr
+# PC = pattern_corr_leads(F, O, latmin=latMin, latmax=latMax)
+# plot_pattcorr(PC, F.model.values, plotpath, latMin, latMax)
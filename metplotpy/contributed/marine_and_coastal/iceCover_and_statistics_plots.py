@@ -33,13 +33,14 @@ import xarray as xr
 import pandas as pd
 from pyproj import Geod
 import pyresample as pyr
-from datetime import datetime, date
+from datetime import datetime
 import PIL 
 from PIL import Image
 import io
 import sqlite3
 import os, sys
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 #from mmab_toolkit import MidpointNormalize, add_mmab_logos
 #import ipdb; ipdb.set_trace()
 
@@ -52,6 +53,8 @@ UPDATE_DB=True
 UPLOAD_TO_POLAR=False
 MAKE_MOVIE=False
 
+DBFILE='/scratch2/NCEPDEV/marine/Todd.Spindler/save/VPPPG/Global_RTOFS/EMC_ocean-verification/ice/fix/global_ice.db'
+
 # initialize the database
 def init_db(dbfile):
     
@@ -73,6 +76,8 @@ def init_db(dbfile):
                                               'ncep_area real,' + 
                                               'rtofs_area real,' +
                                               'unique(date,hemisphere))')
+    # the unique constraint is backed by an index on (date,hemisphere),
+    # which the windowed queries in read_db use
                                   
     # Save (commit) the changes
     conn.commit()
@@ -81,40 +86,78 @@ def init_db(dbfile):
     conn.close()    
     return
 
-# initialize the database
-def update_db(dbfile,date,hemisphere,mu,sigma,bias,rms,cc,si,ncep_extent,rtofs_extent,ncep_area,rtofs_area):
-    
+#-------------------------------------
+# open a connection, creating the table if needed
+#-------------------------------------
+def connect_db(dbfile):
+
     if not os.path.isfile(dbfile):
         init_db(dbfile)
-        
-    # connect to db file
-    conn = sqlite3.connect(dbfile,detect_types=sqlite3.PARSE_DECLTYPES,timeout=30.0)
-    c = conn.cursor()    
-    
-    # Larger example that inserts many records at a time
-    
+
+    return sqlite3.connect(dbfile,detect_types=sqlite3.PARSE_DECLTYPES,timeout=30.0)
+
+#-------------------------------------
+# build one row of the ice table
+#-------------------------------------
+def db_record(date,hemisphere,mu,sigma,bias,rms,cc,si,ncep_extent,rtofs_extent,ncep_area,rtofs_area):
+
     y,m,d=int(date[0:4]),int(date[4:6]),int(date[6:8])
     thedate=datetime(y,m,d)
-    
-    update = (thedate,hemisphere,mu,sigma,bias,rms,cc,si,ncep_extent,rtofs_extent,ncep_area,rtofs_area)
-    
-    c.execute('REPLACE INTO ice VALUES (?,?,?,?,?,?,?,?,?,?,?,?)', update)
-    
-    # Save (commit) the changes
-    conn.commit()
-                 
+
+    return (thedate,hemisphere,mu,sigma,bias,rms,cc,si,ncep_extent,rtofs_extent,ncep_area,rtofs_area)
+
+#-------------------------------------
+# write many rows in a single transaction
+#-------------------------------------
+def update_db_many(conn,records):
+
+    # the connection context manager commits on success, rolls back on error
+    with conn:
+        conn.executemany('REPLACE INTO ice VALUES (?,?,?,?,?,?,?,?,?,?,?,?)', records)
+
+# update the database with one day/hemisphere
+def update_db(dbfile,date,hemisphere,mu,sigma,bias,rms,cc,si,ncep_extent,rtofs_extent,ncep_area,rtofs_area):
+
+    conn=connect_db(dbfile)
+    update = db_record(date,hemisphere,mu,sigma,bias,rms,cc,si,ncep_extent,rtofs_extent,ncep_area,rtofs_area)
+    update_db_many(conn,[update])
+
     # close the connection
-    conn.close()    
+    conn.close()
 
 #-------------------------------------
 # read the database back in
 #-------------------------------------
-def read_db(dbfile):
-    
-    conn=sqlite3.connect(dbfile,detect_types=sqlite3.PARSE_DECLTYPES,timeout=30.0)
-    results=pd.read_sql('SELECT DISTINCT * FROM ice',conn)
-    conn.close()
-    
+def read_db(dbfile,hemisphere=None,start=None,end=None,conn=None):
+    """
+    Read the ice table, optionally restricted to one hemisphere and a
+    [start, end] date window so only the rows being plotted are loaded.
+    An open connection may be passed in to avoid reconnecting.
+    """
+    clauses=[]
+    params=[]
+    if hemisphere is not None:
+        clauses.append('hemisphere = ?')
+        params.append(hemisphere)
+    if start is not None:
+        clauses.append('date >= ?')
+        params.append(pd.to_datetime(start).to_pydatetime())
+    if end is not None:
+        clauses.append('date <= ?')
+        params.append(pd.to_datetime(end).to_pydatetime())
+
+    query='SELECT DISTINCT * FROM ice'
+    if clauses:
+        query+=' WHERE '+' AND '.join(clauses)
+    query+=' ORDER BY date'
+
+    if conn is None:
+        conn=sqlite3.connect(dbfile,detect_types=sqlite3.PARSE_DECLTYPES,timeout=30.0)
+        results=pd.read_sql(query,conn,params=params)
+        conn.close()
+    else:
+        results=pd.read_sql(query,conn,params=params)
+
     return results
 #-------------------------------------
 # figure optimization and compression 
@@ -249,17 +292,14 @@ def make_maps(imageDir,hemisphere,theDate,
     return
 
 #---------------------------------------------------------------
-def plot_stats(imageDir,hemisphere,theDate,dbfile,lookback='180 d'):
+def plot_stats(imageDir,hemisphere,theDate,dbfile,lookback='180 d',conn=None):
     """
     Plot accumulated statistics with a 6-month lookback
     """
 
-    results=read_db(dbfile)
-    results=results[results.hemisphere==hemisphere]
-    results.index=results.date
-    
     minDate=pd.to_datetime(theDate)-pd.Timedelta(lookback)
-    results=results[minDate:theDate]
+    results=read_db(dbfile,hemisphere=hemisphere,start=minDate,end=theDate,conn=conn)
+    results.index=results.date
 
     # diff plot
     plt.figure(dpi=150)
@@ -313,7 +353,11 @@ def plot_stats(imageDir,hemisphere,theDate,dbfile,lookback='180 d'):
     return
 
 #-------------------------------------------------------
-def process_one_day(theDate,hemisphere):
+def compute_one_day(theDate,hemisphere):
+    """
+    Read, interpolate and verify one day for one hemisphere, drawing the maps.
+    Returns the database row for the day, or None if an input file is missing.
+    """
     
     print('processing',hemisphere+'ern hemisphere')
     if hemisphere == 'north':
@@ -323,10 +367,9 @@ def process_one_day(theDate,hemisphere):
         crs=ccrs.SouthPolarStereo(central_longitude=-60.)
         bounding_lat=-39.23
         
-    imageDir='/scratch2/NCEPDEV/stmp1/Todd.Spindler/images/ice/'+theDate
+    imageDir=image_dir(theDate)
     rtofsfile='/scratch2/NCEPDEV/marine/Todd.Spindler/noscrub/Global/archive/'+theDate+'/rtofs_glo_2ds_n024_ice.nc'
     icefile='/scratch2/NCEPDEV/marine/Todd.Spindler/noscrub/OSTIA/OSTIA-UKMO-L4-GLOB-v2.0_'+theDate+'.nc'
-    dbfile='/scratch2/NCEPDEV/marine/Todd.Spindler/save/VPPPG/Global_RTOFS/EMC_ocean-verification/ice/fix/global_ice.db'
         
     # separate the images by date
     if not os.path.isdir(imageDir):
@@ -336,7 +379,7 @@ def process_one_day(theDate,hemisphere):
     print('reading rtofs ice')
     if not os.path.exists(rtofsfile):
         print('missing rtofs file',rtofsfile)
-        return
+        return None
     rtofs=xr.open_dataset(rtofsfile,decode_times=True)
     rtofs=rtofs.ice_coverage[0,:-1,]
     #rtofs=rtofs[::-1,] # flip it to match ncep ice
@@ -345,7 +388,7 @@ def process_one_day(theDate,hemisphere):
     print('reading ncep ice')
     if not os.path.exists(icefile):
         print('missing ncep ice file',icefile)
-        return
+        return None
 
     ncep=xr.open_dataset(icefile,decode_times=True)
     ncep=ncep.rename({'lon':'Longitude','lat':'Latitude'})
@@ -419,10 +462,28 @@ def process_one_day(theDate,hemisphere):
     make_maps(imageDir,hemisphere,theDate,
               nlon1,nlat1,nice2,nlon1,nlat1,rice2,
               diff,crs,ncep_area,rtofs_area,mu,sigma,bias,rms,cc,si)
-    
+
+    return db_record(theDate,hemisphere,mu,sigma,bias,rms,cc,si,ncep_extent,rtofs_extent,ncep_area,rtofs_area)
+
+#-------------------------------------------------------
+def image_dir(theDate):
+    return '/scratch2/NCEPDEV/stmp1/Todd.Spindler/images/ice/'+theDate
+
+#-------------------------------------------------------
+def process_one_day(theDate,hemisphere):
+
+    record=compute_one_day(theDate,hemisphere)
+    if record is None:
+        return
+
+    imageDir=image_dir(theDate)
+    dbfile=DBFILE
+
     # update the dbase
     if UPDATE_DB:
-        update_db(dbfile,theDate,hemisphere,mu,sigma,bias,rms,cc,si,ncep_extent,rtofs_extent,ncep_area,rtofs_area)
+        conn=connect_db(dbfile)
+        update_db_many(conn,[record])
+        conn.close()
 
     # plot ice stats
     if PLOT_STATS:
@@ -445,18 +506,53 @@ def process_one_day(theDate,hemisphere):
         
     return
 
+#-------------------------------------------------------
+def process_date_range(startDate,endDate,hemispheres=('north','south'),nprocs=4):
+    """
+    Batch reprocessing of every day in [startDate, endDate] (YYYYMMDD) for
+    each hemisphere.  The days are verified in parallel worker processes,
+    then all rows are written with one connection in a single transaction
+    and the statistics plots are drawn reading only their lookback window.
+    """
+    days=pd.date_range(pd.to_datetime(startDate),pd.to_datetime(endDate),freq='D').strftime('%Y%m%d')
+    jobs=[(theDate,hemi) for theDate in days for hemi in hemispheres]
+
+    with ProcessPoolExecutor(max_workers=nprocs) as pool:
+        records=list(pool.map(compute_one_day,*zip(*jobs)))
+
+    done=[job for job,record in zip(jobs,records) if record is not None]
+    records=[record for record in records if record is not None]
+    print('verified',len(records),'of',len(jobs),'days/hemispheres')
+
+    conn=connect_db(DBFILE)
+    try:
+        if UPDATE_DB:
+            update_db_many(conn,records)
+        if PLOT_STATS:
+            for theDate,hemi in done:
+                plot_stats(image_dir(theDate),hemi,theDate,DBFILE,conn=conn)
+    finally:
+        conn.close()
+
+    return records
+
 #-----------------------------------------------------------------
 
 if __name__ == '__main__':
 
-    theDate=sys.argv[1]
-
     if len(sys.argv)<2:
         theDate=datetime.now().strftime('%Y%m%d')
+    else:
+        theDate=sys.argv[1]
 
-    print('Starting Ice Concentration V&V at',datetime.now(),'for',theDate)
-    
-    for hemi in ['north','south']:
-        process_one_day(theDate,hemi)
+    if len(sys.argv)>2:
+        # batch mode: start and end dates
+        print('Starting Ice Concentration V&V at',datetime.now(),'for',theDate,'to',sys.argv[2])
+        process_date_range(theDate,sys.argv[2])
+    else:
+        print('Starting Ice Concentration V&V at',datetime.now(),'for',theDate)
+
+        for hemi in ['north','south']:
+            process_one_day(theDate,hemi)
 
     print('completed ice at',datetime.now())
@@ -8,15 +8,20 @@
  
  
  
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 from matplotlib.ticker import AutoMinorLocator
 
 
-def phase_diagram(indexname,PC1,PC2,dates,months,days,plotname='./MJO_phase_diagram',plottype='png'):
+def phase_diagram(indexname,PC1,PC2,dates,months,days,plotname='./MJO_phase_diagram',plottype='png',
+                  max_labels=200):
     """
     Plot phase diagram for OMI or RMM. Do not flip the sign and PCs for OMI before
-    passing to the routine.
+    passing to the routine. The trajectory is drawn as one collection of segments
+    colored by month, so long records don't create an artist per day.
     :param indexname: name of index, should be either OMI or RMM
     :type indexname: string
     :param PC1: first principal component, either from observations or computed
@@ -26,7 +31,9 @@ def phase_diagram(indexname,PC1,PC2,dates,months,days,plotname='./MJO_phase_diag
     :param days: numpy array of day of month intergers for each time in PC1 and PC2
     :param plotname: name of figure file
     :param plottype: type of figure file to save
-    :return: none
+    :param max_labels: maximum number of day labels, every fifth day is labeled up to
+        this number, only some of them beyond it. No limit if None.
+    :return: the figure
     """
 
     # flip the sign for OMI to match RMM phases
@@ -41,10 +48,6 @@ def phase_diagram(indexname,PC1,PC2,dates,months,days,plotname='./MJO_phase_diag
     colors = ['black','gold','darkgreen','tab:red','tab:purple','tab:orange',
     'tab:blue','tab:grey','tab:green','tab:pink','tab:olive','tab:cyan']
 
-    nMon            = 0
-    monName         = [monthnames[months[0]-1]]
-    monCol          = [colors[months[0]-1]]
-
     # plot phase diagram
     fig = plt.figure()
     ax = fig.add_subplot(111)
@@ -61,28 +64,36 @@ def phase_diagram(indexname,PC1,PC2,dates,months,days,plotname='./MJO_phase_diag
     circle = plt.Circle((0, 0), radius=1.0, fc='k', ec='k', alpha=0.2)
     plt.gca().add_patch(circle)
 
-    # cycle over dates and plot the two princial components against each other  
+    # plot the two princial components against each other
     alph=1.0
-    time = dates
     labelday = 5  # label every fifth day
+    PC1 = np.asarray(PC1)
+    PC2 = np.asarray(PC2)
+    months = np.asarray(months)
+    days = np.asarray(days)
 
     # start marker
     plt.plot(PC1[0],PC2[0],color='k',marker='o',markersize=5)
-    # loop through dates and plot line from current to next time 
-    for im in np.arange(0,len(months)-1):
-        lcolor = colors[months[im]-1]
-        plt.plot(PC1[im:im+2],PC2[im:im+2],'-',color=lcolor,alpha=alph)
-        plt.plot(PC1[im],PC2[im],color='k',alpha=alph,marker='o',markersize=2)
-        # text labels for the days
-        if days[im]%labelday==0:
-            plt.text(PC1[im],PC2[im],str(days[im]),color='k')
-        # get current month color for month labels
-        if im>0 and days[im]==1:
-            nMon = nMon+1
-            monName.append(monthnames[months[im]-1])
-            monCol.append(colors[months[im]-1])   
-    # last date marker        
-    plt.plot(PC1[len(months)-1],PC2[len(months)-1],color='k',alpha=alph,marker='o',markersize=2)    
+    # line from each time to the next one, in the color of the month of the first time
+    points = np.column_stack((PC1, PC2))
+    segments = np.stack((points[:-1], points[1:]), axis=1)
+    segment_colors = np.array(colors)[months[:-1]-1]
+    ax.add_collection(LineCollection(segments, colors=segment_colors, alpha=alph,
+                                     capstyle='projecting', joinstyle='round'))
+    # markers of all the dates
+    plt.plot(PC1,PC2,color='k',alpha=alph,marker='o',markersize=2,linestyle='none')
+
+    # text labels for the days
+    labels = np.flatnonzero(days[:-1]%labelday==0)
+    if max_labels is not None and len(labels) > max_labels:
+        labels = labels[::int(np.ceil(len(labels)/max_labels))]
+    for im in labels:
+        plt.text(PC1[im],PC2[im],str(days[im]),color='k')
+
+    # month names, for the first month and each month starting in the record
+    newmonths = np.concatenate(([0], np.flatnonzero(days[1:-1]==1)+1))
+    monName = [monthnames[months[im]-1] for im in newmonths]
+    monCol = [colors[months[im]-1] for im in newmonths]
 
     # axis labels and title 
     #plt.xlabel(indexname+'1')
@@ -107,14 +118,52 @@ def phase_diagram(indexname,PC1,PC2,dates,months,days,plotname='./MJO_phase_diag
 
     # text for month names
     xstrt=0.01
-    for im in np.arange(0,nMon+1,1):
-        plt.text(xstrt, 0.01, monName[im], color=monCol[im], horizontalalignment='left', verticalalignment='bottom',
+    for name, col in zip(monName, monCol):
+        plt.text(xstrt, 0.01, name, color=col, horizontalalignment='left', verticalalignment='bottom',
         transform=ax.transAxes)
         xstrt=xstrt+0.08
 
     # save figure to file
     plt.savefig(plotname+'.'+plottype,format=plottype)
 
+    return fig
+
+
+def _season_phase_diagram(args):
+    fig = phase_diagram(*args)
+    plt.close(fig)
+    return args[6]+'.'+args[7]
+
+
+def phase_diagrams(indexname,PC1,PC2,dates,months,days,seasons,plotname='./MJO_phase_diagram',plottype='png',
+                   nprocs=1):
+    """
+    Plot the phase diagrams of several seasons of one OMI or RMM record, see phase_diagram.
+    The seasons are plotted on a pool of nprocs processes.
+    :param indexname: name of index, should be either OMI or RMM
+    :param PC1: first principal component, either from observations or computed
+    :param PC2: second principal component, either from observations or computed
+    :param dates: numpy array of dates
+    :param months: numpy array of month integers for each time in PC1 and PC2
+    :param days: numpy array of day of month intergers for each time in PC1 and PC2
+    :param seasons: dictionary of the name of each season and its (first date, last date)
+    :param plotname: name of figure files, the name of the season is appended to it
+    :param plottype: type of figure files to save
+    :param nprocs: number of processes, the seasons are plotted in this process if 1
+    :return: list of the figure files
+    """
+    PC1, PC2, dates, months, days = (np.asarray(x) for x in (PC1, PC2, dates, months, days))
+    jobs = []
+    for name, (start, end) in seasons.items():
+        season = (dates >= start) & (dates <= end)
+        jobs.append((indexname, PC1[season], PC2[season], dates[season], months[season], days[season],
+                     plotname+'_'+str(name), plottype))
+
+    if nprocs is None or nprocs <= 1 or len(jobs) <= 1:
+        return [_season_phase_diagram(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(nprocs, len(jobs))) as executor:
+        return list(executor.map(_season_phase_diagram, jobs))
+
 
 
 def pc_time_series(indexname,PC1,PC2,dates,months,days,plotname='./MJO_time_series',plottype='png'):
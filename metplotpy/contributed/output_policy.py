@@ -0,0 +1,172 @@
+# ============================*
+# ** Copyright UCAR (c) 2024
+# ** University Corporation for Atmospheric Research (UCAR)
+# ** National Center for Atmospheric Research (NCAR)
+# ** Research Applications Lab (RAL)
+# ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+# ============================*
+
+
+"""
+Module Name: output_policy.py
+
+Output of the figures of the contributed matplotlib plots (blocking, weather regimes).
+An OutputPolicy sets the formats, the resolution and the bounding box of the output
+files of a figure.  save_figure() writes all the formats of a figure with the Agg
+backend: the tight bounding box is computed once for all the formats instead of
+with an extra draw of the figure by each savefig(), the PNG files can be reduced to
+a 256 colors palette and the figure is closed once saved.
+
+Unset fields of a policy are read from the environment:
+  * METPLOTPY_PLOT_FORMATS: comma separated formats, the formats of the plot by default
+  * METPLOTPY_PLOT_DPI: resolution in dots per inch, 400 by default
+  * METPLOTPY_PLOT_TIGHT: crop the figure to its tight bounding box, True by default
+  * METPLOTPY_PLOT_OPTIMIZE_PNG: quantize and optimize the PNG files, False by default
+"""
+
+import io
+import os
+from collections import namedtuple
+from contextlib import nullcontext
+
+import matplotlib.pyplot as plt
+from matplotlib import rcParams
+from matplotlib.backends.backend_agg import RendererAgg
+from PIL import Image
+
+DEFAULT_DPI = 400
+
+# formats: list of file formats (extensions), dpi: resolution of the figure,
+# tight: crop to the tight bounding box, optimize_png: quantize and optimize the PNG files
+OutputPolicy = namedtuple('OutputPolicy', ['formats', 'dpi', 'tight', 'optimize_png'],
+                          defaults=[None, None, None, None])
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None or value.strip() == '':
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def resolve_policy(policy=None, formats=('png',)):
+    """Fill the unset fields of an output policy
+
+    Parameters
+    ----------
+    policy : OutputPolicy or None
+    formats : the formats of the plot, used if neither the policy nor the environment set them
+
+    Returns
+    -------
+    OutputPolicy with all fields set
+
+    """
+    policy = policy or OutputPolicy()
+    if policy.formats is None:
+        env_formats = os.environ.get('METPLOTPY_PLOT_FORMATS')
+        if env_formats:
+            formats = [fmt.strip() for fmt in env_formats.split(',') if fmt.strip()]
+    else:
+        formats = [policy.formats] if isinstance(policy.formats, str) else policy.formats
+    dpi = policy.dpi
+    if dpi is None:
+        dpi = float(os.environ.get('METPLOTPY_PLOT_DPI', DEFAULT_DPI))
+    tight = policy.tight
+    if tight is None:
+        tight = _env_bool('METPLOTPY_PLOT_TIGHT', True)
+    optimize_png = policy.optimize_png
+    if optimize_png is None:
+        optimize_png = _env_bool('METPLOTPY_PLOT_OPTIMIZE_PNG', False)
+    return OutputPolicy([fmt.lower() for fmt in formats], dpi, tight, optimize_png)
+
+
+def tight_bbox(fig, dpi, pad_inches=None):
+    """Tight bounding box of a figure, as computed by savefig(bbox_inches='tight')
+
+    The figure is laid out once with an Agg renderer at the output resolution,
+    without rasterizing it.
+
+    Parameters
+    ----------
+    fig : matplotlib Figure
+    dpi : resolution of the output
+    pad_inches : padding around the bounding box, rcParams['savefig.pad_inches'] by default
+
+    Returns
+    -------
+    The padded bounding box in inches
+
+    """
+    if pad_inches is None:
+        pad_inches = rcParams['savefig.pad_inches']
+    figure_dpi = fig.dpi
+    try:
+        fig.dpi = dpi
+        renderer = RendererAgg(fig.bbox.width, fig.bbox.height, dpi)
+        with getattr(renderer, '_draw_disabled', nullcontext)():
+            fig.draw(renderer)
+        bbox = fig.get_tightbbox(renderer)
+    finally:
+        fig.dpi = figure_dpi
+    return bbox.padded(pad_inches)
+
+
+def save_png(fig, filename, optimize=False, **kwargs):
+    """Save a figure in PNG format, optionally reduced to a 256 colors palette
+
+    Parameters
+    ----------
+    fig : matplotlib Figure
+    filename : path of the PNG file
+    optimize : quantize the image to an adaptive palette and optimize the file
+    kwargs : arguments of savefig
+
+    Returns
+    -------
+    None
+
+    """
+    if not optimize:
+        fig.savefig(filename, format='png', **kwargs)
+        return
+    with io.BytesIO() as ram:
+        fig.savefig(ram, format='png', **kwargs)
+        ram.seek(0)
+        with Image.open(ram) as im:
+            im2 = im.convert('RGB').convert('P', palette=Image.Palette.ADAPTIVE, colors=256)
+            im2.save(filename, format='PNG', optimize=True)
+
+
+def save_figure(fig, output_plotname, formats=('png',), policy=None, close=True):
+    """Save a figure in all the formats of the output policy
+
+    Parameters
+    ----------
+    fig : matplotlib Figure
+    output_plotname : path of the output files without extension
+    formats : the formats of the plot, see resolve_policy()
+    policy : OutputPolicy or None
+    close : close the figure once saved
+
+    Returns
+    -------
+    The list of the paths of the output files
+
+    """
+    policy = resolve_policy(policy, formats)
+    bbox_inches = tight_bbox(fig, policy.dpi) if policy.tight else None
+
+    output_files = []
+    for fmt in policy.formats:
+        full_output_plot = output_plotname + "." + fmt
+        if fmt == 'png':
+            save_png(fig, full_output_plot, optimize=policy.optimize_png,
+                     dpi=policy.dpi, bbox_inches=bbox_inches)
+        else:
+            fig.savefig(full_output_plot, format=fmt, dpi=policy.dpi, bbox_inches=bbox_inches)
+        output_files.append(full_output_plot)
+
+    if close:
+        plt.close(fig)
+    return output_files
@@ -8,17 +8,57 @@
  
  
  
-"""Creates animation (gif) file of the static plots generated
-   from a series analysis by lead for all forecast hours.
+"""Creates animation (gif or mp4) file of the static plots generated
+   from a series analysis by lead for all forecast hours, or renders the
+   frames directly from the series analysis netcdf files.
 """
 
 import re
 import os, sys
 import errno
 import yaml
+import numpy as np
+import cartopy.crs as ccrs
+#pylint: disable=import-error
+from netCDF4 import Dataset
 sys.path.append("../..")
 import metplotpy.contributed.series_analysis.animate_utilities as au
 import metplotpy.plots.util as util
+from metplotpy.plots.map_template import get_map_template
+from metplotpy.contributed.series_analysis.series_file_index import SeriesFileIndex
+
+
+def render_frame_from_netcdf(input_nc_file, statistic, title, background_on,
+                             value_range=None):
+    """
+        Draw the OBAR/FBAR contour map of one series analysis netcdf file and
+        return it as an RGB array, no intermediate png file is written.  The
+        map is drawn the same way plot_series_by_lead_all draws it.  This is a
+        module level function so that it can be run in worker processes.
+
+        :param input_nc_file: The full path to the netcdf file
+        :param statistic: The statistic to draw, obar or fbar
+        :param title: The title of the frame
+        :param background_on: Draw the coastlines when True
+        :param value_range: Optional (min, max) of the contour levels and colorbar,
+                            the range of the frame's values by default
+        :return: the frame as a (height, width, 3) uint8 array
+    """
+    with Dataset(input_nc_file, mode='r') as file_handle:
+        lons = file_handle.variables['lon'][:]
+        lats = file_handle.variables['lat'][:]
+        value = file_handle.variables['series_cnt_' + statistic.upper()][:]
+
+    map_template = get_map_template(ccrs.PlateCarree(), figsize=(13, 6.2),
+                                    coastlines=background_on, cmap='Spectral_r')
+    # set number of contour levels to 65, higher number results in more smoothing.
+    if value_range is None:
+        map_template.contourf(lons, lats, value, 65, vmin=value.min(), vmax=value.max())
+    else:
+        map_template.contourf(lons, lats, value, np.linspace(value_range[0], value_range[1], 65),
+                              vmin=value_range[0], vmax=value_range[1])
+    map_template.set_title(title)
+    return au.figure_to_array(map_template.figure)
 
 
 class AnimateSeriesByLeadAll():
@@ -72,7 +112,8 @@ class AnimateSeriesByLeadAll():
 
         return sorted_var_level_stat_paths
 
-    def create_output_filename(self, output_dir, file_to_animate, filename_regex):
+    def create_output_filename(self, output_dir, file_to_animate, filename_regex,
+                               extension='.gif'):
         ''' Create an output file using the directory specified by the user, and
              based on one of the input files (minus
              the Fxyz portion, hence only one sample is needed)
@@ -84,6 +125,7 @@ class AnimateSeriesByLeadAll():
              :param filename_regex:  The regular expression which defines the format
                                      of the png file, used to
                                      create the output gif (animation) file.
+             :param extension: The animation format, .gif or .mp4
         '''
 
         # filename_regex = "series_F([0-9]{3})_to_F([0-9]{3})_([A-Z]{3})_((P|Z)[0-9]{1,3})_(obar|fbar).png"
@@ -98,8 +140,21 @@ class AnimateSeriesByLeadAll():
                 "Input file's format does not match expected format, please check the "
                 "input filename regular expression")
 
+        return self.build_output_filename(output_dir, variable, full_level, statistic, extension)
+
+    def build_output_filename(self, output_dir, variable, full_level, statistic,
+                              extension='.gif'):
+        ''' Create the full path of the animation file, series_[var]_[level]_[stat].[ext],
+            creating the output directory if needed.
+
+             :param output_dir:  The directory where the final animation file is to be saved
+             :param variable: The variable, e.g. TMP
+             :param full_level: The level type and level, e.g. Z2
+             :param statistic: The statistic, obar or fbar
+             :param extension: The animation format, .gif or .mp4
+        '''
         output_name = "series_" + variable + "_" + full_level + "_" + \
-                      statistic + ".gif"
+                      statistic + extension
 
         # create the output directory if it doesn't exist (equivalent of mkdir -p)
         try:
@@ -111,6 +166,48 @@ class AnimateSeriesByLeadAll():
 
         return output_filename
 
+    def animate_from_netcdf(self, input_nc_file_dir, forecast_hours, variable, level_type,
+                            level, statistic, output_filename, background_on=False,
+                            nprocs=None):
+        ''' Render the frames straight from the netcdf files written by the series
+            analysis by lead (input_nc_file_dir/series_Fnnn/series_Fnnn_to_Fnnn_[var]_[level].nc)
+            on a pool of processes and stream them into the animation file, without
+            writing intermediate png files.
+
+             :param input_nc_file_dir: The directory above the series_Fnnn subdirectories
+             :param forecast_hours: The list of forecast hours, e.g. ['F000', 'F006']
+             :param variable: The variable: TMP, HGT, etc.
+             :param level_type: Level type, P or Z
+             :param level: The level: 500, 850, etc.
+             :param statistic: The statistic of interest, obar or fbar
+             :param output_filename: The full path of the gif or mp4 file
+             :param background_on: Draw the coastlines when True
+             :param nprocs: The number of rendering processes, None for the number of cpus
+             :return: the number of frames written
+        '''
+        frame_args = []
+        for fhr in sorted(forecast_hours):
+            hour = fhr.lstrip('F')
+            input_nc_file = os.path.join(input_nc_file_dir, 'series_' + fhr,
+                                         'series_' + fhr + '_to_' + fhr + '_' + variable + '_' +
+                                         level_type + str(level) + '.nc')
+            title = " series by init " + statistic.upper() + " for fhr " + hour + " " + \
+                    variable + " " + level_type + str(level)
+            frame_args.append([input_nc_file, statistic, title, background_on])
+
+        # Optional: the same contour levels and colorbar range for every frame
+        if str(self.config.get('consistent_colorbar', 'False')).upper() == 'TRUE':
+            file_index = SeriesFileIndex(input_nc_file_dir)
+            value_range = file_index.series_range('series_cnt_' + statistic.upper(),
+                                                  [args[0] for args in frame_args])
+            for args in frame_args:
+                args.append(value_range)
+
+        palette_size = int(self.config.get('palette_size', 256))
+        frames = au.render_frames(render_frame_from_netcdf, frame_args, nprocs=nprocs)
+        return au.write_animation(frames, output_filename,
+                                  self.config['animation_duration_secs'], palette_size)
+
 
 def main():
     """Performs animation of static (png) files that were created by plot_series_by_lead_all.
@@ -140,13 +237,31 @@ def main():
     #list of statistics of interest
     statistics_of_interest = asbl.config['statistic_of_interest']
 
+    # optional settings: the animation format (gif or mp4), the netcdf directory
+    # to render the frames from instead of the static plots, and the number of
+    # rendering processes
+    extension = '.' + str(asbl.config.get('animation_format', 'gif')).lower().lstrip('.')
+    input_nc_file_dir = asbl.config.get('input_nc_file_dir')
+    nprocs = asbl.config.get('nprocs')
+    background_on = str(asbl.config.get('background_on', 'False')).upper() == 'TRUE'
+
     # Animate the plots corresponding to the statistics of interest for the corresponding forecast, variable, and level
     for statistic in statistics_of_interest:
-        stat_files = asbl.collect_files_to_animate(input_dir, fhrs_list, variable,
-                                          level_type, level, statistic)
-        # create output filename for statistic animation (gif) file
-        output_filename = asbl.create_output_filename(output_dir, stat_files[0], filename_regex)
-        au.create_gif(animation_duration_secs, stat_files, output_filename)
+        if input_nc_file_dir:
+            output_filename = asbl.build_output_filename(output_dir, variable,
+                                                         level_type + str(level),
+                                                         statistic, extension)
+            asbl.animate_from_netcdf(input_nc_file_dir, fhrs_list, variable, level_type,
+                                     level, statistic, output_filename, background_on,
+                                     nprocs)
+        else:
+            stat_files = asbl.collect_files_to_animate(input_dir, fhrs_list, variable,
+                                              level_type, level, statistic)
+            # create output filename for statistic animation (gif) file
+            output_filename = asbl.create_output_filename(output_dir, stat_files[0],
+                                                          filename_regex, extension)
+            au.write_animation(stat_files, output_filename, animation_duration_secs,
+                               int(asbl.config.get('palette_size', 256)))
 
 
 if __name__ == "__main__":
@@ -14,6 +14,9 @@
 import os
 import re
 import errno
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import imageio
 
 
@@ -53,8 +56,92 @@ def create_gif(duration_secs, files_to_animate, output_filename):
 
     '''
 
-    images = [imageio.imread(filename) for filename in files_to_animate]
-    imageio.mimsave(output_filename, images, duration=duration_secs)
+    write_animation(files_to_animate, output_filename, duration_secs)
+
+
+def write_animation(frames, output_filename, duration_secs, palette_size=256):
+    """
+        Stream frames into a gif or mp4 file, one frame at a time, so that only
+        the frame being encoded is held in memory.
+
+        :param frames: An iterable of frames in the order they are to appear,
+                       either image filenames (png/jpg) or RGB(A) uint8 arrays,
+                       e.g. the output of render_frames().
+        :param output_filename: The full path of the animation file, the format
+                                is chosen by the extension (.gif or .mp4).
+        :param duration_secs: The time in seconds to view each frame
+        :param palette_size: The number of colors of the gif palette (a power
+                             of 2, at most 256), each frame is quantized to it.
+                             Ignored for mp4 output.
+        :return: the number of frames written
+    """
+    duration_secs = float(duration_secs)
+    if output_filename.lower().endswith('.mp4'):
+        # requires the imageio-ffmpeg package
+        writer = imageio.get_writer(output_filename, fps=1.0 / duration_secs)
+    else:
+        writer = imageio.get_writer(output_filename, mode='I', duration=duration_secs,
+                                    palettesize=palette_size)
+
+    num_frames = 0
+    with writer:
+        for frame in frames:
+            if isinstance(frame, str):
+                frame = imageio.imread(frame)
+            frame = np.asarray(frame)
+            # drop the alpha channel of color frames, neither format needs it
+            if frame.ndim == 3:
+                frame = frame[..., :3]
+            writer.append_data(frame)
+            num_frames += 1
+
+    return num_frames
+
+
+def render_frames(render_func, frame_args, nprocs=None, max_pending=None):
+    """
+        Render the frames of an animation on a pool of processes, yielding the
+        rendered frames in order as they complete.  At most max_pending frames
+        are rendered ahead of the consumer, which bounds the memory used when
+        the frames are streamed into write_animation().
+
+        :param render_func: A picklable (module level) function returning one
+                            frame as an RGB(A) array, e.g. figure_to_array() of
+                            the figure it draws.
+        :param frame_args: An iterable of argument tuples, one per frame.
+        :param nprocs: The number of worker processes, None for the number of
+                       cpus, 1 to render in the calling process.
+        :param max_pending: The maximum number of frames submitted but not yet
+                            consumed, by default twice the number of workers.
+    """
+    if nprocs == 1:
+        for args in frame_args:
+            yield render_func(*args)
+        return
+
+    if max_pending is None:
+        max_pending = 2 * (nprocs or os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(max_workers=nprocs) as pool:
+        pending = deque()
+        for args in frame_args:
+            pending.append(pool.submit(render_func, *args))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def figure_to_array(figure):
+    """
+        Rasterize a matplotlib figure to an RGB array, without writing an
+        intermediate image file.
+
+        :param figure: The matplotlib figure (Agg based canvas)
+        :return: a (height, width, 3) uint8 array
+    """
+    figure.canvas.draw()
+    return np.asarray(figure.canvas.buffer_rgba())[..., :3].copy()
 
 
 def create_gif_from_subset(duration_secs, input_file_dir,
@@ -100,9 +187,7 @@ def create_gif_from_subset(duration_secs, input_file_dir,
 
     sorted_files_to_animate = sorted(files_to_animate)
 
-
-    images = [imageio.imread(filename) for filename in sorted_files_to_animate]
-    imageio.mimsave(full_path_output_filename, images, duration=duration_secs)
+    write_animation(sorted_files_to_animate, full_path_output_filename, duration_secs)
 
 
 
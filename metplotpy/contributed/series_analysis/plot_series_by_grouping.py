@@ -20,16 +20,15 @@ import os, sys
 import re
 import errno, warnings
 import yaml
-import matplotlib.pyplot as plt
 from matplotlib import cm
 import matplotlib.cbook
+import numpy as np
 import cartopy.crs as ccrs
-from cartopy.util import add_cyclic_point
 import metplotpy.contributed.series_analysis.animate_utilities as au
-#pylint: disable=import-error
-from netCDF4 import Dataset
 sys.path.append("../..")
 import metplotpy.plots.util as util
+from metplotpy.contributed.series_analysis.series_file_index import SeriesFileIndex
+from metplotpy.plots.map_template import get_map_template
 # ignore the MatplotlibFutureDeprecation warning which does not affect this code
 # since changes must be made in Cartopy code
 warnings.simplefilter(action='ignore', category=matplotlib.cbook.mplDeprecation)
@@ -43,7 +42,8 @@ class PlotSeriesByGrouping():
     def __init__(self, cfg):
         self.config = cfg
 
-    def create_plots(self, input_dir, output_dir, background_on, filename_regex):
+    def create_plots(self, input_dir, output_dir, background_on, filename_regex,
+                     consistent_colorbar=False, file_index=None):
         '''
 
         :param input_dir:   The input directory where the netcdf files are located.
@@ -54,38 +54,54 @@ class PlotSeriesByGrouping():
                                Fxxx_to_Fyyy grouping descriptor is
                                needed to include in the plot title to differntiate it
                                from the other groupings.
+        :param consistent_colorbar: When True, the contour levels and colorbar of every
+                                    plot of a statistic span the minimum and maximum of
+                                    that statistic over all the files, so the plots
+                                    (and animation frames) are comparable.  By default
+                                    each plot is normalized to its own values.
+        :param file_index: An optional SeriesFileIndex of input_dir, scanned here if
+                           not provided.
         :return:
         '''
 
-        # Get the netcdf files in each subdirectory, sorted by grouping name so that
-        # Day1 preceeds Day2, and Day2 preceeds Day3, etc.
-        nc_files = self.get_nc_files(input_dir)
+        # Scan the input directory once.  The index lists the netcdf files in each
+        # subdirectory, sorted by grouping name so that Day1 preceeds Day2, and Day2
+        # preceeds Day3, etc., and reads only the variables needed below.
+        if file_index is None:
+            file_index = SeriesFileIndex(input_dir)
+        nc_files = file_index.files()
         # print(nc_files)
 
+        stat_variables = {'FBAR': 'series_cnt_FBAR', 'OBAR': 'series_cnt_OBAR'}
+        if consistent_colorbar:
+            series_ranges = {key: file_index.series_range(nc_var, nc_files)
+                             for key, nc_var in stat_variables.items()}
+
+        # create the output directory if it doesn't exist (equivalent of mkdir -p)
+        try:
+            os.makedirs(output_dir)
+        except OSError as exc:
+            if exc.errno == errno.EEXIST and os.path.isdir(output_dir):
+                pass
+
+        # extract the variable_name and level from the output_filename
+        # regex for series by lead groupings:
+        # series_(F[0 - 9]{3}_to_F[0 - 9]{3})_([A - Z]{3})_(P | Z)([0 - 9]{1, 3}).*
+        filename_only_regex = filename_regex.split('.png')[0] + ')'
+
+        # Use the reversed Spectral colormap to reflect temperatures.
+        cmap = cm.get_cmap('Spectral_r')
+
         # For each nc_file, read in the necessary values from the netcdf file
         for nc_file in nc_files:
             # print("current nc file: ", nc_file)
-            match = re.match(r'.*/(.*).nc', nc_file)
-            if match:
-                filename_only = match.group(1)
-
-            # Create the output directory if it doesn't already exist
-            # create the output directory if it doesn't exist (equivalent of mkdir -p)
-            try:
-                os.makedirs(output_dir)
-            except OSError as exc:
-                if exc.errno == errno.EEXIST and os.path.isdir(output_dir):
-                    pass
+            filename_only = os.path.splitext(os.path.basename(nc_file))[0]
             output_filename = os.path.join(output_dir, filename_only)
 
-            # extract the variable_name and level from the output_filename
-            # regex for series by lead groupings:
-            # series_(F[0 - 9]{3}_to_F[0 - 9]{3})_([A - Z]{3})_(P | Z)([0 - 9]{1, 3}).*
-            filename_only = filename_regex.split('.png')[0]
-            filename_only_regex = filename_only + ')'
-
             var_level_match = re.match(filename_only_regex, output_filename)
             if var_level_match:
+                # the Fxxx_to_Fyyy grouping descriptor
+                group_descriptor = var_level_match.group(2)
                 variable_name = var_level_match.group(3)
                 level_type = var_level_match.group(4)
                 level_name = var_level_match.group(5)
@@ -94,121 +110,41 @@ class PlotSeriesByGrouping():
                 raise ValueError("The variable and level couldn't be extracted from "
                                  "the netcdf filename.")
 
-            input_nc_file = os.path.join(input_dir, nc_file)
-
-            if input_nc_file.endswith('.nc'):
-                try:
-                    file_handle = Dataset(input_nc_file, mode='r')
-                except FileNotFoundError:
-                    print("File ", input_nc_file, " does not exist.")
-                else:
-
-                    # Retrieve variables of interest
-                    lons = file_handle.variables['lon'][:]
-                    lats = file_handle.variables['lat'][:]
-                    fbar = file_handle.variables['series_cnt_FBAR'][:]
-                    obar = file_handle.variables['series_cnt_OBAR'][:]
+            # Retrieve variables of interest, opening the file once
+            values = file_index.read(nc_file, ['lon', 'lat'] + list(stat_variables.values()))
+            lons = values['lon']
+            lats = values['lat']
 
-                    # close the file handle now that we are finished retrieving what we need
-                    file_handle.close()
+            for key, nc_var in stat_variables.items():
+                value = values[nc_var]
 
-                # Verify that these values are consistent with lat, lon values, etc.
-                # print("lat : ", lats)
-                # print("lon : ", lons)
-                # print("FBAR: ", fbar)
-                # print("OBAR: ", obar)
-                # print("===============\n\n")
-
-            # Use the reversed Spectral colormap to reflect temperatures.
-            cmap = cm.get_cmap('Spectral_r')
-
-            vars_dict = {'FBAR': fbar, 'OBAR': obar}
-            for key, value in vars_dict.items():
-                # generate a contour map of OBAR/FBAR values
-                plt.figure(figsize=(13, 6.2))
-                geo_ax = plt.axes(projection=ccrs.PlateCarree())
+                # The figure, map axes, coastlines (only plotted if the background map is
+                # requested) and colorbar are built once and reused for every variable
+                # and file, only the contours are redrawn.
+                map_template = get_map_template(ccrs.PlateCarree(), figsize=(13, 6.2),
+                                                coastlines=background_on, cmap='Spectral_r')
 
+                # Figure out the minimum and maximum values of the OBAR/FBAR
+                # temperature and use these values in the colorbar normalization.
                 # set number of contour levels to 65, higher number results in more smoothing.
-                plt.contourf(lons, lats, value, 65, transform=ccrs.PlateCarree(), cmap=cmap)
-
-                # Only plot the coastlines if the background map is requested
-                if background_on:
-                    geo_ax.coastlines()
-
-                if key == 'OBAR':
-                    var_in_title = "OBAR"
-                    # Figure out the minimum and maximum values of the OBAR/FBAR
-                    # temperature and use these values in the
-                    # plt.Normalize() call.
-                    minimum = obar.min()
-                    maximum = obar.max()
-                    # Allow the temperature values (OBAR, FBAR) and the longitude to
-                    # cycle (encircle the globe)
-                    # pylint: disable=unused-variable
-                    obar_cyc, lon_cyc = add_cyclic_point(obar, coord=lons)
-                else:
-                    var_in_title = "FBAR"
-                    # Figure out the minimum and maximum values of the OBAR/FBAR
-                    # temperature and use these values in the
-                    # plt.Normalize() call.
-                    minimum = fbar.min()
-                    maximum = fbar.max()
-                    # Allow the temperature values (OBAR, FBAR) and the longitude to cycle
-                    # (encircle the globe)
-                    # pylint: disable=unused-variable
-                    fbar_cyc, lon_cyc = add_cyclic_point(fbar, coord=lons)
-
-                # Adding a legend from Stack Overflow.  Create your own mappable object
-                # (scalar mappable) that can be passed to colorbar.  Normalize values
-                # are the min and max values normalized to 0, 1 in the
-                # solution, here we use the minimum and maximum values found in the
-                # FBAR/OBAR array.
-
-                scalar_mappable = plt.cm.ScalarMappable(cmap=cmap, norm=plt.Normalize(minimum, maximum))
-                # pylint: disable=protected-access
-                scalar_mappable._A = []
-                plt.colorbar(scalar_mappable, ax=geo_ax)
-                match_group_desc = re.match(filename_only_regex, output_filename)
-                if match_group_desc:
-                    group_descriptor = match_group_desc.group(2)
+                if consistent_colorbar:
+                    minimum, maximum = series_ranges[key]
+                    levels = np.linspace(minimum, maximum, 65)
                 else:
-                    raise ValueError("Expecting Fxxx_to_Fyyy info in netcdf "
-                                     "filename but info not found... ")
+                    minimum, maximum = file_index.value_range(nc_file, nc_var)
+                    levels = 65
 
-                title = group_descriptor + " for " + var_in_title + " from series by init for " + \
+                # generate a contour map of OBAR/FBAR values
+                map_template.contourf(lons, lats, value, levels, cmap=cmap, vmin=minimum, vmax=maximum)
+
+                title = group_descriptor + " for " + key + " from series by init for " + \
                         variable_name + " " + level
-                plt.title(title)
+                map_template.set_title(title)
 
                 # output file will be saved as png
-                if key == 'OBAR':
-                    output_png_file = output_filename + "_obar.png"
-                else:
-                    output_png_file = output_filename + "_fbar.png"
+                output_png_file = output_filename + "_" + key.lower() + ".png"
                 # print("output filename: ", output_png_file)
-                plt.savefig(output_png_file)
-
-    def get_nc_files(self, input_dir_base):
-        '''
-            Generate a sorted list (by ascending alphanumeric name) of the netcdf files
-            that will be read in to be used for generating plots.
-            :param input_dir_base: the base directory where all the input netcdf files
-                                   are located
-            :return: sorted_nc_files:  A sorted list of the full filepath of the netcdf
-                                       files to be used for plotting
-        '''
-        nc_files = []
-        # pylint: disable=unused-variable
-        for root, dirs, files in os.walk(input_dir_base):
-            for file in files:
-                # We only want netcdf files, ignore all other file extensions
-                if file.endswith('.nc'):
-                    nc_files.append(os.path.join(root, file))
-
-        # sort files by full path in ascending order so Day1 preceeds Day2, and
-        # Day3 preceeds Day4...
-        sorted_nc_files = sorted(nc_files)
-        # print("sorted nc files: ", sorted_nc_files)
-        return sorted_nc_files
+                map_template.savefig(output_png_file)
 
     def collect_files_to_animate(self, input_dir, statistic):
         '''
@@ -305,7 +241,11 @@ def main():
     # the level type : e.g. P or Z, and
     # the level value: e.g. 2, 500, 850, etc.
     filename_regex = psl.config['png_plot_filename_regex']
-    psl.create_plots(input_nc_file_dir, output_dir, background_on, filename_regex)
+
+    # Optional: normalize the colorbar of each statistic over the whole series
+    consistent_colorbar = str(psl.config.get('consistent_colorbar', 'False')).upper() == 'TRUE'
+    psl.create_plots(input_nc_file_dir, output_dir, background_on, filename_regex,
+                     consistent_colorbar)
 
     # duration in sec to stay on each frame in the animation
     duration = psl.config['duration']
@@ -17,7 +17,6 @@ import sys
 import yaml
 import errno
 import warnings
-import matplotlib.pyplot as plt
 import matplotlib.cbook
 from matplotlib import cm
 import cartopy.crs as ccrs
@@ -26,6 +25,7 @@ from cartopy.util import add_cyclic_point
 from netCDF4 import Dataset
 sys.path.append("../..")
 import metplotpy.plots.util as util
+from metplotpy.plots.map_template import get_map_template
 # ignore the MatplotlibFutureDeprecation warning which does not affect this code
 # since changes must be made in Cartopy code
 warnings.simplefilter(action='ignore', category=matplotlib.cbook.mplDeprecation)
@@ -99,22 +99,17 @@ class PlotSeriesByInit():
 
             vars_dict = {'FBAR': fbar, 'OBAR': obar}
             for key, value in vars_dict.items():
-                # generate a contour map of OBAR/FBAR values
-                plt.figure(figsize=(13, 6.2))
-                geo_ax = plt.axes(projection=ccrs.PlateCarree())
-
-                # set number of contour levels to 65, higher number results in more smoothing.
-                plt.contourf(lons, lats, value, 65, transform=ccrs.PlateCarree(), cmap=cmap)
-
-                # Only plot the coastlines if the background map is requested
-                if background_on:
-                    geo_ax.coastlines()
+                # The figure, map axes, coastlines (only plotted if the background map is
+                # requested) and colorbar are built once and reused for every variable
+                # and file, only the contours are redrawn.
+                map_template = get_map_template(ccrs.PlateCarree(), figsize=(13, 6.2),
+                                                coastlines=background_on, cmap='Spectral_r')
 
                 if key == 'OBAR':
                     var_in_title = "OBAR"
                     # Figure out the minimum and maximum values of the OBAR/FBAR
                     # temperature and use these values in the
-                    # plt.Normalize() call.
+                    # colorbar normalization.
                     minimum = obar.min()
                     maximum = obar.max()
                     # Allow the temperature values (OBAR, FBAR) and the longitude
@@ -126,7 +121,7 @@ class PlotSeriesByInit():
                     var_in_title = "FBAR"
                     # Figure out the minimum and maximum values of the OBAR/FBAR
                     # temperature and use these values in the
-                    # plt.Normalize() call.
+                    # colorbar normalization.
                     minimum = fbar.min()
                     maximum = fbar.max()
                     # Allow the temperature values (OBAR, FBAR) and the longitude
@@ -134,20 +129,15 @@ class PlotSeriesByInit():
                     # pylint: disable=unused-variable
                     fbar_cyc, lon_cyc = add_cyclic_point(fbar, coord=lons)
 
-                # Adding a legend from Stack Overflow.  Create your own mappable object
-                # (scalar mappable) that can be passed to colorbar.  Normalize values
-                # are the min and max values normalized to 0, 1 in the
-                # solution, here we use the minimum and maximum values found in the FBAR/OBAR
-                # array.
+                # generate a contour map of OBAR/FBAR values, the colorbar is normalized
+                # to the minimum and maximum values found in the FBAR/OBAR array.
+                # set number of contour levels to 65, higher number results in more smoothing.
+                map_template.contourf(lons, lats, value, 65, cmap=cmap, vmin=minimum, vmax=maximum)
 
-                scalar_mappable = plt.cm.ScalarMappable(cmap=cmap, norm=plt.Normalize(minimum, maximum))
-                # pylint: disable=protected-access
-                scalar_mappable._A = []
-                plt.colorbar(scalar_mappable, ax=geo_ax)
                 title = var_in_title + " from series by init for " + variable_name + \
                         " " + level + " Storm " \
                         + storm_number
-                plt.title(title)
+                map_template.set_title(title)
 
                 # output file will be saved as png
                 if key == 'OBAR':
@@ -163,7 +153,7 @@ class PlotSeriesByInit():
                     output_png_file = os.path.join(output_dir, output_png_filename)
 
                 print("output filename: ", output_png_file)
-                plt.savefig(output_png_file)
+                map_template.savefig(output_png_file)
 
 
 def main():
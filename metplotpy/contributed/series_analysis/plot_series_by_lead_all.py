@@ -21,16 +21,15 @@ import errno
 import warnings
 from collections import namedtuple
 import re
-import matplotlib.pyplot as plt
 from matplotlib import cm
 import matplotlib.cbook
+import numpy as np
 import cartopy.crs as ccrs
-from cartopy.util import add_cyclic_point
-#pylint: disable=import-error
 sys.path.append("../..")
 import metplotpy.plots.util as util
+from metplotpy.plots.map_template import get_map_template
+from metplotpy.contributed.series_analysis.series_file_index import SeriesFileIndex
 
-from netCDF4 import Dataset
 # ignore the MatplotlibFutureDeprecation warning which does not affect this code
 # since changes must be made in Cartopy code
 warnings.simplefilter(action='ignore', category=matplotlib.cbook.mplDeprecation)
@@ -41,105 +40,72 @@ class PlotSeriesByLeadAll():
 
     # input_file, hour, variable_name, level_type, level, output_filename)
     def generate_plot(self, input_nc_filename, fhr, variable_name,
-                      level_type, level, output_filename):
+                      level_type, level, output_filename, file_index=None,
+                      series_ranges=None):
         '''
-
+        :param file_index: the SeriesFileIndex of the input directory, by default the
+                           directory of the input file is indexed
+        :param series_ranges: optional {'FBAR': (min, max), 'OBAR': (min, max)} used to
+                              normalize the colorbar consistently across all the plots
+                              of the series, by default each plot uses its own range
 
         :return:
         '''
 
         input_nc_file_dir = self.config['input_nc_file_dir']
-        output_dir = self.config['output_dir']
-        output_full_filename = os.path.join(output_dir, output_filename)
         background_on_value = self.config['background_on']
         if background_on_value.upper() == 'FALSE':
             background_on = False
         else:
             background_on = True
 
-        # read in the netcdf file
-        try:
-            input_nc_file = os.path.join(input_nc_file_dir, input_nc_filename)
-            file_handle = Dataset(input_nc_file, mode='r')
-        except FileNotFoundError:
+        input_nc_file = os.path.join(input_nc_file_dir, input_nc_filename)
+        if file_index is None:
+            file_index = SeriesFileIndex(os.path.dirname(input_nc_file))
+        if input_nc_file not in file_index.entries:
             print("File ", input_nc_file, " does not exist.")
-        else:
-
-            # Retrieve variables of interest
-            lons = file_handle.variables['lon'][:]
-            lats = file_handle.variables['lat'][:]
-            fbar = file_handle.variables['series_cnt_FBAR'][:]
-            obar = file_handle.variables['series_cnt_OBAR'][:]
-
-            # close the file handle now that we are finished retrieving what we need
-            file_handle.close()
-
-            # Uncomment to visually verify that these values are "reasonable" lat/lon values, etc.
-            # print("lat : ", lats)
-            # print("lon : ", lons)
-            # print("FBAR: ", fbar)
-            # print("OBAR: ", obar)
-
-            # Use the reversed Spectral colormap to reflect temperatures.
-            cmap = cm.get_cmap('Spectral_r')
-
-            vars_dict = {'FBAR': fbar, 'OBAR': obar}
-            for key, value in vars_dict.items():
-                # generate a contour map of OBAR/FBAR values
-                plt.figure(figsize=(13, 6.2))
-                geo_ax = plt.axes(projection=ccrs.PlateCarree())
-
-                # set number of contour levels to 65, higher number results in more smoothing.
-                plt.contourf(lons, lats, value, 65, transform=ccrs.PlateCarree(), cmap=cmap)
-
-                # Only plot the coastlines if the background map is requested
-                if background_on:
-                    geo_ax.coastlines()
-
-                if key == 'OBAR':
-                    var_in_title = "OBAR"
-                    # Figure out the minimum and maximum values of the OBAR/FBAR temperature
-                    # and use these values in the plt.Normalize() call.
-                    minimum = obar.min()
-                    maximum = obar.max()
-                    # Allow the temperature values (OBAR, FBAR) and the longitude to cycle
-                    # (encircle the globe)
-                    # pylint: disable=unused-variable
-                    obar_cyc, lon_cyc = add_cyclic_point(obar, coord=lons)
-                else:
-                    var_in_title = "FBAR"
-                    # Figure out the minimum and maximum values of the OBAR/FBAR temperature
-                    # and use these values in the plt.Normalize() call.
-                    minimum = fbar.min()
-                    maximum = fbar.max()
-                    # Allow the temperature values (OBAR, FBAR) and the longitude to
-                    # cycle (encircle the globe)
-                    # pylint: disable=unused-variable
-                    fbar_cyc, lon_cyc = add_cyclic_point(fbar, coord=lons)
-
-                # Adding a legend from Stack Overflow.  Create your own mappable
-                # object (scalar mappable) that can be passed to colorbar.
-                # Normalize values are the min and max values normalized to
-                # 0, 1 in the solution, here we use the minimum and maximum
-                # values found in the FBAR/OBAR array.
-
-                scalar_mappable = plt.cm.ScalarMappable(cmap=cmap, norm=plt.Normalize(minimum, maximum))
-                # pylint: disable=protected-access
-                scalar_mappable._A = []
-                plt.colorbar(scalar_mappable, ax=geo_ax)
-                title = " series by init " + var_in_title + " for fhr " + fhr + " " + \
-                        variable_name + " " + level_type + level
-                plt.title(title)
-
-                # output file will be saved as png
-                if key == 'OBAR':
-                    output_png_file = output_filename + "_obar.png"
-                else:
-                    output_png_file = output_filename + "_fbar.png"
-                print("output filename: ", output_png_file)
-                plt.savefig(output_png_file)
-
-    def get_info(self, base_dir, output_base_dir):
+            return
+
+        # Retrieve variables of interest, opening the file once
+        stat_variables = {'FBAR': 'series_cnt_FBAR', 'OBAR': 'series_cnt_OBAR'}
+        values = file_index.read(input_nc_file, ['lon', 'lat'] + list(stat_variables.values()))
+        lons = values['lon']
+        lats = values['lat']
+
+        # Use the reversed Spectral colormap to reflect temperatures.
+        cmap = cm.get_cmap('Spectral_r')
+
+        for key, nc_var in stat_variables.items():
+            # The figure, map axes, coastlines (only plotted if the background map is
+            # requested) and colorbar are built once and reused for every variable
+            # and file, only the contours are redrawn.
+            map_template = get_map_template(ccrs.PlateCarree(), figsize=(13, 6.2),
+                                            coastlines=background_on, cmap='Spectral_r')
+
+            # Figure out the minimum and maximum values of the OBAR/FBAR temperature
+            # and use these values in the colorbar normalization.
+            # set number of contour levels to 65, higher number results in more smoothing.
+            if series_ranges:
+                minimum, maximum = series_ranges[key]
+                levels = np.linspace(minimum, maximum, 65)
+            else:
+                minimum, maximum = file_index.value_range(input_nc_file, nc_var)
+                levels = 65
+
+            # generate a contour map of OBAR/FBAR values
+            map_template.contourf(lons, lats, values[nc_var], levels, cmap=cmap,
+                                  vmin=minimum, vmax=maximum)
+
+            title = " series by init " + key + " for fhr " + fhr + " " + \
+                    variable_name + " " + level_type + level
+            map_template.set_title(title)
+
+            # output file will be saved as png
+            output_png_file = output_filename + "_" + key.lower() + ".png"
+            print("output filename: ", output_png_file)
+            map_template.savefig(output_png_file)
+
+    def get_info(self, base_dir, output_base_dir, file_index=None):
         '''From the base_dir, where the series_F### subdirectories reside (and contain the
         netcdf output from the
            feature relative use case):
@@ -153,6 +119,8 @@ class PlotSeriesByLeadAll():
                             which in turn contain the netcdf
                             files created by running the METplus use cases
            :param output_base_dir The base directory where the plots are stored
+           :param file_index  An optional SeriesFileIndex of base_dir, so the directories
+                              are only scanned once
 
 
            :return: file_info_list   A list of named tuples that contain the file info
@@ -160,29 +128,33 @@ class PlotSeriesByLeadAll():
                                      each plot and the output filename of each plot.
         '''
 
-        # Get a list of all the subdirectories under the base_dir and create a list of named
+        # Get a list of all the netcdf files under the base_dir and create a list of named
         # tuples that contain the forecast hour, variable (TMP or HGT), level type
-        # (ie P or Z) and level.
-        FileInfo = namedtuple('FileInfo', 'fhr, variable_name,level_type, level, output_filename')
+        # (ie P or Z), level and the input file.
+        FileInfo = namedtuple('FileInfo', 'fhr, variable_name,level_type, level, output_filename, '
+                                          'input_file')
 
         # filename looks like the following: series_[fhr]_to_[fhr]_[variable]_[level].nc
         file_info_list = []
 
-        # pylint: disable=unused-variable
-        for root, dirs, files in os.walk(base_dir):
-            for file in files:
-                # match = re.search('series_F([0-9]{3})_(HGT|TMP)_(P|Z)([0-9]{3}).nc', file)
-                match = re.search('series_F([0-9]{1,3})_to_F([0-9]{1,3})_(HGT|TMP)_(P|Z)([0-9]{1,3}).nc', file)
-                if match:
-                    fhr = match.group(1)
-                    variable_name = match.group(3)
-                    level_type = match.group(4)
-                    level = match.group(5)
-                    # Create the output filename (full path) but omit the extension
-                    output_filename = 'series_F' + fhr + "_to_F" + fhr + "_" + variable_name + '_' + level_type + level
-                    output_file_no_ext = os.path.join(output_base_dir, output_filename)
-                    cur_file_info = FileInfo(fhr, variable_name, level_type, level, output_file_no_ext)
-                    file_info_list.append(cur_file_info)
+        if file_index is None:
+            file_index = SeriesFileIndex(base_dir)
+
+        for input_file in file_index.files():
+            # match = re.search('series_F([0-9]{3})_(HGT|TMP)_(P|Z)([0-9]{3}).nc', file)
+            match = re.search('series_F([0-9]{1,3})_to_F([0-9]{1,3})_(HGT|TMP)_(P|Z)([0-9]{1,3}).nc',
+                              os.path.basename(input_file))
+            if match:
+                fhr = match.group(1)
+                variable_name = match.group(3)
+                level_type = match.group(4)
+                level = match.group(5)
+                # Create the output filename (full path) but omit the extension
+                output_filename = 'series_F' + fhr + "_to_F" + fhr + "_" + variable_name + '_' + level_type + level
+                output_file_no_ext = os.path.join(output_base_dir, output_filename)
+                cur_file_info = FileInfo(fhr, variable_name, level_type, level, output_file_no_ext,
+                                         input_file)
+                file_info_list.append(cur_file_info)
 
         return file_info_list
 
@@ -220,22 +192,23 @@ def main():
             # directory already exists, proceed
             pass
 
+    # Scan the input directories once, the index is shared by get_info and the plotting
+    file_index = SeriesFileIndex(input_nc_file_dir)
+
     # Invoke the function that generates the plot
-    file_info_list = psl.get_info(input_nc_file_dir, output_dir)
+    file_info_list = psl.get_info(input_nc_file_dir, output_dir, file_index)
+
+    # Optional: normalize the colorbar of each statistic over all the forecast hours
+    series_ranges = None
+    if str(psl.config.get('consistent_colorbar', 'False')).upper() == 'TRUE':
+        input_files = [file_info.input_file for file_info in file_info_list]
+        series_ranges = {'FBAR': file_index.series_range('series_cnt_FBAR', input_files),
+                         'OBAR': file_index.series_range('series_cnt_OBAR', input_files)}
 
     for file_info in file_info_list:
-        hour = file_info.fhr
-        fhr = 'series_F' + hour
-        input_dir = os.path.join(input_nc_file_dir, fhr)
-        level_type = file_info.level_type
-        level = file_info.level
-        variable_name = file_info.variable_name
-        input_filename = 'series_F' + hour + '_to_F' + hour + '_' + variable_name + '_' + level_type + \
-                         level + '.nc'
-        input_file = os.path.join(input_dir, input_filename)
-        output_filename = file_info.output_filename
-
-        psl.generate_plot(input_file, hour, variable_name, level_type, level, output_filename)
+        psl.generate_plot(file_info.input_file, file_info.fhr, file_info.variable_name,
+                          file_info.level_type, file_info.level, file_info.output_filename,
+                          file_index, series_ranges)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+# ============================*
+ # ** Copyright UCAR (c) 2024
+ # ** University Corporation for Atmospheric Research (UCAR)
+ # ** National Center for Atmospheric Research (NCAR)
+ # ** Research Applications Lab (RAL)
+ # ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+ # ============================*
+
+
+
+"""
+ Index of the netcdf files written by a METplus series analysis.
+
+ The input tree is scanned once, recording for every file the dimensions,
+ shape and type of its variables (only the headers are read).  Data is read
+ on request, only the variables and slices asked for, and the minimum and
+ maximum of each variable read are remembered.  The variables read only for
+ their range (the colorbar range common to the whole series) are kept until
+ the next read() of them, so the plots don't load them from the files again.
+"""
+
+import os
+import re
+from collections import namedtuple
+#pylint: disable=import-error
+from netCDF4 import Dataset
+
+# path: full path of the netcdf file
+# variables: {variable name: VariableInfo}
+VariableInfo = namedtuple('VariableInfo', 'dimensions, shape, dtype')
+SeriesFileInfo = namedtuple('SeriesFileInfo', 'path, variables')
+
+
+class SeriesFileIndex():
+    ''' Scans a directory tree of series analysis netcdf files once and serves
+        the file list, variable metadata, lazily read data and value ranges.
+    '''
+
+    def __init__(self, input_dir):
+        '''
+        :param input_dir: The base directory of the netcdf files, all the
+                          subdirectories are scanned.
+        '''
+        self.input_dir = input_dir
+        self.entries = {}
+        # (path, variable name) -> (minimum, maximum)
+        self._ranges = {}
+        # (path, variable name) -> whole variable read for its range, handed
+        # over to the next read() of the variable
+        self._loaded = {}
+        self._scan()
+
+    def _scan(self):
+        # pylint: disable=unused-variable
+        for root, dirs, files in os.walk(self.input_dir):
+            for file in files:
+                # We only want netcdf files, ignore all other file extensions
+                if file.endswith('.nc'):
+                    path = os.path.join(root, file)
+                    with Dataset(path, mode='r') as file_handle:
+                        variables = {name: VariableInfo(var.dimensions, var.shape, var.dtype)
+                                     for name, var in file_handle.variables.items()}
+                    self.entries[path] = SeriesFileInfo(path, variables)
+
+    def files(self, filename_regex=None):
+        '''
+            The full path of the indexed files, sorted in ascending order so
+            Day1 preceeds Day2, and F006 preceeds F012...
+
+            :param filename_regex: Optional regular expression the filename
+                                   (without its directory) must match
+            :return: sorted list of full paths
+        '''
+        paths = self.entries.keys()
+        if filename_regex is not None:
+            paths = [path for path in paths
+                     if re.match(filename_regex, os.path.basename(path))]
+        return sorted(paths)
+
+    def has_variable(self, path, variable):
+        return variable in self.entries[path].variables
+
+    def read(self, path, variables, key=Ellipsis):
+        '''
+            Read only the requested variables (and optionally only a slice of
+            them) from one file, opening it once.
+
+            :param path: The full path of an indexed file
+            :param variables: A list of variable names
+            :param key: The index/slice applied to every variable with more
+                        than one dimension, e.g. (0, slice(10, 20)), the whole
+                        variable by default
+            :return: {variable name: masked array}
+        '''
+        values = {}
+        to_read = []
+        for variable in variables:
+            loaded = self._loaded.pop((path, variable), None)
+            if loaded is None:
+                to_read.append(variable)
+            else:
+                values[variable] = loaded[key] if loaded.ndim > 1 else loaded
+        if to_read:
+            with Dataset(path, mode='r') as file_handle:
+                for variable in to_read:
+                    nc_var = file_handle.variables[variable]
+                    if nc_var.ndim > 1:
+                        values[variable] = nc_var[key]
+                    else:
+                        values[variable] = nc_var[:]
+                    if key is Ellipsis:
+                        self._remember_range(path, variable, values[variable])
+        return {variable: values[variable] for variable in variables}
+
+    def _remember_range(self, path, variable, values):
+        if values.size and (path, variable) not in self._ranges:
+            self._ranges[(path, variable)] = (values.min(), values.max())
+
+    def value_range(self, path, variable):
+        '''
+            The minimum and maximum of a variable in one file, read only if it
+            has not already been read.  The variable is then kept for the
+            next read() of it.
+        '''
+        if (path, variable) not in self._ranges:
+            self._loaded[(path, variable)] = self.read(path, [variable])[variable]
+        return self._ranges[(path, variable)]
+
+    def series_range(self, variable, paths=None):
+        '''
+            The minimum and maximum of a variable over several files, used to
+            normalize the colorbar consistently across a series.
+
+            :param variable: The variable name
+            :param paths: The files of the series, all the indexed files
+                          containing the variable by default
+            :return: (minimum, maximum)
+        '''
+        if paths is None:
+            paths = [path for path in self.files() if self.has_variable(path, variable)]
+        ranges = [self.value_range(path, variable) for path in paths]
+        return min(rng[0] for rng in ranges), max(rng[1] for rng in ranges)
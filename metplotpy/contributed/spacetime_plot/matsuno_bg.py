@@ -0,0 +1,206 @@
+# ============================*
+ # ** Copyright UCAR (c) 2020
+ # ** University Corporation for Atmospheric Research (UCAR)
+ # ** National Center for Atmospheric Research (NCAR)
+ # ** Research Applications Lab (RAL)
+ # ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+ # ============================*
+ 
+ 
+ 
+# -*- coding: utf-8 -*-
+
+"""
+Dispersion curves of the mid-latitude Rossby waves with a background flow,
+for the space-time spectra plots.  Only uses numpy and pandas, not the NCAR
+NGL module of the plots.
+Created by: Maria Gehne
+2019
+"""
+import os
+import hashlib
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+import metcalcpy.contributed.spacetime.matsuno_plot as mp
+
+pi = np.pi
+g = 9.80665  # Gravitational acceleration [m s^{-2}]
+sec2day = 1. / (24. * 60. * 60.)  # Seconds to Days
+
+
+def dispersion_bg(w, k, n, he, beta, u):
+    """
+    Dispersion relationship for Matsuno Modes with a non-zero background flow.
+    The roots of this function correspond to the angular frequencies of the
+    Matsuno modes for a given k.
+    :param w:
+        Angular Frequency
+    :param k:
+        Longitudinal Wavenumber
+    :param n:
+        Meridional Mode Number
+    :param he:
+        Equivalent Depth
+    :param beta:
+        Beta-Plane Parameter
+    :param u:
+        Background flow in m/s
+    :type w: Float
+    :type k: Float
+    :type n: Integer
+    :type he: Float
+    :type beta: Float
+    :return: Zero if w and k corresponds to a Matsuno Mode.
+    :rtype: Float
+    """
+    w = -u * k + w
+    disp = w ** 3 - g * he * (k ** 2 + (beta * (2. * n + 1.) / np.sqrt(g * he))) * w - k * beta * g * he
+    return disp
+
+
+def er_n_bg_frequencies(he, n, latitude=0., max_wn=50, n_wn=500, u=30):
+    """
+    Function that calculates the dispersion curves for the beta-plane Rossby wave
+    for a list of Equivalent Depths and Meridional Mode Numbers and background wind,
+    for all of them at once.
+    With the intrinsic frequency w' = w - u * k, the dispersion relationship
+    (see dispersion_bg) is the cubic w'**3 - a * w' - b = 0 with a > 0, which
+    has three real roots: the Rossby wave is the root with the smallest magnitude,
+    computed with the trigonometric formula of the roots of the cubic.
+    :param he:
+        Equivalent Depths
+    :param n:
+        Meridional Mode Numbers
+    :param latitude:
+        Latitude
+    :param max_wn:
+        Max global wave number.
+        The global wave number range is (-max_wn,max_wn)
+    :param n_wn:
+        Number of global wave numbers in the range (-max_wn,max_wn)
+    :param u:
+        Background wind in m/s
+    :type he: List of floats
+    :type n: List of integers
+    :type latitude: Float
+    :type maxwn: Positive Integer (max_wn > 0)
+    :type n_wn: Integer
+    :return: (wn, frequency)
+        Global wave numbers
+        Frequency in [cycles/day] Cycles per Day(CPD) with shape (len(he), len(n), n_wn)
+    :rtype: tuple
+    """
+    (beta, perimeter) = mp.beta_parameters(latitude)
+    wn = mp.wn_array(max_wn, n_wn)  # Global Wavenumber
+    with np.errstate(divide='ignore'):
+        k = mp.wn2k(wn, perimeter)  # Wavenumber[rad m^{-1}]
+    gh = g * np.asarray(he, dtype=float)[:, np.newaxis, np.newaxis]
+    nn = np.asarray(n, dtype=float)[np.newaxis, :, np.newaxis]
+    a = gh * (k ** 2 + (beta * (2. * nn + 1.) / np.sqrt(gh)))
+    b = k * beta * gh
+    phase = np.arccos(np.clip(1.5 * b / a * np.sqrt(3. / a), -1., 1.)) / 3.
+    angular_frequency = 2. * np.sqrt(a / 3.) * np.cos(phase - 2. * pi / 3.) + u * k
+    (period, frequency) = mp.afreq2freq(angular_frequency)
+    return wn, frequency
+
+
+def er_n_bg(he, n, latitude=0., max_wn=50, n_wn=500, u=30):
+    """
+    Function that calculates the dispersion curve for the beta-plane Rossby wave
+    for a given Equivalent Depth and background wind.
+    :param he:
+        Equivalent Depth
+    :param n:
+        Meridional Mode Number
+    :param latitude:
+        Latitude
+    :param max_wn:
+        Max global wave number.
+        The global wave number range is (-max_wn,max_wn)
+    :param n_wn:
+        Number of global wave numbers in the range (-max_wn,max_wn)
+    :param u:
+        Background wind in m/s
+    :type he: Float
+    :type n: Integer
+    :type latitude: Float
+    :type maxwn: Positive Integer (max_wn > 0)
+    :type n_wn: Integer
+    :return: DataFrame with wn and frequency
+    :rtype: DataFrame
+    """
+    (wn, frequency) = er_n_bg_frequencies([he], [n], latitude, max_wn, n_wn, u)
+    # Frequency [cycles/day] Cycles per Day(CPD)
+    name = 'ER(n=' + str(n) + ',he=' + str(he) + 'm)'
+    df = pd.DataFrame(data={name: frequency[0, 0]}, index=wn)
+    df.index.name = 'Wavenumber'
+    return df
+
+
+@lru_cache(maxsize=32)
+def _matsuno_frequencies_bg(he, n, latitude, max_wn, n_wn, u):
+    """
+    er_n_bg_frequencies for the tuples he and n, read from and saved to the
+    directory of the METPLOTPY_MATSUNO_CACHE_DIR environment variable if set.
+    The arrays returned are shared by the calls and are read only.
+    """
+    cache_dir = os.environ.get('METPLOTPY_MATSUNO_CACHE_DIR')
+    cache_file = None
+    if cache_dir:
+        key = repr((he, n, float(latitude), max_wn, n_wn, u))
+        cache_file = os.path.join(cache_dir, 'matsuno_bg_' + hashlib.sha1(key.encode('utf-8')).hexdigest() + '.npz')
+
+    if cache_file and os.path.exists(cache_file):
+        with np.load(cache_file) as cached:
+            (wn, frequency) = (cached['wn'], cached['frequency'])
+    else:
+        (wn, frequency) = er_n_bg_frequencies(he, n, latitude, max_wn, n_wn, u)
+        if cache_file:
+            # write and rename, for the plots run in parallel
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_file = cache_file + '.' + str(os.getpid()) + '.tmp.npz'
+            np.savez(tmp_file, wn=wn, frequency=frequency)
+            os.replace(tmp_file, cache_file)
+    wn.flags.writeable = False
+    frequency.flags.writeable = False
+    return wn, frequency
+
+
+def matsuno_modes_wk_bg(he=[3000, 7000, 10000], n=[1, ], latitude=0., max_wn=20, n_wn=500, u=30):
+    """
+    Creates a dataframe with Rossby modes for a non-zero background flow for a given set
+    of meridional mode numbers given in a list.
+    The dispersion curves are computed once for a given set of parameters, and
+    saved to the directory of the METPLOTPY_MATSUNO_CACHE_DIR environment
+    variable if it is set, to be reused by the next plots and runs.
+    :param he:
+        Equivalent Depth
+    :param n:
+        Meridional Mode Number
+    :param latitude:
+        Latitude
+    :param max_wn:
+        Max global wave number.
+        The global wave number range is (-max_wn,max_wn)
+    :param n_wn:
+        Number of global wave numbers in the range (-max_wn,max_wn)
+    :param u:
+        Background wind in m/s
+    :type he: Float
+    :type n: List of integers (e.g. [1,2,3])
+    :type latitude: Float
+    :type maxwn: Positive Integer (max_wn > 0)
+    :type n_wn: Integer
+    :return: DataFrame with wn and frequency
+    :rtype: DataFrame
+    """
+    (wn, frequency) = _matsuno_frequencies_bg(tuple(he), tuple(n), latitude, max_wn, n_wn, u)
+    matsuno_modes = {}
+    for i, h in enumerate(he):
+        data = {'ER(n=' + str(nn) + ',he=' + str(h) + 'm)': frequency[i, j].copy()
+                for j, nn in enumerate(n)}
+        df = pd.DataFrame(data=data, index=wn.copy())
+        df.index.name = 'Wavenumber'
+        matsuno_modes[h] = df
+    return matsuno_modes
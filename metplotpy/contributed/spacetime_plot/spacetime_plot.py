@@ -18,12 +18,10 @@ maria.gehne@noaa.gov
 """
 import os
 import numpy as np
-from scipy.optimize import fsolve
-from functools import reduce
-import pandas as pd
 import Ngl as ngl
 import string
 import metcalcpy.contributed.spacetime.matsuno_plot as mp
+from metplotpy.contributed.spacetime_plot.matsuno_bg import dispersion_bg, er_n_bg, matsuno_modes_wk_bg
 
 pi = np.pi
 re = 6.371008e6  # Earth's radius in meters
@@ -32,121 +30,6 @@ omega = 7.292e-05  # Angular speed of rotation of Earth [rad s^{-1}]
 deg2rad = pi / 180  # Degrees to Radians
 sec2day = 1. / (24. * 60. * 60.)  # Seconds to Days
 
-"""
-The following utilities include a background flow for mid-latitude Rossby wave dispersion
-curves.
-Created by: Maria Gehne
-2019
-"""
-
-
-def dispersion_bg(w, k, n, he, beta, u):
-    """
-    Dispersion relationship for Matsuno Modes with a non-zero background flow.
-    The roots of this function correspond to the angular frequencies of the
-    Matsuno modes for a given k.
-    :param w:
-        Angular Frequency
-    :param k:
-        Longitudinal Wavenumber
-    :param n:
-        Meridional Mode Number
-    :param he:
-        Equivalent Depth
-    :param beta:
-        Beta-Plane Parameter
-    :param u:
-        Background flow in m/s
-    :type w: Float
-    :type k: Float
-    :type n: Integer
-    :type he: Float
-    :type beta: Float
-    :return: Zero if w and k corresponds to a Matsuno Mode.
-    :rtype: Float
-    """
-    w = -u * k + w
-    disp = w ** 3 - g * he * (k ** 2 + (beta * (2. * n + 1.) / np.sqrt(g * he))) * w - k * beta * g * he
-    return disp
-
-
-def er_n_bg(he, n, latitude=0., max_wn=50, n_wn=500, u=30):
-    """
-    Function that calculates the dispersion curve for the beta-plane Rossby wave
-    for a given Equivalent Depth and background wind.
-    :param he:
-        Equivalent Depth
-    :param n:
-        Meridional Mode Number
-    :param latitude:
-        Latitude
-    :param max_wn:
-        Max global wave number.
-        The global wave number range is (-max_wn,max_wn)
-    :param n_wn:
-        Number of global wave numbers in the range (-max_wn,max_wn)
-    :param u:
-        Background wind in m/s
-    :type he: Float
-    :type n: Integer
-    :type latitude: Float
-    :type maxwn: Positive Integer (max_wn > 0)
-    :type n_wn: Integer
-    :return: DataFrame with wn and frequency
-    :rtype: DataFrame
-    """
-    (beta, perimeter) = mp.beta_parameters(latitude)
-    wn = mp.wn_array(max_wn, n_wn)  # Global Wavenumber
-    k = mp.wn2k(wn, perimeter)  # Wavenumber[rad m^{-1}]
-    # Use the Approximation to the Equatorial Rossby dispersion relationship as
-    # a seed for the solver function
-    angular_frequency = -beta * k / ((k * k) + (2. * n + 1.) * (beta / np.sqrt(g * he)))
-    angular_frequency[:] = fsolve(dispersion_bg, angular_frequency[:], \
-                                  args=(k[:], n, he, beta, u))
-    (period, frequency) = mp.afreq2freq(angular_frequency)
-    # Period in [days/cycle]
-    # Frequency [cycles/day] Cycles per Day(CPD)
-    name = 'ER(n=' + str(n) + ',he=' + str(he) + 'm)'
-    df = pd.DataFrame(data={name: frequency}, index=wn)
-    df.index.name = 'Wavenumber'
-    return df
-
-
-def matsuno_modes_wk_bg(he=[3000, 7000, 10000], n=[1, ], latitude=0., max_wn=20, n_wn=500, u=30):
-    """
-    Creates a dataframe with Rossby modes for a non-zero background flow for a given set
-    of meridional mode numbers given in a list.
-    :param he:
-        Equivalent Depth
-    :param n:
-        Meridional Mode Number
-    :param latitude:
-        Latitude
-    :param max_wn:
-        Max global wave number.
-        The global wave number range is (-max_wn,max_wn)
-    :param n_wn:
-        Number of global wave numbers in the range (-max_wn,max_wn)
-    :param u:
-        Background wind in m/s
-    :type he: Float
-    :type n: List of integers (e.g. [1,2,3])
-    :type latitude: Float
-    :type maxwn: Positive Integer (max_wn > 0)
-    :type n_wn: Integer
-    :return: DataFrame with wn and frequency
-    :rtype: DataFrame
-    """
-    matsuno_modes = {}
-    for h in he:
-        df = []
-        for nn in n:
-            df.append(er_n_bg(h, nn, latitude, max_wn, n_wn, u))
-        df = reduce(lambda left, right: pd.merge(left, right, on='Wavenumber'), df)
-        matsuno_modes[h] = df
-    return matsuno_modes
-
-
 """
 Plotting utilities using the NCAR NGL python module to generate space-time plots.
 """
@@ -390,7 +273,7 @@ def plot_power(Pow, symmetry=("symm"), source="", var1="", plotpath="./", flim=0
         # generate matsuno mode dispersion curves
         if Symmetry == "midlat":
             He = [3000, 7000, 10000]
-            matsuno_modes = mp.matsuno_modes_wk_bg(he=He, n=N, latitude=0., max_wn=nWavePlt, n_wn=500, u=25)
+            matsuno_modes = matsuno_modes_wk_bg(he=He, n=N, latitude=0., max_wn=nWavePlt, n_wn=500, u=25)
         else:
             He = [12, 25, 50]
             matsuno_modes = mp.matsuno_modes_wk(he=He, n=N, latitude=0., max_wn=nWavePlt, n_wn=500)
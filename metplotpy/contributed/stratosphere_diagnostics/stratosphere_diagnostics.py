@@ -21,6 +21,7 @@ Code was modified to use a configuration file and to be consistent with NCAR's M
 __author__ = 'Zach D. Lawrence (CIRES/CU, NOAA/PSL), modified by Minna Win (NCAR)'
 
 import os
+from concurrent.futures import ProcessPoolExecutor
 import xarray
 import xarray as xr
 import numpy as np
@@ -31,6 +32,10 @@ import yaml
 import errno
 from metplotpy.plots import util
 
+# the variables with a zonal mean plot
+ZONAL_MEAN_VARIABLES = ['u_wind', 'temperature']
+
+
 def create_output_file(config: dict, plotname: str)->str:
     '''
         Create the output directory where plots are to be saved and then generate the full path and
@@ -87,117 +92,269 @@ def retrieve_data(config: dict) -> xarray.Dataset:
 
 
 
-def plot_zonal_mean_wind_contour(config_obj:dict, dataset:xarray.Dataset) -> None:
+def compute_zonal_means(dataset: xarray.Dataset, variables: list = ZONAL_MEAN_VARIABLES,
+                        time_chunk: int = None) -> xarray.Dataset:
     '''
+        Compute the zonal means of the variables of interest once, to be shared by all the plots.
+        The data are read and averaged time_chunk time steps at a time, so only a part of the
+        4-D fields of a long reanalysis file is in memory at once.
 
         Input:
-        :param config_obj: The dictionary representation of settings from the configuration file
         :param dataset: An xarray dataset representation of the input data, subset to only the
                         variables of interest.
+        :param variables: The names of the variables to average
+        :param time_chunk: The number of time steps read at once, all of them if None
 
         Returns:
-        :return: None creates a contour plot of latitude vs atmospheric pressure level of the
-                zonal mean wind
+        :return: An xarray dataset of the zonal means (time, pres, latitude) of the variables
     '''
+    ntimes = dataset.sizes['time']
+    if not time_chunk:
+        time_chunk = ntimes
+
+    zonal_means = {}
+    for variable in variables:
+        chunks = [zonal_mean(dataset[variable].isel(time=slice(start, start + time_chunk))).load()
+                  for start in range(0, ntimes, time_chunk)]
+        zonal_means[variable] = xr.concat(chunks, dim='time') if len(chunks) > 1 else chunks[0]
+    return xr.Dataset(zonal_means)
+
+
+def _field(dataset: xarray.Dataset, zonal_means: xarray.Dataset, variable: str) -> xarray.DataArray:
+    '''
+        The zonal mean of the variable computed by compute_zonal_means if set, otherwise the
+        variable of the dataset, to be averaged by _zonal_mean_of after selecting the data to plot.
+    '''
+    if zonal_means is not None:
+        return zonal_means[variable]
+    return dataset[variable]
+
+
+def _zonal_mean_of(data: xarray.DataArray) -> xarray.DataArray:
+    '''
+        The zonal mean of data, data itself if it is already a zonal mean.
+    '''
+    if 'longitude' in data.dims:
+        return zonal_mean(data)
+    return data
+
+
+def _time_indices(config_obj: dict, key: str) -> list:
+    '''
+        The time indices of a contour plot: one index or a list of indices.
+    '''
+    time_index = config_obj.get(key)
+    if isinstance(time_index, (list, tuple)):
+        return list(time_index)
+    return [time_index]
+
+
+def _contour_output_file(config_obj: dict, plotname: str, time_index: int, time_indices: list) -> str:
+    '''
+        The full filename of a contour plot, with the time index before the extension if there are
+        several time indices to plot.
+    '''
+    if len(time_indices) > 1:
+        root, ext = os.path.splitext(plotname)
+        plotname = f'{root}_t{time_index:03d}{ext}'
+    return create_output_file(config_obj, plotname)
+
+
+def _render_contour(data: xarray.DataArray, levels: np.ndarray, yscale: str, output_plot_file: str) -> None:
+    '''
+        Create the contour plot of latitude vs atmospheric pressure level of data and save it.
+    '''
+    fig = plt.figure()
+    data.plot.contourf(levels=levels)
+    plt.gca().invert_yaxis()
+    plt.gca().set_yscale(yscale)
+
+    plt.savefig(output_plot_file)
+    plt.close(fig)
 
-    plt.figure(0)
-    output_plotname = config_obj.get('zonal_mean_wind_contour_output_plotname')
-    output_plot_file = create_output_file(config_obj, output_plotname)
 
-    u_zonal_mean = zonal_mean(dataset.u_wind)
+def _render_line(data: xarray.DataArray, output_plot_file: str) -> None:
+    '''
+        Create the line plot of data over time and save it.
+    '''
+    fig = plt.figure()
+    data.plot()
+
+    plt.savefig(output_plot_file)
+    plt.close(fig)
+
+
+def _render(jobs: list, num_processes: int = 1) -> None:
+    '''
+        Render the plots of the jobs (render function, arguments), in num_processes processes.
+    '''
+    if num_processes is None or num_processes <= 1 or len(jobs) <= 1:
+        for render, args in jobs:
+            render(*args)
+        return
 
-    time_index = config_obj.get('zonal_mean_wind_contour_time_index')
+    with ProcessPoolExecutor(max_workers=min(num_processes, len(jobs))) as executor:
+        futures = [executor.submit(render, *args) for render, args in jobs]
+        for future in futures:
+            future.result()
+
+
+def _zonal_mean_wind_contour_jobs(config_obj: dict, u_wind: xarray.DataArray) -> list:
+    '''
+        The render jobs of the zonal mean wind contour plots, one for each time index.
+    '''
+    plotname = config_obj.get('zonal_mean_wind_contour_output_plotname')
+    time_indices = _time_indices(config_obj, 'zonal_mean_wind_contour_time_index')
     contour_start = config_obj.get('zonal_mean_wind_contour_level_start')
     contour_end = config_obj.get('zonal_mean_wind_contour_level_end')
     contour_step = config_obj.get('zonal_mean_wind_contour_level_step_size')
     yscale = config_obj.get('zonal_mean_wind_yscale')
+    levels = np.arange(contour_start, contour_end, contour_step)
 
     # Vary the index over time.
-    u_zonal_mean.isel(time=time_index).plot.contourf(levels=np.arange(contour_start, contour_end, contour_step))
-    plt.gca().invert_yaxis()
-    plt.gca().set_yscale(yscale)
+    return [(_render_contour, (_zonal_mean_of(u_wind.isel(time=time_index)), levels, yscale,
+                               _contour_output_file(config_obj, plotname, time_index, time_indices)))
+            for time_index in time_indices]
 
-    plt.savefig(output_plot_file)
 
-def plot_zonal_mean_temperature_contour(config_obj:dict, dataset:xarray.Dataset) -> None:
+def _zonal_mean_temperature_contour_jobs(config_obj: dict, temperature: xarray.DataArray) -> list:
+    '''
+        The render jobs of the zonal mean temperature contour plots, one for each time index.
+    '''
+    plotname = config_obj.get('zonal_mean_temperature_output_plotname')
+    time_indices = _time_indices(config_obj, 'zonal_mean_temp_contour_time_index')
+    contour_start = config_obj.get('zonal_mean_temp_contour_level_start')
+    contour_end = config_obj.get('zonal_mean_temp_contour_level_end')
+    contour_step = config_obj.get('zonal_mean_temp_contour_level_step_size')
+    yscale = config_obj.get('zonal_mean_temp_yscale')
+    levels = np.arange(contour_start, contour_end, contour_step)
+
+    return [(_render_contour, (_zonal_mean_of(temperature.isel(time=time_index)), levels, yscale,
+                               _contour_output_file(config_obj, plotname, time_index, time_indices)))
+            for time_index in time_indices]
+
+
+def _zonal_mean_wind_jobs(config_obj: dict, u_wind: xarray.DataArray) -> list:
+    '''
+        The render job of the zonal mean wind plot over time at one latitude and pressure level.
+    '''
+    output_plotname = config_obj.get('zonal_mean_wind_output_plotname')
+    output_plot_file = create_output_file(config_obj, output_plotname)
+    zm_latitude = config_obj.get('zonal_mean_wind_latitude')
+    pressure = config_obj.get('zonal_mean_wind_pressure_hpa')
+    u_wind_zonal_mean = _zonal_mean_of(u_wind.sel(latitude=zm_latitude, pres=pressure))
+    return [(_render_line, (u_wind_zonal_mean, output_plot_file))]
+
+
+def _polar_zonal_mean_temperature_jobs(config_obj: dict, temperature: xarray.DataArray) -> list:
+    '''
+        The render job of the polar cap zonal mean temperature plot over time at one pressure level.
+    '''
+    output_plotname = config_obj.get('polar_cap_meridional_mean_temp_output_plotname')
+    output_plot_file = create_output_file(config_obj, output_plotname)
+    start_lat = config_obj.get('polar_cap_lat_start')
+    end_lat = config_obj.get('polar_cap_lat_end')
+    pressure_hp = config_obj.get('polar_cap_pressure_hpa')
+    # polar cap average of temperatures from latitudes specified in the configuration file
+    temperature_zonal_mean = _zonal_mean_of(temperature.sel(pres=pressure_hp))
+    polar_temp = meridional_mean(temperature_zonal_mean, start_lat, end_lat)
+    return [(_render_line, (polar_temp, output_plot_file))]
+
+
+def plot_zonal_mean_wind_contour(config_obj:dict, dataset:xarray.Dataset,
+                                 zonal_means:xarray.Dataset=None) -> None:
     '''
 
         Input:
         :param config_obj: The dictionary representation of settings from the configuration file
         :param dataset: An xarray dataset representation of the input data, subset to only the
                         variables of interest.
+        :param zonal_means: The zonal means computed by compute_zonal_means, computed from the
+                        dataset if None
 
         Returns:
-        :return: None creates a contour plot latitude vs atmospheric pressure level of the
-                 zonal mean temperature
+        :return: None creates a contour plot of latitude vs atmospheric pressure level of the
+                zonal mean wind, for each time index
     '''
+    _render(_zonal_mean_wind_contour_jobs(config_obj, _field(dataset, zonal_means, 'u_wind')))
 
-    plt.figure(1)
-    output_plotname = config_obj.get('zonal_mean_temperature_output_plotname')
-    output_plot_file = create_output_file(config_obj, output_plotname)
-    time_index = config_obj.get('zonal_mean_temp_contour_time_index')
-    contour_start = config_obj.get('zonal_mean_temp_contour_level_start')
-    contour_end = config_obj.get('zonal_mean_temp_contour_level_end')
-    contour_step = config_obj.get('zonal_mean_temp_contour_level_step_size')
-    yscale = config_obj.get('zonal_mean_temp_yscale')
 
-    temperature_zonal_mean = zonal_mean(dataset.temperature)
-    temperature_zonal_mean.isel(time=time_index).plot.contourf(
-        levels=np.arange(contour_start, contour_end, contour_step))
-    plt.gca().invert_yaxis()
-    plt.gca().set_yscale(yscale)
+def plot_zonal_mean_temperature_contour(config_obj:dict, dataset:xarray.Dataset,
+                                        zonal_means:xarray.Dataset=None) -> None:
+    '''
 
-    plt.savefig(output_plot_file)
+        Input:
+        :param config_obj: The dictionary representation of settings from the configuration file
+        :param dataset: An xarray dataset representation of the input data, subset to only the
+                        variables of interest.
+        :param zonal_means: The zonal means computed by compute_zonal_means, computed from the
+                        dataset if None
+
+        Returns:
+        :return: None creates a contour plot latitude vs atmospheric pressure level of the
+                 zonal mean temperature, for each time index
+    '''
+    _render(_zonal_mean_temperature_contour_jobs(config_obj, _field(dataset, zonal_means, 'temperature')))
 
 
-def plot_zonal_mean_wind(config_obj:dict, dataset:xarray.Dataset) -> None:
+def plot_zonal_mean_wind(config_obj:dict, dataset:xarray.Dataset,
+                         zonal_means:xarray.Dataset=None) -> None:
     '''
 
         Input:
         :param config_obj: The dictionary representation of settings from the configuration file
         :param dataset: An xarray dataset representation of the input data, subset to only the
                         variables of interest.
+        :param zonal_means: The zonal means computed by compute_zonal_means, computed from the
+                        dataset if None
 
         Returns:
         :return: None creates a contour plot latitude vs atmospheric pressure level of the
                  zonal mean wind.
     '''
+    _render(_zonal_mean_wind_jobs(config_obj, _field(dataset, zonal_means, 'u_wind')))
 
-    plt.figure(2)
-    output_plotname = config_obj.get('zonal_mean_wind_output_plotname')
-    output_plot_file = create_output_file(config_obj, output_plotname)
-    zm_latitude = config_obj.get('zonal_mean_wind_latitude')
-    pressure = config_obj.get('zonal_mean_wind_pressure_hpa')
-    u_wind_zonal_mean = zonal_mean(dataset.u_wind)
-    u_wind_zonal_mean.sel(latitude=zm_latitude, pres=pressure).plot()
-
-    plt.savefig(output_plot_file)
 
-
-def plot_polar_zonal_mean_temperature(config_obj:dict, dataset:xarray.Dataset) -> None:
+def plot_polar_zonal_mean_temperature(config_obj:dict, dataset:xarray.Dataset,
+                                      zonal_means:xarray.Dataset=None) -> None:
     '''
 
         Input:
         :param config_obj: The dictionary representation of settings from the configuration file
         :param dataset: An xarray dataset representation of the input data, subset to only the
                         variables of interest.
+        :param zonal_means: The zonal means computed by compute_zonal_means, computed from the
+                        dataset if None
 
         Returns:
         :return: None creates a contour plot latitude vs atmospheric pressure level of the
                  zonal mean wind.
     '''
+    _render(_polar_zonal_mean_temperature_jobs(config_obj, _field(dataset, zonal_means, 'temperature')))
+
+
+def plot_diagnostics(config_obj:dict, dataset:xarray.Dataset) -> None:
+    '''
+        Create all the plots: the zonal means of the wind and the temperature are computed once,
+        time_chunk time steps at a time (zonal_mean_time_chunk setting), and the plots are rendered
+        by num_processes processes (num_processes setting, 1 by default).
+
+        Input:
+        :param config_obj: The dictionary representation of settings from the configuration file
+        :param dataset: An xarray dataset representation of the input data, subset to only the
+                        variables of interest.
+
+        Returns:
+        :return: None creates the plots
+    '''
+    zonal_means = compute_zonal_means(dataset, time_chunk=config_obj.get('zonal_mean_time_chunk'))
+
+    jobs = _zonal_mean_wind_contour_jobs(config_obj, zonal_means.u_wind)
+    jobs += _zonal_mean_temperature_contour_jobs(config_obj, zonal_means.temperature)
+    jobs += _zonal_mean_wind_jobs(config_obj, zonal_means.u_wind)
+    jobs += _polar_zonal_mean_temperature_jobs(config_obj, zonal_means.temperature)
+    _render(jobs, config_obj.get('num_processes', 1))
 
-    plt.figure(3)
-    output_plotname = config_obj.get('polar_cap_meridional_mean_temp_output_plotname')
-    output_plot_file = create_output_file(config_obj, output_plotname)
-    temperature_zonal_mean = zonal_mean(dataset.temperature)
-    start_lat = config_obj.get('polar_cap_lat_start')
-    end_lat = config_obj.get('polar_cap_lat_end')
-    pressure_hp = config_obj.get('polar_cap_pressure_hpa')
-    # polar cap average of temperatures from latitudes specified in the configuration file
-    polar_temp = meridional_mean(temperature_zonal_mean, start_lat, end_lat)
-    polar_temp.sel(pres=pressure_hp).plot()
-    plt.savefig(output_plot_file)
 
 def main(config_filename=None):
     # Retrieve the contents of the config file
@@ -216,10 +373,7 @@ def main(config_filename=None):
         dataset = retrieve_data(config)
 
         # generate the plots
-        plot_zonal_mean_wind_contour(config, dataset)
-        plot_zonal_mean_temperature_contour(config, dataset)
-        plot_zonal_mean_wind(config, dataset)
-        plot_polar_zonal_mean_temperature(config, dataset)
+        plot_diagnostics(config, dataset)
     except ValueError as val_er:
         print(val_er)
 
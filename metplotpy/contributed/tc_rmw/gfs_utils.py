@@ -5,59 +5,140 @@
  # ** Research Applications Lab (RAL)
  # ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
  # ============================*
- 
- 
- 
+
+
+
 import os
 import sys
 import logging
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import xarray as xr
 
-def read_gfs_times(datadir, filelist):
+# filters of the GRIB messages of the times and of each wind component,
+# the other isobaric variables of GFS files are on other pressure levels
+time_keys = {'typeOfLevel' : 'sigma'}
+u_keys = {'typeOfLevel' : 'isobaricInhPa', 'shortName' : 'u'}
+v_keys = {'typeOfLevel' : 'isobaricInhPa', 'shortName' : 'v'}
+
+class GFSGribReader:
     """
-    Read times from a list of GFS grib files.
+    Read GFS grib files with cfgrib, building the index of each file once.
+
+    cfgrib scans a grib file to build its index the first time the file is
+    opened and saves it in an index file, so the next openings of the file
+    (for the times or for the winds, in this process or in another one)
+    only load the index.  The index files are written in index_dir
+    (default: the METPLOTPY_GRIB_INDEX_DIR environment variable, or next to
+    the grib files if unset), which is useful if the data directory is
+    read only.
+
+    The times are read from the index, no field is decoded, and each wind
+    component is read with its own filter from the same index file.  Lists
+    of files are read on a pool of nprocs processes.
+
+    Usage:
+        reader = GFSGribReader(datadir, nprocs=4)
+        lead_times, valid_times = reader.read_times(filelist)
+        UGRD, VGRD = reader.read_winds(filelist[0])
     """
-    lead_times = []
-    valid_times = []
-    for filename in filelist:
-        filename = os.path.join(datadir, filename.rstrip())
+
+    def __init__(self, datadir, index_dir=None, nprocs=1):
+        """
+        Args:
+            @param datadir: directory of the grib files
+            @param index_dir: directory of the cfgrib index files
+            @param nprocs: number of processes reading lists of files
+        """
+        self.datadir = datadir
+        self.index_dir = index_dir or os.environ.get('METPLOTPY_GRIB_INDEX_DIR')
+        self.nprocs = nprocs
+        if self.index_dir:
+            os.makedirs(self.index_dir, exist_ok=True)
+
+    def path(self, filename):
+        return os.path.join(self.datadir, filename.rstrip())
+
+    def indexpath(self, path):
+        """
+        cfgrib template of the index file of a grib file,
+        {short_hash} is the hash of the index keys.
+        """
+        if not self.index_dir:
+            return '{path}.{short_hash}.idx'
+        return os.path.join(self.index_dir, os.path.basename(path) + '.{short_hash}.idx')
+
+    def open(self, filename, filter_by_keys):
+        """
+        Open the messages of a grib file selected by filter_by_keys.
+        """
+        path = self.path(filename)
         try:
-            ds = xr.open_dataset(filename, engine='cfgrib',
+            logging.info('reading ' + path)
+            return xr.open_dataset(path, engine='cfgrib',
                 backend_kwargs={
-                'filter_by_keys' : {'typeOfLevel' : 'sigma'}})
-            logging.info('reading ' + filename)
+                'filter_by_keys' : filter_by_keys,
+                'indexpath' : self.indexpath(path)})
         except IOError:
-            logging.error('failed to open ' + filename)
+            logging.error('failed to open ' + path)
             sys.exit()
 
-        logging.info(ds)
-        lead_times.append(ds['time'].values)
-        valid_times.append(ds['valid_time'].values)
+    def read_file_times(self, filename):
+        """
+        Read the time and the valid time of a grib file.
+        """
+        with self.open(filename, time_keys) as ds:
+            logging.info(ds)
+            return ds['time'].values, ds['valid_time'].values
+
+    def read_file_winds(self, filename):
+        """
+        Read the u and v wind fields of a grib file.
+        """
+        with self.open(filename, u_keys) as ds:
+            logging.info(ds)
+            UGRD = ds['u'].values
+        with self.open(filename, v_keys) as ds:
+            logging.info(ds)
+            VGRD = ds['v'].values
+        return UGRD, VGRD
+
+    def _map(self, function, filelist):
+        filelist = list(filelist)
+        if self.nprocs is None or self.nprocs <= 1 or len(filelist) <= 1:
+            return [function(filename) for filename in filelist]
+        with ProcessPoolExecutor(max_workers=min(self.nprocs, len(filelist))) as executor:
+            return list(executor.map(function, filelist))
+
+    def read_times(self, filelist):
+        """
+        Read the times of a list of grib files.
+
+        Returns:
+            lists of the times and of the valid times of the files
+        """
+        times = self._map(self.read_file_times, filelist)
+        lead_times = [time for time, valid_time in times]
+        valid_times = [valid_time for time, valid_time in times]
+        return lead_times, valid_times
 
-    return lead_times, valid_times
+    def read_winds(self, filelist):
+        """
+        Read the wind fields of a list of grib files.
+
+        Returns:
+            list of the (UGRD, VGRD) fields of the files
+        """
+        return self._map(self.read_file_winds, filelist)
+
+def read_gfs_times(datadir, filelist, nprocs=1):
+    """
+    Read times from a list of GFS grib files.
+    """
+    return GFSGribReader(datadir, nprocs=nprocs).read_times(filelist)
 
 def read_gfs_winds(datadir, filename):
     """
     Read wind fields from a GFS grib file.
     """
-    filename = os.path.join(datadir, filename.rstrip())
-    try:
-        logging.info('reading ' + filename)
-        ds = xr.open_dataset(filename, engine='cfgrib',
-            backend_kwargs={
-            'filter_by_keys' :
-            {'typeOfLevel' : 'isobaricInhPa', 'shortName' : 'u'}})
-        logging.info(ds)
-        UGRD = ds['u'].values
-        ds = xr.open_dataset(filename, engine='cfgrib',
-            backend_kwargs={
-            'filter_by_keys' :
-            {'typeOfLevel' : 'isobaricInhPa', 'shortName' : 'v'}})
-        logging.info(ds)
-        VGRD = ds['v'].values
-    except IOError:
-        logging.error('failed to open ' + filename)
-        sys.exit()
-
-    return UGRD, VGRD
+    return GFSGribReader(datadir).read_file_winds(filename)
@@ -12,167 +12,205 @@ import os
 import sys
 import argparse
 import logging
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import matplotlib
 import yaml
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
+from matplotlib.artist import Artist
 from matplotlib.colors import ListedColormap
 from tc_utils import read_tcrmw, format_valid_time, \
     radial_tangential_winds, height_from_pressure
 
-def plot_cross_section(config, plotdir,
-    valid_time, range_grid, pressure_grid,
-    wind_data, scalar_data,
-    field='TMP', track_index=0):
+def vertical_axis(config):
     """
-       Generate the cross-section plot of the tangential and radial wind
+       Vertical levels of the config: whether they are pressure levels,
+       the starting and ending levels and the tick step
     """
-
     # Retrieve vertical level information: coordinate input type, dimension name, and vertical levels
-    vert_coord_input_type = config['vertical_coord_type_in']
     vert_dimension_name = config['vertical_dim_name']
     vert_levels = config['vertical_levels']
     y_tick_step = config['vertical_level_stepsize'][0]
-    if vert_dimension_name == "pressure":
-        by_pressure_lvl = True
-        levels = np.array(vert_levels)
-        # determine the starting and ending PRESSURE levels
-        start_level = np.amax(levels)
-        end_level = np.amin(levels)
+    by_pressure_lvl = vert_dimension_name == "pressure"
+    levels = np.array(vert_levels)
+    # determine the starting and ending PRESSURE or HEIGHT levels
+    start_level = np.amax(levels)
+    end_level = np.amin(levels)
+    return by_pressure_lvl, start_level, end_level, y_tick_step
+
+def remove_contour(contour_set):
+    """
+       Remove a contour set and its labels from its axes
+    """
+    if isinstance(contour_set, Artist):
+        # matplotlib >= 3.8, the contour set is a single collection
+        contour_set.remove()
     else:
-        by_pressure_lvl = False
-        levels = np.array(vert_levels)
-        # determine the starting and ending HEIGHT levels
-        start_level = np.amax(levels)
-        end_level = np.amin(levels)
+        for collection in contour_set.collections:
+            collection.remove()
+    for text in contour_set.labelTexts:
+        if text.axes is not None:
+            text.remove()
 
-    # azimuthal mean
-    wind_radial = np.mean(wind_data['radial'], axis=1)
-    wind_tangential = np.mean(wind_data['tangential'], axis=1)
-    scalar_field = np.mean(scalar_data[field], axis=1)
-    logging.debug(wind_radial.shape)
-    logging.debug(wind_tangential.shape)
-    logging.debug(scalar_field.shape)
-
-    # Generate two plots, one for tangential cross-section and the other
-    # for radial cross-section winds
-    wind_types = ['tangential', 'radial']
-    for wt in wind_types:
-        fig, ax = plt.subplots(figsize=(8., 4.5))
-        ax.plot([1, 1], [1000, 50], color='lightgrey')
-
-        plt.title(
-            format_valid_time(int(valid_time[track_index])))
-
-        if wt == 'tangential':
-            #
-            # Tangential wind
-            #
-
-            # read in the config options for tangential_contour_level_start, tangential_contour_level_end, and
-            # tangential_contour_level_stepsize
-            start = config['tangential_contour_level_start']
-            end = config['tangential_contour_level_end']
-            step = config['tangential_contour_level_stepsize']
-            wind_contour = ax.contour(range_grid, pressure_grid,
-                                      wind_tangential[:, :, track_index].transpose(),
-                                      levels=np.arange(start, end, step), colors='darkgreen', linewidths=1)
-            ax.clabel(wind_contour, colors='darkgreen', fmt='%1.0f')
-
-
-            scalar_contour = ax.contour(range_grid, pressure_grid,
-                                        scalar_field[:, :, track_index].transpose(),
-                                        levels=np.arange(250, 300, 10), colors='darkblue',
-                                        linewidths=1)
-
-            ax.clabel(scalar_contour, colors='darkblue', fmt='%1.0f')
-
-            ax.annotate('Tangential Wind (m s-1)', xy=(14, 350), color='darkgreen')
-            ax.annotate('Temperature (K)', xy=(14, 370), color='darkblue')
-
-            ax.set_xlabel(
-                'Range (RMW = %4.1f km)' % track_data['RMW'][track_index])
-            ax.set_xticks(np.arange(1, 20))
-
-            ax.set_yscale('symlog')
-
-            # provide support for wind data in pressure or height
-            min_y_tick = config['vertical_levels'][0]
-            num_vert_levels = len(config['vertical_levels']) -1
-            max_y_tick = config['vertical_levels'][num_vert_levels]
-
-            if by_pressure_lvl:
-                ax.set_ylabel('Pressure (mb)')
-                ax.set_ylim(start_level, end_level)
-                ax.set_yticks(np.arange(start_level, end_level, y_tick_step))
-                ax.set_yticklabels(np.arange(start_level, end_level, y_tick_step))
-            else:
-                ax.set_ylabel('Height (m)')
-                ax.set_ylim(start_level, end_level)
-                ax.set_yticks(np.arange(start_level, end_level, y_tick_step))
-                ax.set_yticklabels(np.arange(start_level, end_level, y_tick_step))
-
-            tang_outfile = os.path.join(plotdir,
-                                        'tangential_cross_section_' + str(valid_time[track_index]))
-
-            fig.savefig(tang_outfile + '.png', dpi=300)
-            fig.savefig(tang_outfile + '.pdf')
+def reset_y_axis(ax):
+    """
+       Back to the linear, autoscaled y-axis of a new figure, where the
+       contour labels are placed before the y scale and limits are set
+    """
+    ax.set_yscale('linear')
+    ax.relim()
+    ax.autoscale()
+    if ax.yaxis_inverted():
+        ax.invert_yaxis()
+
+class WindCrossSectionPlot:
+    """
+       Cross-section figure of the tangential or radial wind and of the scalar
+       field, reused for several track times: only the title, the range label,
+       the contour lines and their labels change from one time to the next.
+    """
+
+    def __init__(self, config, wind_type, range_grid, pressure_grid):
+        self.config = config
+        self.wind_type = wind_type
+        self.range_grid = range_grid
+        self.pressure_grid = pressure_grid
+        self.contours = []
+
+        self.fig, self.ax = plt.subplots(figsize=(8., 4.5))
+        self.ax.plot([1, 1], [1000, 50], color='lightgrey')
+        self.title = self.ax.set_title('')
+
+    def plot(self, valid_time, rmw, wind_field, scalar_field, plotdir):
+        """
+           Plot one track time, wind_field and scalar_field are the
+           (range, level) azimuthal means.
+        """
+        config = self.config
+        ax = self.ax
+        for contour in self.contours:
+            remove_contour(contour)
+        if self.contours:
+            reset_y_axis(ax)
+        for text in ax.texts[:]:
+            text.remove()
+
+        self.title.set_text(format_valid_time(int(valid_time)))
+
+        # read in the config options for <wind type>_contour_level_start, <wind type>_contour_level_end, and
+        # <wind type>_contour_level_stepsize
+        start = config[self.wind_type + '_contour_level_start']
+        end = config[self.wind_type + '_contour_level_end']
+        step = config[self.wind_type + '_contour_level_stepsize']
+        wind_contour = ax.contour(self.range_grid, self.pressure_grid,
+                                  wind_field.transpose(),
+                                  levels=np.arange(start, end, step), colors='darkgreen', linewidths=1)
+        ax.clabel(wind_contour, colors='darkgreen', fmt='%1.0f')
+
+        scalar_contour = ax.contour(self.range_grid, self.pressure_grid,
+                                    scalar_field.transpose(),
+                                    levels=np.arange(250, 300, 10), colors='darkblue',
+                                    linewidths=1)
+
+        ax.clabel(scalar_contour, colors='darkblue', fmt='%1.0f')
+        self.contours = [wind_contour, scalar_contour]
+
+        ax.annotate(self.wind_type.capitalize() + ' Wind (m s-1)', xy=(14, 350), color='darkgreen')
+        ax.annotate('Temperature (K)', xy=(14, 370), color='darkblue')
+
+        ax.set_xlabel(
+            'Range (RMW = %4.1f km)' % rmw)
+        ax.set_xticks(np.arange(1, 20))
+
+        ax.set_yscale('symlog')
+
+        # provide support for wind data in pressure or height
+        by_pressure_lvl, start_level, end_level, y_tick_step = vertical_axis(config)
+        if by_pressure_lvl:
+            ax.set_ylabel('Pressure (mb)')
         else:
-            #
-            # Radial wind
-            #
-
-            # read in the config options for radial_contour_level_start, radial_contour_level_end, and
-            # radial_contour_level_stepsize
-            start = config['radial_contour_level_start']
-            end = config['radial_contour_level_end']
-            step = config['radial_contour_level_stepsize']
-            wind_contour = ax.contour(range_grid, pressure_grid,
-                                      wind_radial[:, :, track_index].transpose(),
-                                      levels=np.arange(start,end,step), colors='darkgreen', linewidths=1)
-            ax.clabel(wind_contour, colors='darkgreen', fmt='%1.0f')
-
-
-            scalar_contour = ax.contour(range_grid, pressure_grid,
-                                        scalar_field[:, :, track_index].transpose(),
-                                        levels=np.arange(250, 300, 10), colors='darkblue',
-                                        linewidths=1)
-
-            ax.clabel(scalar_contour, colors='darkblue', fmt='%1.0f')
-
-            ax.annotate('Radial Wind (m s-1)', xy=(14, 350), color='darkgreen')
-            ax.annotate('Temperature (K)', xy=(14, 370), color='darkblue')
-
-            ax.set_xlabel(
-                'Range (RMW = %4.1f km)' % track_data['RMW'][track_index])
-            ax.set_xticks(np.arange(1, 20))
-
-            ax.set_yscale('symlog')
-
-            # provide support for wind data in pressure or height
-            if by_pressure_lvl:
-                ax.set_ylabel('Pressure (mb)')
-                # ax.set_ylim(1000, 250)
-                # ax.set_yticks(np.arange(1000, 250, -100))
-                # ax.set_yticklabels(np.arange(1000, 250, -100))
-                ax.set_ylim(start_level, end_level)
-                ax.set_yticks(np.arange(start_level, end_level, y_tick_step))
-                ax.set_yticklabels(np.arange(start_level, end_level, y_tick_step))
-            else:
-                ax.set_ylabel('Height (m)')
-                # ax.set_ylim(110, 10359)
-                # ax.set_yticks(np.arange(110, 10359, 1000))
-                # ax.set_yticklabels(np.arange(110, 10359, 1000))
-                ax.set_ylim(start_level, end_level)
-                ax.set_yticks(np.arange(start_level, end_level, y_tick_step))
-                ax.set_yticklabels(np.arange(start_level, end_level, y_tick_step))
-
-            rad_outfile = os.path.join(plotdir,
-                                       'radial_cross_section_' + str(valid_time[track_index]))
-
-            fig.savefig(rad_outfile + '.png', dpi=300)
-            fig.savefig(rad_outfile + '.pdf')
+            ax.set_ylabel('Height (m)')
+        ax.set_ylim(start_level, end_level)
+        ax.set_yticks(np.arange(start_level, end_level, y_tick_step))
+        ax.set_yticklabels(np.arange(start_level, end_level, y_tick_step))
+
+        outfile = os.path.join(plotdir,
+                               self.wind_type + '_cross_section_' + str(valid_time))
+
+        self.fig.savefig(outfile + '.png', dpi=300)
+        self.fig.savefig(outfile + '.pdf')
+        return outfile
+
+    def close(self):
+        plt.close(self.fig)
+
+def plot_track_times(config, plotdir, valid_time, range_grid, pressure_grid,
+    wind_fields, scalar_fields, rmw):
+    """
+       Plot the tangential and radial cross-sections of several track times,
+       on one figure per wind type. The wind and scalar fields are the
+       (range, level, time) azimuthal means.
+    """
+    outfiles = []
+    for wt in ['tangential', 'radial']:
+        cross_section = WindCrossSectionPlot(config, wt, range_grid, pressure_grid)
+        for i in range(len(valid_time)):
+            outfiles.append(cross_section.plot(valid_time[i], rmw[i],
+                wind_fields[wt][:, :, i], scalar_fields[:, :, i], plotdir))
+        cross_section.close()
+    return outfiles
+
+def plot_cross_sections(config, plotdir,
+    valid_time, range_grid, pressure_grid,
+    wind_data, scalar_data, rmw,
+    field='TMP', track_indices=None, nprocs=1):
+    """
+       Generate the cross-section plots of the tangential and radial wind
+       at several track times (all of them if track_indices is None).
+       The azimuthal means are only computed at these times, which are
+       split between nprocs worker processes reusing their figures.
+    """
+    if track_indices is None:
+        track_indices = list(range(len(valid_time)))
+    track_indices = list(track_indices)
+
+    # azimuthal mean
+    wind_fields = {wt: np.mean(wind_data[wt][..., track_indices], axis=1)
+        for wt in ['tangential', 'radial']}
+    scalar_fields = np.mean(scalar_data[field][..., track_indices], axis=1)
+    logging.debug(wind_fields['radial'].shape)
+    logging.debug(wind_fields['tangential'].shape)
+    logging.debug(scalar_fields.shape)
+    valid_time = np.asarray(valid_time)[track_indices]
+    rmw = np.asarray(rmw)[track_indices]
+
+    if nprocs is None or nprocs <= 1 or len(track_indices) == 1:
+        return plot_track_times(config, plotdir, valid_time, range_grid, pressure_grid,
+            wind_fields, scalar_fields, rmw)
+
+    # contiguous batches of times, one pair of figures per worker
+    batches = np.array_split(np.arange(len(track_indices)), min(nprocs, len(track_indices)))
+    with ProcessPoolExecutor(max_workers=len(batches)) as executor:
+        futures = [executor.submit(plot_track_times, config, plotdir,
+            valid_time[batch], range_grid, pressure_grid,
+            {wt: wind_fields[wt][:, :, batch] for wt in wind_fields},
+            scalar_fields[:, :, batch], rmw[batch]) for batch in batches]
+        return [outfile for future in futures for outfile in future.result()]
+
+def plot_cross_section(config, plotdir,
+    valid_time, range_grid, pressure_grid,
+    wind_data, scalar_data,
+    field='TMP', track_index=0, rmw=None):
+    """
+       Generate the cross-section plot of the tangential and radial wind
+       at one track time. rmw is the radius of maximum wind (km) at each
+       track time, by default the one of the track data read by __main__.
+    """
+    if rmw is None:
+        rmw = track_data['RMW']
+    plot_cross_sections(config, plotdir, valid_time, range_grid, pressure_grid,
+        wind_data, scalar_data, rmw, field=field, track_indices=[track_index])
 
 
 if __name__ == '__main__':
@@ -192,6 +230,12 @@ if __name__ == '__main__':
     parser.add_argument('--config', type=str,
                         required=True,
                         help='configuration file')
+    parser.add_argument('--track_indices', type=str, dest='track_indices',
+                        required=False, default='0',
+                        help="comma separated track point indices, or 'all'")
+    parser.add_argument('--nprocs', type=int, dest='nprocs',
+                        required=False, default=1,
+                        help='number of processes drawing the track times')
 
     args = parser.parse_args()
 
@@ -221,5 +265,10 @@ if __name__ == '__main__':
     # logging.debug(wind_data.keys())
     logging.debug(radial_tangential_wind_data.keys())
 
-    plot_cross_section(config, args.plotdir, valid_time, range_grid, pressure_grid,
-                       radial_tangential_wind_data, scalar_data)
+    if args.track_indices.lower() == 'all':
+        track_indices = None
+    else:
+        track_indices = [int(index) for index in args.track_indices.split(',')]
+    plot_cross_sections(config, args.plotdir, valid_time, range_grid, pressure_grid,
+                        radial_tangential_wind_data, scalar_data, track_data['RMW'],
+                        track_indices=track_indices, nprocs=args.nprocs)
@@ -15,15 +15,187 @@ __author__ = 'David Fillmore'
 
 import os
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 import yaml
 import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.artist import Artist
 import numpy as np
 import xarray as xr
 
 matplotlib.use('Agg')
 
 
+def time_indices(index_time_slice, n_times):
+    """
+        Track time indices of the index_time_slice config item: a single index,
+        a list of indices or 'all'.
+    """
+    if isinstance(index_time_slice, str) and index_time_slice.lower() == 'all':
+        return list(range(n_times))
+    if isinstance(index_time_slice, (list, tuple)):
+        return [int(itime) for itime in index_time_slice]
+    return [int(index_time_slice)]
+
+
+def remove_contour(contour_set):
+    """
+        Remove a contour set and its labels from its axes.
+    """
+    if isinstance(contour_set, Artist):
+        # matplotlib >= 3.8, the contour set is a single collection
+        contour_set.remove()
+    else:
+        for collection in contour_set.collections:
+            collection.remove()
+    for text in contour_set.labelTexts:
+        if text.axes is not None:
+            text.remove()
+
+
+def reset_y_axis(ax):
+    """
+        Back to the linear, autoscaled y-axis of a new figure, where the
+        contour labels are placed before the y scale and limits are set.
+    """
+    # pylint: disable=invalid-name
+    ax.set_yscale('linear')
+    ax.relim()
+    ax.autoscale()
+    if ax.yaxis_inverted():
+        ax.invert_yaxis()
+
+
+class CrossSectionPlot:
+    """
+        Cross-section figure of the azimuthal mean of a field, reused for several track
+        times: the figure, its axes and title are created once, each plot only replaces
+        the contour lines and their labels before saving the figure.
+    """
+
+    def __init__(self, config, range_grid, vertical_grid):
+        """
+           Args:
+              @param config: The config object of items in the YAML configuration file.
+              @param range_grid: The range values (x-axis).
+              @param vertical_grid: The values of the vertical coordinate (y-axis).
+        """
+
+        # pylint raises issues with the use of 'ax' for matplotlib calls,
+        # Keep the use of 'ax' as this is commonly used
+        # pylint: disable=invalid-name
+
+        self.config = config
+        self.range_grid = range_grid
+        self.vertical_grid = vertical_grid
+        self.fig, self.ax = plt.subplots(figsize=(config['plot_size_width'], config['plot_size_height']))
+        self.ax.set_title(config['plot_title'])
+        self.scalar_contour = None
+
+    def plot(self, field_azi_mean, outfile):
+        """
+           Plot the azimuthal mean of the field at one track time.
+
+           Args:
+              @param field_azi_mean: The (range, vertical level) azimuthal mean of the field.
+              @param outfile: The output file path without extension.
+
+           Returns:
+           The output file path, .png and .pdf versions of the cross-section plot are written.
+        """
+        config = self.config
+        ax = self.ax  # pylint: disable=invalid-name
+
+        if self.scalar_contour is not None:
+            remove_contour(self.scalar_contour)
+            reset_y_axis(ax)
+
+        self.scalar_contour = ax.contour(self.range_grid,
+                                         self.vertical_grid,
+                                         field_azi_mean.transpose(),
+                                         levels=np.arange(config['contour_level_start'],
+                                                          config['contour_level_end'],
+                                                          config['contour_level_stepsize']),
+                                                          colors=config['contour_line_colors'],
+                                                          linewidths=(config['line_width'])
+                                         )
+        ax.clabel(self.scalar_contour, colors=config['contour_label_color'], fmt=config['contour_label_fmt'])
+        ax.set_xlabel(config['x_label'])
+        ax.set_ylabel(config['y_label'])
+        ax.set_xticks(np.arange(config['x_tick_start'], config['x_tick_end']))
+        ax.set_yticks(np.arange(config['y_tick_start'],
+                                config['y_tick_end'],
+                                config['y_tick_stepsize']))
+        ax.set_yscale(config['y_scale'])
+        ax.set_ylim(config['y_lim_start'], config['y_lim_end'])
+        self.fig.savefig(outfile + '.png', dpi=config['plot_res'])
+        self.fig.savefig(outfile + '.pdf')
+        return outfile
+
+    def close(self):
+        plt.close(self.fig)
+
+
+def plot_cross_section_times(config, range_grid, vertical_grid, fields_azi_mean, outfiles):
+    """
+        Plot the cross-sections of several track times on the same figure.
+        fields_azi_mean is a (range, vertical level, time) array.
+    """
+    cross_section = CrossSectionPlot(config, range_grid, vertical_grid)
+    for i, outfile in enumerate(outfiles):
+        cross_section.plot(fields_azi_mean[:, :, i], outfile)
+    cross_section.close()
+    return outfiles
+
+
+def plot_cross_sections(config, data_set, plotdir, nprocs=1):
+    """
+        Generate the cross-section plots of the field specified in the YAML config file
+        at all the track times of its index_time_slice (an index, a list of indices or 'all').
+
+        The data set is read once: only the azimuthal mean of the field at the requested
+        track times is computed.  The times are split between nprocs worker processes,
+        each worker reuses one figure for all its times.
+
+       Args:
+          @param config: The config object of items in the YAML configuration file.
+          @param data_set: The xarray dataset (gridded data, either netCDF or grib2).
+          @param plotdir: The output directory.
+          @param nprocs: The number of worker processes, the plots are drawn in this process if 1.
+
+       Returns:
+       The list of the output file paths without extension: the config plot_filename if a
+       single time is plotted, otherwise plot_filename_<valid time> (or plot_filename_<index>).
+    """
+    field = data_set[config['field']]
+    itimes = time_indices(config['index_time_slice'], field.shape[-1])
+
+    # azimuthal mean of the requested track times
+    fields_azi_mean = field.isel({field.dims[-1]: itimes}).mean(axis=1).values
+    range_grid = data_set['range'].values
+    vertical_grid = data_set[config['vertical_coord_name']].values
+
+    if len(itimes) == 1:
+        outfiles = [os.path.join(plotdir, config['plot_filename'])]
+    else:
+        if 'valid_time' in data_set:
+            labels = [str(data_set['valid_time'].values[itime]) for itime in itimes]
+        else:
+            labels = [str(itime) for itime in itimes]
+        outfiles = [os.path.join(plotdir, config['plot_filename'] + '_' + label) for label in labels]
+
+    if nprocs is None or nprocs <= 1 or len(itimes) == 1:
+        return plot_cross_section_times(config, range_grid, vertical_grid, fields_azi_mean, outfiles)
+
+    # contiguous batches of times, one figure per worker
+    batches = np.array_split(np.arange(len(itimes)), min(nprocs, len(itimes)))
+    with ProcessPoolExecutor(max_workers=len(batches)) as executor:
+        futures = [executor.submit(plot_cross_section_times, config, range_grid, vertical_grid,
+                                   fields_azi_mean[:, :, batch], [outfiles[i] for i in batch])
+                   for batch in batches]
+        return [outfile for future in futures for outfile in future.result()]
+
+
 def plot_cross_section(config, data_set, args):
     """
         Generate the cross-section plot of the field specified in the YAML config file
@@ -36,45 +208,11 @@ def plot_cross_section(config, data_set, args):
           @param args: The command line arguments indicating the location of input and output dirs, etc.
 
        Returns:
-       None, generates output files: .png and .pdf versions of the cross-section plot.
+       None, generates output files: .png and .pdf versions of the cross-section plot
+       of each track time of index_time_slice, see plot_cross_sections.
 
     """
-
-    # pylint raises issues with the use of 'ax' for matplotlib calls,
-    # Keep the use of 'ax' as this is commonly used
-    # pylint: disable=invalid-name
-
-
-    plot_width = config['plot_size_width']
-    plot_height = config['plot_size_height']
-    fig, ax = plt.subplots(figsize=(plot_width, plot_height))
-
-    field = data_set[config['field']]
-    itime = config['index_time_slice']
-    field_azi_mean = np.mean(field, axis=1)[:, :, itime]
-
-    scalar_contour = ax.contour(data_set['range'],
-                                data_set[config['vertical_coord_name']],
-                                field_azi_mean.transpose(),
-                                levels=np.arange(config['contour_level_start'],
-                                                 config['contour_level_end'],
-                                                 config['contour_level_stepsize']),
-                                                 colors=config['contour_line_colors'],
-                                                 linewidths=(config['line_width'])
-                                )
-    plt.title(config['plot_title'])
-    ax.clabel(scalar_contour, colors=config['contour_label_color'], fmt=config['contour_label_fmt'])
-    ax.set_xlabel(config['x_label'])
-    ax.set_ylabel(config['y_label'])
-    ax.set_xticks(np.arange(config['x_tick_start'], config['x_tick_end']))
-    ax.set_yticks(np.arange(config['y_tick_start'],
-                            config['y_tick_end'],
-                            config['y_tick_stepsize']))
-    ax.set_yscale(config['y_scale'])
-    ax.set_ylim(config['y_lim_start'], config['y_lim_end'])
-    plot_outdir = args.plotdir
-    fig.savefig(os.path.join(plot_outdir, config['plot_filename'] + '.png'), dpi=config['plot_res'])
-    fig.savefig(os.path.join(plot_outdir, config['plot_filename'] + '.pdf'))
+    plot_cross_sections(config, data_set, args.plotdir, nprocs=getattr(args, 'nprocs', 1))
 
 
 if __name__ == '__main__':
@@ -93,6 +231,9 @@ if __name__ == '__main__':
     parser.add_argument('--config', type=str,
                         required=True,
                         help='configuration file')
+    parser.add_argument('--nprocs', type=int, dest='nprocs',
+                        required=False, default=1,
+                        help='number of processes drawing the track times')
 
     input_args = parser.parse_args()
 
@@ -10,17 +10,216 @@
  
 import os
 import sys
+import time
 import argparse
 import logging
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import matplotlib
 # matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 from matplotlib.colors import ListedColormap
+from matplotlib.collections import LineCollection
+from matplotlib.ticker import MaxNLocator
 import cartopy
 import cartopy.crs as ccrs
 import shapely.geometry as sgeom
-from tc_utils import read_tcrmw, format_valid_time
+from tc_utils import TCRMWFile, format_valid_time
+
+def grid_segments(lon_grid, lat_grid, range_step, azimuth_step):
+    """
+    Range circles and azimuth lines of the range azimuth grids of all the
+    track points, as a list of (n, 2) lon/lat (or x/y) arrays for a LineCollection.
+    lon_grid and lat_grid are (range, azimuth, track point) arrays.
+    """
+    n_range, n_azimuth, n_plotted = lat_grid.shape
+    circles = list(range(0, n_range, range_step)) + [-1]
+    segments = []
+    for i in range(n_plotted):
+        for j in circles:
+            segments.append(np.column_stack((lon_grid[j,:,i], lat_grid[j,:,i])))
+        for j in range(0, n_azimuth, azimuth_step):
+            segments.append(np.column_stack((lon_grid[:,j,i], lat_grid[:,j,i])))
+    return segments
+
+def merge_track_fields(lon_grid, lat_grid, field):
+    """
+    Place the range azimuth grids of all the track points side by side along
+    the azimuth axis, separated by a masked column, so that the fields of all
+    the track points are contoured by a single contour call.
+    Returns the (range, azimuth * track points + gaps) lon, lat and masked field
+    (or x, y and field if the grid is given in map coordinates), the non finite
+    values of the field are masked.
+    """
+    field = np.ma.masked_invalid(field)
+    n_range, n_azimuth, n_plotted = lat_grid.shape
+    shape = (n_range, (n_azimuth + 1) * n_plotted - 1)
+    lon = np.empty(shape)
+    lat = np.empty(shape)
+    merged = np.ma.masked_all(shape)
+    for i in range(n_plotted):
+        cols = slice(i * (n_azimuth + 1), i * (n_azimuth + 1) + n_azimuth)
+        lon[:, cols] = lon_grid[:,:,i]
+        lat[:, cols] = lat_grid[:,:,i]
+        merged[:, cols] = field[:,:,i]
+        if i < n_plotted - 1:
+            # The gap column repeats the last azimuth, it is masked so the
+            # quadrilaterals joining two track points are never filled.
+            lon[:, cols.stop] = lon_grid[:,-1,i]
+            lat[:, cols.stop] = lat_grid[:,-1,i]
+    return lon, lat, merged
+
+def draw_fields(ax, lon_grid, lat_grid, field, proj_geom):
+    """
+    Draw the scalar field of each track point separately.
+    """
+    n_plotted = lat_grid.shape[2]
+    for i in range(n_plotted):
+        cfplot = plt.contourf(
+            # lon_grid[:,:,i], lat_grid[:,:,i], field[::-1,:,i],
+            lon_grid[:,:,i], lat_grid[:,:,i], field[:,:,i],
+            transform=proj_geom,
+            # cmap=ListedColormap(plt.cm.cividis.colors[::-1]),
+            cmap=plt.cm.gist_yarg,
+            alpha=0.5)
+        cplot = plt.contour(
+            # lon_grid[:,:,i], lat_grid[:,:,i], field[::-1,:,i],
+            lon_grid[:,:,i], lat_grid[:,:,i], field[:,:,i],
+            colors='k',
+            transform=proj_geom)
+        ax.clabel(cplot, colors='k', fmt='%1.0f', fontsize=14)
+        """
+        vplot = plt.streamplot(
+            lon_grid[:,:,i], lat_grid[:,:,i],
+            # u_grid[::-1,:,i], v_grid[::-1,:,i],
+            u_grid[:,:,i], v_grid[:,:,i],
+            # color=magnitude[::-1,:,i],
+            color=magnitude[:,:,i],
+            transform=proj_geom, density=6)
+        """
+
+def draw_grid(ax, lon_grid, lat_grid, proj_geom, params):
+    """
+    Draw each range circle and azimuth line of the grid of each track point separately.
+    """
+    n_range, n_azimuth, n_plotted = lat_grid.shape
+    for i in range(n_plotted):
+        # scale = float(i) / n_track
+        scale = 0.5
+        for j in range(0, n_range, params['range_step']):
+            circle = sgeom.LineString(
+                zip(lon_grid[j,:,i], lat_grid[j,:,i]))
+            ax.add_geometries([circle], proj_geom,
+                edgecolor=(scale, scale, scale), facecolor='none')
+        circle = sgeom.LineString(
+            zip(lon_grid[-1,:,i], lat_grid[-1,:,i]))
+        ax.add_geometries([circle], proj_geom,
+            edgecolor=(scale, scale, scale), facecolor='none')
+        for j in range(0, n_azimuth, params['azimuth_step']):
+            line = sgeom.LineString(
+                zip(lon_grid[:,j,i], lat_grid[:,j,i]))
+            ax.add_geometries([line], proj_geom,
+                edgecolor=(scale, scale, scale), facecolor='none')
+
+def project_grid(proj, proj_geom, lon_grid, lat_grid):
+    """
+    Project the lon/lat of the grid points to the map projection proj, once
+    for all the track points. Artists drawn in map coordinates are not
+    projected again by cartopy, which is the bulk of the drawing time
+    when lines and contours are given in lon/lat.
+    Returns the x and y arrays, with the shape of lon_grid.
+    """
+    lon_grid = np.asarray(lon_grid, dtype=float)
+    points = proj.transform_points(proj_geom,
+        lon_grid.ravel(), np.asarray(lat_grid, dtype=float).ravel())
+    return points[:, 0].reshape(lon_grid.shape), points[:, 1].reshape(lon_grid.shape)
+
+def draw_fields_batched(ax, x_grid, y_grid, field):
+    """
+    Draw the scalar field of all the track points with one contourf and one
+    contour call, on common contour levels, instead of one per track point.
+    x_grid and y_grid are the grid points in map coordinates (see project_grid).
+    """
+    x, y, merged = merge_track_fields(x_grid, y_grid, field)
+    levels = MaxNLocator(nbins=7).tick_values(merged.min(), merged.max())
+    # transData: x and y are already map coordinates
+    ax.contourf(x, y, merged, levels=levels, transform=ax.transData,
+        cmap=plt.cm.gist_yarg, alpha=0.5)
+    cplot = ax.contour(x, y, merged, levels=levels, transform=ax.transData,
+        colors='k')
+    ax.clabel(cplot, colors='k', fmt='%1.0f', fontsize=14)
+
+def draw_grid_batched(ax, x_grid, y_grid, params):
+    """
+    Draw the grids of all the track points as a single LineCollection,
+    instead of one artist per range circle and azimuth line.
+    x_grid and y_grid are the grid points in map coordinates (see project_grid).
+    """
+    segments = grid_segments(x_grid, y_grid,
+        params['range_step'], params['azimuth_step'])
+    scale = 0.5
+    ax.add_collection(LineCollection(segments,
+        colors=[(scale, scale, scale)], linewidths=1), autolim=False)
+
+def plot_track_panel(lon_grid, lat_grid, field, lon_track, lat_track,
+    valid_time, params, outfile):
+    """
+    Plot the scalar field and grid of one track point, zoomed on its range
+    azimuth grid. lon_grid, lat_grid and field are (range, azimuth) arrays.
+    """
+    proj = ccrs.LambertConformal()
+    proj_geom = ccrs.PlateCarree()
+    fig = plt.figure(figsize=(params['figsize'],params['figsize']))
+    ax = plt.axes(projection=proj)
+    ax.set_extent(
+        [lon_grid.min(), lon_grid.max(), lat_grid.min(), lat_grid.max()])
+    ax.add_feature(cartopy.feature.LAND)
+    ax.add_feature(cartopy.feature.OCEAN)
+    ax.gridlines()
+
+    x_grid, y_grid = project_grid(proj, proj_geom,
+        lon_grid[:,:,np.newaxis], lat_grid[:,:,np.newaxis])
+    draw_fields_batched(ax, x_grid, y_grid, field[:,:,np.newaxis])
+    track = sgeom.LineString(zip(lon_track, lat_track))
+    ax.add_geometries([track], proj_geom,
+        edgecolor='black', facecolor='none', linewidth=4)
+    draw_grid_batched(ax, x_grid, y_grid, params)
+
+    plt.title(params['title'] + ' ' + format_valid_time(int(valid_time)),
+        fontsize=24)
+    plt.tight_layout()
+    plt.savefig(outfile + '.png', dpi=300)
+    plt.close(fig)
+    return outfile + '.png'
+
+def plot_track_panels(datadir, plotdir, filename, params):
+    """
+    Plot each track point (start::step) in its own figure, one panel per
+    track time, rendered in parallel by params['nprocs'] worker processes.
+    The file is read once, the workers only receive the data of their panel.
+    """
+    tcrmw = TCRMWFile(os.path.join(datadir, filename))
+    track = slice(params['start'], None, params['step'])
+    valid_time = tcrmw.read('valid_time', track=track)
+    lat_grid = tcrmw.read('lat', track=track)
+    lon_grid = tcrmw.read('lon', track=track)
+    field = tcrmw.read(params['scalar_field'], track=track) * params['scalar_field_scale']
+    lat_track, lon_track = tcrmw.read_track_center()
+    tcrmw.close()
+
+    render_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=params.get('nprocs')) as executor:
+        futures = []
+        for i in range(lat_grid.shape[2]):
+            outfile = os.path.join(plotdir,
+                params['scalar_field'] + '_panel_' + str(valid_time[i]))
+            futures.append(executor.submit(plot_track_panel,
+                lon_grid[:,:,i], lat_grid[:,:,i], field[:,:,i],
+                lon_track, lat_track, valid_time[i], params, outfile))
+        outfiles = [future.result() for future in futures]
+    logging.info('rendered %d track panels in %.2f s' %
+        (len(outfiles), time.perf_counter() - render_start))
+    return outfiles
 
 def plot_fields(datadir, plotdir, filename, params):
     """
@@ -30,14 +229,15 @@ def plot_fields(datadir, plotdir, filename, params):
     logging.info(datadir)
     logging.info(plotdir)
 
-    # valid_time, lat_grid, lon_grid, wind_data, scalar_data = \
-    #     read_tcrmw(os.path.join(datadir, filename))
-    valid_time, lat_grid, lon_grid, \
-        range_grid, azimuth_grid, pressure_grid, \
-        track_data, wind_data, scalar_data \
-        = read_tcrmw(os.path.join(datadir, filename))
-    lat_track, lon_track \
-        = lat_grid[0, 0, :], lon_grid[0, 0, :]
+    # Only read the drawn field at the drawn track points.
+    tcrmw = TCRMWFile(os.path.join(datadir, filename))
+    valid_time = tcrmw.read('valid_time')
+    track = slice(params['start'], None, params['step'])
+    lat_grid = tcrmw.read('lat', track=track)
+    lon_grid = tcrmw.read('lon', track=track)
+    field = tcrmw.read(params['scalar_field'], track=track) * params['scalar_field_scale']
+    lat_track, lon_track = tcrmw.read_track_center()
+    tcrmw.close()
     lat_min, lat_max = lat_track.min(), lat_track.max()
     lon_min, lon_max = lon_track.min(), lon_track.max()
     lat_mid = (lat_min + lat_max) / 2
@@ -63,36 +263,15 @@ def plot_fields(datadir, plotdir, filename, params):
     ax.add_feature(cartopy.feature.OCEAN)
     ax.gridlines()
 
-    n_range, n_azimuth, n_track = lat_grid.shape
+    # lat_grid, lon_grid and field only hold the plotted track points
+    render_start = time.perf_counter()
 
     # plot scalar field
-    field = scalar_data[args.scalar_field] * args.scalar_field_scale
-    u_grid = wind_data['U']
-    v_grid = wind_data['V']
-    magnitude = (u_grid**2 + v_grid**2)**0.5
-    for i in range(params['start'], n_track, params['step']):
-        cfplot = plt.contourf(
-            # lon_grid[:,:,i], lat_grid[:,:,i], field[::-1,:,i],
-            lon_grid[:,:,i], lat_grid[:,:,i], field[:,:,i],
-            transform=proj_geom,
-            # cmap=ListedColormap(plt.cm.cividis.colors[::-1]),
-            cmap=plt.cm.gist_yarg,
-            alpha=0.5)
-        cplot = plt.contour(
-            # lon_grid[:,:,i], lat_grid[:,:,i], field[::-1,:,i],
-            lon_grid[:,:,i], lat_grid[:,:,i], field[:,:,i],
-            colors='k',
-            transform=proj_geom)
-        ax.clabel(cplot, colors='k', fmt='%1.0f', fontsize=14)
-        """
-        vplot = plt.streamplot(
-            lon_grid[:,:,i], lat_grid[:,:,i],
-            # u_grid[::-1,:,i], v_grid[::-1,:,i],
-            u_grid[:,:,i], v_grid[:,:,i],
-            # color=magnitude[::-1,:,i],
-            color=magnitude[:,:,i],
-            transform=proj_geom, density=6)
-        """
+    if params.get('batched'):
+        x_grid, y_grid = project_grid(proj, proj_geom, lon_grid, lat_grid)
+        draw_fields_batched(ax, x_grid, y_grid, field)
+    else:
+        draw_fields(ax, lon_grid, lat_grid, field, proj_geom)
 
     # plt.colorbar(cplot, shrink=0.8)
     """
@@ -108,23 +287,10 @@ def plot_fields(datadir, plotdir, filename, params):
         edgecolor='black', facecolor='none', linewidth=4)
 
     # plot grid
-    for i in range(params['start'], n_track, params['step']):
-        # scale = float(i) / n_track
-        scale = 0.5
-        for j in range(0, n_range, params['range_step']):
-            circle = sgeom.LineString(
-                zip(lon_grid[j,:,i], lat_grid[j,:,i]))
-            ax.add_geometries([circle], proj_geom,
-                edgecolor=(scale, scale, scale), facecolor='none')
-        circle = sgeom.LineString(
-            zip(lon_grid[-1,:,i], lat_grid[-1,:,i]))
-        ax.add_geometries([circle], proj_geom,
-            edgecolor=(scale, scale, scale), facecolor='none')
-        for j in range(0, n_azimuth, params['azimuth_step']):
-            line = sgeom.LineString(
-                zip(lon_grid[:,j,i], lat_grid[:,j,i]))
-            ax.add_geometries([line], proj_geom,
-                edgecolor=(scale, scale, scale), facecolor='none')
+    if params.get('batched'):
+        draw_grid_batched(ax, x_grid, y_grid, params)
+    else:
+        draw_grid(ax, lon_grid, lat_grid, proj_geom, params)
 
     logging.debug(int(valid_time[params['start']]))
     plt.title(params['title']
@@ -133,9 +299,11 @@ def plot_fields(datadir, plotdir, filename, params):
 
     fig.canvas.draw()
     plt.tight_layout()
+    logging.info('rendered %d track points in %.2f s' %
+        (lat_grid.shape[2], time.perf_counter() - render_start))
     # save figure
     outfile = os.path.join(plotdir,
-        args.scalar_field + '_' + str(valid_time[params['start']]))
+        params['scalar_field'] + '_' + str(valid_time[params['start']]))
     # plt.savefig(os.path.join(plotdir,
     #     filename.replace('.nc', '.png')), dpi=300)
     # plt.savefig(os.path.join(plotdir,
@@ -183,6 +351,16 @@ if __name__ == '__main__':
     parser.add_argument(
         '--title', type=str, dest='title', required=False,
         default='')
+    parser.add_argument(
+        '--batched', action='store_true', dest='batched',
+        help='draw the fields of all the track points with one contour call '
+             'and all the grid lines as one LineCollection')
+    parser.add_argument(
+        '--panels', action='store_true', dest='panels',
+        help='plot each track point in its own figure, in parallel')
+    parser.add_argument(
+        '--nprocs', type=int, dest='nprocs', required=False,
+        default=None, help='number of processes drawing the panels')
 
     args = parser.parse_args()
 
@@ -196,9 +374,17 @@ if __name__ == '__main__':
               'figsize' : args.figsize,
               'scalar_field' : args.scalar_field,
               'scalar_field_scale' : args.scalar_field_scale,
-              'title' : args.title}
+              'title' : args.title,
+              'batched' : args.batched,
+              'nprocs' : args.nprocs}
 
-    plot_fields(args.datadir,
-                args.plotdir,
-                args.filename,
-                params)
+    if args.panels:
+        plot_track_panels(args.datadir,
+                          args.plotdir,
+                          args.filename,
+                          params)
+    else:
+        plot_fields(args.datadir,
+                    args.plotdir,
+                    args.filename,
+                    params)
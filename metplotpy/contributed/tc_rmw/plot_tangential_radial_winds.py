@@ -47,18 +47,18 @@ def plot_pressure_lev(arg, ds, track_index=0):
     ax.set_yticks(np.arange(1000, 250, -100))
     ax.set_yticklabels(np.arange(1000, 250, -100))
 
-    # Azimuthal averages
-    u_radial_azi_mean = np.mean(ds['u_radial'].values, axis=1)
-    u_tangential_azi_mean = np.mean(ds['u_tangential'].values, axis=1)
-    T_azi_mean = np.mean(ds[arg.T].values, axis=1)
+    # Azimuthal averages, only the plotted track point is read
+    u_tangential_azi_mean = np.mean(
+        ds['u_tangential'].isel(track_point=track_index).values, axis=1)
+    T_azi_mean = np.mean(ds[arg.T].isel(track_point=track_index).values, axis=1)
 
     # Contour plots
     u_contour = ax.contour(ds['range'].values, ds['pressure'].values,
-        u_tangential_azi_mean[:, :, track_index].transpose(),
+        u_tangential_azi_mean.transpose(),
         levels=np.arange(5, 40, 5), colors='darkgreen', linewidths=1)
     ax.clabel(u_contour, colors='darkgreen', fmt='%1.0f')
     T_contour = ax.contour(ds['range'].values, ds['pressure'].values,
-        T_azi_mean[:, :, track_index].transpose(),
+        T_azi_mean.transpose(),
         levels=np.arange(250, 300, 10), colors='darkblue', linewidths=1)
     ax.clabel(T_contour, colors='darkblue', fmt='%1.0f')
 
@@ -31,58 +31,151 @@ def format_valid_time(valid_time):
     valid_time_str = '%d %s %2.2d %2.2d:00Z' % (year, month_name, day, hour)
     return valid_time_str
 
-def read_tcrmw(filename):
+# possible U, V variable names
+u_vars = set(['U', 'UGRD'])
+v_vars = set(['V', 'VGRD'])
+
+grid_vars = set(['valid_time', 'lat', 'lon',
+    'range', 'azimuth', 'pressure'])
+track_vars = set(['Lat', 'Lon', 'RMW', 'TrackLines'])
+
+class TCRMWFile:
     """
-    Read pressure level variables from
-    netcdf file generated by the TCRMW tool.
+    Lazy access to the variables of a netcdf file generated by the TCRMW tool
+    (or by the METcalcpy vertical_interpolation tool).
+    Nothing is read when the file is opened, each call of read() reads only
+    the requested variable and, optionally, only the requested track points.
+
+    Usage:
+        with TCRMWFile(filename) as tcrmw:
+            lat_grid = tcrmw.read('lat', track=slice(0, None, 3))
+            field = tcrmw.read('PRMSL', track=slice(0, None, 3))
     """
 
-    try:
-        file_id = Dataset(filename, 'r')
-        logging.info('reading ' + filename)
-    except IOError:
-        logging.error('failed to open ' + filename)
-        sys.exit()
-
-    valid_time = file_id.variables['valid_time'][:]
-    # read grid variables
-    lat_grid = file_id.variables['lat'][:]
-    lon_grid = file_id.variables['lon'][:]
-    range_grid = file_id.variables['range'][:]
-    azimuth_grid = file_id.variables['azimuth'][:]
-    pressure_grid = file_id.variables['pressure'][:]
+    def __init__(self, filename):
+        """
+        Args:
+            @param filename: the netcdf file generated by the TCRMW tool
+        """
+        try:
+            self.file_id = Dataset(filename, 'r')
+            logging.info('opening ' + filename)
+        except IOError:
+            logging.error('failed to open ' + filename)
+            sys.exit()
+        self.filename = filename
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.file_id.close()
+
+    @property
+    def names(self):
+        """ Names of all the variables in the file """
+        return list(self.file_id.variables)
+
+    def __contains__(self, name):
+        return name in self.file_id.variables
+
+    def wind_names(self):
+        """
+        Returns:
+            dictionary with the name of the U and V variables in the file,
+            under the 'U' and 'V' keys
+        """
+        names = {}
+        for var in self.file_id.variables:
+            if var in u_vars:
+                names['U'] = var
+            if var in v_vars:
+                names['V'] = var
+        return names
+
+    def scalar_names(self):
+        """ Names of the variables that are neither grid, track nor wind variables """
+        return [var for var in self.file_id.variables
+                if var not in grid_vars.union(track_vars).union(u_vars).union(v_vars)]
+
+    def track_axis(self, name):
+        """
+        Axis of the track points of variable name. The track points are the
+        'track_point' dimension if the variable has one, otherwise its last dimension.
+        """
+        dimensions = self.file_id.variables[name].dimensions
+        if 'track_point' in dimensions:
+            return dimensions.index('track_point')
+        return len(dimensions) - 1
+
+    def read(self, name, track=None):
+        """
+        Read variable name.
 
-    logging.debug('lat_grid.shape=' + str(lat_grid.shape))
-    logging.debug('lon_grid.shape=' + str(lon_grid.shape))
+        Args:
+            @param name: the name of the variable
+            @param track: None to read all the track points, otherwise the track point index
+                          or slice of track point indices to read
+        Returns:
+            the (masked) array of values
+        """
+        logging.debug('reading ' + name)
+        var = self.file_id.variables[name]
+        if track is None or var.ndim == 0:
+            return var[:]
+        index = [slice(None)] * var.ndim
+        index[self.track_axis(name)] = track
+        return var[tuple(index)]
+
+    def read_track_center(self):
+        """
+        Read lat and lon of the first range and azimuth (the track center)
+        at every track point, without reading the rest of the grid
+        """
+        return self.file_id.variables['lat'][0, 0, :], \
+            self.file_id.variables['lon'][0, 0, :]
+
+    def read_wind(self, track=None):
+        """ Read U and V, returns dictionary with 'U' and 'V' keys like read_tcrmw """
+        return {key: self.read(name, track) for key, name in self.wind_names().items()}
+
+    def read_track(self):
+        """ Read track center and cyclone radius (in km), returns dictionary like read_tcrmw """
+        track_data = {}
+        track_data['Lat'] = self.read('Lat')
+        track_data['Lon'] = self.read('Lon')
+        track_data['RMW'] = self.read('RMW') * nm_to_km
+        track_data['TrackLines'] = self.read('TrackLines')
+        return track_data
 
-    # read track center and cyclone radius
-    track_data = {}
-    track_data['Lat'] = file_id.variables['Lat'][:]
-    track_data['Lon'] = file_id.variables['Lon'][:]
-    track_data['RMW'] = file_id.variables['RMW'][:] * nm_to_km
-    track_data['TrackLines'] = file_id.variables['TrackLines'][:]
+def read_tcrmw(filename):
+    """
+    Read pressure level variables from
+    netcdf file generated by the TCRMW tool.
+    Every variable is read, use TCRMWFile to read only some variables.
+    """
 
-    # possible U, V variable names
-    u_vars = set(['U', 'UGRD'])
-    v_vars = set(['V', 'VGRD'])
+    with TCRMWFile(filename) as tcrmw:
+        valid_time = tcrmw.read('valid_time')
+        # read grid variables
+        lat_grid = tcrmw.read('lat')
+        lon_grid = tcrmw.read('lon')
+        range_grid = tcrmw.read('range')
+        azimuth_grid = tcrmw.read('azimuth')
+        pressure_grid = tcrmw.read('pressure')
 
-    grid_vars = set(['valid_time', 'lat', 'lon',
-        'range', 'azimuth', 'pressure'])
-    track_vars = set(['Lat', 'Lon', 'RMW', 'TrackLines'])
-    wind_data = {}
-    scalar_data = {}
+        logging.debug('lat_grid.shape=' + str(lat_grid.shape))
+        logging.debug('lon_grid.shape=' + str(lon_grid.shape))
 
-    # read all variables and group as either wind or scalar
-    for var in file_id.variables:
-        logging.info(var)
-        if var in u_vars:
-            wind_data['U'] = file_id.variables[var][:]
-        if var in v_vars:
-            wind_data['V'] = file_id.variables[var][:]
-        if var not in grid_vars.union(track_vars).union(u_vars).union(v_vars):
-            scalar_data[var] = file_id.variables[var][:]
+        # read track center and cyclone radius
+        track_data = tcrmw.read_track()
 
-    file_id.close()
+        # read all variables and group as either wind or scalar
+        wind_data = tcrmw.read_wind()
+        scalar_data = {var: tcrmw.read(var) for var in tcrmw.scalar_names()}
 
     return valid_time, lat_grid, lon_grid, \
         range_grid, azimuth_grid, pressure_grid, \
@@ -108,41 +201,16 @@ def read_vert_interp_tcrmw(filename):
 
     """
 
-    try:
-        file_id = Dataset(filename, 'r')
-        logging.info('reading ' + filename)
-    except IOError:
-        logging.error('failed to open ' + filename)
-        sys.exit()
-
-    valid_time = file_id.variables['valid_time'][:]
-
-    # read grid variables
-    range_grid = file_id.variables['range'][:]
-    azimuth_grid = file_id.variables['azimuth'][:]
-    pressure_grid = file_id.variables['lev'][:]
-
+    with TCRMWFile(filename) as tcrmw:
+        valid_time = tcrmw.read('valid_time')
 
-    # possible U, V variable names
-    u_vars = set(['U', 'UGRD'])
-    v_vars = set(['V', 'VGRD'])
+        # read grid variables
+        range_grid = tcrmw.read('range')
+        azimuth_grid = tcrmw.read('azimuth')
+        pressure_grid = tcrmw.read('lev')
 
-    # grid_vars = set(['valid_time', 'lat', 'lon',
-    #     'range', 'azimuth', 'pressure'])
-    grid_vars = set(['valid_time',
-                     'range', 'azimuth', 'pressure'])
-    wind_data = {}
-    scalar_data = {}
-
-    # read all variables and group as either wind or scalar
-    for var in file_id.variables:
-        logging.info(var)
-        if var in u_vars:
-            wind_data['U'] = file_id.variables[var][:]
-        if var in v_vars:
-            wind_data['V'] = file_id.variables[var][:]
-
-    file_id.close()
+        # only the wind variables are used
+        wind_data = tcrmw.read_wind()
 
     return valid_time,  \
         range_grid, azimuth_grid, pressure_grid, \
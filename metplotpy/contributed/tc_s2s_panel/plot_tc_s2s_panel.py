@@ -22,6 +22,11 @@ Contains the following functions
   * plot_gdf_cat()
   * plot_gdf_ufs()
   * plot_tdf()
+  * plot_panels()
+
+The figure of each panel plot (maps, titles and colorbars) is created once per process and
+reused for the data of the next files, see PanelPlot; plot_panels() plots the GDF/TDF panels of
+many files or seasons on a pool of processes.
 
 Author: Daniel R. Adriaansen
 Date: 24 March 2021
@@ -29,7 +34,11 @@ Date: 24 March 2021
 """
 
 import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
+import xarray as xr
 import cartopy.crs as ccrs
 import matplotlib.gridspec as gridspec
 import matplotlib.pyplot as plt
@@ -42,6 +51,9 @@ from mpl_toolkits.axes_grid1 import make_axes_locatable
 ADDPTS = False
 PANELTITLELOC = 'left'
 
+# Latitude window of the panels
+LAT_LIMITS = [-40, 40]
+
 # Set some variables
 lead_step = int(str(os.environ.get('TCGEN_INIT_FREQ', 6)))
 shortest_lead = int(str(os.environ.get('TCGEN_MIN_LEAD', 48)))
@@ -71,7 +83,7 @@ def setup_axis(ax):
     ax.coastlines(resolution='50m', color='black')
 
     # Set the latitude window limit (y-axis)
-    ax.set_ylim([-40, 40])
+    ax.set_ylim(LAT_LIMITS)
 
     # Define the tickmark locations for the x-axis (longitude)
     ax.set_xticks([45, 90, 135, 180, 225, 270, 315], minor=False, crs=ccrs.PlateCarree())
@@ -92,7 +104,295 @@ def setup_axis(ax):
     ax.set_xlabel('')
 
 
-# Panels go 1,2,3 top to bottom
+# One panel of a panel plot: the field plotted from the data set, where mask is True,
+# and its colorbar. label is the label of the colorbar, if any.
+Panel = namedtuple('Panel', ['title', 'field', 'mask', 'levels', 'cmap', 'extend', 'label'],
+                   defaults=[None])
+
+# Plot of the panels of a data set
+# kind: GDF, GDF_UFS, GDF_CAT or TDF
+# data: Xarray Dataset or path of the netCDF file of the Dataset
+# outdir: string path to output directory (optional)
+# outfile: name of the output file (optional), <kind>.png by default
+PanelJob = namedtuple('PanelJob', ['kind', 'data', 'outdir', 'outfile'], defaults=[None, None])
+
+GDF_LEVELS = [0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0]
+GDF_DIFF_LEVELS = [-2.7, -2.1, -1.5, -0.9, -0.3, 0.3, 0.9, 1.5, 2.1, 2.7]
+GDF_CAT_LEVELS = [0.0, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.8, 1.1, 1.4]
+TDF_LEVELS = [3.0, 6.0, 9.0, 12.0, 15.0, 18.0, 21.0, 24.0]
+TDF_DIFF_LEVELS = [-11.0, -9.0, -7.0, -5.0, -3.0, -1.0, 1.0, 3.0, 5.0, 7.0, 9.0]
+
+
+def _variable(name):
+    return lambda data: data[name]
+
+
+def _positive(field):
+    return field > 0.0
+
+
+def _outside(threshold):
+    return lambda field: (field > threshold) | (field < -threshold)
+
+
+# Panels go 1,2,3 top to bottom, with a blank fourth panel
+GDF_PANELS = [
+    # Observed genesis density
+    Panel('(a) BEST Genesis Event Density', _variable('OBS_DENS'), _positive,
+          GDF_LEVELS, plt.cm.Reds, 'max'),
+    # Forecast genesis density
+    Panel(f'(b) Forecast Genesis Event Density ({LEAD_WINDOW_STR}h)', _variable('FCST_DENS'), _positive,
+          GDF_LEVELS, plt.cm.Reds, 'max'),
+    # Panel 2 - Panel 1 difference
+    Panel('(c) (b) minus (a)', lambda data: data['FCST_DENS'] - data['OBS_DENS'], _outside(0.3),
+          GDF_DIFF_LEVELS, plt.cm.coolwarm, 'both', count_string)]
+
+# Panels go 1,2,3,4 top to bottom
+GDF_UFS_PANELS = [
+    # Observed genesis density
+    Panel('(a) BEST Genesis Event Density', _variable('OBS_DENS'), _positive,
+          GDF_CAT_LEVELS, plt.cm.Reds, 'max'),
+    # Density of forecast hits
+    Panel('(b) Hits (Forecast Yes/Observation Yes)', _variable('FYOY_DENS'), _positive,
+          GDF_CAT_LEVELS, plt.cm.Reds, 'max'),
+    # Density of forecast false alarms
+    Panel('(c) False Alarms (Forecast Yes/Observation No)', _variable('FYON_DENS'), _positive,
+          GDF_CAT_LEVELS, plt.cm.Reds, 'max'),
+    # Panel 2 + Panel 3 sum
+    Panel('(d) Hits + False Alarms', lambda data: data['FYOY_DENS'] + data['FYON_DENS'], _positive,
+          GDF_CAT_LEVELS, plt.cm.Reds, 'max', count_string)]
+
+# Panels go 1,2,3,4 top to bottom
+GDF_CAT_PANELS = [
+    # Forecast hit density
+    Panel('(a) Hits (Forecast Yes/Observation Yes)', _variable('FYOY_DENS'), _positive,
+          GDF_CAT_LEVELS, plt.cm.Reds, 'max'),
+    # Early forecast hit density
+    Panel('(b) Early Hits', _variable('EHIT_DENS'), _positive,
+          GDF_CAT_LEVELS, plt.cm.Reds, 'max'),
+    # Late forecast hit density
+    Panel('(c) Late Hits', _variable('LHIT_DENS'), _positive,
+          GDF_CAT_LEVELS, plt.cm.Reds, 'max'),
+    # Forecast false alarm density
+    Panel('(d) False Alarms (Forecast Yes/Observation No)', _variable('FYON_DENS'), _positive,
+          GDF_CAT_LEVELS, plt.cm.Reds, 'max', count_string)]
+
+# Panels go 1,2,3 top to bottom, with a blank fourth panel
+TDF_PANELS = [
+    # Observed genesis track density
+    Panel('(a) BEST Genesis Track Density', _variable('OTRK_DENS'), _positive,
+          TDF_LEVELS, plt.cm.Reds, 'max'),
+    # Forecast genesis track density
+    Panel(f'(b) Forecast Genesis Track Density ({LEAD_WINDOW_STR}h)', _variable('FTRK_DENS'), _positive,
+          TDF_LEVELS, plt.cm.Reds, 'max'),
+    # Panel 2 - Panel 1 difference
+    Panel('(c) (b) minus (a)', lambda data: data['FTRK_DENS'] - data['OTRK_DENS'], _outside(1.0),
+          TDF_DIFF_LEVELS, plt.cm.coolwarm, 'both', days_string)]
+
+PANELS = {'GDF': GDF_PANELS, 'GDF_UFS': GDF_UFS_PANELS, 'GDF_CAT': GDF_CAT_PANELS, 'TDF': TDF_PANELS}
+
+
+def clip_to_extent(field, lat_limits=LAT_LIMITS, margin=2):
+    """Clip a field to the latitudes displayed on the panels
+
+    The rows within margin grid cells of the latitude window are kept, so the cells
+    drawn by pcolormesh in the window are the same as with the whole field.
+
+    Parameters
+    ----------
+    field : Xarray DataArray with a lat or latitude dimension
+    lat_limits : the latitude window
+    margin : number of grid cells kept outside the window
+
+    Returns
+    -------
+    The clipped Xarray DataArray, the field itself if it has no latitude dimension
+
+    """
+    lat_dim = next((dim for dim in ('lat', 'latitude') if dim in field.dims), None)
+    if lat_dim is None or field.sizes[lat_dim] < 2:
+        return field
+    lats = field[lat_dim].values
+    spacing = margin * np.abs(np.diff(lats)).max()
+    keep = np.flatnonzero((lats >= lat_limits[0] - spacing) & (lats <= lat_limits[1] + spacing))
+    return field.isel({lat_dim: keep})
+
+
+class PanelPlot:
+    """A four panel plot whose figure is reused for the data of many files
+
+    The figure, the map of each panel (coastlines, tickmarks and title) and the colorbars only
+    depend on the panels, they are created for the first data set. For the next data sets on the
+    same grid only the data of the meshes is replaced before saving the figure.
+
+    """
+
+    def __init__(self, panels):
+        self.panels = panels
+        self.fig = None
+        self.axes = []
+        self.meshes = []
+        self.grid = None
+
+    def _create_figure(self):
+        # Use gridspec
+        gs = gridspec.GridSpec(nrows=4, ncols=1, height_ratios=[1, 1, 1, 1], hspace=0.20, wspace=0.0)
+
+        # New Figure
+        self.fig = plt.figure(figsize=(20, 15))
+
+        # Coordinate reference system
+        crs = ccrs.PlateCarree(central_longitude=180.0)
+
+        self.axes = []
+        for row, panel in enumerate(self.panels):
+            ax = self.fig.add_subplot(gs[row, 0], projection=crs)
+            setup_axis(ax)
+            ax.set_title(panel.title, loc=PANELTITLELOC)
+
+            # create an axis on the bottom of ax. The width of cax will be 5%
+            # of ax and the padding between cax and ax will be fixed at 0.35 inch.
+            # since cartopy uses a geo_axes, we need to specify the axes_class for the append_axes method
+            # Use this axis for the colorbar
+            cbax = make_axes_locatable(ax).append_axes("bottom", size="5%", pad=0.35, axes_class=plt.Axes)
+            self.axes.append((ax, cbax))
+
+        # Blank last panel
+        for row in range(len(self.panels), 4):
+            ax = self.fig.add_subplot(gs[row, 0], projection=crs)
+            ax.axis('off')
+
+    def close(self):
+        if self.fig is not None:
+            plt.close(self.fig)
+        self.fig = None
+        self.meshes = []
+
+    def plot(self, data, outfile):
+        """Plot the panels of a data set and save the figure
+
+        Parameters
+        ----------
+        data : Xarray Dataset
+        outfile : string path of the output file
+
+        Returns
+        -------
+        None
+
+        """
+        fields = [clip_to_extent(panel.field(data)) for panel in self.panels]
+        fields = [field.where(panel.mask(field)) for panel, field in zip(self.panels, fields)]
+        grid = [(field.dims, field.shape, [field[dim].values for dim in field.dims]) for field in fields]
+
+        # Same grid as the last plot: only replace the data of the meshes
+        if self.fig is not None and plt.fignum_exists(self.fig.number) and self._same_grid(grid):
+            for mesh, field in zip(self.meshes, fields):
+                mesh.set_array(field.to_masked_array(copy=False))
+        else:
+            self.close()
+            self._create_figure()
+            self.grid = grid
+            for panel, field, (ax, cbax) in zip(self.panels, fields, self.axes):
+                # Contour the data
+                mesh = field.plot.pcolormesh(ax=ax, transform=ccrs.PlateCarree(),
+                                             levels=panel.levels, cmap=panel.cmap,
+                                             cbar_kwargs={'cax': cbax, 'ax': ax, 'orientation': 'horizontal'},
+                                             extend=panel.extend, add_labels=False)
+                self.meshes.append(mesh)
+
+                # Set the tickmarks on the colorbar
+                mesh.colorbar.set_ticks(panel.levels)
+                if panel.label:
+                    mesh.colorbar.set_label(panel.label, labelpad=0, y=1.05, rotation=0, size=20)
+
+        if ADDPTS:
+            self.fig.savefig(outfile)
+        else:
+            self.fig.savefig(outfile, bbox_inches='tight', pad_inches=0.25)
+
+    def _same_grid(self, grid):
+        if self.grid is None or len(grid) != len(self.grid):
+            return False
+        for (dims, shape, coords), (prev_dims, prev_shape, prev_coords) in zip(grid, self.grid):
+            if dims != prev_dims or shape != prev_shape:
+                return False
+            if not all(np.array_equal(coord, prev_coord) for coord, prev_coord in zip(coords, prev_coords)):
+                return False
+        return True
+
+
+# The panel plots of this process, reused by the next plots of the same kind
+_PANEL_PLOTS = {}
+
+
+def _output_file(kind, outdir=None, outfile=None):
+    outfile = outfile or kind + '.png'
+    if outdir:
+        if not os.path.exists(outdir):
+            os.makedirs(outdir, exist_ok=True)
+        outfile = os.path.join(outdir, outfile)
+    return outfile
+
+
+def plot_panel(kind, data, outdir=None, outfile=None):
+    """Plot the panels of a data set
+
+    Parameters
+    ----------
+    kind : GDF, GDF_UFS, GDF_CAT or TDF
+    data : Xarray Dataset or string path of its netCDF file
+    outdir : string path to output directory (optional)
+    outfile : name of the output file (optional), <kind>.png by default
+
+    Returns
+    -------
+    The path of the output file
+
+    """
+    if kind not in _PANEL_PLOTS:
+        _PANEL_PLOTS[kind] = PanelPlot(PANELS[kind])
+    outfile = _output_file(kind, outdir, outfile)
+    if isinstance(data, str):
+        with xr.open_dataset(data) as dataset:
+            _PANEL_PLOTS[kind].plot(dataset, outfile)
+    else:
+        _PANEL_PLOTS[kind].plot(data, outfile)
+    return outfile
+
+
+def _plot_panel_jobs(jobs):
+    return [plot_panel(*job) for job in jobs]
+
+
+def plot_panels(jobs, nprocs=1):
+    """Plot the panels of many files or seasons
+
+    The jobs are split between nprocs processes, each process reuses the figure of
+    a panel plot for all its jobs of the same kind.
+
+    Parameters
+    ----------
+    jobs : list of PanelJob or (kind, data, outdir, outfile) tuples
+    nprocs : number of processes, the jobs are plotted in this process if 1
+
+    Returns
+    -------
+    The list of the paths of the output files, in the order of the jobs
+
+    """
+    jobs = [PanelJob(*job) for job in jobs]
+    if nprocs is None or nprocs <= 1 or len(jobs) <= 1:
+        return _plot_panel_jobs(jobs)
+
+    # contiguous batches, so the jobs of one kind reuse the figures of their process
+    nprocs = min(nprocs, len(jobs))
+    batches = [batch.tolist() for batch in np.array_split(np.arange(len(jobs)), nprocs)]
+    with ProcessPoolExecutor(max_workers=nprocs) as executor:
+        results = executor.map(_plot_panel_jobs, [[jobs[i] for i in batch] for batch in batches])
+        return [outfile for batch_outfiles in results for outfile in batch_outfiles]
+
+
 def plot_gdf(gdf_data, outdir=None):
     """Plot the GDF panel plot
 
@@ -111,127 +411,9 @@ def plot_gdf(gdf_data, outdir=None):
     None
 
     """
+    plot_panel('GDF', gdf_data, outdir)
 
-    # Use gridspec
-    gs_gdf = gridspec.GridSpec(nrows=4, ncols=1, height_ratios=[1, 1, 1, 1], hspace=0.20, wspace=0.0)
-
-    # New Figure
-    fig_gdf = plt.figure(1, figsize=(20, 15))
-
-    # Coordinate reference system
-    crs_gdf = ccrs.PlateCarree(central_longitude=180.0)
-
-    ####### PANEL 1
-    ax1 = plt.subplot(gs_gdf[0, 0], projection=crs_gdf)
-    setup_axis(ax1)
-    ax1.set_title('(a) BEST Genesis Event Density', loc=PANELTITLELOC)
-    levels = [0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0]
-
-    # create an axis on the bottom of ax. The width of cax will be 5%
-    # of ax and the padding between cax and ax will be fixed at 0.35 inch.
-    # since cartopy uses a geo_axes, we need to specify the axes_class for the append_axes method
-    # Use this axis for the colorbar
-    axdiv1 = make_axes_locatable(ax1)
-    cbax1 = axdiv1.append_axes("bottom", size="5%", pad=0.35, axes_class=plt.Axes)
-
-    # Contour the data
-    con1 = gdf_data['OBS_DENS']. \
-        where(gdf_data['OBS_DENS'] > 0.0). \
-        plot.pcolormesh(ax=ax1, transform=ccrs.PlateCarree(), \
-                        levels=levels, cmap=plt.cm.Reds, \
-                        cbar_kwargs={'cax': cbax1, 'ax': ax1, 'orientation': 'horizontal'}, \
-                        extend='max', add_labels=False)
-
-    # Add scatter points if requested
-    if ADDPTS:
-        scat1 = ax1.scatter(alons, alats, transform=ccrs.PlateCarree(), s=1, c='cyan')
-
-    # Add the colorbar and set the tickmarks on it
-    cbar1 = con1.colorbar
-    cbar1.set_ticks(levels)
-
-    ######## PANEL 2
-    ax2 = plt.subplot(gs_gdf[1, 0], projection=crs_gdf)
-    setup_axis(ax2)
-    ax2.set_title(f'(b) Forecast Genesis Event Density ({LEAD_WINDOW_STR}h)', loc=PANELTITLELOC)
-
-    # create an axis on the bottom of ax. The width of cax will be 5%
-    # of ax and the padding between cax and ax will be fixed at 0.35 inch.
-    # since cartopy uses a geo_axes, we need to specify the axes_class for the append_axes method
-    # Use this axis for the colorbar
-    axdiv2 = make_axes_locatable(ax2)
-    cbax2 = axdiv2.append_axes("bottom", size="5%", pad=0.35, axes_class=plt.Axes)
-
-    # Contour the data
-    con2 = gdf_data['FCST_DENS']. \
-        where(gdf_data['FCST_DENS'] > 0.0). \
-        plot.pcolormesh(ax=ax2, transform=ccrs.PlateCarree(), \
-                        levels=levels, cmap=plt.cm.Reds, \
-                        cbar_kwargs={'cax': cbax2, 'ax': ax2, 'orientation': 'horizontal'}, \
-                        extend='max', add_labels=False)
-
-    # Add scatter points if requested
-    if ADDPTS:
-        scat2 = ax2.scatter(hlon, hlat, transform=ccrs.PlateCarree(), s=1, c='cyan')
-
-    # Add the colorbar and set the tickmarks on it
-    cbar2 = con2.colorbar
-    cbar2.set_ticks(levels)
-
-    ######## PANEL 3
-    fminuso = gdf_data['FCST_DENS'] - gdf_data['OBS_DENS']
-    ax3 = plt.subplot(gs_gdf[2, 0], projection=crs_gdf)
-    setup_axis(ax3)
-    ax3.set_title(f'(c) (b) minus (a)', loc=PANELTITLELOC)
-    levels = [-2.7, -2.1, -1.5, -0.9, -0.3, 0.3, 0.9, 1.5, 2.1, 2.7]
-
-    # create an axis on the bottom of ax. The width of cax will be 5%
-    # of ax and the padding between cax and ax will be fixed at 0.35 inch.
-    # since cartopy uses a geo_axes, we need to specify the axes_class for the append_axes method
-    # Use this axis for the colorbar
-    axdiv3 = make_axes_locatable(ax3)
-    cbax3 = axdiv3.append_axes("bottom", size="5%", pad=0.35, axes_class=plt.Axes)
-
-    # Contour the data
-    con3 = fminuso. \
-        where((fminuso > 0.3) | (fminuso < -0.3)). \
-        plot.pcolormesh(ax=ax3, transform=ccrs.PlateCarree(), \
-                        levels=levels, cmap=plt.cm.coolwarm, \
-                        cbar_kwargs={'cax': cbax3, 'ax': ax3, 'orientation': 'horizontal'}, \
-                        extend='both', add_labels=False)
-
-    # Add scatter points if requested
-    if ADDPTS:
-        scat3 = ax3.scatter(flon, flat, transform=ccrs.PlateCarree(), s=1, c='cyan')
-
-    # Add the colorbar and set the tickmarks on it
-    cbar3 = con3.colorbar
-    cbar3.set_ticks(levels)
-    cbar3.set_label(count_string, labelpad=0, y=1.05, rotation=0, size=20)
-
-    ######## PANEL 4
-    ax4 = plt.subplot(gs_gdf[3, 0], projection=crs_gdf)
-    ax4.axis('off')
-
-    # Save off figure
-    # plt.show()
-    if outdir:
-        if not os.path.exists(outdir):
-            os.makedirs(outdir)
-        outfile = os.path.join(outdir, 'GDF.png')
-    else:
-        outfile = 'GDF.png'
 
-    if ADDPTS:
-        plt.savefig(outfile)
-    else:
-        plt.savefig(outfile, bbox_inches='tight', pad_inches=0.25)
-
-    # Cleanup
-    del (fig_gdf, gs_gdf)
-
-
-# Panels go 1,2,3,4 top to bottom
 def plot_gdf_ufs(gdf_data, outdir=None):
     """Plot the GDF panel with UFS workshop format
 
@@ -251,151 +433,9 @@ def plot_gdf_ufs(gdf_data, outdir=None):
     None
 
     """
-
-    # Use gridspec
-    gs_gdf = gridspec.GridSpec(nrows=4, ncols=1, height_ratios=[1, 1, 1, 1], hspace=0.20, wspace=0.0)
-
-    # New Figure
-    fig_gdf = plt.figure(1, figsize=(20, 15))
-
-    # Coordinate reference system
-    crs_gdf = ccrs.PlateCarree(central_longitude=180.0)
-
-    ####### PANEL 1
-    ax1 = plt.subplot(gs_gdf[0, 0], projection=crs_gdf)
-    setup_axis(ax1)
-    ax1.set_title('(a) BEST Genesis Event Density', loc=PANELTITLELOC)
-    levels = [0.0, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.8, 1.1, 1.4]
-
-    # create an axis on the bottom of ax. The width of cax will be 5%
-    # of ax and the padding between cax and ax will be fixed at 0.35 inch.
-    # since cartopy uses a geo_axes, we need to specify the axes_class for the append_axes method
-    # Use this axis for the colorbar
-    axdiv1 = make_axes_locatable(ax1)
-    cbax1 = axdiv1.append_axes("bottom", size="5%", pad=0.35, axes_class=plt.Axes)
-
-    # Contour the data
-    con1 = gdf_data['OBS_DENS']. \
-        where(gdf_data['OBS_DENS'] > 0.0). \
-        plot.pcolormesh(ax=ax1, transform=ccrs.PlateCarree(), \
-                        levels=levels, cmap=plt.cm.Reds, \
-                        cbar_kwargs={'cax': cbax1, 'ax': ax1, 'orientation': 'horizontal'}, \
-                        extend='max', add_labels=False)
-
-    # Add scatter points if requested
-    if ADDPTS:
-        scat1 = ax1.scatter(alons, alats, transform=ccrs.PlateCarree(), s=1, c='cyan')
-
-    # Add the colorbar and set the tickmarks on it
-    cbar1 = con1.colorbar
-    cbar1.set_ticks(levels)
-
-    ######## PANEL 2
-    ax2 = plt.subplot(gs_gdf[1, 0], projection=crs_gdf)
-    setup_axis(ax2)
-    ax2.set_title('(b) Hits (Forecast Yes/Observation Yes)', loc=PANELTITLELOC)
-
-    # create an axis on the bottom of ax. The width of cax will be 5%
-    # of ax and the padding between cax and ax will be fixed at 0.35 inch.
-    # since cartopy uses a geo_axes, we need to specify the axes_class for the append_axes method
-    # Use this axis for the colorbar
-    axdiv2 = make_axes_locatable(ax2)
-    cbax2 = axdiv2.append_axes("bottom", size="5%", pad=0.35, axes_class=plt.Axes)
-
-    # Contour the data
-    con2 = gdf_data['FYOY_DENS']. \
-        where(gdf_data['FYOY_DENS'] > 0.0). \
-        plot.pcolormesh(ax=ax2, transform=ccrs.PlateCarree(), \
-                        levels=levels, cmap=plt.cm.Reds, \
-                        cbar_kwargs={'cax': cbax2, 'ax': ax2, 'orientation': 'horizontal'}, \
-                        extend='max', add_labels=False)
-
-    # Add scatter points if requested
-    if ADDPTS:
-        scat2 = ax2.scatter(hlon, hlat, transform=ccrs.PlateCarree(), s=1, c='cyan')
-
-    # Add the colorbar and set the tickmarks on it
-    cbar2 = con2.colorbar
-    cbar2.set_ticks(levels)
-
-    ######## PANEL 3
-    ax3 = plt.subplot(gs_gdf[2, 0], projection=crs_gdf)
-    setup_axis(ax3)
-    ax3.set_title('(c) False Alarms (Forecast Yes/Observation No)', loc=PANELTITLELOC)
-
-    # create an axis on the bottom of ax. The width of cax will be 5%
-    # of ax and the padding between cax and ax will be fixed at 0.35 inch.
-    # since cartopy uses a geo_axes, we need to specify the axes_class for the append_axes method
-    # Use this axis for the colorbar
-    axdiv3 = make_axes_locatable(ax3)
-    cbax3 = axdiv3.append_axes("bottom", size="5%", pad=0.35, axes_class=plt.Axes)
-
-    # Contour the data
-    con3 = gdf_data['FYON_DENS']. \
-        where(gdf_data['FYON_DENS'] > 0.0). \
-        plot.pcolormesh(ax=ax3, transform=ccrs.PlateCarree(), \
-                        levels=levels, cmap=plt.cm.Reds, \
-                        cbar_kwargs={'cax': cbax3, 'ax': ax3, 'orientation': 'horizontal'}, \
-                        extend='max', add_labels=False)
-
-    # Add scatter points if requested
-    if ADDPTS:
-        scat3 = ax3.scatter(flon, flat, transform=ccrs.PlateCarree(), s=1, c='cyan')
-
-    # Add the colorbar and set the tickmarks on it
-    cbar3 = con3.colorbar
-    cbar3.set_ticks(levels)
-
-    ######## PANEL 4
-    hitfalse = gdf_data['FYOY_DENS'] + gdf_data['FYON_DENS']
-    ax4 = plt.subplot(gs_gdf[3, 0], projection=crs_gdf)
-    setup_axis(ax4)
-    ax4.set_title('(d) Hits + False Alarms', loc=PANELTITLELOC)
-
-    # create an axes on the bottom of ax. The width of cax will be 5%
-    # of ax and the padding between cax and ax will be fixed at 0.35 inch.
-    # since cartopy uses a geo_axes, we need to specify the axes_class for the append_axes method
-    # Use this axis for the colorbar
-    axdiv4 = make_axes_locatable(ax4)
-    cbax4 = axdiv4.append_axes("bottom", size="5%", pad=0.35, axes_class=plt.Axes)
-
-    # Contour the data
-    con4 = hitfalse. \
-        where(hitfalse > 0.0). \
-        plot.pcolormesh(ax=ax4, transform=ccrs.PlateCarree(), \
-                        levels=levels, cmap=plt.cm.Reds, \
-                        cbar_kwargs={'cax': cbax4, 'ax': ax4, 'orientation': 'horizontal'}, \
-                        extend='max', add_labels=False)
-
-    # Add scatter points if requested
-    if ADDPTS:
-        scat4 = ax4.scatter(flon, flat, transform=ccrs.PlateCarree(), s=1, c='cyan')
-
-    # Add the colorbar and set the tickmarks on it
-    # Since this is the bottom panel also add a title
-    cbar4 = con4.colorbar
-    cbar4.set_ticks(levels)
-    cbar4.set_label(count_string, labelpad=0, y=1.05, rotation=0, size=20)
-
-    # Save off figure
-    # plt.show()
-    if outdir:
-        if not os.path.exists(outdir):
-            os.makedirs(outdir)
-        outfile = os.path.join(outdir, 'GDF_UFS.png')
-    else:
-        outfile = 'GDF_UFS.png'
-
-    if ADDPTS:
-        plt.savefig(outfile)
-    else:
-        plt.savefig(outfile, bbox_inches='tight', pad_inches=0.25)
-
-    # Cleanup
-    del (gs_gdf, fig_gdf)
+    plot_panel('GDF_UFS', gdf_data, outdir)
 
 
-# Panels go 1,2,3,4 top to bottom
 def plot_gdf_cat(gdf_data, outdir=None):
     """Plot the GDF category panel plot
 
@@ -415,151 +455,9 @@ def plot_gdf_cat(gdf_data, outdir=None):
     None
 
     """
-
-    # Use gridspec
-    gs_gdf = gridspec.GridSpec(nrows=4, ncols=1, height_ratios=[1, 1, 1, 1], hspace=0.20, wspace=0.0)
-
-    # New Figure
-    fig_gdf = plt.figure(1, figsize=(20, 15))
-
-    # Coordinate reference system
-    crs_gdf = ccrs.PlateCarree(central_longitude=180.0)
-
-    ####### PANEL 1
-    ax1 = plt.subplot(gs_gdf[0, 0], projection=crs_gdf)
-    setup_axis(ax1)
-    ax1.set_title('(a) Hits (Forecast Yes/Observation Yes)', loc=PANELTITLELOC)
-    levels = [0.0, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.8, 1.1, 1.4]
-
-    # create an axis on the bottom of ax. The width of cax will be 5%
-    # of ax and the padding between cax and ax will be fixed at 0.35 inch.
-    # since cartopy uses a geo_axes, we need to specify the axes_class for the append_axes method
-    # Use this axis for the colorbar
-    axdiv1 = make_axes_locatable(ax1)
-    cbax1 = axdiv1.append_axes("bottom", size="5%", pad=0.35, axes_class=plt.Axes)
-
-    # Contour the data
-    con1 = gdf_data['FYOY_DENS']. \
-        where(gdf_data['FYOY_DENS'] > 0.0). \
-        plot.pcolormesh(ax=ax1, transform=ccrs.PlateCarree(), \
-                        levels=levels, cmap=plt.cm.Reds, \
-                        cbar_kwargs={'cax': cbax1, 'ax': ax1, 'orientation': 'horizontal'}, \
-                        extend='max', add_labels=False)
-
-    # Add scatter points if requested
-    if ADDPTS:
-        scat1 = ax1.scatter(alons, alats, transform=ccrs.PlateCarree(), s=1, c='cyan')
-
-    # Add the colorbar and set the tickmarks on it
-    cbar1 = con1.colorbar
-    cbar1.set_ticks(levels)
-
-    ######## PANEL 2
-    ax2 = plt.subplot(gs_gdf[1, 0], projection=crs_gdf)
-    setup_axis(ax2)
-    ax2.set_title('(b) Early Hits', loc=PANELTITLELOC)
-
-    # create an axis on the bottom of ax. The width of cax will be 5%
-    # of ax and the padding between cax and ax will be fixed at 0.35 inch.
-    # since cartopy uses a geo_axes, we need to specify the axes_class for the append_axes method
-    # Use this axis for the colorbar
-    axdiv2 = make_axes_locatable(ax2)
-    cbax2 = axdiv2.append_axes("bottom", size="5%", pad=0.35, axes_class=plt.Axes)
-
-    # Contour the data
-    con2 = gdf_data['EHIT_DENS']. \
-        where(gdf_data['EHIT_DENS'] > 0.0). \
-        plot.pcolormesh(ax=ax2, transform=ccrs.PlateCarree(), \
-                        levels=levels, cmap=plt.cm.Reds, \
-                        cbar_kwargs={'cax': cbax2, 'ax': ax2, 'orientation': 'horizontal'}, \
-                        extend='max', add_labels=False)
-
-    # Add scatter points if requested
-    if ADDPTS:
-        scat2 = ax2.scatter(hlon, hlat, transform=ccrs.PlateCarree(), s=1, c='cyan')
-
-    # Add the colorbar and set the tickmarks on it
-    cbar2 = con2.colorbar
-    cbar2.set_ticks(levels)
-
-    ######## PANEL 3
-    ax3 = plt.subplot(gs_gdf[2, 0], projection=crs_gdf)
-    setup_axis(ax3)
-    ax3.set_title('(c) Late Hits', loc=PANELTITLELOC)
-
-    # create an axis on the bottom of ax. The width of cax will be 5%
-    # of ax and the padding between cax and ax will be fixed at 0.35 inch.
-    # since cartopy uses a geo_axes, we need to specify the axes_class for the append_axes method
-    # Use this axis for the colorbar
-    axdiv3 = make_axes_locatable(ax3)
-    cbax3 = axdiv3.append_axes("bottom", size="5%", pad=0.35, axes_class=plt.Axes)
-
-    # Contour the data
-    con3 = gdf_data['LHIT_DENS']. \
-        where(gdf_data['LHIT_DENS'] > 0.0). \
-        plot.pcolormesh(ax=ax3, transform=ccrs.PlateCarree(), \
-                        levels=levels, cmap=plt.cm.Reds, \
-                        cbar_kwargs={'cax': cbax3, 'ax': ax3, 'orientation': 'horizontal'}, \
-                        extend='max', add_labels=False)
-
-    # Add scatter points if requested
-    if ADDPTS:
-        scat3 = ax3.scatter(flon, flat, transform=ccrs.PlateCarree(), s=1, c='cyan')
-
-    # Add the colorbar and set the tickmarks on it
-    cbar3 = con3.colorbar
-    cbar3.set_ticks(levels)
-
-    ######## PANEL 4
-    # tot_xr = hit_xr+fam_xr
-    ax4 = plt.subplot(gs_gdf[3, 0], projection=crs_gdf)
-    setup_axis(ax4)
-    ax4.set_title('(d) False Alarms (Forecast Yes/Observation No)', loc=PANELTITLELOC)
-
-    # create an axes on the bottom of ax. The width of cax will be 5%
-    # of ax and the padding between cax and ax will be fixed at 0.35 inch.
-    # since cartopy uses a geo_axes, we need to specify the axes_class for the append_axes method
-    # Use this axis for the colorbar
-    axdiv4 = make_axes_locatable(ax4)
-    cbax4 = axdiv4.append_axes("bottom", size="5%", pad=0.35, axes_class=plt.Axes)
-
-    # Contour the data
-    con4 = gdf_data['FYON_DENS']. \
-        where(gdf_data['FYON_DENS'] > 0.0). \
-        plot.pcolormesh(ax=ax4, transform=ccrs.PlateCarree(), \
-                        levels=levels, cmap=plt.cm.Reds, \
-                        cbar_kwargs={'cax': cbax4, 'ax': ax4, 'orientation': 'horizontal'}, \
-                        extend='max', add_labels=False)
-
-    # Add scatter points if requested
-    if ADDPTS:
-        scat4 = ax4.scatter(flon, flat, transform=ccrs.PlateCarree(), s=1, c='cyan')
-
-    # Add the colorbar and set the tickmarks on it
-    # Since this is the bottom panel also add a title
-    cbar4 = con4.colorbar
-    cbar4.set_ticks(levels)
-    cbar4.set_label(count_string, labelpad=0, y=1.05, rotation=0, size=20)
-
-    # Save off figure
-    # plt.show()
-    if outdir:
-        if not os.path.exists(outdir):
-            os.makedirs(outdir)
-        outfile = os.path.join(outdir, 'GDF_CAT.png')
-    else:
-        outfile = 'GDF_CAT.png'
-
-    if ADDPTS:
-        plt.savefig(outfile)
-    else:
-        plt.savefig(outfile, bbox_inches='tight', pad_inches=0.25)
-
-    # Cleanup
-    del (gs_gdf, fig_gdf)
+    plot_panel('GDF_CAT', gdf_data, outdir)
 
 
-# Panels go 1,2,3,4 top to bottom
 def plot_tdf(tdf_data, outdir=None):
     """Plot the TDF panel plot
 
@@ -578,121 +476,4 @@ def plot_tdf(tdf_data, outdir=None):
     None
 
     """
-
-    # Use gridspec
-    gs_tdf = gridspec.GridSpec(nrows=4, ncols=1, height_ratios=[1, 1, 1, 1], hspace=0.20, wspace=0.0)
-
-    # New Figure
-    fig_tdf = plt.figure(1, figsize=(20, 15))
-
-    # Coordinate reference system
-    crs_tdf = ccrs.PlateCarree(central_longitude=180.0)
-
-    ####### PANEL 1
-    ax1 = plt.subplot(gs_tdf[0, 0], projection=crs_tdf)
-    setup_axis(ax1)
-    ax1.set_title('(a) BEST Genesis Track Density', loc=PANELTITLELOC)
-    levels = [3.0, 6.0, 9.0, 12.0, 15.0, 18.0, 21.0, 24.0]
-
-    # create an axis on the bottom of ax. The width of cax will be 5%
-    # of ax and the padding between cax and ax will be fixed at 0.35 inch.
-    # since cartopy uses a geo_axes, we need to specify the axes_class for the append_axes method
-    # Use this axis for the colorbar
-    axdiv1 = make_axes_locatable(ax1)
-    cbax1 = axdiv1.append_axes("bottom", size="5%", pad=0.35, axes_class=plt.Axes)
-
-    # Contour the data
-    con1 = tdf_data['OTRK_DENS']. \
-        where(tdf_data['OTRK_DENS'] > 0.0). \
-        plot.pcolormesh(ax=ax1, transform=ccrs.PlateCarree(), \
-                        levels=levels, cmap=plt.cm.Reds, \
-                        cbar_kwargs={'cax': cbax1, 'ax': ax1, 'orientation': 'horizontal'}, \
-                        extend='max', add_labels=False)
-
-    # Add scatter points if requested
-    if ADDPTS:
-        scat1 = ax1.scatter(alons, alats, transform=ccrs.PlateCarree(), s=1, c='cyan')
-
-    # Add the colorbar and set the tickmarks on it
-    cbar1 = con1.colorbar
-    cbar1.set_ticks(levels)
-
-    ######## PANEL 2
-    ax2 = plt.subplot(gs_tdf[1, 0], projection=crs_tdf)
-    setup_axis(ax2)
-    ax2.set_title(f'(b) Forecast Genesis Track Density ({LEAD_WINDOW_STR}h)', loc=PANELTITLELOC)
-
-    # create an axis on the bottom of ax. The width of cax will be 5%
-    # of ax and the padding between cax and ax will be fixed at 0.35 inch.
-    # since cartopy uses a geo_axes, we need to specify the axes_class for the append_axes method
-    # Use this axis for the colorbar
-    axdiv2 = make_axes_locatable(ax2)
-    cbax2 = axdiv2.append_axes("bottom", size="5%", pad=0.35, axes_class=plt.Axes)
-
-    # Contour the data
-    con2 = tdf_data['FTRK_DENS']. \
-        where(tdf_data['FTRK_DENS'] > 0.0). \
-        plot.pcolormesh(ax=ax2, transform=ccrs.PlateCarree(), \
-                        levels=levels, cmap=plt.cm.Reds, \
-                        cbar_kwargs={'cax': cbax2, 'ax': ax2, 'orientation': 'horizontal'}, \
-                        extend='max', add_labels=False)
-
-    # Add scatter points if requested
-    if ADDPTS:
-        scat2 = ax2.scatter(hlon, hlat, transform=ccrs.PlateCarree(), s=1, c='cyan')
-
-    # Add the colorbar and set the tickmarks on it
-    cbar2 = con2.colorbar
-    cbar2.set_ticks(levels)
-
-    ######## PANEL 3
-    fminuso = tdf_data['FTRK_DENS'] - tdf_data['OTRK_DENS']
-    ax3 = plt.subplot(gs_tdf[2, 0], projection=crs_tdf)
-    setup_axis(ax3)
-    ax3.set_title('(c) (b) minus (a)', loc=PANELTITLELOC)
-    levels = [-11.0, -9.0, -7.0, -5.0, -3.0, -1.0, 1.0, 3.0, 5.0, 7.0, 9.0]
-
-    # create an axis on the bottom of ax. The width of cax will be 5%
-    # of ax and the padding between cax and ax will be fixed at 0.35 inch.
-    # since cartopy uses a geo_axes, we need to specify the axes_class for the append_axes method
-    # Use this axis for the colorbar
-    axdiv3 = make_axes_locatable(ax3)
-    cbax3 = axdiv3.append_axes("bottom", size="5%", pad=0.35, axes_class=plt.Axes)
-
-    # Contour the data
-    con3 = fminuso. \
-        where((fminuso > 1.0) | (fminuso < -1.0)). \
-        plot.pcolormesh(ax=ax3, transform=ccrs.PlateCarree(), \
-                        levels=levels, cmap=plt.cm.coolwarm, \
-                        cbar_kwargs={'cax': cbax3, 'ax': ax3, 'orientation': 'horizontal'}, \
-                        extend='both', add_labels=False)
-
-    # Add scatter points if requested
-    if ADDPTS:
-        scat3 = ax3.scatter(flon, flat, transform=ccrs.PlateCarree(), s=1, c='cyan')
-
-    # Add the colorbar and set the tickmarks on it
-    cbar3 = con3.colorbar
-    cbar3.set_ticks(levels)
-    cbar3.set_label(days_string, labelpad=0, y=1.05, rotation=0, size=20)
-
-    ######## PANEL 4
-    ax4 = plt.subplot(gs_tdf[3, 0], projection=crs_tdf)
-    ax4.axis('off')
-
-    # Save off figure
-    # plt.show()
-    if outdir:
-        if not os.path.exists(outdir):
-            os.makedirs(outdir)
-        outfile = os.path.join(outdir, 'TDF.png')
-    else:
-        outfile = 'TDF.png'
-
-    if ADDPTS:
-        plt.savefig(outfile)
-    else:
-        plt.savefig(outfile, bbox_inches='tight', pad_inches=0.25)
-
-    # Cleanup
-    del (gs_tdf, fig_tdf)
+    plot_panel('TDF', tdf_data, outdir)
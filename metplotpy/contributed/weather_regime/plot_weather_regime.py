@@ -21,8 +21,9 @@ import cartopy.feature as cfeature
 from cartopy.util import add_cyclic_point
 import numpy as np
 import metcalcpy.util.utils as util
+from metplotpy.contributed.output_policy import save_figure
 
-def plot_elbow(K,d,mi,line,curve,plot_title,output_plotname):
+def plot_elbow(K,d,mi,line,curve,plot_title,output_plotname,policy=None):
 
     plt.plot(K[int(mi)],d[mi]*-1,'*k')
     plt.plot(K, np.array(curve), 'kx-')
@@ -32,12 +33,10 @@ def plot_elbow(K,d,mi,line,curve,plot_title,output_plotname):
     plt.ylabel('Sum_of_squared_distances')
     plt.title(plot_title)
 
-    fmt = 'png'
-    full_output_plot = output_plotname + "." + fmt
-    plt.savefig(full_output_plot,format=fmt,dpi=400, bbox_inches='tight')
+    save_figure(plt.gcf(), output_plotname, policy=policy)
 
 
-def plot_eof(eof,wrnum,variance_fractions,lons,lats,output_plotname,plevels):
+def plot_eof(eof,wrnum,variance_fractions,lons,lats,output_plotname,plevels,policy=None):
 
     print(output_plotname)
     middleIndex = int((len(lons) - 1)/2)
@@ -65,12 +64,10 @@ def plot_eof(eof,wrnum,variance_fractions,lons,lats,output_plotname,plevels):
         plt.title('EOF '+str(i+1)+' ('+str(round(variance_fractions[i],2))+' %)')
 
     plt.tight_layout()
-    fmt='png'
-    full_output_plot = output_plotname + "." + fmt
-    plt.savefig(full_output_plot,format=fmt,dpi=400, bbox_inches='tight')
+    save_figure(fig, output_plotname, policy=policy)
 
 
-def plot_K_means(inputi,wrnum,lons,lats,perc,output_plotname,plevels):
+def plot_K_means(inputi,wrnum,lons,lats,perc,output_plotname,plevels,policy=None):
 
     lons,lonsort = util.convert_lons_indices(lons,-180,360)
 
@@ -103,15 +100,13 @@ def plot_K_means(inputi,wrnum,lons,lats,perc,output_plotname,plevels):
         plt.title('Weather Regime '+str(g1+1)+' ('+str(round(fr,1))+'%)')
 
     plt.tight_layout()
-    fmt='png'
-    full_output_plot = output_plotname + "." + fmt
-    plt.savefig(full_output_plot,format=fmt,dpi=400, bbox_inches='tight')
+    save_figure(fig, output_plotname, policy=policy)
 
 
-def plot_wr_frequency(WRmean,wrnum,dlen,plot_title,output_plotname):
+def plot_wr_frequency(WRmean,wrnum,dlen,plot_title,output_plotname,policy=None):
 
     days = np.arange(1,dlen+1)
-    plt.figure(figsize=(10,5))
+    fig = plt.figure(figsize=(10,5))
 
     for ww in np.arange(np.int32(wrnum)):
         plt.plot(days,WRmean[ww],label='WR'+str(ww+1)+'')
@@ -122,6 +117,4 @@ def plot_wr_frequency(WRmean,wrnum,dlen,plot_title,output_plotname):
     plt.legend()
     plt.xlim([1,dlen+1])
 
-    fmt='png'
-    full_output_plot = output_plotname + "." + fmt
-    plt.savefig(full_output_plot,format=fmt,dpi=400, bbox_inches='tight')
+    save_figure(fig, output_plotname, policy=policy)
@@ -18,16 +18,15 @@ import re
 from operator import add
 
 import pandas as pd
-import plotly.graph_objects as go
 import yaml
-from plotly.graph_objects import Figure
-from plotly.subplots import make_subplots
 
 import metcalcpy.util.utils as calc_util
 from metplotpy.plots import util
+from metplotpy.plots.timing import timed_stage
 from metplotpy.plots.bar.bar_config import BarConfig
 from metplotpy.plots.bar.bar_series import BarSeries
 from metplotpy.plots.base_plot import BasePlot
+from metplotpy.plots.figure_builder import FigureBuilder
 from metplotpy.plots.constants import PLOTLY_AXIS_LINE_COLOR, PLOTLY_AXIS_LINE_WIDTH, \
     PLOTLY_PAPER_BGCOOR
 
@@ -77,8 +76,9 @@ class Bar(BasePlot):
         # Apply event equalization, if requested
         if self.config_obj.use_ee is True:
             self.bar_logger.info(f"Performing event equalization: {datetime.now()}")
-            self.input_df = calc_util.perform_event_equalization(self.parameters,
-                                                                 self.input_df)
+            with self.timer.stage('equalize'):
+                self.input_df = calc_util.perform_event_equalization(self.parameters,
+                                                                     self.input_df)
             self.bar_logger.info(f"End event equalization: {datetime.now()}")
 
         # Create a list of series objects.
@@ -102,6 +102,7 @@ class Bar(BasePlot):
 
         return f'Bar({self.parameters!r})'
 
+    @timed_stage('read')
     def _read_input_data(self):
         """
             Read the input data file
@@ -119,6 +120,7 @@ class Bar(BasePlot):
         return pd.read_csv(self.config_obj.parameters['stat_input'], sep='\t',
                            header='infer', float_precision='round_trip')
 
+    @timed_stage('series')
     def _create_series(self, input_data):
         """
            Generate all the series objects that are to be displayed as specified by
@@ -163,6 +165,7 @@ class Bar(BasePlot):
 
         return series_list
 
+    @timed_stage('layout')
     def _create_figure(self):
         """
         Create a bar plot from defaults and custom parameters
@@ -204,6 +207,8 @@ class Bar(BasePlot):
         # add x2 axis
         self._add_x2axis(n_stats)
 
+        self.figure = self.figure.build()
+
     def _draw_series(self, series: BarSeries) -> None:
         """
         Draws the formatted Bar on the plot
@@ -237,7 +242,7 @@ class Bar(BasePlot):
 
         # add the plot
         self.figure.add_trace(
-            go.Bar(
+            dict(type='bar',
                 x=x_points,
                 y=y_points,
                 showlegend=True,
@@ -247,12 +252,12 @@ class Bar(BasePlot):
             )
         )
 
-    def _create_layout(self) -> Figure:
+    def _create_layout(self) -> FigureBuilder:
         """
         Creates a new layout based on the properties from the config file
         including plots size, annotation and title
 
-        :return: Figure object
+        :return: FigureBuilder object, build() creates the Figure
         """
         # create annotation
         annotation = [
@@ -284,7 +289,7 @@ class Bar(BasePlot):
                  }
 
         # create a layout
-        fig = make_subplots(specs=[[{"secondary_y": False}]])
+        fig = FigureBuilder(secondary_y=False)
 
         # add size, annotation, title
         fig.update_layout(
@@ -434,9 +439,10 @@ class Bar(BasePlot):
 
             # need to add an invisible line with all values = None
             self.figure.add_trace(
-                go.Scatter(y=[None] * len(self.config_obj.indy_vals),
-                           x=self.config_obj.indy_vals,
-                           xaxis='x2', showlegend=False)
+                dict(type='scatter',
+                     y=[None] * len(self.config_obj.indy_vals),
+                     x=self.config_obj.indy_vals,
+                     xaxis='x2', showlegend=False)
             )
 
     def remove_file(self):
@@ -460,6 +466,7 @@ class Bar(BasePlot):
         if os.path.exists(html_name):
             os.remove(html_name)
 
+    @timed_stage('export')
     def write_html(self) -> None:
         """
         Is needed - creates and saves the html representation of the plot WITHOUT
@@ -531,10 +538,8 @@ def main(config_filename=None):
 
     try:
         plot = Bar(docs)
-        plot.save_to_file()
+        plot.write_outputs()
         # plot.show_in_browser()
-        plot.write_html()
-        plot.write_output_file()
         plot.bar_logger.info(f"Finished bar plot at {datetime.now()}")
     except ValueError as val_er:
         print(val_er)
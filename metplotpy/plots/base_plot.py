@@ -16,13 +16,17 @@ __author__ = 'Tatiana Burek'
 
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import yaml
 from typing import Union
+import plotly.io as pio
 
 import metplotpy.plots.util
 from .config import Config
 from metplotpy.plots.context_filter import ContextFilter
+from metplotpy.plots.timing import PlotTimer, timed_stage
+from metplotpy.plots import export
 
 
 
@@ -73,6 +77,11 @@ class BasePlot:
         self.remove_file()
         self.config_obj = Config(self.parameters)
 
+        # times the read, equalize, series, layout and export stages and
+        # writes them to the optional timing_file as JSON
+        self.timer = PlotTimer(type(self).__name__, self.config_obj.logger,
+                               self.parameters.get('timing_file'))
+
 
     def get_image_format(self):
         """Reads the image format type from user provided image name.
@@ -330,6 +339,7 @@ class BasePlot:
 
         return None
 
+    @timed_stage('export')
     def save_to_file(self):
         """Saves the image to a file specified in the config file.
          Prints a message if fails
@@ -349,7 +359,7 @@ class BasePlot:
             os.mkdir(dirname)
         if self.figure:
             try:
-                self.figure.write_image(image_name)
+                export.write_image(self.figure, image_name)
             except FileNotFoundError:
                 self.logger.error(f"FileNotFoundError: Cannot save to file"
                                   f" {image_name}")
@@ -361,6 +371,72 @@ class BasePlot:
             self.logger.error(f"The figure {dirname} cannot be saved.")
             print("Oops!  The figure was not created. Can't save.")
 
+    def get_html_filename(self) -> str:
+        """Returns the name of the html file: plot_filename with the html extension
+        """
+        name_arr = self.get_config_value('plot_filename').split('.')
+        name_arr[-1] = 'html'
+        return ".".join(name_arr)
+
+    @timed_stage('export')
+    def write_outputs(self, image_formats: Union[list, None] = None) -> None:
+        """Saves the image, the html file (if create_html is True) and the points
+         files (write_output_file) of the plot in one pass, in place of save_to_file,
+         write_html and write_output_file.
+         The figure is converted to a dictionary once and the images and the html
+         are created from it.  The points files are written by another thread
+         while the images are rendered.  Logs a message if fails
+
+        Args:
+            @param image_formats: formats of the images.  Default is the image_formats
+                   config setting or, if not set, the format of plot_filename.
+                   The images of the other formats are saved next to plot_filename,
+                   with their extension.
+                   The html file references plotly.js according to the html_plotlyjs
+                   config setting: False (default, not included), 'cdn' or 'directory'
+                   (one plotly.min.js shared by the html files of the directory)
+
+        Returns:
+
+        """
+        logger = self.config_obj.logger
+        image_name = self.get_config_value('plot_filename')
+
+        # Create the directory for the output plot if it doesn't already exist
+        dirname = os.path.dirname(os.path.abspath(image_name))
+        if not os.path.exists(dirname):
+            os.mkdir(dirname)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            points = None
+            if hasattr(self, 'write_output_file'):
+                points = executor.submit(self.write_output_file)
+
+            if self.figure:
+                figure_dict = self.figure.to_dict()
+                if image_formats is None:
+                    image_formats = self.parameters.get('image_formats') or [export.image_format(image_name)]
+                root = os.path.splitext(image_name)[0]
+                jobs = []
+                for image_format in image_formats:
+                    path = image_name
+                    if image_format != export.image_format(image_name):
+                        path = f"{root}.{image_format}"
+                    jobs.append(export.ExportJob(figure_dict, path, image_format))
+                for result in export.get_exporter().export(jobs):
+                    if result.error is not None:
+                        logger.error(f"{type(result.error).__name__}: Cannot save to file"
+                                     f" {result.path}: {result.error}")
+
+                if getattr(self.config_obj, 'create_html', False) is True:
+                    pio.write_html(figure_dict, self.get_html_filename(), validate=False,
+                                   include_plotlyjs=self.parameters.get('html_plotlyjs', False))
+            else:
+                logger.error(f"The figure {dirname} cannot be saved.")
+
+            if points is not None:
+                points.result()
+
     def remove_file(self):
         """Removes previously made image file .
         """
@@ -23,16 +23,15 @@ from itertools import chain
 import yaml
 import pandas as pd
 
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from plotly.graph_objects import Figure
 
 import metcalcpy.util.utils as calc_util
 
 from metplotpy.plots.base_plot import BasePlot
+from metplotpy.plots.figure_builder import FigureBuilder
 from metplotpy.plots.box.box_config import BoxConfig
 from metplotpy.plots.box.box_series import BoxSeries
 from metplotpy.plots import util
+from metplotpy.plots.timing import timed_stage
 from metplotpy.plots.constants import PLOTLY_AXIS_LINE_COLOR, PLOTLY_AXIS_LINE_WIDTH, PLOTLY_PAPER_BGCOOR
 
 
@@ -78,7 +77,8 @@ class Box(BasePlot):
         # Apply event equalization, if requested
         if self.config_obj.use_ee is True:
             self.box_logger.info(f"Start event equalization: {datetime.now()}")
-            self.input_df = calc_util.perform_event_equalization(self.parameters, self.input_df)
+            with self.timer.stage('equalize'):
+                self.input_df = calc_util.perform_event_equalization(self.parameters, self.input_df)
             self.box_logger.info(f"Finish event equalization: {datetime.now()}")
 
         # Create a list of series objects.
@@ -94,6 +94,7 @@ class Box(BasePlot):
         # create binary versions of the plot.
         self._create_figure()
 
+    @timed_stage('read')
     def _read_input_data(self):
         """
             Read the input data file
@@ -113,6 +114,7 @@ class Box(BasePlot):
                                  f" {datetime.now()}")
         return pd.read_csv(file, sep='\t', header='infer', float_precision='round_trip')
 
+    @timed_stage('series')
     def _create_series(self, input_data):
         """
            Generate all the series objects that are to be displayed as specified by the plot_disp
@@ -178,6 +180,7 @@ class Box(BasePlot):
 
         return series_list
 
+    @timed_stage('layout')
     def _create_figure(self):
         """ Create a box plot from default and custom parameters"""
         self.box_logger.info(f"Begin creating the figure: "
@@ -229,6 +232,7 @@ class Box(BasePlot):
         self._add_x2axis(n_stats)
 
         self.figure.update_layout(boxmode='group')
+        self.figure = self.figure.build()
 
         self.box_logger.info(f"End creating the figure: "
                                     f"{datetime.now()}")
@@ -260,27 +264,28 @@ class Box(BasePlot):
 
         # create a trace
         self.figure.add_trace(
-            go.Box(x=series.series_data[self.config_obj.indy_var],
-                   y=series.series_data['stat_value'],
-                   notched=self.config_obj.box_notch,
-                   line=line_color,
-                   fillcolor=fillcolor,
-                   name=series.user_legends,
-                   showlegend=True,
-                   # quartilemethod='linear', #"exclusive", "inclusive", or "linear"
-                   boxmean=self.config_obj.box_avg,
-                   boxpoints=self.config_obj.boxpoints,  # outliers, all, False
-                   pointpos=0,
-                   marker=dict(size=4,
-                               color=marker_color,
-                               line=dict(
-                                   width=1,
-                                   color=marker_line_color
-                               ),
-                               symbol=marker_symbol,
-                               ),
-                   jitter=0
-                   ),
+            dict(type='box',
+                 x=series.series_data[self.config_obj.indy_var],
+                 y=series.series_data['stat_value'],
+                 notched=self.config_obj.box_notch,
+                 line=line_color,
+                 fillcolor=fillcolor,
+                 name=series.user_legends,
+                 showlegend=True,
+                 # quartilemethod='linear', #"exclusive", "inclusive", or "linear"
+                 boxmean=self.config_obj.box_avg,
+                 boxpoints=self.config_obj.boxpoints,  # outliers, all, False
+                 pointpos=0,
+                 marker=dict(size=4,
+                             color=marker_color,
+                             line=dict(
+                                 width=1,
+                                 color=marker_line_color
+                             ),
+                             symbol=marker_symbol,
+                             ),
+                 jitter=0
+                 ),
             secondary_y=series.y_axis != 1
         )
 
@@ -334,12 +339,12 @@ class Box(BasePlot):
                                                         self.config_obj.parameters['y2lim'][1]],
                                               'autorange': False})
 
-    def _create_layout(self) -> Figure:
+    def _create_layout(self) -> FigureBuilder:
         """
         Creates a new layout based on the properties from the config file
         including plots size, annotation and title
 
-        :return: Figure object
+        :return: FigureBuilder object, build() creates the Figure
         """
         # create annotation
         annotation = [
@@ -369,7 +374,7 @@ class Box(BasePlot):
                  }
 
         # create a layout and allow y2 axis
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        fig = FigureBuilder(secondary_y=True)
 
         # add size, annotation, title
         fig.update_layout(
@@ -535,8 +540,9 @@ class Box(BasePlot):
 
             # need to add an invisible line with all values = None
             self.figure.add_trace(
-                go.Scatter(y=[None] * len(self.config_obj.indy_vals), x=self.config_obj.indy_vals,
-                           xaxis='x2', showlegend=False)
+                dict(type='scatter',
+                     y=[None] * len(self.config_obj.indy_vals), x=self.config_obj.indy_vals,
+                     xaxis='x2', showlegend=False)
             )
 
     def _add_legend(self) -> None:
@@ -560,6 +566,7 @@ class Box(BasePlot):
         if hasattr( self.config_obj, 'xaxis_reverse' ) and self.config_obj.xaxis_reverse is True:
             self.figure.update_layout(legend={'traceorder':'reversed'})
 
+    @timed_stage('export')
     def write_html(self) -> None:
         """
         Is needed - creates and saves the html representation of the plot WITHOUT Plotly.js
@@ -653,10 +660,8 @@ def main(config_filename=None):
 
     try:
         plot = Box(docs)
-        plot.save_to_file()
+        plot.write_outputs()
         #plot.show_in_browser()
-        plot.write_html()
-        plot.write_output_file()
         plot.box_logger.info(f"Finished box plot at {datetime.now()}")
     except ValueError as ve:
         print(ve)
@@ -18,12 +18,12 @@ from typing import Union
 import re
 
 import numpy as np
-import pandas as pd
 from pandas import DataFrame
 
 import metcalcpy.util.utils as utils
 import metplotpy.plots.util
 from ..series import Series
+from ..derived_series import derive_series_data, typed_indy_vals
 
 
 class BoxSeries(Series):
@@ -220,50 +220,13 @@ class BoxSeries(Series):
 
         logger.info(f"Start calculating derived values: "
                                 f"{datetime.now()}")
-        # for each independent value
-        for indy in self.config.indy_vals:
-            if utils.is_string_integer(indy):
-                indy = int(indy)
-            elif utils.is_string_strictly_float(indy):
-                indy = float(indy)
-
-            stats_indy_1 = \
-                series_data_1.loc[series_data_1[self.config.indy_var] == indy]
-            stats_indy_2 = \
-                series_data_2.loc[series_data_2[self.config.indy_var] == indy]
-
-            # validate data
-            if 'fcst_valid_beg' in stats_indy_1.columns:
-                unique_dates = \
-                    stats_indy_1[['fcst_valid_beg', 'fcst_lead', 'stat_name']].drop_duplicates().shape[0]
-            elif 'fcst_valid' in stats_indy_1.columns:
-                unique_dates = \
-                    stats_indy_1[['fcst_valid', 'fcst_lead', 'stat_name']].drop_duplicates().shape[0]
-            elif 'fcst_init_beg' in stats_indy_1.columns:
-                unique_dates = \
-                    stats_indy_1[['fcst_init_beg', 'fcst_lead', 'stat_name']].drop_duplicates().shape[0]
-            else:
-                unique_dates = \
-                    stats_indy_1[['fcst_init', 'fcst_lead', 'stat_name"']].drop_duplicates().shape[0]
-            if stats_indy_1.shape[0] != unique_dates:
-                logger.error(f"ValueError:Derived curve cannot be "
-                                         f"calculated.  Multiple values for one valid "
-                                         f"date/fcst_lead")
-                raise ValueError(
-                    'Derived curve can\'t be calculated. '
-                    'Multiple values for one valid date/fcst_lead')
-
-            # data should be sorted sorted  by fcst_init_beg !!!!!
-            stats_values = utils.calc_derived_curve_value(stats_indy_1['stat_value'].tolist(),
-                                                          stats_indy_2['stat_value'].tolist(),
-                                                          operation)
-            stats_indy_1 = stats_indy_1.drop(columns=['stat_value'])
-            stats_indy_1['stat_value'] = stats_values
-
-            if self.series_data is None:
-                self.series_data = stats_indy_1
-            else:
-                self.series_data = pd.concat([self.series_data, (stats_indy_1)], sort=False)
+        try:
+            self.series_data = derive_series_data(series_data_1, series_data_2, operation,
+                                                  self.config.indy_var,
+                                                  typed_indy_vals(self.config.indy_vals))
+        except ValueError as err:
+            logger.error(f"ValueError: {err}")
+            raise
 
         logger.info(f"End calculating derived values: "
                                 f"{datetime.now()}")
@@ -1,5 +1,15 @@
 import logging
 import getpass
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_user():
+    '''
+      Returns: the user id of the user running the code, looked up once per process
+    '''
+    return getpass.getuser()
+
 
 class ContextFilter(logging.Filter):
     '''
@@ -18,5 +28,5 @@ class ContextFilter(logging.Filter):
        '''
 
        # Retrieve the user id of the user running the code.
-       record.user = getpass.getuser()
+       record.user = get_user()
        return True
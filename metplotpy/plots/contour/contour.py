@@ -454,10 +454,8 @@ def main(config_filename=None):
 
     try:
         plot = Contour(docs)
-        plot.save_to_file()
+        plot.write_outputs()
         # plot.show_in_browser()
-        plot.write_html()
-        plot.write_output_file()
         plot.contour_logger.info(f"Finished contour plot at {datetime.now()}")
     except ValueError as val_er:
         print(val_er)
@@ -0,0 +1,185 @@
+# ============================*
+# ** Copyright UCAR (c) 2024
+# ** University Corporation for Atmospheric Research (UCAR)
+# ** National Center for Atmospheric Research (NCAR)
+# ** Research Applications Lab (RAL)
+# ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+# ============================*
+
+
+"""
+Module Name: derived_series.py
+
+Data of the derived series (DIFF, RATIO, SS, ...) of the line, bar and box
+plots, computed from the data of their two parent series for all the
+independent values at once: the rows of the parents are aligned with one
+join and the derived statistics are computed on whole columns.
+"""
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+import metcalcpy.util.utils as utils
+
+# the first of these columns found in the data identifies the date of a row
+DATE_COLUMNS = ('fcst_valid_beg', 'fcst_valid', 'fcst_init_beg', 'fcst_init')
+
+# operations computed on whole columns, the others go through calc_derived_curve_value
+COLUMN_OPERATIONS = ('DIFF', 'DIFF_SIG', 'RATIO', 'SS', 'SINGLE')
+
+DUPLICATES_MESSAGE = 'Derived curve can\'t be calculated. Multiple values for one valid date/fcst_lead'
+
+
+def typed_indy_vals(indy_vals: Sequence) -> list:
+    """
+    The independent values converted to int or float when they are numbers,
+    to compare them with the values of the independent variable column
+    """
+    typed = []
+    for indy in indy_vals:
+        if utils.is_string_integer(indy):
+            indy = int(indy)
+        elif utils.is_string_strictly_float(indy):
+            indy = float(indy)
+        typed.append(indy)
+    return typed
+
+
+def key_columns(series_data: DataFrame, indy_var: str) -> list:
+    """
+    Columns identifying the rows of a series for one statistic:
+    the independent variable, the date and the forecast lead, if present and
+    not the independent variable
+    """
+    keys = [indy_var]
+    for date_column in DATE_COLUMNS:
+        if date_column in series_data.columns:
+            if date_column != indy_var:
+                keys.append(date_column)
+            break
+    if 'fcst_lead' in series_data.columns and indy_var != 'fcst_lead':
+        keys.append('fcst_lead')
+    return keys
+
+
+def _select_indy(series_data: DataFrame, indy_var: str, indy_vals: Sequence) -> DataFrame:
+    """
+    Rows of series_data with an independent value in indy_vals, in the order of
+    indy_vals and, for one independent value, in the order of series_data
+    """
+    indy_position = series_data[indy_var].map({indy: i for i, indy in enumerate(indy_vals)})
+    selected = indy_position.notna().to_numpy()
+    order = np.argsort(indy_position.to_numpy()[selected], kind='stable')
+    return series_data[selected].iloc[order]
+
+
+def _is_none(values: pd.Series) -> np.ndarray:
+    if values.dtype == object:
+        return values.map(lambda value: value is None).to_numpy(dtype=bool)
+    return np.zeros(len(values), dtype=bool)
+
+
+def _derive_column(values_1: pd.Series, values_2: pd.Series, operation: str) -> np.ndarray:
+    val1 = pd.to_numeric(values_1, errors='coerce').to_numpy(dtype=float)
+    val2 = pd.to_numeric(values_2, errors='coerce').to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if operation in ('DIFF', 'DIFF_SIG'):
+            return val1 - val2
+        if operation == 'RATIO':
+            return val1 / val2
+        if operation == 'SS':
+            return (val1 - val2) / val1
+    return values_1.to_numpy()
+
+
+def derive_series_data(series_data_1: DataFrame, series_data_2: DataFrame, operation: str,
+                       indy_var: str, indy_vals: Sequence,
+                       value_columns: Sequence = ('stat_value',)) -> DataFrame:
+    """
+    Calculates the data of the derived series operation(series 1, series 2),
+    for example the difference of the statistics of the two series if the
+    operation is 'DIFF'.
+
+    The rows of the two series are joined on the independent value, the date,
+    the forecast lead and the number of the row for these keys (for several
+    statistics per date).  As before, the derived values of an independent value
+    are missing (NaN) if the two series don't have the same rows (dates) for it, or if one
+    of its values is 0 in the denominator of the RATIO (2nd series) or SS (1st series).
+
+    Args:
+        @param series_data_1: data of the 1st series sorted by date
+        @param series_data_2: data of the 2nd series sorted by date
+        @param operation: DIFF, DIFF_SIG, RATIO, SS, SINGLE or an other operation
+               of calc_derived_curve_value
+        @param indy_var: the name of the independent variable column
+        @param indy_vals: the independent values (converted to int or float), in plot order
+        @param value_columns: the columns of the statistic and CIs to derive,
+               the missing ones are ignored
+    Returns:
+        the rows of series_data_1 for indy_vals, ordered by indy_vals, with the
+        value_columns replaced by the derived values
+    Raises:
+        ValueError if the 1st series has several rows for one date, lead and statistic
+    """
+    data_1 = _select_indy(series_data_1, indy_var, indy_vals)
+    data_2 = _select_indy(series_data_2, indy_var, indy_vals)
+    value_columns = [column for column in value_columns if column in data_1.columns]
+
+    keys = key_columns(data_1, indy_var)
+    unique_columns = keys + ['stat_name'] if 'stat_name' in data_1.columns else keys
+    if data_1.duplicated(unique_columns).any():
+        raise ValueError(DUPLICATES_MESSAGE)
+
+    if operation not in COLUMN_OPERATIONS:
+        return _derive_by_indy(data_1, data_2, operation, indy_var, indy_vals, value_columns)
+
+    # join the rows of the 2nd series to the rows of the 1st series
+    left = data_1[keys].assign(occurrence=data_1.groupby(keys).cumcount().to_numpy())
+    right = data_2[keys + value_columns].assign(occurrence=data_2.groupby(keys).cumcount().to_numpy())
+    joined = left.merge(right, how='left', on=keys + ['occurrence'], indicator=True)
+    joined.index = data_1.index
+    indy_1 = data_1[indy_var]
+
+    # an independent value is derived if both series have the same rows for it
+    rows_2 = data_2.groupby(indy_var).size()
+    same_rows = (indy_1.map(data_1.groupby(indy_var).size()) == indy_1.map(rows_2).fillna(0)) \
+                & (joined['_merge'] == 'both').groupby(indy_1).transform('all')
+
+    derived = data_1.copy()
+    for column in value_columns:
+        values_1 = data_1[column]
+        values_2 = joined[column]
+        invalid = pd.Series(_is_none(values_1) | _is_none(values_2), index=data_1.index)
+        if operation == 'RATIO':
+            invalid |= (values_2 == 0).to_numpy()
+        elif operation == 'SS':
+            invalid |= (values_1 == 0).to_numpy()
+        invalid = invalid.groupby(indy_1).transform('any') | ~same_rows
+
+        values = _derive_column(values_1, values_2, operation)
+        derived[column] = np.where(invalid.to_numpy(), np.nan, values)
+    return derived
+
+
+def _derive_by_indy(data_1: DataFrame, data_2: DataFrame, operation: str, indy_var: str,
+                    indy_vals: Sequence, value_columns: Sequence) -> DataFrame:
+    """
+    Derived values of the operations that need all the values of an independent
+    value (ETB), computed by calc_derived_curve_value for each independent value
+    """
+    derived = []
+    for indy in indy_vals:
+        stats_indy_1 = data_1.loc[data_1[indy_var] == indy]
+        stats_indy_2 = data_2.loc[data_2[indy_var] == indy]
+        values = {column: utils.calc_derived_curve_value(stats_indy_1[column].tolist(),
+                                                         stats_indy_2[column].tolist(), operation)
+                  for column in value_columns}
+        stats_indy_1 = stats_indy_1.drop(columns=value_columns)
+        for column in value_columns:
+            stats_indy_1[column] = values[column]
+        derived.append(stats_indy_1)
+    if not derived:
+        return data_1.drop(columns=value_columns)
+    return pd.concat(derived, sort=False)
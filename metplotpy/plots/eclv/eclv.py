@@ -20,8 +20,6 @@ from typing import Union
 import yaml
 import itertools
 
-import plotly.graph_objects as go
-
 from datetime import datetime
 from metcalcpy.event_equalize import event_equalize
 from metplotpy.plots.base_plot import BasePlot
@@ -227,6 +225,7 @@ class Eclv(Line):
         # add x2 axis
         self._add_x2axis(n_stats)
 
+        self.figure = self.figure.build()
         self.eclv_logger.info(f"Finished creating the figure: {datetime.now()}")
 
     def _add_x2axis(self, n_stats) -> None:
@@ -273,7 +272,7 @@ class Eclv(Line):
 
             # need to add an invisible line with all values = None
             self.figure.add_trace(
-                go.Scatter(
+                dict(type='scatter',
                     y=[None] * len(self.series_list[0].series_points[0]['x_pnt']),
                     x=self.series_list[0].series_points[0]['x_pnt'],
                     xaxis='x2', showlegend=False)
@@ -304,33 +303,34 @@ class Eclv(Line):
 
             # add the plot
             self.figure.add_trace(
-                go.Scatter(x=x_points,
-                           y=y_points,
-                           showlegend=ind == 0,
-                           mode=self.config_obj.mode[series.idx],
-                           textposition="top right",
-                           name=self.config_obj.user_legends[series.idx],
-                           connectgaps=self.config_obj.con_series[series.idx] == 1,
-                           line={'color': self.config_obj.colors_list[series.idx],
-                                 'width': self.config_obj.linewidth_list[series.idx],
-                                 'dash': self.config_obj.linestyles_list[series.idx]},
-                           marker_symbol=self.config_obj.marker_list[series.idx],
-                           marker_color=self.config_obj.colors_list[series.idx],
-                           marker_line_color=self.config_obj.colors_list[series.idx],
-                           marker_size=self.config_obj.marker_size[series.idx],
-                           error_y={'type': 'data',
-                                    'symmetric': False,
-                                    'array': series_points['dbl_up_ci'],
-                                    'arrayminus': series_points['dbl_lo_ci'],
-                                    'visible': error_y_visible,
-                                    'thickness': self.config_obj.linewidth_list[
-                                        series.idx]},
-                           hovertemplate="<br>".join([
-                               "Cost/Lost Ratio: %{customdata}",
-                               "Economic Value: %{y}"
-                           ]),
-                           customdata=x_points
-                           ),
+                dict(type='scatter',
+                     x=x_points,
+                     y=y_points,
+                     showlegend=ind == 0,
+                     mode=self.config_obj.mode[series.idx],
+                     textposition="top right",
+                     name=self.config_obj.user_legends[series.idx],
+                     connectgaps=self.config_obj.con_series[series.idx] == 1,
+                     line={'color': self.config_obj.colors_list[series.idx],
+                           'width': self.config_obj.linewidth_list[series.idx],
+                           'dash': self.config_obj.linestyles_list[series.idx]},
+                     marker_symbol=self.config_obj.marker_list[series.idx],
+                     marker_color=self.config_obj.colors_list[series.idx],
+                     marker_line_color=self.config_obj.colors_list[series.idx],
+                     marker_size=self.config_obj.marker_size[series.idx],
+                     error_y={'type': 'data',
+                              'symmetric': False,
+                              'array': series_points['dbl_up_ci'],
+                              'arrayminus': series_points['dbl_lo_ci'],
+                              'visible': error_y_visible,
+                              'thickness': self.config_obj.linewidth_list[
+                                  series.idx]},
+                     hovertemplate="<br>".join([
+                         "Cost/Lost Ratio: %{customdata}",
+                         "Economic Value: %{y}"
+                     ]),
+                     customdata=x_points
+                     ),
                 secondary_y=False
             )
 
@@ -410,10 +410,8 @@ def main(config_filename=None):
 
     try:
         plot = Eclv(docs)
-        plot.save_to_file()
+        plot.write_outputs()
         # plot.show_in_browser()
-        plot.write_html()
-        plot.write_output_file()
         plot.eclv_logger.info(f"Finished ECLV plot: {datetime.now()}")
     except ValueError as val_er:
         print(val_er)
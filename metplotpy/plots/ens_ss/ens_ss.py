@@ -572,10 +572,8 @@ def main(config_filename=None):
 
     try:
         plot = EnsSs(docs)
-        plot.save_to_file()
+        plot.write_outputs()
         # plot.show_in_browser()
-        plot.write_html()
-        plot.write_output_file()
         plot.ens_logger.info(f"Finished EnsSs plot: {datetime.now()}")
     except ValueError as val_er:
         print(val_er)
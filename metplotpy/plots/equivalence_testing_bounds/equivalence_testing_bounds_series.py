@@ -16,7 +16,6 @@ __author__ = 'Tatiana Burek'
 from typing import Union
 from datetime import datetime
 import statistics
-import math
 
 import numpy as np
 import pandas as pd
@@ -41,6 +40,9 @@ class EquivalenceTestingBoundsSeries(LineSeries):
     def __init__(self, config, idx: int, input_data, series_list: list,
                  series_name: Union[list, tuple], y_axis: int = 1):
 
+        # stat_value columns recomputed from the partial sums, by statistic name,
+        # reused by all the derived series built on this series
+        self.recomputed_stat_values = {}
         super().__init__(config, idx, input_data, series_list, series_name, y_axis)
 
     def _create_series_points(self) -> dict:
@@ -97,14 +99,14 @@ class EquivalenceTestingBoundsSeries(LineSeries):
         # operation
         operation = self.series_name[2]
 
-        # find original series data
-        series_data_1 = None
-        series_data_2 = None
+        # find original series
+        series_1 = None
+        series_2 = None
         for series in self.series_list:
             if set(series_name_1) == set(series.series_name):
-                series_data_1 = series.series_data
+                series_1 = series
             if set(series_name_2) == set(series.series_name):
-                series_data_2 = series.series_data
+                series_2 = series
 
         # create a series name as a string
         series_name_str = utils.get_derived_curve_name([self.series_name[0],
@@ -119,60 +121,44 @@ class EquivalenceTestingBoundsSeries(LineSeries):
 
         # check if the input frame already has derived series ( from calculation agg stats )
         if len(self.series_data) == 0:
-            # convert  'stat_value' column of ints to floats
-            series_data_1['stat_value'] = pd.to_numeric(series_data_1['stat_value'],
-                                                        downcast='float')
-            series_data_2['stat_value'] = pd.to_numeric(series_data_2['stat_value'],
-                                                        downcast='float')
-
             # no data with with the series name value was found -
             # calculate derived statistic for the each line
-            self._calculate_tost_paired(series_data_1.reset_index(drop=True),
-                                        series_data_2.reset_index(drop=True))
+            self._calculate_tost_paired(series_1, series_2)
 
         logger.info(f"Finished creating series points (calculating the "
                                 f"values for each point: {datetime.now()}")
 
         return self.series_data
 
-    def _calculate_tost_paired(self, series_data_1: DataFrame, series_data_2: DataFrame) -> None:
+    def _calculate_tost_paired(self, series_1: 'EquivalenceTestingBoundsSeries',
+                               series_2: 'EquivalenceTestingBoundsSeries') -> None:
         """
         Validates if both DataFrames have the same fcst_valid_beg values and if it is TRUE
         Calculates derived statistic for the each line based on data from thr 1st and
-        2nd data frames. For example, if the operation is 'DIFF' the differences between
-        values from the 1st and the 2nd frames will be calculated
+        2nd series. For example, if the operation is 'DIFF' the differences between
+        values from the 1st and the 2nd series will be calculated
         This method also calculates CI(s)
 
-        :param series_data_1: 1st data frame sorted  by fcst_init_beg
-        :param series_data_2: 2nd data frame sorted  by fcst_init_beg
+        :param series_1: 1st series, its data sorted  by fcst_init_beg
+        :param series_2: 2nd series, its data sorted  by fcst_init_beg
         """
 
         logger = metplotpy.plots.util.get_common_logger(self.log_level,
                                                         self.log_filename)
         logger.info(f"Validating dataframe fcst_valid_beg: "
                                 f"{datetime.now()}")
-        all_zero_1 = all(elem is None or math.isnan(elem)
-                         for elem in series_data_1['stat_value'].tolist())
-        all_zero_2 = all(elem is None or math.isnan(elem)
-                         for elem in series_data_2['stat_value'].tolist())
+        # convert  'stat_value' column of ints to floats
+        stat_values_1 = pd.to_numeric(series_1.series_data['stat_value'], downcast='float')
+        stat_values_2 = pd.to_numeric(series_2.series_data['stat_value'], downcast='float')
 
-        if all_zero_1 is True and all_zero_2 is True:
+        if stat_values_1.isna().all() and stat_values_2.isna().all():
             # calculate stat values
-            for index, row in series_data_1.iterrows():
-                row_array = np.expand_dims(row.to_numpy(), axis=0)
-                stat_value = calculate_statistic(row_array, series_data_1.columns,
-                                                 series_data_1["stat_name"][0].lower())
-                # save the value to the 'stat_value' column
-                series_data_1.at[index, 'stat_value'] = stat_value
-            for index, row in series_data_2.iterrows():
-                row_array = np.expand_dims(row.to_numpy(), axis=0)
-                stat_value = calculate_statistic(row_array, series_data_2.columns,
-                                                 series_data_2["stat_name"][0].lower())
-                # save the value to the 'stat_value' column
-                series_data_2.at[index, 'stat_value'] = stat_value
-
-        corr = pg.corr(x=series_data_1['stat_value'],
-                       y=series_data_2['stat_value'])['r'].tolist()[0]
+            stat_values_1 = series_1.get_recomputed_stat_values()
+            stat_values_2 = series_2.get_recomputed_stat_values()
+
+        stat_values_1 = stat_values_1.reset_index(drop=True)
+        stat_values_2 = stat_values_2.reset_index(drop=True)
+        corr = pg.corr(x=stat_values_1, y=stat_values_2)['r'].tolist()[0]
         low_eqbound = self.config.get_config_value('low_eqbound')
         if not low_eqbound:
             low_eqbound = -0.001
@@ -180,11 +166,11 @@ class EquivalenceTestingBoundsSeries(LineSeries):
         if not high_eqbound:
             high_eqbound = 0.001
 
-        self.series_data = utils.tost_paired(len(series_data_1['stat_value']),
-                                             statistics.mean(series_data_1['stat_value']),
-                                             statistics.mean(series_data_2['stat_value']),
-                                             statistics.stdev(series_data_1['stat_value']),
-                                             statistics.stdev(series_data_2['stat_value']),
+        self.series_data = utils.tost_paired(len(stat_values_1),
+                                             statistics.mean(stat_values_1),
+                                             statistics.mean(stat_values_2),
+                                             statistics.stdev(stat_values_1),
+                                             statistics.stdev(stat_values_2),
                                              corr,
                                              low_eqbound, high_eqbound,
                                              self.config.get_config_value('alpha')
@@ -192,3 +178,37 @@ class EquivalenceTestingBoundsSeries(LineSeries):
 
         logger.info(f"Finished validating dataframe fcst_valid_beg:"
                                 f" {datetime.now()}")
+
+    def get_recomputed_stat_values(self) -> pd.Series:
+        """
+        Calculates the statistic of each row of the series data from its
+        partial sums. The values are calculated once per statistic and reused
+        by every derived series built on this series.
+
+        :return: the statistic values, in the order of the series data rows
+        """
+        stat_name = self.series_data['stat_name'].iloc[0].lower()
+        if stat_name not in self.recomputed_stat_values:
+            self.recomputed_stat_values[stat_name] = pd.Series(
+                calculate_row_statistics(self.series_data, stat_name),
+                index=self.series_data.index, name='stat_value')
+        return self.recomputed_stat_values[stat_name]
+
+
+def calculate_row_statistics(series_data: DataFrame, stat_name: str) -> np.ndarray:
+    """
+    Calculates a statistic separately for each row of the data frame.
+    The frame is converted to an array once and each row is passed to
+    calculate_statistic as a one row view of it.
+
+    :param series_data: the data frame with the partial sums columns
+    :param stat_name: the lower case name of the statistic
+    :return: a float array with one value per row, NaN if the value can't be calculated
+    """
+    values = series_data.to_numpy()
+    columns = series_data.columns
+    stat_values = np.empty(len(values), dtype=float)
+    for ind in range(len(values)):
+        stat_value = calculate_statistic(values[ind:ind + 1], columns, stat_name)
+        stat_values[ind] = np.nan if stat_value is None else stat_value
+    return stat_values
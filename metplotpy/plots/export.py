@@ -0,0 +1,248 @@
+# ============================*
+# ** Copyright UCAR (c) 2024
+# ** University Corporation for Atmospheric Research (UCAR)
+# ** National Center for Atmospheric Research (NCAR)
+# ** Research Applications Lab (RAL)
+# ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+# ============================*
+
+
+"""
+Module Name: export.py
+
+Static image export of Plotly figures through a pool of warmed Kaleido
+scopes.  figure.write_image() uses the single Kaleido scope of plotly.io,
+which starts a Chromium subprocess and loads plotly.js on the first export
+of every process and exports one image at a time.  ImageExporter keeps
+pool_size scopes alive, can start them in the background while the figures
+are built (warm) and exports batches of ExportJob concurrently, one job per
+scope at a time.  The export time of each image is returned with its
+result, separately from the time spent building the figure.
+
+The plots share one exporter, see get_exporter().  Its pool size is read
+from the METPLOTPY_EXPORT_POOL_SIZE environment variable (default 1).
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union
+
+import plotly.io as pio
+from plotly.io._utils import validate_coerce_fig_to_dict
+
+# image formats supported by Kaleido
+IMAGE_FORMATS = ("png", "jpg", "jpeg", "webp", "svg", "pdf", "eps")
+DEFAULT_IMAGE_FORMAT = 'png'
+
+# width, height and scale of None use the defaults of the Kaleido scope,
+# the same as figure.write_image()
+ExportJob = namedtuple('ExportJob', ['figure', 'path', 'format', 'width', 'height', 'scale'],
+                       defaults=[None, None, None, None])
+
+# secs is the time spent exporting and writing the image, error is the
+# exception raised by the export or None
+ExportResult = namedtuple('ExportResult', ['path', 'secs', 'error'])
+
+
+def image_format(path: str, image_format: Union[str, None] = None) -> str:
+    """
+    Returns the format of the image: image_format if set, otherwise the
+    extension of path, the default format if path has no extension.
+    Same as the format inferred by figure.write_image().
+    """
+    if image_format:
+        return image_format.lower()
+    extension = os.path.splitext(path)[1]
+    if extension:
+        return extension[1:].lower()
+    return pio.kaleido.scope.default_format or DEFAULT_IMAGE_FORMAT
+
+
+class ImageExporter:
+    """
+       A pool of Kaleido scopes exporting Plotly figures to static images.
+
+       To use:
+          exporter = ImageExporter(pool_size=4)
+          exporter.warm()
+          ... build the figures ...
+          results = exporter.export([ExportJob(figure, 'plot.png'), ...])
+          exporter.close()
+    """
+
+    def __init__(self, pool_size: int = 1, logger=None):
+        """
+        Args:
+            @param pool_size: number of Kaleido scopes (Chromium subprocesses)
+                              exporting images concurrently
+            @param logger: optional logger, the export times are logged at DEBUG level
+        """
+        self.pool_size = max(1, int(pool_size))
+        self.logger = logger if logger is not None else logging.getLogger(__name__)
+        self._scopes = queue.Queue()
+        self._executor = None
+        self._lock = threading.Lock()
+        self._warming = []
+
+    def _new_scope(self):
+        from kaleido.scopes.plotly import PlotlyScope
+
+        # Same setup as the scope of plotly.io
+        scope = PlotlyScope()
+        scope.plotlyjs = pio.kaleido.scope.plotlyjs
+        if pio.kaleido.scope.mathjax is not None:
+            scope.mathjax = pio.kaleido.scope.mathjax
+        return scope
+
+    def _start(self):
+        """
+        Creates the scopes and the thread pool, if not done yet.
+        The scopes start their subprocess on their first export.
+        """
+        with self._lock:
+            if self._executor is None:
+                for _ in range(self.pool_size):
+                    self._scopes.put(self._new_scope())
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_size,
+                                                    thread_name_prefix='kaleido')
+
+    def _transform(self, figure_dict: dict, fmt: str, width, height, scale) -> bytes:
+        scope = self._scopes.get()
+        try:
+            # the defaults set on the scope of plotly.io apply, as in figure.write_image()
+            scope.default_width = pio.kaleido.scope.default_width
+            scope.default_height = pio.kaleido.scope.default_height
+            scope.default_scale = pio.kaleido.scope.default_scale
+            return scope.transform(figure_dict, format=fmt, width=width, height=height,
+                                   scale=scale)
+        finally:
+            self._scopes.put(scope)
+
+    def warm(self, block: bool = False) -> None:
+        """
+        Starts the Chromium subprocess of every scope and loads plotly.js by
+        exporting an empty figure, in the background unless block is True.
+        Call it before building the figures so that the start up overlaps
+        with the figure building.
+        """
+        self._start()
+        empty = {'data': [], 'layout': {}}
+        self._warming = [self._executor.submit(self._transform, empty, 'png', 10, 10, 1)
+                         for _ in range(self.pool_size)]
+        if block:
+            self._wait_warm()
+
+    def _wait_warm(self):
+        for future in self._warming:
+            try:
+                future.result()
+            except Exception as ex:
+                # the same error is raised by the export of the first job
+                self.logger.warning(f"Could not start Kaleido: {ex}")
+        self._warming = []
+
+    def _export(self, job: ExportJob) -> ExportResult:
+        start = time.perf_counter()
+        try:
+            fmt = image_format(job.path, job.format)
+            if fmt not in IMAGE_FORMATS:
+                raise ValueError(f"Invalid image format '{fmt}', supported formats: "
+                                 f"{', '.join(IMAGE_FORMATS)}")
+            # a dictionary is expected to come from Figure.to_dict() and is not validated again
+            figure_dict = validate_coerce_fig_to_dict(job.figure, False)
+            img_bytes = self._transform(figure_dict, fmt, job.width, job.height, job.scale)
+            with open(job.path, 'wb') as image_file:
+                image_file.write(img_bytes)
+            error = None
+        except Exception as ex:
+            error = ex
+        secs = time.perf_counter() - start
+        self.logger.debug(f"Exported {job.path} in {secs:.3f} s")
+        return ExportResult(job.path, secs, error)
+
+    def export(self, jobs: list) -> list:
+        """
+        Exports the figures of jobs concurrently.
+
+        Args:
+            @param jobs: list of ExportJob
+        Returns:
+            the list of ExportResult, in the order of jobs.  The errors are
+            returned, not raised.
+        """
+        self._start()
+        self._wait_warm()
+        start = time.perf_counter()
+        results = list(self._executor.map(self._export, jobs))
+        if len(results) > 1:
+            self.logger.info(f"Exported {len(results)} images in "
+                             f"{time.perf_counter() - start:.3f} s with {self.pool_size} "
+                             f"Kaleido scopes ({sum(result.secs for result in results):.3f} s "
+                             f"summed over the images)")
+        return results
+
+    def write_image(self, figure, path: str, format: Union[str, None] = None,
+                    width: Union[int, None] = None, height: Union[int, None] = None,
+                    scale: Union[float, None] = None) -> float:
+        """
+        Exports one figure, like figure.write_image(), on a warm scope.
+        Raises the exception of the export, if any.
+
+        Returns:
+            the export time in seconds
+        """
+        result = self.export([ExportJob(figure, path, format, width, height, scale)])[0]
+        if result.error is not None:
+            raise result.error
+        return result.secs
+
+    def close(self) -> None:
+        """
+        Stops the thread pool and the Kaleido subprocesses
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            while not self._scopes.empty():
+                self._scopes.get()._shutdown_kaleido()
+        self._warming = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter() -> ImageExporter:
+    """
+    Returns the ImageExporter shared by the plots of this process, created
+    on first use with METPLOTPY_EXPORT_POOL_SIZE scopes
+    """
+    global _exporter
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = ImageExporter(int(os.environ.get('METPLOTPY_EXPORT_POOL_SIZE', 1)))
+            atexit.register(_exporter.close)
+    return _exporter
+
+
+def write_image(figure, path: str, format: Union[str, None] = None,
+                width: Union[int, None] = None, height: Union[int, None] = None,
+                scale: Union[float, None] = None) -> float:
+    """
+    Exports one figure with the shared exporter, see ImageExporter.write_image()
+    """
+    return get_exporter().write_image(figure, path, format=format, width=width,
+                                      height=height, scale=scale)
@@ -0,0 +1,160 @@
+# ============================*
+# ** Copyright UCAR (c) 2024
+# ** University Corporation for Atmospheric Research (UCAR)
+# ** National Center for Atmospheric Research (NCAR)
+# ** Research Applications Lab (RAL)
+# ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+# ============================*
+
+
+"""
+Module Name: figure_builder.py
+
+Builds a Plotly figure with one x axis and an optional secondary y axis, the
+layout of make_subplots(specs=[[{"secondary_y": ...}]]), without materializing
+the Figure until all of its traces are known.
+
+figure.add_trace() validates the trace and copies the data of the figure on
+every call, so drawing a plot trace by trace gets slower with every series.
+FigureBuilder has the add_trace/update_layout/update_xaxes/update_yaxes
+methods of the figure used by the plots: the traces are kept as plain dicts
+and the figure is created once by build(), with all the traces and without
+validating them again.  The layout is still a go.Layout, updating it is
+cheap and keeps the magic underscore and merge rules of the figure.
+"""
+
+import re
+from typing import Union
+
+import plotly.graph_objects as go
+from plotly.basedatatypes import BaseTraceType
+
+XAXIS_NAME = re.compile(r'^xaxis\d*$')
+YAXIS_NAME = re.compile(r'^yaxis\d*$')
+
+
+def _without_none(properties: dict) -> dict:
+    """
+    properties without the ones set to None, which the validation of a trace
+    leaves unset, in the nested dicts too
+    """
+    return {name: _without_none(value) if isinstance(value, dict) else value
+            for name, value in properties.items() if value is not None}
+
+
+class FigureBuilder:
+    """
+    Traces and layout of a figure, see build().
+    """
+
+    def __init__(self, secondary_y: bool = False) -> None:
+        """
+        Creates an empty figure layout with one x and y axis, and a secondary
+        y axis on the right if secondary_y is True.
+        """
+        self.secondary_y = secondary_y
+        self.data = []
+        if secondary_y:
+            self.layout = go.Layout(xaxis={'anchor': 'y', 'domain': [0.0, 0.94]},
+                                    yaxis={'anchor': 'x', 'domain': [0.0, 1.0]},
+                                    yaxis2={'anchor': 'x', 'overlaying': 'y', 'side': 'right'})
+        else:
+            self.layout = go.Layout(xaxis={'anchor': 'y', 'domain': [0.0, 1.0]},
+                                    yaxis={'anchor': 'x', 'domain': [0.0, 1.0]})
+
+    def add_trace(self, trace: Union[dict, BaseTraceType], row: Union[int, None] = None,
+                  col: Union[int, None] = None,
+                  secondary_y: Union[bool, None] = None) -> 'FigureBuilder':
+        """
+        Adds a trace to the figure.
+
+        Args:
+            @param trace: the trace properties with its 'type' ('scatter', 'bar', ...)
+                   or a trace object
+            @param row, col: the subplot of the trace, only 1 is supported
+            @param secondary_y: plot the trace on the secondary y axis if True,
+                   on the primary one if False
+        Returns:
+            the builder
+        """
+        if isinstance(trace, BaseTraceType):
+            trace = trace.to_plotly_json()
+        else:
+            trace = _without_none(trace)
+        if row not in (None, 1) or col not in (None, 1):
+            raise ValueError(f'Only row=1 and col=1 are supported, got row={row}, col={col}')
+        if secondary_y and not self.secondary_y:
+            raise ValueError('secondary_y=True but the figure has no secondary y axis')
+
+        if secondary_y is not None or row is not None:
+            trace['xaxis'] = 'x'
+            trace['yaxis'] = 'y2' if secondary_y else 'y'
+        self.data.append(trace)
+        return self
+
+    def add_traces(self, traces: list, secondary_ys: Union[list, None] = None) -> 'FigureBuilder':
+        """
+        Adds the traces to the figure, with their secondary_y, see add_trace()
+        """
+        if secondary_ys is None:
+            secondary_ys = [None] * len(traces)
+        for trace, secondary_y in zip(traces, secondary_ys):
+            self.add_trace(trace, secondary_y=secondary_y)
+        return self
+
+    def update_layout(self, dict1: Union[dict, None] = None, overwrite: bool = False,
+                      **kwargs) -> 'FigureBuilder':
+        """
+        Updates the layout, same as figure.update_layout()
+        """
+        self.layout.update(dict1, overwrite=overwrite, **kwargs)
+        return self
+
+    def add_annotation(self, arg: Union[dict, None] = None, **kwargs) -> 'FigureBuilder':
+        """
+        Adds an annotation to the layout, same as figure.add_annotation()
+        """
+        self.layout.annotations += (go.layout.Annotation(arg, **kwargs),)
+        return self
+
+    def update_xaxes(self, patch: Union[dict, None] = None, overwrite: bool = False,
+                     **kwargs) -> 'FigureBuilder':
+        """
+        Updates all the x axes of the layout, same as figure.update_xaxes()
+        """
+        for name in self._axes(XAXIS_NAME):
+            self.layout[name].update(patch, overwrite=overwrite, **kwargs)
+        return self
+
+    def update_yaxes(self, patch: Union[dict, None] = None, overwrite: bool = False,
+                     secondary_y: Union[bool, None] = None, **kwargs) -> 'FigureBuilder':
+        """
+        Updates the y axes of the layout, same as figure.update_yaxes():
+        all the y axes if secondary_y is None, otherwise the secondary or
+        the primary y axis
+        """
+        if secondary_y is None:
+            names = self._axes(YAXIS_NAME)
+        elif secondary_y:
+            names = ['yaxis2'] if self.secondary_y else []
+        else:
+            names = ['yaxis']
+        for name in names:
+            self.layout[name].update(patch, overwrite=overwrite, **kwargs)
+        return self
+
+    def _axes(self, axis_name: re.Pattern) -> list:
+        names = [name for name in self.layout.to_plotly_json() if axis_name.match(name)]
+        return sorted(names, key=lambda name: int(name[5:] or 1))
+
+    def build(self, validate: bool = False) -> go.Figure:
+        """
+        Creates the figure from the traces and the layout.
+
+        Args:
+            @param validate: validate the traces again; the traces added as
+                   trace objects are already valid
+        Returns:
+            the Plotly figure
+        """
+        return go.Figure(data=self.data, layout=self.layout, _validate=validate)
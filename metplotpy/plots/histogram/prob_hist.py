@@ -82,10 +82,8 @@ def main(config_filename=None):
     try:
 
         plot = ProbHist(docs)
-        plot.save_to_file()
+        plot.write_outputs()
         # plot.show_in_browser()
-        plot.write_html()
-        plot.write_output_file()
         log_level = plot.get_config_value('log_level')
         log_filename = plot.get_config_value('log_filename')
         prob_logger = util.get_common_logger(log_level, log_filename)
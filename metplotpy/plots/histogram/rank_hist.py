@@ -57,10 +57,8 @@ def main(config_filename=None):
 
     try:
         plot = RankHist(docs)
-        plot.save_to_file()
+        plot.write_outputs()
         # plot.show_in_browser()
-        plot.write_html()
-        plot.write_output_file()
         plot.hist_logger.info(f"Finished creating rank histogram: {datetime.now()}")
     except ValueError as val_er:
         print(val_er)
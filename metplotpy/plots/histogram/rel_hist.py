@@ -60,10 +60,8 @@ def main(config_filename=None):
 
     try:
         plot = RelHist(docs)
-        plot.save_to_file()
+        plot.write_outputs()
         # plot.show_in_browser()
-        plot.write_html()
-        plot.write_output_file()
         plot.hist_logger.info(f"Finished creating the relative frequency histogram: "
                               f"{datetime.now()}")
     except ValueError as val_er:
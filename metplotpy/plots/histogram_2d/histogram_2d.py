@@ -35,6 +35,8 @@ import metplotpy.plots.util as util
 Import BasePlot class
 """
 from metplotpy.plots.base_plot import BasePlot
+from metplotpy.plots import export
+from metplotpy.plots.timing import timed_stage
 
 
 class Histogram_2d(BasePlot):
@@ -96,6 +98,7 @@ class Histogram_2d(BasePlot):
 
         self.logger.info(f"Finished creating the figure: {datetime.now()}")
 
+    @timed_stage('export')
     def save_to_file(self):
         """Saves the image to a file specified in the config file.
          Prints a message if fails
@@ -109,7 +112,7 @@ class Histogram_2d(BasePlot):
         self.logger.info(f"Saving plot to file {image_name}: {datetime.now()} ")
         if self.figure:
             try:
-                self.figure.write_image(image_name)
+                export.write_image(self.figure, image_name)
 
             except FileNotFoundError:
                 self.logger.error(f"FileNotFoundError: Can't save to file {image_name}")
@@ -25,15 +25,14 @@ import yaml
 import numpy as np
 import pandas as pd
 
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from plotly.graph_objects import Figure
 
 from metplotpy.plots.constants import PLOTLY_AXIS_LINE_COLOR, PLOTLY_AXIS_LINE_WIDTH, PLOTLY_PAPER_BGCOOR
 from metplotpy.plots.line.line_config import LineConfig
 from metplotpy.plots.line.line_series import LineSeries
 from metplotpy.plots.base_plot import BasePlot
+from metplotpy.plots.figure_builder import FigureBuilder
 from metplotpy.plots import util
+from metplotpy.plots.timing import timed_stage
 from metplotpy.plots.series import Series
 
 import metcalcpy.util.utils as calc_util
@@ -87,8 +86,9 @@ class Line(BasePlot):
         # Apply event equalization, if requested
         if self.config_obj.use_ee is True:
             self.line_logger.info(f"Begin event equalization: {datetime.now()}")
-            self.input_df = calc_util.perform_event_equalization(self.parameters,
-                                                                 self.input_df)
+            with self.timer.stage('equalize'):
+                self.input_df = calc_util.perform_event_equalization(self.parameters,
+                                                                     self.input_df)
             self.line_logger.info(f"Finished event equalization: {datetime.now()}")
 
         # Create a list of series objects.
@@ -111,6 +111,7 @@ class Line(BasePlot):
 
         return f'Line({self.parameters!r})'
 
+    @timed_stage('read')
     def _read_input_data(self):
         """
             Read the input data file
@@ -127,6 +128,7 @@ class Line(BasePlot):
         return pd.read_csv(self.config_obj.parameters['stat_input'], sep='\t',
                            header='infer', float_precision='round_trip', low_memory=False)
 
+    @timed_stage('series')
     def _create_series(self, input_data):
         """
            Generate all the series objects that are to be displayed as specified by the plot_disp
@@ -190,6 +192,7 @@ class Line(BasePlot):
         self.line_logger.info(f"Finished creating the series objects: {datetime.now()}")
         return series_list
 
+    @timed_stage('layout')
     def _create_figure(self):
         """
         Create a line plot from defaults and custom parameters
@@ -265,6 +268,7 @@ class Line(BasePlot):
         if self.config_obj.start_from_zero is True:
             self.figure.update_xaxes(range=[0, len(x_points_index) - 1])
 
+        self.figure = self.figure.build()
         self.line_logger.info(f"Finished creating the figure: {datetime.now()}")
 
     def _draw_series(self, series: Series, x_points_index_adj: Union[list, None] = None) -> None:
@@ -294,64 +298,66 @@ class Line(BasePlot):
         # orient the confidence interval bars based on the vert_plot setting in the yaml configuration file.
         if self.config_obj.vert_plot:
             self.figure.add_trace(
-                go.Scatter(x=x_points_index_adj,
-                           y=y_points,
-                           showlegend=True,
-                           mode=self.config_obj.mode[series.idx],
-                           textposition="top right",
-                           name=self.config_obj.user_legends[series.idx],
-                           connectgaps=self.config_obj.con_series[series.idx] == 1,
-                           line={'color': self.config_obj.colors_list[series.idx],
-                                 'width': self.config_obj.linewidth_list[series.idx],
-                                 'dash': self.config_obj.linestyles_list[series.idx]},
-                           marker_symbol=self.config_obj.marker_list[series.idx],
-                           marker_color=self.config_obj.colors_list[series.idx],
-                           marker_line_color=self.config_obj.colors_list[series.idx],
-                           marker_size=self.config_obj.marker_size[series.idx],
-                           error_x={'type': 'data',
-                                    'symmetric': False,
-                                    'array': series.series_points['dbl_up_ci'],
-                                    'arrayminus': series.series_points['dbl_lo_ci'],
-                                    'visible': error_y_visible,
-                                    'thickness': self.config_obj.linewidth_list[series.idx]}
-                           ),
+                dict(type='scatter',
+                     x=x_points_index_adj,
+                     y=y_points,
+                     showlegend=True,
+                     mode=self.config_obj.mode[series.idx],
+                     textposition="top right",
+                     name=self.config_obj.user_legends[series.idx],
+                     connectgaps=self.config_obj.con_series[series.idx] == 1,
+                     line={'color': self.config_obj.colors_list[series.idx],
+                           'width': self.config_obj.linewidth_list[series.idx],
+                           'dash': self.config_obj.linestyles_list[series.idx]},
+                     marker_symbol=self.config_obj.marker_list[series.idx],
+                     marker_color=self.config_obj.colors_list[series.idx],
+                     marker_line_color=self.config_obj.colors_list[series.idx],
+                     marker_size=self.config_obj.marker_size[series.idx],
+                     error_x={'type': 'data',
+                              'symmetric': False,
+                              'array': series.series_points['dbl_up_ci'],
+                              'arrayminus': series.series_points['dbl_lo_ci'],
+                              'visible': error_y_visible,
+                              'thickness': self.config_obj.linewidth_list[series.idx]}
+                     ),
                 secondary_y=series.y_axis != 1
             )
         else:
             self.figure.add_trace(
-            go.Scatter(x=x_points_index_adj,
-                       y=y_points,
-                       showlegend=True,
-                       mode=self.config_obj.mode[series.idx],
-                       textposition="top right",
-                       name=self.config_obj.user_legends[series.idx],
-                       connectgaps=self.config_obj.con_series[series.idx] == 1,
-                       line={'color': self.config_obj.colors_list[series.idx],
-                             'width': self.config_obj.linewidth_list[series.idx],
-                             'dash': self.config_obj.linestyles_list[series.idx]},
-                       marker_symbol=self.config_obj.marker_list[series.idx],
-                       marker_color=self.config_obj.colors_list[series.idx],
-                       marker_line_color=self.config_obj.colors_list[series.idx],
-                       marker_size=self.config_obj.marker_size[series.idx],
-                       error_y={'type': 'data',
-                                'symmetric': False,
-                                'array': series.series_points['dbl_up_ci'],
-                                'arrayminus': series.series_points['dbl_lo_ci'],
-                                'visible': error_y_visible,
-                                'thickness': self.config_obj.linewidth_list[series.idx]}
-                       ),
+            dict(type='scatter',
+                 x=x_points_index_adj,
+                 y=y_points,
+                 showlegend=True,
+                 mode=self.config_obj.mode[series.idx],
+                 textposition="top right",
+                 name=self.config_obj.user_legends[series.idx],
+                 connectgaps=self.config_obj.con_series[series.idx] == 1,
+                 line={'color': self.config_obj.colors_list[series.idx],
+                       'width': self.config_obj.linewidth_list[series.idx],
+                       'dash': self.config_obj.linestyles_list[series.idx]},
+                 marker_symbol=self.config_obj.marker_list[series.idx],
+                 marker_color=self.config_obj.colors_list[series.idx],
+                 marker_line_color=self.config_obj.colors_list[series.idx],
+                 marker_size=self.config_obj.marker_size[series.idx],
+                 error_y={'type': 'data',
+                          'symmetric': False,
+                          'array': series.series_points['dbl_up_ci'],
+                          'arrayminus': series.series_points['dbl_lo_ci'],
+                          'visible': error_y_visible,
+                          'thickness': self.config_obj.linewidth_list[series.idx]}
+                 ),
             secondary_y=series.y_axis != 1
         )
 
         self.line_logger.info(f"Finished drawing the lines on the plot:"
                              f" {datetime.now()}")
 
-    def _create_layout(self) -> Figure:
+    def _create_layout(self) -> FigureBuilder:
         """
         Creates a new layout based on the properties from the config file
         including plots size, annotation and title
 
-        :return: Figure object
+        :return: FigureBuilder object, build() creates the Figure
         """
         # create annotation
         annotation = [
@@ -381,7 +387,7 @@ class Line(BasePlot):
                  }
 
         # create a layout and allow y2 axis
-        fig = make_subplots(specs=[[{"secondary_y": self.allow_secondary_y}]])
+        fig = FigureBuilder(secondary_y=self.allow_secondary_y)
 
         # add size, annotation, title
         fig.update_layout(
@@ -622,8 +628,8 @@ class Line(BasePlot):
 
             # need to add an invisible line with all values = None
             self.figure.add_trace(
-                go.Scatter(y=[None] * len(x_points_index), x=x_points_index,
-                           xaxis='x2', showlegend=False)
+                dict(type='scatter', y=[None] * len(x_points_index), x=x_points_index,
+                     xaxis='x2', showlegend=False)
             )
 
     def remove_file(self):
@@ -646,6 +652,7 @@ class Line(BasePlot):
         if os.path.exists(html_name):
             os.remove(html_name)
 
+    @timed_stage('export')
     def write_html(self) -> None:
         """
         Is needed - creates and saves the html representation of the plot WITHOUT Plotly.js
@@ -829,10 +836,8 @@ def main(config_filename=None):
 
     try:
         plot = Line(docs)
-        plot.save_to_file()
+        plot.write_outputs()
         # plot.show_in_browser()
-        plot.write_html()
-        plot.write_output_file()
         plot.line_logger.info(f"Finished creating line plot: {datetime.now()}")
     except ValueError as val_er:
         print(val_er)
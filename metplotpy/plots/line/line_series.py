@@ -20,7 +20,6 @@ import math
 import statistics
 import re
 import numpy as np
-import pandas as pd
 from pandas import DataFrame
 import metcalcpy.util.correlation as pg
 from scipy.stats import norm
@@ -28,6 +27,7 @@ from scipy.stats import norm
 import metcalcpy.util.utils as utils
 import metplotpy.plots.util
 from ..series import Series
+from ..derived_series import derive_series_data, typed_indy_vals
 from .. import GROUP_SEPARATOR
 
 
@@ -45,9 +45,9 @@ class LineSeries(Series):
                  series_name: Union[list, tuple], y_axis: int = 1):
         self.series_list = series_list
         self.series_name = series_name
-        super().__init__(config, idx, input_data, y_axis)
         self.logger = metplotpy.plots.util.get_common_logger(config.log_level,
                                                              config.log_filename)
+        super().__init__(config, idx, input_data, y_axis)
 
     def _create_all_fields_values_no_indy(self) -> dict:
         """
@@ -87,10 +87,8 @@ class LineSeries(Series):
         :return:  mean, median or sum of the values from the input list or
             None if the statistic parameter is invalid
         """
-        logger = metplotpy.plots.util.get_common_logger(self.log_level,
-                                                        self.log_filename)
-        logger.info(f"Begin calculating plot_stat parameter: "
-                                f"{datetime.now()}")
+        self.logger.info(f"Begin calculating plot_stat parameter: "
+                         f"{datetime.now()}")
         # calculate point stat
         if self.config.plot_stat == 'MEAN':
             with warnings.catch_warnings():
@@ -107,10 +105,8 @@ class LineSeries(Series):
         else:
             point_stat = None
 
-        logger = metplotpy.plots.util.get_common_logger(self.log_level,
-                                                        self.log_filename)
-        logger.info(f"Begin calculating plot_stat parameter: "
-                                f"{datetime.now()}")
+        self.logger.info(f"Finished calculating plot_stat parameter: "
+                         f"{datetime.now()}")
         return point_stat
 
     def _create_series_points(self) -> dict:
@@ -408,76 +404,9 @@ class LineSeries(Series):
         """
 
         indy_vals_ordered = self.config.create_list_by_plot_val_ordering(self.config.indy_vals)
-        # for each independent value
-        for indy in indy_vals_ordered:
-            if utils.is_string_integer(indy):
-                indy = int(indy)
-            elif utils.is_string_strictly_float(indy):
-                indy= float(indy)
-
-            stats_indy_1 = \
-                series_data_1.loc[series_data_1[self.config.indy_var] == indy]
-            stats_indy_2 = \
-                series_data_2.loc[series_data_2[self.config.indy_var] == indy]
-
-            # validate data
-            if 'fcst_lead' in stats_indy_1.columns:
-                if 'fcst_valid_beg' in stats_indy_1.columns:
-                    unique_dates = \
-                        stats_indy_1[['fcst_valid_beg', 'fcst_lead', 'stat_name']].drop_duplicates().shape[0]
-                elif 'fcst_valid' in stats_indy_1.columns:
-                    unique_dates = \
-                        stats_indy_1[['fcst_valid', 'fcst_lead', 'stat_name']].drop_duplicates().shape[0]
-                elif 'fcst_init_beg' in stats_indy_1.columns:
-                    unique_dates = \
-                        stats_indy_1[['fcst_init_beg', 'fcst_lead', 'stat_name']].drop_duplicates().shape[0]
-                else:
-                    unique_dates = \
-                        stats_indy_1[['fcst_init', 'fcst_lead', 'stat_name"']].drop_duplicates().shape[0]
-            else:
-                if 'fcst_valid_beg' in stats_indy_1.columns:
-                    unique_dates = \
-                        stats_indy_1[['fcst_valid_beg', 'stat_name']].drop_duplicates().shape[0]
-                elif 'fcst_valid' in stats_indy_1.columns:
-                    unique_dates = \
-                        stats_indy_1[['fcst_valid', 'stat_name']].drop_duplicates().shape[0]
-                elif 'fcst_init_beg' in stats_indy_1.columns:
-                    unique_dates = \
-                        stats_indy_1[['fcst_init_beg', 'stat_name']].drop_duplicates().shape[0]
-                else:
-                    unique_dates = \
-                        stats_indy_1[['fcst_init', 'stat_name"']].drop_duplicates().shape[0]
-            if stats_indy_1.shape[0] != unique_dates:
-                raise ValueError(
-                    'Derived curve can\'t be calculated. '
-                    'Multiple values for one valid date/fcst_lead')
-
-            # data should be sorted sorted  by fcst_init_beg !!!!!
-            stats_values = utils.calc_derived_curve_value(stats_indy_1['stat_value'].tolist(),
-                                                          stats_indy_2['stat_value'].tolist(),
-                                                          operation)
-            stats_indy_1 = stats_indy_1.drop(columns=['stat_value'])
-            stats_indy_1['stat_value'] = stats_values
-
-            # calculate CI(s)
-            if 'stat_bcl' in stats_indy_1.columns:
-                stats_values = utils.calc_derived_curve_value(stats_indy_1['stat_bcl'].tolist(),
-                                                              stats_indy_2['stat_bcl'].tolist(),
-                                                              operation)
-                stats_indy_1 = stats_indy_1.drop(columns=['stat_bcl'])
-                stats_indy_1['stat_bcl'] = stats_values
-
-            if 'stat_bcu' in stats_indy_1.columns:
-                stats_values = utils.calc_derived_curve_value(stats_indy_1['stat_bcu'].tolist(),
-                                                              stats_indy_2['stat_bcu'].tolist(),
-                                                              operation)
-                stats_indy_1 = stats_indy_1.drop(columns=['stat_bcu'])
-                stats_indy_1['stat_bcu'] = stats_values
-
-            if self.series_data is None:
-                self.series_data = stats_indy_1
-            else:
-                self.series_data = pd.concat([self.series_data, stats_indy_1], sort=False)
+        self.series_data = derive_series_data(series_data_1, series_data_2, operation,
+                                              self.config.indy_var, typed_indy_vals(indy_vals_ordered),
+                                              ('stat_value', 'stat_bcl', 'stat_bcu'))
 
     def _calculate_tost_paired(self, series_data_1: DataFrame, series_data_2: DataFrame) -> dict:
         """
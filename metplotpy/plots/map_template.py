@@ -0,0 +1,186 @@
+# ============================*
+# ** Copyright UCAR (c) 2024
+# ** University Corporation for Atmospheric Research (UCAR)
+# ** National Center for Atmospheric Research (NCAR)
+# ** Research Applications Lab (RAL)
+# ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+# ============================*
+
+
+"""
+    Reusable cartopy map scaffolding for plots that render many frames
+    on the same map (series analysis, grid-to-grid, polar ice).
+
+    Creating a figure, a GeoAxes, the coastlines and a colorbar dominates the
+    cost of these plots, so a MapTemplate builds them once per
+    (projection, extent, size, decorations) and each frame only replaces the
+    data artist, the colorbar normalization and the title.
+"""
+
+import matplotlib.pyplot as plt
+from matplotlib import cm
+from matplotlib.colors import Normalize
+import cartopy.crs as ccrs
+import cartopy.feature as cfeature
+
+# cache of MapTemplate instances, keyed by get_map_template() arguments
+_TEMPLATES = {}
+
+
+class MapTemplate():
+    """
+       A figure with one GeoAxes whose projection, extent, coastlines,
+       land, gridlines and colorbar are drawn once.  Successive calls to
+       contourf()/pcolormesh() replace the previously drawn data.
+    """
+
+    def __init__(self, projection, extent=None, figsize=(13, 6.2), dpi=None,
+                 coastlines=True, land=False, gridlines=False,
+                 colorbar=True, cmap='Spectral_r', tick_labelsize=None):
+        """
+            :param projection: the cartopy CRS of the map axes
+            :param extent: optional (x0, x1, y0, y1) extent in PlateCarree
+            :param figsize: figure size in inches, None for the matplotlib default
+            :param dpi: figure dpi, None to use the matplotlib default
+            :param coastlines: draw the coastlines
+            :param land: fill the land with the Natural Earth land feature
+            :param gridlines: draw the lat/lon gridlines
+            :param colorbar: add a colorbar, updated for every frame
+            :param cmap: colormap of the colorbar
+            :param tick_labelsize: label size of the map and colorbar ticks
+        """
+        self.figure = plt.figure(figsize=figsize, dpi=dpi)
+        self.geo_ax = plt.axes(projection=projection)
+        if extent is not None:
+            self.geo_ax.set_extent(extent, crs=ccrs.PlateCarree())
+        if land:
+            self.geo_ax.add_feature(cfeature.LAND, zorder=1)
+        if coastlines:
+            self.geo_ax.coastlines(zorder=1)
+        if gridlines:
+            self.geo_ax.gridlines()
+        if tick_labelsize is not None:
+            self.geo_ax.tick_params(labelsize=tick_labelsize)
+
+        self._data_artist = None
+        self.scalar_mappable = None
+        self.colorbar = None
+        if colorbar:
+            # the colorbar is attached to its own mappable so that it survives
+            # swapping the data artist, only its normalization changes per frame
+            self.scalar_mappable = plt.cm.ScalarMappable(cmap=cm.get_cmap(cmap),
+                                                         norm=Normalize(0, 1))
+            # pylint: disable=protected-access
+            self.scalar_mappable._A = []
+            self.colorbar = self.figure.colorbar(self.scalar_mappable, ax=self.geo_ax)
+            if tick_labelsize is not None:
+                self.colorbar.ax.tick_params(labelsize=tick_labelsize)
+
+    def _clear_data(self):
+        """
+            Remove the data artist of the previous frame
+        """
+        if self._data_artist is None:
+            return
+        try:
+            self._data_artist.remove()
+        except AttributeError:
+            # ContourSet is not an Artist in older matplotlib versions
+            for collection in self._data_artist.collections:
+                collection.remove()
+        self._data_artist = None
+
+    def _update_colorbar(self, vmin, vmax, cmap):
+        if self.colorbar is None:
+            return
+        if cmap is not None:
+            self.scalar_mappable.set_cmap(cmap)
+        self.scalar_mappable.set_clim(vmin, vmax)
+        self.colorbar.update_normal(self.scalar_mappable)
+
+    def contourf(self, lons, lats, values, levels, cmap=None, vmin=None, vmax=None,
+                 transform=ccrs.PlateCarree()):
+        """
+            Replace the frame data with filled contours of values.
+
+            :param vmin, vmax: the colorbar limits, the data min/max if None
+            :return: the contour set
+        """
+        self._clear_data()
+        cmap = self.scalar_mappable.get_cmap() if cmap is None and self.colorbar else cmap
+        self._data_artist = self.geo_ax.contourf(lons, lats, values, levels,
+                                                 transform=transform, cmap=cmap)
+        self._update_colorbar(values.min() if vmin is None else vmin,
+                              values.max() if vmax is None else vmax, cmap)
+        return self._data_artist
+
+    def pcolormesh(self, lons, lats, values, cmap=None, vmin=None, vmax=None,
+                   transform=ccrs.PlateCarree()):
+        """
+            Replace the frame data with a pseudocolor mesh of values.
+
+            :param vmin, vmax: the color limits, the data min/max if None
+            :return: the QuadMesh
+        """
+        self._clear_data()
+        cmap = self.scalar_mappable.get_cmap() if cmap is None and self.colorbar else cmap
+        vmin = values.min() if vmin is None else vmin
+        vmax = values.max() if vmax is None else vmax
+        self._data_artist = self.geo_ax.pcolormesh(lons, lats, values, cmap=cmap,
+                                                   vmin=vmin, vmax=vmax,
+                                                   transform=transform)
+        self._update_colorbar(vmin, vmax, cmap)
+        return self._data_artist
+
+    def set_title(self, title, **kwargs):
+        self.geo_ax.set_title(title, **kwargs)
+
+    def activate(self):
+        """
+            Make this template's figure the current pyplot figure, for helpers
+            that save plt.gcf()
+        """
+        plt.figure(self.figure.number)
+        plt.sca(self.geo_ax)
+
+    def savefig(self, filename, **kwargs):
+        self.figure.savefig(filename, **kwargs)
+
+    def close(self):
+        """
+            Close the figure and remove this template from the cache
+        """
+        plt.close(self.figure)
+        for key in [key for key, template in _TEMPLATES.items() if template is self]:
+            del _TEMPLATES[key]
+
+
+def get_map_template(projection, extent=None, figsize=(13, 6.2), dpi=None,
+                     coastlines=True, land=False, gridlines=False,
+                     colorbar=True, cmap='Spectral_r', tick_labelsize=None):
+    """
+        Return the cached MapTemplate for these settings, building it on the
+        first request.  See MapTemplate for the arguments.
+
+        :return: a MapTemplate
+    """
+    key = (type(projection).__name__, projection.proj4_init,
+           None if extent is None else tuple(extent),
+           None if figsize is None else tuple(figsize), dpi,
+           coastlines, land, gridlines, colorbar, cmap, tick_labelsize)
+    template = _TEMPLATES.get(key)
+    if template is None or not plt.fignum_exists(template.figure.number):
+        template = MapTemplate(projection, extent=extent, figsize=figsize, dpi=dpi,
+                               coastlines=coastlines, land=land, gridlines=gridlines,
+                               colorbar=colorbar, cmap=cmap,
+                               tick_labelsize=tick_labelsize)
+        _TEMPLATES[key] = template
+    return template
+
+
+def clear_map_templates():
+    """
+        Close the figures of all cached templates and empty the cache
+    """
+    for template in list(_TEMPLATES.values()):
+        template.close()
@@ -29,6 +29,9 @@ from metplotpy.plots.constants import PLOTLY_AXIS_LINE_COLOR, PLOTLY_AXIS_LINE_W
 from metplotpy.plots.mpr_plot.mpr_plot_config import MprPlotConfig
 from metplotpy.plots.wind_rose.wind_rose import WindRosePlot
 from metplotpy.plots import util
+from metplotpy.plots import export
+from metplotpy.plots.timing import timed_stage
+from metplotpy.plots import pairs_analytics
 
 
 class MprPlotInfo():
@@ -397,13 +400,11 @@ class MprPlot(BasePlot):
         :return: a trend line as a Plotly Scatter
         """
 
-        fcst = case_subset['FCST']
-        x_coords = np.array([fcst.min(), fcst.max()])
+        fcst = case_subset['FCST'].to_numpy(dtype=float)
+        x_coords = np.array([np.nanmin(fcst), np.nanmax(fcst)])
 
         # find intercept and slope for the regression line
-        slope_intercept = np.polyfit(case_subset['FCST'], case_subset['OBS'], 1)
-        slope = slope_intercept[0]
-        intercept = slope_intercept[1]
+        slope, intercept = pairs_analytics.trend_line(fcst, case_subset['OBS'])
 
         if intercept == 0 and slope == 0:
             x_coords = [-1, 1]
@@ -433,17 +434,19 @@ class MprPlot(BasePlot):
         """
 
         self.logger.info(f"Begin creating qq plot: {datetime.now()}")
-        # subset and sort data
-        qq_fcst = case_subset['FCST'].tolist()
-        qq_fcst.sort()
-
-        qq_obs = case_subset['OBS'].tolist()
-        qq_obs.sort()
+        # sort data, summarized by quantiles if the scatter is density binned
+        max_points = None
+        if self.config_obj.scatter_density_bins:
+            max_points = self.config_obj.scatter_density_bins ** 2
+        qq_fcst, qq_obs = pairs_analytics.sorted_quantiles(case_subset['FCST'],
+                                                           case_subset['OBS'],
+                                                           max_points)
 
         # create the plot
-        qq_plot = go.Scatter(
-            x=qq_fcst,
-            y=qq_obs,
+        qq_plot = pairs_analytics.scatter_trace(
+            qq_fcst,
+            qq_obs,
+            gl_threshold=self.config_obj.scattergl_threshold,
             mode='markers',
             name='Q-Q Plot',
             marker=dict(
@@ -478,9 +481,11 @@ class MprPlot(BasePlot):
 
         self.logger.info(f"Begin creating scatter plot: {datetime.now()}")
         # create the plot
-        scatter = go.Scatter(
-            x=case_subset['FCST'],
-            y=case_subset['OBS'],
+        scatter = pairs_analytics.scatter_trace(
+            case_subset['FCST'],
+            case_subset['OBS'],
+            gl_threshold=self.config_obj.scattergl_threshold,
+            density_bins=self.config_obj.scatter_density_bins,
             mode='markers',
             name='Scatter Plot',
             marker=dict(
@@ -553,6 +558,7 @@ class MprPlot(BasePlot):
         self.logger.info(f"Finished creating histogram: {datetime.now()}")
         return info
 
+    @timed_stage('export')
     def save_to_file(self) -> None:
         """Saves the image to a file specified in the config file.
          Prints a message if fails
@@ -569,7 +575,7 @@ class MprPlot(BasePlot):
         pio.kaleido.scope.default_width = self.config_obj.width
         if self.figure:
             try:
-                self.figure.write_image(image_name)
+                export.write_image(self.figure, image_name)
             except FileNotFoundError:
                 self.logger.error(f"FileNotFoundError: {image_name}")
             except ValueError as ex:
@@ -14,6 +14,7 @@ Class Name: wind_rose_config.py
 Holds values set in the Wind Rose config file(s)
 """
 from ..config import Config
+from ..pairs_analytics import SCATTERGL_THRESHOLD
 
 
 class MprPlotConfig(Config):
@@ -46,3 +47,11 @@ class MprPlotConfig(Config):
         self.height = self.get_config_value('height')
         self.marker_color = self.get_config_value('marker_color')
         self.show_in_browser = self.get_config_value('show_in_browser')
+
+        # number of points above which the scatter and Q-Q plots use WebGL
+        self.scattergl_threshold = self.get_config_value('scattergl_threshold')
+        if self.scattergl_threshold is None:
+            self.scattergl_threshold = SCATTERGL_THRESHOLD
+        # bins along each axis used to summarize very large scatter plots,
+        # empty to plot every pair
+        self.scatter_density_bins = self.get_config_value('scatter_density_bins')
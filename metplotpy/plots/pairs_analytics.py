@@ -0,0 +1,174 @@
+# ============================*
+# ** Copyright UCAR (c) 2024
+# ** University Corporation for Atmospheric Research (UCAR)
+# ** National Center for Atmospheric Research (NCAR)
+# ** Research Applications Lab (RAL)
+# ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+# ============================*
+
+
+"""
+Module Name: pairs_analytics.py
+
+NumPy computations on matched pairs (forecast/observation, x/y) shared by the
+MPR and TCMPR scatter plots: sorted quantiles for Q-Q plots, the least-squares
+trend line, density binning of very large scatters and the selection of the
+Plotly scatter trace type.
+"""
+
+from typing import Tuple, Union
+
+import numpy as np
+import plotly.graph_objects as go
+
+# above this number of points the scatter is rendered with WebGL (Scattergl)
+SCATTERGL_THRESHOLD = 10000
+
+# marker size range used for density binned scatters
+DENSITY_MIN_MARKER_SIZE = 4
+DENSITY_MAX_MARKER_SIZE = 16
+
+
+def finite_pairs(x_values, y_values) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converts both sequences to float arrays and drops the pairs where
+    either value is missing or not finite
+
+    Args:
+        @param x_values: sequence (list, Series, array) of x values
+        @param y_values: sequence of y values, the same length as x_values
+    Returns:
+        the x and y arrays of the finite pairs
+    """
+    x_arr = np.asarray(x_values, dtype=float)
+    y_arr = np.asarray(y_values, dtype=float)
+    if x_arr.shape != y_arr.shape:
+        raise ValueError(f"x and y must have the same length, got {x_arr.size} and {y_arr.size}")
+    mask = np.isfinite(x_arr) & np.isfinite(y_arr)
+    if mask.all():
+        return x_arr, y_arr
+    return x_arr[mask], y_arr[mask]
+
+
+def sorted_quantiles(x_values, y_values,
+                     max_points: Union[int, None] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the matching quantiles of two samples for a Q-Q plot.
+    When the samples are larger than max_points, or differ in size,
+    they are interpolated on a common set of probabilities.
+
+    Args:
+        @param x_values: the first sample
+        @param y_values: the second sample
+        @param max_points: the maximum number of quantiles to return,
+                           None to keep all the points
+    Returns:
+        the sorted x and y quantiles
+    """
+    x_arr = np.sort(np.asarray(x_values, dtype=float))
+    y_arr = np.sort(np.asarray(y_values, dtype=float))
+    x_arr = x_arr[np.isfinite(x_arr)]
+    y_arr = y_arr[np.isfinite(y_arr)]
+
+    n_points = min(x_arr.size, y_arr.size)
+    if max_points is not None and max_points > 0:
+        n_points = min(n_points, max_points)
+    if n_points == x_arr.size == y_arr.size:
+        return x_arr, y_arr
+
+    probabilities = np.linspace(0, 1, n_points)
+    return np.quantile(x_arr, probabilities), np.quantile(y_arr, probabilities)
+
+
+def trend_line(x_values, y_values) -> Tuple[float, float]:
+    """
+    Least-squares fit of y = intercept + slope * x, equivalent to
+    np.polyfit(x, y, 1) computed in closed form.
+    The slope is 0 when all the x values are the same.
+
+    Args:
+        @param x_values: the independent values
+        @param y_values: the dependent values
+    Returns:
+        the slope and intercept of the line
+    """
+    x_arr, y_arr = finite_pairs(x_values, y_values)
+    if x_arr.size == 0:
+        return 0.0, 0.0
+    x_mean = x_arr.mean()
+    y_mean = y_arr.mean()
+    x_anomaly = x_arr - x_mean
+    sum_squares = np.dot(x_anomaly, x_anomaly)
+    if sum_squares == 0:
+        return 0.0, float(y_mean)
+    slope = np.dot(x_anomaly, y_arr - y_mean) / sum_squares
+    return float(slope), float(y_mean - slope * x_mean)
+
+
+def density_bin_pairs(x_values, y_values, bins: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bins the pairs on a bins x bins grid and returns one point per
+    non-empty cell, placed at the centre of the cell
+
+    Args:
+        @param x_values: the x values
+        @param y_values: the y values
+        @param bins: the number of bins along each axis
+    Returns:
+        the x and y of the cell centres and the number of pairs in each cell
+    """
+    x_arr, y_arr = finite_pairs(x_values, y_values)
+    counts, x_edges, y_edges = np.histogram2d(x_arr, y_arr, bins=bins)
+    x_ind, y_ind = np.nonzero(counts)
+    x_centres = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centres = (y_edges[:-1] + y_edges[1:]) / 2
+    return x_centres[x_ind], y_centres[y_ind], counts[x_ind, y_ind].astype(int)
+
+
+def density_marker_sizes(counts: np.ndarray) -> np.ndarray:
+    """
+    Marker sizes proportional to the square root of the counts so that
+    the marker area follows the number of pairs in the cell
+    """
+    counts = np.asarray(counts, dtype=float)
+    if counts.size == 0:
+        return counts
+    scale = np.sqrt(counts / counts.max())
+    return DENSITY_MIN_MARKER_SIZE + (DENSITY_MAX_MARKER_SIZE - DENSITY_MIN_MARKER_SIZE) * scale
+
+
+def scatter_trace(x_values, y_values,
+                  gl_threshold: Union[int, None] = SCATTERGL_THRESHOLD,
+                  density_bins: Union[int, None] = None,
+                  **kwargs) -> Union[go.Scatter, go.Scattergl]:
+    """
+    Creates the Plotly marker trace of the pairs.
+    If density_bins is set and there are more pairs than grid cells,
+    the pairs are replaced by one marker per non-empty cell, sized by the
+    number of pairs in the cell.  A Scattergl trace is returned when the
+    number of plotted points is above gl_threshold.
+
+    Args:
+        @param x_values: the x values
+        @param y_values: the y values
+        @param gl_threshold: the number of points above which WebGL is used,
+                             None to never use it
+        @param density_bins: the number of bins along each axis for the
+                             density binning, None to plot every pair
+        @param kwargs: the other go.Scatter arguments (mode, name, marker, ...)
+    Returns:
+        a go.Scatter or go.Scattergl trace
+    """
+    x_arr, y_arr = finite_pairs(x_values, y_values)
+
+    if density_bins is not None and density_bins > 0 and x_arr.size > density_bins * density_bins:
+        x_arr, y_arr, counts = density_bin_pairs(x_arr, y_arr, density_bins)
+        marker = dict(kwargs.pop('marker', None) or {})
+        marker['size'] = density_marker_sizes(counts)
+        kwargs['marker'] = marker
+        kwargs['customdata'] = counts
+        kwargs.setdefault('hovertemplate', '(%{x}, %{y})<br>%{customdata} pairs')
+
+    if gl_threshold is not None and x_arr.size > gl_threshold:
+        return go.Scattergl(x=x_arr, y=y_arr, **kwargs)
+    return go.Scatter(x=x_arr, y=y_arr, **kwargs)
@@ -36,6 +36,7 @@ import os, sys
 import subprocess
 import logging
 import yaml
+from metplotpy.plots.map_template import get_map_template, clear_map_templates
 
 
 # something pandas needs
@@ -85,40 +86,25 @@ def make_maps(imageDir,hemisphere,
     
     cmap='nipy_spectral'
 
+    # the observed and forecast maps share the projection, coastlines and
+    # colorbar, only the ice concentration mesh changes between them
+    map_template=get_map_template(crs,figsize=None,dpi=150,
+                                  land=True,gridlines=True,cmap=cmap,
+                                  tick_labelsize='x-small')
+
     # pretty pictures
     print('plotting %s ice'%obstype_name)
-    plt.figure(dpi=150)
-    ax=plt.axes(projection=crs)
-    plt.pcolormesh(rlon,rlat,rice,cmap=cmap,
-                   transform=ccrs.PlateCarree(),
-                   vmin=0,vmax=1.0)
-    plt.tick_params(labelsize='x-small')
-    ax.add_feature(cfeature.LAND,zorder=1)
-    ax.coastlines(zorder=1)
-    ax.gridlines()
-    cb=plt.colorbar()
-    cb.ax.tick_params(labelsize='x-small')
-
-    plt.title(obstype_name+' Global sea ice concentration '+init_time+'\n(area='+'%10.3e'%obs_area+' km$^2$)',fontsize='small')
+    map_template.pcolormesh(rlon,rlat,rice,cmap=cmap,vmin=0,vmax=1.0)
+    map_template.set_title(obstype_name+' Global sea ice concentration '+init_time+'\n(area='+'%10.3e'%obs_area+' km$^2$)',fontsize='small')
+    map_template.activate()
     print("Saving image to "+imageDir)
     saveImage(imageDir+'/'+init_time+'_observation_ice_'+hemisphere+'.png',dpi=150)
-    plt.close()
     
     print('plotting %s ice'%model_name)
-    plt.figure(dpi=150)
-    ax=plt.axes(projection=crs)
-    plt.pcolormesh(nlon,nlat,nice,cmap=cmap,
-                   transform=ccrs.PlateCarree(),
-                   vmin=0,vmax=1.0)
-    plt.tick_params(labelsize='x-small')
-    ax.add_feature(cfeature.LAND,zorder=1)
-    ax.coastlines(zorder=1)
-    ax.gridlines()
-    cb=plt.colorbar()
-    cb.ax.tick_params(labelsize='x-small')
-    plt.title(model_name+' Forecast sea ice concentration '+init_time+'\n(area='+'%10.3e'%fcst_area+' km$^2$)',fontsize='small')
+    map_template.pcolormesh(nlon,nlat,nice,cmap=cmap,vmin=0,vmax=1.0)
+    map_template.set_title(model_name+' Forecast sea ice concentration '+init_time+'\n(area='+'%10.3e'%fcst_area+' km$^2$)',fontsize='small')
+    map_template.activate()
     saveImage(imageDir+'/'+init_time+'_fcst_ice_'+hemisphere+'.png',dpi=150)
-    plt.close()
     
     print('plotting difference')
     plt.figure(dpi=150)
@@ -280,5 +266,7 @@ if __name__ == '__main__':
     #for hemi in ['north','south']:
     #    process_one_day(theDate,hemi)
     process_one_day(config,"north")
+    # close the cached observed/forecast map figures
+    clear_map_templates()
 
     print('completed ice at',datetime.now())
@@ -31,7 +31,7 @@ from metplotpy.plots.constants import PLOTLY_AXIS_LINE_COLOR, PLOTLY_AXIS_LINE_W
 from metplotpy.plots.base_plot import BasePlot
 from metplotpy.plots import util
 from metplotpy.plots.reliability_diagram.reliability_config import ReliabilityConfig
-from metplotpy.plots.reliability_diagram.reliability_series import ReliabilitySeries
+from metplotpy.plots.reliability_diagram.reliability_series import ReliabilitySeries, pivot_pstd_stats
 
 
 class Reliability(BasePlot):
@@ -128,15 +128,19 @@ class Reliability(BasePlot):
         """
         self.logger.info(f"Begin creating series objects: {datetime.now()}")
         series_list = []
+        # pivot the statistics once for all the series
+        pstd_data = pivot_pstd_stats(input_data)
+
         # add series for y1 axis
         for i, name in enumerate(self.config_obj.get_series_y()):
-            series_obj = ReliabilitySeries(self.config_obj, i, input_data, series_list, name)
+            series_obj = ReliabilitySeries(self.config_obj, i, input_data, series_list, name,
+                                           pstd_data=pstd_data)
             series_list.append(series_obj)
 
         # add derived
         for i, name in enumerate(self.config_obj.summary_curves):
             series_obj = ReliabilitySeries(self.config_obj, len(self.config_obj.get_series_y()) + i,
-                                           input_data, series_list, name)
+                                           input_data, series_list, name, pstd_data=pstd_data)
             series_list.append(series_obj)
 
         # reorder series
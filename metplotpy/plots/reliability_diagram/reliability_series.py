@@ -15,12 +15,70 @@ __author__ = 'Tatiana Burek'
 
 from typing import Union
 import numpy as np
+import pandas as pd
 import warnings
 
 import metcalcpy.util.utils as utils
 from .. import GROUP_SEPARATOR
 from ..series import Series
 
+# columns holding the value of a statistic, all the other columns
+# (fcst_var, model, thresh_i, dates...) identify the point
+STAT_COLUMNS = ['stat_name', 'stat_value', 'stat_btcl', 'stat_btcu', 'nstats']
+
+# the date columns used to order the points, the last one found is used
+DATE_SORT_COLUMNS = ['fcst_valid_beg', 'fcst_valid', 'fcst_init_beg', 'fcst_init']
+
+
+def pivot_pstd_stats(input_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pivots the PSTD statistics so that every probability bin is one row:
+    the PSTD_CALIBRATION rows, in their input order, with the matching
+    PSTD_BASER value in a 'baser' column and PSTD_NI value in a 'n_i' column.
+    Rows are matched on all the non statistic columns, repeated rows are
+    matched in the order they appear.
+
+    :param input_data: the reliability statistics in the long format
+    :return: one row per PSTD_CALIBRATION row
+    """
+    pstd_data = input_data.loc[input_data['stat_name'].isin(
+        ['PSTD_CALIBRATION', 'PSTD_BASER', 'PSTD_NI'])]
+    key_columns = [column for column in pstd_data.columns if column not in STAT_COLUMNS]
+    occurrence = pstd_data.groupby(key_columns + ['stat_name'], sort=False,
+                                   dropna=False).cumcount().rename('occurrence')
+    pstd_data = pd.concat([pstd_data, occurrence], axis=1)
+    key_columns.append('occurrence')
+
+    pivoted = pstd_data.loc[pstd_data['stat_name'] == 'PSTD_CALIBRATION']
+    pivoted = pivoted.drop(columns=['stat_name'])
+    for stat_name, column in (('PSTD_BASER', 'baser'), ('PSTD_NI', 'n_i')):
+        stat_values = pstd_data.loc[pstd_data['stat_name'] == stat_name,
+                                    key_columns + ['stat_value']]
+        pivoted = pivoted.merge(stat_values.rename(columns={'stat_value': column}),
+                                on=key_columns, how='left')
+    return pivoted.drop(columns=['occurrence'])
+
+
+def _date_sort_columns(columns) -> list:
+    """
+    The columns used to order the points of a series by date/time
+    """
+    date_columns = [column for column in DATE_SORT_COLUMNS if column in columns]
+    if not date_columns:
+        return []
+    if 'fcst_lead' in columns:
+        return [date_columns[-1], 'fcst_lead']
+    return [date_columns[-1]]
+
+
+def _bin_midpoints(thresholds) -> np.ndarray:
+    """
+    The midpoints of the probability bins starting at thresholds,
+    the last bin ends at 1
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    return 0.5 * (thresholds + np.append(thresholds[1:], 1.0))
+
 
 class ReliabilitySeries(Series):
     """
@@ -31,9 +89,18 @@ class ReliabilitySeries(Series):
     """
 
     def __init__(self, config, idx: int, input_data, series_list: list,
-                 series_name: Union[list, tuple], y_axis: int = 1):
+                 series_name: Union[list, tuple], y_axis: int = 1,
+                 pstd_data: Union[pd.DataFrame, None] = None):
+        """
+        :param pstd_data: the input data pivoted by pivot_pstd_stats(),
+                          shared by all the series of a plot. It is computed
+                          from input_data if None
+        """
         self.series_list = series_list
         self.series_name = series_name
+        if pstd_data is None:
+            pstd_data = pivot_pstd_stats(input_data)
+        self.pstd_data = pstd_data
         super().__init__(config, idx, input_data, y_axis)
 
     def _create_all_fields_values_no_indy(self) -> dict:
@@ -113,55 +180,26 @@ class ReliabilitySeries(Series):
                     elif utils.is_string_strictly_float(filter_val):
                         filter_list[i] = float(filter_val)
 
-                all_filters.append((self.input_data[field].isin(filter_list)))
+                all_filters.append((self.pstd_data[field].isin(filter_list)))
             # use numpy to select the rows where any record evaluates to True
             if all_filters:
                 mask = np.array(all_filters).all(axis=0)
-                self.series_data = self.input_data.loc[mask]
+                self.series_data = self.pstd_data.loc[mask]
             else:
-                self.series_data = self.input_data
+                self.series_data = self.pstd_data
 
             # sort data by date/time - needed for CI calculations
-            if 'fcst_lead' in self.series_data.columns:
-                if 'fcst_valid_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid_beg', 'fcst_lead'])
-                if 'fcst_valid' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid', 'fcst_lead'])
-                if 'fcst_init_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init_beg', 'fcst_lead'])
-                if 'fcst_init' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init', 'fcst_lead'])
-            else:
-                if 'fcst_valid_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid_beg'])
-                if 'fcst_valid' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid'])
-                if 'fcst_init_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init_beg'])
-                if 'fcst_init' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init'])
-
-            obar_data = self.series_data.loc[lambda df: df['stat_name'] == 'PSTD_BASER', :]
-            calibration_data = self.series_data.loc[lambda df: df['stat_name'] == 'PSTD_CALIBRATION', :]
-            n_i_data = self.series_data.loc[lambda df: df['stat_name'] == 'PSTD_NI', :]
-
-            series_points_results = calibration_data.copy()
-            series_points_results['thresh_ii'] = series_points_results['thresh_i'].tolist()
-            series_points_results['n_i'] = n_i_data['stat_value'].tolist()
-            series_points_results.reset_index(drop=True, inplace=True)
-
-            for i in range(1, len(series_points_results)):
-                series_points_results.loc[i - 1, 'thresh_i'] = 0.5 * (
-                        series_points_results.loc[i, 'thresh_ii']
-                        + series_points_results.loc[i - 1, 'thresh_ii']
-                )
+            sort_columns = _date_sort_columns(self.series_data.columns)
+            if sort_columns:
+                self.series_data = self.series_data.sort_values(sort_columns, kind='mergesort')
 
-            series_points_results.loc[len(series_points_results) - 1, 'thresh_i'] = 0.5 * (
-                    1 + series_points_results.loc[len(series_points_results) - 1, 'thresh_ii'])
+            series_points_results = self.series_data.drop(columns=['baser'])
+            series_points_results.reset_index(drop=True, inplace=True)
+            series_points_results['thresh_ii'] = series_points_results['thresh_i']
+            series_points_results['thresh_i'] = _bin_midpoints(series_points_results['thresh_ii'])
             series_points_results['no_skill'] = \
-                [0.5 * (a + b) for a, b in zip(series_points_results['thresh_i'],
-                                               obar_data['stat_value'])]
-            series_points_results = series_points_results.drop(columns=['stat_name'])
+                0.5 * (series_points_results['thresh_i'].to_numpy()
+                       + self.series_data['baser'].to_numpy())
 
             series_points_results['stat_btcl'] = \
                 series_points_results['stat_value'] - series_points_results['stat_btcl']
@@ -170,16 +208,14 @@ class ReliabilitySeries(Series):
 
         else:
             # this is a derived series
-            calibration_data = \
-                self.input_data.loc[lambda df: df['stat_name'] == 'PSTD_CALIBRATION', :]
             if self.series_name == 'median':
-                series_points_results = calibration_data.groupby('thresh_i')[[
+                series_points_results = self.pstd_data.groupby('thresh_i')[[
                     'stat_value', 'stat_btcl', 'stat_btcu']].median().reset_index()
             elif self.series_name == 'mean':
-                series_points_results = calibration_data.groupby('thresh_i')[[
+                series_points_results = self.pstd_data.groupby('thresh_i')[[
                     'stat_value', 'stat_btcl', 'stat_btcu']].mean().reset_index()
             else:
-                series_points_results = calibration_data.copy()
+                series_points_results = self.pstd_data.copy()
                 series_points_results['stat_name'] = None
                 series_points_results['stat_btcl'] = None
                 series_points_results['stat_btcu'] = None
@@ -189,13 +225,6 @@ class ReliabilitySeries(Series):
             series_points_results['stat_btcu'] = \
                 series_points_results['stat_btcu'] - series_points_results['stat_value']
             series_points_results['thresh_ii'] = series_points_results['thresh_i'].copy()
-
-            for i in range(1, len(series_points_results)):
-                series_points_results.loc[i - 1, 'thresh_i'] = \
-                    0.5 * (series_points_results.loc[i, 'thresh_ii']
-                           + series_points_results.loc[i - 1, 'thresh_ii'])
-
-            series_points_results.loc[len(series_points_results) - 1, 'thresh_i'] = 0.5 * (
-                    1 + series_points_results.loc[len(series_points_results) - 1, 'thresh_ii'])
+            series_points_results['thresh_i'] = _bin_midpoints(series_points_results['thresh_ii'])
 
         return series_points_results
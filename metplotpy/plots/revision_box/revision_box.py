@@ -14,7 +14,6 @@ import os
 import re
 from datetime import datetime
 import yaml
-import plotly.graph_objects as go
 
 from metplotpy.plots.base_plot import BasePlot
 
@@ -176,7 +175,8 @@ class RevisionBox(Box):
                                        borderwidth=0
                                        )
 
-            self.logger.info(f"Finished creating figure: {datetime.now()}")
+        self.figure = self.figure.build()
+        self.logger.info(f"Finished creating figure: {datetime.now()}")
 
     def _draw_series(self, series: RevisionBoxSeries) -> None:
         """
@@ -203,7 +203,7 @@ class RevisionBox(Box):
 
         # create a trace
         self.figure.add_trace(
-            go.Box(  # x=[series.idx],
+            dict(type='box',  # x=[series.idx],
                 y=series.series_points['points']['stat_value'].tolist(),
                 notched=self.config_obj.box_notch,
                 line=line_color,
@@ -319,10 +319,8 @@ def main(config_filename=None):
 
     try:
         plot = RevisionBox(docs)
-        plot.save_to_file()
+        plot.write_outputs()
         # plot.show_in_browser()
-        plot.write_html()
-        plot.write_output_file()
         plot.logger.info(f"Finished revision box plot: {datetime.now()}")
     except ValueError as ve:
         print(ve)
@@ -20,8 +20,6 @@ from typing import Union
 import yaml
 import numpy as np
 
-import plotly.graph_objects as go
-
 from metplotpy.plots.constants import PLOTLY_AXIS_LINE_COLOR, PLOTLY_AXIS_LINE_WIDTH
 from metplotpy.plots.base_plot import BasePlot
 
@@ -179,6 +177,7 @@ class RevisionSeries(Line):
         # apply y axis limits
         self._yaxis_limits()
 
+        self.figure = self.figure.build()
         self.config_obj.logger.info(f"Finish creating revision series figure: "
                                     f"{datetime.now()}")
 
@@ -195,17 +194,18 @@ class RevisionSeries(Line):
 
         # add the plot
         self.figure.add_trace(
-            go.Scatter(x=x_points_index_adj,
-                       y=y_points,
-                       showlegend=True,
-                       mode='markers',
-                       textposition="top right",
-                       name=series.user_legends,
-                       marker_symbol=self.config_obj.marker_list[series.idx],
-                       marker_color=self.config_obj.colors_list[series.idx],
-                       marker_line_color=self.config_obj.colors_list[series.idx],
-                       marker_size=self.config_obj.marker_size[series.idx],
-                       ),
+            dict(type='scatter',
+                 x=x_points_index_adj,
+                 y=y_points,
+                 showlegend=True,
+                 mode='markers',
+                 textposition="top right",
+                 name=series.user_legends,
+                 marker_symbol=self.config_obj.marker_list[series.idx],
+                 marker_color=self.config_obj.colors_list[series.idx],
+                 marker_line_color=self.config_obj.colors_list[series.idx],
+                 marker_size=self.config_obj.marker_size[series.idx],
+                 ),
             secondary_y=False
         )
         self.config_obj.logger.info(f"Finished drawing series: {datetime.now()}")
@@ -321,10 +321,8 @@ def main(config_filename=None):
 
     try:
         plot = RevisionSeries(docs)
-        plot.save_to_file()
+        plot.write_outputs()
         #plot.show_in_browser()
-        plot.write_html()
-        plot.write_output_file()
         plot.config_obj.logger.info(f"Finished creating revision series plot: "
                                     f"{datetime.now()}")
     except ValueError as val_er:
@@ -24,6 +24,8 @@ from plotly.subplots import make_subplots
 from metplotpy.plots import util
 from metplotpy.plots import constants
 from metplotpy.plots.base_plot import BasePlot
+from metplotpy.plots import export
+from metplotpy.plots.timing import timed_stage
 from metplotpy.plots.roc_diagram.roc_diagram_config import ROCDiagramConfig
 from metplotpy.plots.roc_diagram.roc_diagram_series import ROCDiagramSeries
 import metcalcpy.util.utils as calc_util
@@ -363,6 +365,7 @@ class ROCDiagram(BasePlot):
 
         return fig
 
+    @timed_stage('export')
     def save_to_file(self):
         """Saves the image to a file specified in the config file.
          Prints a message if fails
@@ -375,7 +378,7 @@ class ROCDiagram(BasePlot):
         image_name = self.get_config_value('plot_filename')
         if self.figure:
             try:
-                self.figure.write_image(image_name)
+                export.write_image(self.figure, image_name)
 
             except FileNotFoundError:
                 self.logger.error(f"FileNotFoundError: Cannot save "
@@ -35,7 +35,7 @@ from metplotpy.plots import constants
 from metplotpy.plots.base_plot import BasePlot
 from metplotpy.plots import util
 from metplotpy.plots.taylor_diagram.taylor_diagram_config import TaylorDiagramConfig
-from metplotpy.plots.taylor_diagram.taylor_diagram_series import TaylorDiagramSeries
+from metplotpy.plots.taylor_diagram.taylor_diagram_series import TaylorDiagramSeries, pivot_taylor_stats
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
@@ -139,9 +139,13 @@ class TaylorDiagram(BasePlot):
         # we need.
         num_series = self.config_obj.calculate_number_of_series()
 
+        # extract the statistics of all the series at once
+        taylor_stats = pivot_taylor_stats(self.input_df, self.config_obj.series_val_names)
+
         for i, series in enumerate(range(num_series)):
             # Create a TaylorDiagramSeries object
-            series_obj = TaylorDiagramSeries(self.config_obj, i, self.input_df)
+            series_obj = TaylorDiagramSeries(self.config_obj, i, self.input_df,
+                                             taylor_stats=taylor_stats)
             series_list.append(series_obj)
         self.logger.info(f"Finished creating series objects: {datetime.now()}")
 
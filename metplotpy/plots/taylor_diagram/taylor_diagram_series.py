@@ -20,6 +20,34 @@ import pandas
 from ..series import Series
 import metcalcpy.util.utils as calcpy_utils
 
+TaylorStats = namedtuple('TaylorStats', ['fstdev', 'ostdev', 'pr_corr'])
+
+
+def pivot_taylor_stats(input_df: pandas.DataFrame, series_val_names: list) -> pandas.DataFrame:
+    """
+        Extracts the statistics needed by the Taylor diagram for all the series
+        permutations in one pass over the input data.
+
+        Args:
+          :param input_df: The pandas dataframe representation of the MET output data
+          :param series_val_names: The names of the series_val_1 columns (model, vx_mask, ...)
+        Returns:
+            a dataframe indexed by the series values (as strings), with the
+            fstdev and ostdev (the smallest when a series has several rows) and
+            pr_corr (the first row) columns.
+    """
+    stats_df = input_df.loc[input_df['stat_name'].isin(['FSTDEV', 'OSTDEV', 'PR_CORR'])]
+    keys = [stats_df[name].astype(str) for name in series_val_names]
+    grouped = stats_df.groupby(keys + [stats_df['stat_name']], sort=False)['stat_value']
+    min_values = grouped.min().unstack('stat_name')
+    first_values = grouped.first().unstack('stat_name')
+
+    taylor_stats = pandas.DataFrame(index=min_values.index)
+    taylor_stats['fstdev'] = min_values.get('FSTDEV')
+    taylor_stats['ostdev'] = min_values.get('OSTDEV')
+    taylor_stats['pr_corr'] = first_values.get('PR_CORR')
+    # only keep the series with all three statistics
+    return taylor_stats.dropna(how='any')
 
 
 class TaylorDiagramSeries(Series):
@@ -29,42 +57,16 @@ class TaylorDiagramSeries(Series):
        MET output file.
     """
 
-    def __init__(self, config, idx, input_data):
+    def __init__(self, config, idx, input_data, taylor_stats=None):
         # idx is the index number of the series (i.e. a permutation of all
         # possible series values).
+        # taylor_stats is the input data pivoted by pivot_taylor_stats(),
+        # shared by all the series of a diagram, computed here if None.
+        if taylor_stats is None:
+            taylor_stats = pivot_taylor_stats(input_data, config.series_val_names)
+        self.taylor_stats = taylor_stats
         super().__init__(config, idx, input_data)
 
-    def _subset_data(self, input_df) -> pandas.DataFrame:
-        """
-            Args:
-              :param input_df: The pandas dataframe representation of the full data to be subset.
-            Returns:
-                df_by_columns:  The portion of the full dataset that corresponds to the column header(s)
-                            and rows of interest.
-
-        """
-
-        # Work on a copy of the original dataframe so we can subset the
-        # original dataframe based on the columns we need.
-        df_by_columns = input_df.copy(deep=True)
-
-        # For Taylor Diagrams we need the stat_name column that contains the
-        # OSTDEV, FSTDEV, RMSE, and PR_CORR labels and the
-        # column stat_value, which has the corresponding values that are needed for plotting.
-        # We also need the names of the series_val_1 names (i.e. model, vx_mask, etc.)
-        columns_of_interest = [columns_of_interest for columns_of_interest in self.series_val_names]
-        relevant_columns = columns_of_interest
-
-        # These columns are required for getting the statistics values to plot, add
-        # these to the list of columns of interest.
-        required_columns = ['stat_name', 'fcst_var', 'stat_value']
-        for required in required_columns:
-            relevant_columns.append(required)
-
-        df_by_columns = df_by_columns[relevant_columns]
-
-        return df_by_columns
-
     def _create_series_points(self) -> collections.namedtuple:
         """
            Subset the MET output data into an individual series consisting of values of standard
@@ -77,54 +79,24 @@ class TaylorDiagramSeries(Series):
 
         """
 
-        # Subset the initial dataframe (i.e. the one that contains *all* the
-        # input data and columns from the MET input file).
-        permutations_list = calcpy_utils.create_permutations(self.all_series_vals)
-        self.subsetted_df = self._subset_data(self.input_data)
-
         # Determine which series this corresponds to.
+        permutations_list = calcpy_utils.create_permutations(self.all_series_vals)
         cur_perm = permutations_list[self.series_order]
 
-        for i, svn in enumerate(self.series_val_names):
-            # qstr = self.series_val_names[0] + "==" + '"' + cur_perm[0] + '"' + " & " + self.series_val_names[
-            #       1] + "==" + '"' + cur_perm[1] + '"'
-
-            column_name = svn
-
-            # If we have more than one item in the series_val1, treat this
-            # differently than if there is only one item
-            if len(self.series_val_names) > 1:
-                series_var_val_str = cur_perm[i]
-            else:
-                series_var_val_str = cur_perm[0]
-            if i == 0:
-                qstr = column_name+ " == " + '"' + series_var_val_str + '"'
-            else:
-                qstr = qstr + " and " + column_name + " == " + '"' + series_var_val_str + '"'
-
-        # retrieve the row of data corresponding to this current permutation/series
-        fstdev_query = qstr + " & " + 'stat_name == "FSTDEV"'
-        ostdev_query = qstr + " & " + 'stat_name == "OSTDEV"'
-        corr_query = qstr + " & " + 'stat_name == "PR_CORR"'
-
-
-        # This works in stand-alone, but not within METviewer
-        # fstdev_row = self.subsetted_df.query(fstdev_query)['stat_value'].values[0]
-        # Break up the filtering/subsetting into simpler statements, as METviewer is having
-        # issues with chaining pandas commands.
-        fstdev_row: pandas.Series = self.subsetted_df.query(fstdev_query)
-        # Don't use fstdev_row['stat_value'].values[0], as the values[0] syntax may
-        # cause issues within METviewer. *Note*: This syntax works for stand-alone/command line invocation.
-        fstdev_results = fstdev_row['stat_value'].values.min()
-        ostdev_row: pandas.Series = self.subsetted_df.query(ostdev_query)
-        ostdev_results = ostdev_row['stat_value'].values.min()
-
-        # for the stdev, pick the max value between fstdev and ostdev
-        stdev_results = max(fstdev_results, ostdev_results)
-        corr_results = self.subsetted_df.query(corr_query)['stat_value'].values[0]
-
-        # Create a named tuple to return
-        TaylorStats = namedtuple('TaylorStats', ['fstdev', 'ostdev', 'pr_corr'])
-        series_stats = TaylorStats(fstdev=fstdev_results, ostdev=ostdev_results, pr_corr=corr_results)
+        # If we have more than one item in the series_val1, the rows are
+        # indexed by all the series values, otherwise only by the first one
+        if len(self.series_val_names) > 1:
+            series_key = tuple(str(series_val) for series_val in cur_perm)
+        else:
+            series_key = str(cur_perm[0])
+
+        try:
+            row = self.taylor_stats.loc[series_key]
+        except KeyError as key_error:
+            raise ValueError(f"No FSTDEV, OSTDEV and PR_CORR statistics found "
+                             f"for the series {cur_perm}") from key_error
+
+        series_stats = TaylorStats(fstdev=row['fstdev'], ostdev=row['ostdev'],
+                                   pr_corr=row['pr_corr'])
 
         return series_stats
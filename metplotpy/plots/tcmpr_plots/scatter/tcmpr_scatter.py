@@ -13,9 +13,11 @@ Class Name: tcmpr.py
 
 import os
 
+import numpy as np
 import plotly.graph_objects as go
 
 from metplotpy.plots.constants import PLOTLY_AXIS_LINE_COLOR, PLOTLY_AXIS_LINE_WIDTH, PLOTLY_PAPER_BGCOOR
+from metplotpy.plots.pairs_analytics import scatter_trace
 from metplotpy.plots.tcmpr_plots.scatter.tcmpr_series_scatter import TcmprSeriesScatter
 from metplotpy.plots.tcmpr_plots.tcmpr import Tcmpr
 from metplotpy.plots.tcmpr_plots.tcmpr_util import get_dep_column
@@ -159,15 +161,18 @@ class TcmprScatter(Tcmpr):
             if series.plot_disp:
                 self._draw_series(series)
 
-        values = [*self.input_df['SCATTER_X'], *self.input_df['SCATTER_Y']]
+        x_values = self.input_df['SCATTER_X'].to_numpy(dtype=float)
+        y_values = self.input_df['SCATTER_Y'].to_numpy(dtype=float)
         # Draw a 1 to 1 reference line
         if (self.elements_with_string(self.config_obj.scatter_x, '_WIND_') > 0 and self.elements_with_string(
                 self.config_obj.scatter_y, '_WIND_') > 0) \
                 or (self.elements_with_string(self.config_obj.scatter_x, 'AMAX_WIND') > 0 and self.elements_with_string(self.config_obj.scatter_y, 'BMAX_WIND') > 0) \
                 or (self.elements_with_string(self.config_obj.scatter_x, 'BMAX_WIND') > 0 and self.elements_with_string(self.config_obj.scatter_y, 'AMAX_WIND') > 0):
 
-            xrange = [min(values) - 1, max(values) + 1]
-            yrange = [min(values) - 1, max(values) + 1]
+            values_min = min(np.nanmin(x_values), np.nanmin(y_values))
+            values_max = max(np.nanmax(x_values), np.nanmax(y_values))
+            xrange = [values_min - 1, values_max + 1]
+            yrange = [values_min - 1, values_max + 1]
             self.figure.update_layout(yaxis={'range': yrange, 'autorange': False})
             self.figure.update_layout(xaxis={'range': xrange, 'autorange': False})
 
@@ -182,8 +187,8 @@ class TcmprScatter(Tcmpr):
                            name='No-Skill'
                            ))
         else:
-            xrange = [min(self.input_df['SCATTER_X']) - 1, max(self.input_df['SCATTER_X']) + 1]
-            yrange = [min(self.input_df['SCATTER_Y']) - 1, max(self.input_df['SCATTER_Y']) + 1]
+            xrange = [np.nanmin(x_values) - 1, np.nanmax(x_values) + 1]
+            yrange = [np.nanmin(y_values) - 1, np.nanmax(y_values) + 1]
             self.figure.update_layout(yaxis={'range': yrange, 'autorange': False})
             self.figure.update_layout(xaxis={'range': xrange, 'autorange': False})
             # Draw a reference line at 0
@@ -193,20 +198,22 @@ class TcmprScatter(Tcmpr):
 
         # Create a point plot
         self.figure.add_trace(
-            go.Scatter(x=series.series_data['SCATTER_X'],
-                       y=series.series_data['SCATTER_Y'],
-                       showlegend=True,
-                       mode='markers',
-                       name=self.config_obj.user_legends[series.idx],
-                       marker=dict(
-                           color=PLOTLY_PAPER_BGCOOR,
-                           size=8,
-                           line=dict(
-                               color=self.config_obj.colors_list[series.idx],
-                               width=1
-                           )
-                       ),
-                       ),
+            scatter_trace(series.series_data['SCATTER_X'],
+                          series.series_data['SCATTER_Y'],
+                          gl_threshold=self.config_obj.scattergl_threshold,
+                          density_bins=self.config_obj.scatter_density_bins,
+                          showlegend=True,
+                          mode='markers',
+                          name=self.config_obj.user_legends[series.idx],
+                          marker=dict(
+                              color=PLOTLY_PAPER_BGCOOR,
+                              size=8,
+                              line=dict(
+                                  color=self.config_obj.colors_list[series.idx],
+                                  width=1
+                              )
+                          ),
+                          ),
             secondary_y=series.y_axis != 1
         )
 
@@ -28,6 +28,8 @@ import metcalcpy.util.utils as calc_util
 from metcalcpy.event_equalize import event_equalize
 from metplotpy.plots import util
 from metplotpy.plots.base_plot import BasePlot
+from metplotpy.plots import export
+from metplotpy.plots.timing import timed_stage
 from metplotpy.plots.constants import PLOTLY_AXIS_LINE_COLOR, PLOTLY_AXIS_LINE_WIDTH, PLOTLY_PAPER_BGCOOR
 from metplotpy.plots.tcmpr_plots.tcmpr_config import TcmprConfig
 from metplotpy.plots.tcmpr_plots.tcmpr_series import TcmprSeries
@@ -388,27 +390,43 @@ class Tcmpr(BasePlot):
         if hasattr(self.config_obj, 'xaxis_reverse') and self.config_obj.xaxis_reverse is True:
             self.figure.update_layout(legend={'traceorder': 'reversed'})
 
-    def save_to_file(self):
-        """Saves the image to a file specified in the config file.
-         Prints a message if fails
+    def export_job(self) -> Union[export.ExportJob, None]:
+        """Creates the directory of the output image if it doesn't already exist
+         and returns the export of the figure, None if the figure was not created.
 
         Args:
 
         Returns:
-
+            - the ExportJob of the figure
         """
 
         # Create the directory for the output plot if it doesn't already exist
         dirname = os.path.dirname(os.path.abspath(self.plot_filename))
         if not os.path.exists(dirname):
             os.mkdir(dirname)
+        if not self.figure:
+            return None
+        return export.ExportJob(self.figure, self.plot_filename, format='png',
+                                width=self.config_obj.plot_width,
+                                height=self.config_obj.plot_height,
+                                scale=2)
+
+    @timed_stage('export')
+    def save_to_file(self):
+        """Saves the image to a file specified in the config file.
+         Prints a message if fails
+
+        Args:
+
+        Returns:
+
+        """
+
+        job = self.export_job()
         print(f'Creating image file: {self.plot_filename}')
-        if self.figure:
+        if job:
             try:
-                self.figure.write_image(file=self.plot_filename, format='png',
-                                        width=self.config_obj.plot_width,
-                                        height=self.config_obj.plot_height,
-                                        scale=2)
+                export.write_image(*job)
             except FileNotFoundError:
                 print("Can't save to file " + self.plot_filename)
             except ValueError as ex:
@@ -553,8 +571,13 @@ def main(config_filename=None):
     if common_member(config_obj.plot_list, PLOTS_WITH_BASELINE):
         baseline_data = init_hfip_baseline(config_obj, config_obj.baseline_file, input_df)
 
+    # start the Kaleido renderers while the plots are built
+    exporter = export.get_exporter()
+    exporter.warm()
+
     plot = None
     common_case_data = None
+    jobs = []
     for plot_type in config_obj.plot_list:
         try:
             if plot_type == 'boxplot':
@@ -585,7 +608,13 @@ def main(config_filename=None):
                 from metplotpy.plots.tcmpr_plots.skill.median.tcmpr_skill_median import TcmprSkillMedian
                 plot = TcmprSkillMedian(config_obj, column_info, col_to_plot, common_case_data, input_df)
 
-            plot.save_to_file()
+            # the images are exported together, once all the plots are built
+            job = plot.export_job()
+            if job:
+                print(f'Creating image file: {plot.plot_filename}')
+                jobs.append(job)
+            else:
+                print("Oops!  The figure was not created. Can't save.")
             #plot.show_in_browser()
             if common_case_data is None:
                 common_case_data = plot.case_data
@@ -593,6 +622,10 @@ def main(config_filename=None):
         except (ValueError, Exception) as ve:
             print(ve)
 
+    for result in exporter.export(jobs):
+        if result.error is not None:
+            print(f"Can't save to file {result.path}: {result.error}")
+
 
 def print_data_info(input_df, series):
     # Print information about the dataset.
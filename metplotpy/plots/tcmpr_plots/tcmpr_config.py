@@ -19,6 +19,7 @@ import metcalcpy.util.utils as utils
 from .. import constants
 from .. import util
 from ..config import Config
+from ..pairs_analytics import SCATTERGL_THRESHOLD
 
 
 class TcmprConfig(Config):
@@ -45,6 +46,13 @@ class TcmprConfig(Config):
         self.n_min = self.get_config_value('n_min')
         self.scatter_x = self.get_config_value('scatter_x')
         self.scatter_y = self.get_config_value('scatter_y')
+        # number of points above which the scatter plot uses WebGL
+        self.scattergl_threshold = self.get_config_value('scattergl_threshold')
+        if self.scattergl_threshold is None:
+            self.scattergl_threshold = SCATTERGL_THRESHOLD
+        # bins along each axis used to summarize very large scatter plots,
+        # empty to plot every pair
+        self.scatter_density_bins = self.get_config_value('scatter_density_bins')
         self.demo_yr = self.get_config_value('demo_yr')  # not used in Rscript. not sure if we need it
         self.alpha = self.get_config_value('alpha')
 
@@ -0,0 +1,111 @@
+# ============================*
+# ** Copyright UCAR (c) 2024
+# ** University Corporation for Atmospheric Research (UCAR)
+# ** National Center for Atmospheric Research (NCAR)
+# ** Research Applications Lab (RAL)
+# ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+# ============================*
+
+
+"""
+Module Name: timing.py
+
+Wall-clock timing of the stages of a plot (read, equalize, series,
+layout, export).  Every plot derived from BasePlot owns a PlotTimer;
+methods are timed with the timed_stage decorator or the
+PlotTimer.stage() context manager.  If the timing_file config setting
+is set, the timings are written to that file as JSON after each stage,
+for example:
+
+    {"plot": "Line", "start": "2024-05-01T10:00:00", "total_secs": 2.41,
+     "stages": [{"name": "read", "secs": 0.12, "calls": 1}, ...]}
+"""
+
+import functools
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Union
+
+
+class PlotTimer:
+    """
+       Accumulates the duration and number of calls of the named stages of a plot
+    """
+
+    def __init__(self, plot_name: str, logger=None, output_file: Union[str, None] = None):
+        """
+        Args:
+            @param plot_name: the name of the plot, written to the JSON
+            @param logger: optional logger, the duration of each stage is logged at DEBUG level
+            @param output_file: optional JSON file rewritten after each stage
+        """
+        self.plot_name = plot_name
+        self.logger = logger
+        self.output_file = output_file
+        self.start = datetime.now()
+        # stage name -> [total seconds, number of calls], in the order first seen
+        self.stages = {}
+        self._depth = 0
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Context manager timing the enclosed block as the stage name.
+        Nested stages are recorded separately, the JSON file is written when
+        the outermost stage ends.
+        """
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            self._depth -= 1
+            totals = self.stages.setdefault(name, [0.0, 0])
+            totals[0] += elapsed
+            totals[1] += 1
+            if self.logger is not None:
+                self.logger.debug(f"Stage {name} of {self.plot_name} took {elapsed:.3f} s")
+            if self._depth == 0 and self.output_file:
+                self.write_json(self.output_file)
+
+    def as_dict(self) -> dict:
+        """
+        Returns:
+            the timings as a dictionary, see the module documentation
+        """
+        return {'plot': self.plot_name,
+                'start': self.start.isoformat(timespec='seconds'),
+                'total_secs': round((datetime.now() - self.start).total_seconds(), 6),
+                'stages': [{'name': name, 'secs': round(secs, 6), 'calls': calls}
+                           for name, (secs, calls) in self.stages.items()]}
+
+    def write_json(self, output_file: str) -> None:
+        """
+        Writes the timings to output_file as JSON
+        """
+        with open(output_file, 'w') as json_file:
+            json.dump(self.as_dict(), json_file, indent=2)
+
+
+def timed_stage(name: str):
+    """
+    Decorator timing a method of a plot as the stage name, using the
+    PlotTimer in the timer attribute of the plot.  The method runs
+    untimed if the plot has no timer.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            timer = getattr(self, 'timer', None)
+            if timer is None:
+                return method(self, *args, **kwargs)
+            with timer.stage(name):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -302,8 +302,16 @@ def sort_threshold_values(thresh_values: pd.core.series.Series) -> list:
     return sorted_val_wt['thresh']
 
 
+# loggers already configured by get_common_logger, keyed by (log level, log file)
+_COMMON_LOGGERS = {}
+
+
 def get_common_logger(log_level, log_filename):
     '''
+      The logging is configured and the user context filter added on the first
+      call only, later calls with the same settings return the same logger, so
+      it is cheap to call from the methods called for each point.
+
       Args:
          @param log_level:  The log level
          @param log_filename: The full path to the log file + filename
@@ -314,6 +322,10 @@ def get_common_logger(log_level, log_filename):
 
     # Supported log levels.
     log_level = log_level.upper()
+    common_logger = _COMMON_LOGGERS.get((log_level, log_filename))
+    if common_logger is not None:
+        return common_logger
+
     log_levels = {'DEBUG': logging.DEBUG, 'INFO': logging.INFO,
                   'WARNING': logging.WARNING, 'ERROR': logging.ERROR,
                   'CRITICAL': logging.CRITICAL}
@@ -336,7 +348,8 @@ def get_common_logger(log_level, log_filename):
                         filemode='w')
     mpl_logger = logging.getLogger(name='matplotlib').setLevel(logging.CRITICAL)
     common_logger = logging.getLogger(__name__)
-    f = cf()
-    common_logger.addFilter(f)
+    if not any(isinstance(log_filter, cf) for log_filter in common_logger.filters):
+        common_logger.addFilter(cf())
+    _COMMON_LOGGERS[(log_level, log_filename)] = common_logger
 
     return common_logger
@@ -31,6 +31,8 @@ from metplotpy.plots.base_plot import BasePlot
 from metplotpy.plots.wind_rose.wind_rose_config import WindRoseConfig
 from metplotpy.plots.constants import PLOTLY_AXIS_LINE_COLOR, PLOTLY_AXIS_LINE_WIDTH, PLOTLY_PAPER_BGCOOR
 from metplotpy.plots import util
+from metplotpy.plots import export
+from metplotpy.plots.timing import timed_stage
 
 
 class WindRosePlot(BasePlot):
@@ -295,6 +297,7 @@ class WindRosePlot(BasePlot):
             self.traces.append(trace)
         self.logger.info(f"Finished creating traces: {datetime.now()}")
 
+    @timed_stage('export')
     def save_to_file(self) -> None:
         """ Saves the image to a file specified in the config file.
             Prints a message if fails
@@ -306,7 +309,7 @@ class WindRosePlot(BasePlot):
         image_name = self.get_config_value('plot_filename')
         if self.figure:
             try:
-                self.figure.write_image(image_name)
+                export.write_image(self.figure, image_name)
 
             except FileNotFoundError:
                 print("Can't save to file " + image_name)
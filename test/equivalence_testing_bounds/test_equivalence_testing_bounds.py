@@ -1,6 +1,9 @@
 import pytest
 import os
+import numpy as np
+import pandas as pd
 from metplotpy.plots.equivalence_testing_bounds import equivalence_testing_bounds as etb
+from metplotpy.plots.equivalence_testing_bounds.equivalence_testing_bounds_series import calculate_row_statistics
 #from metcalcpy.compare_images import CompareImages
 
 
@@ -92,3 +95,13 @@ def test_files_exist(test_input, expected):
         # Typically when files have already been removed or
         # don't exist.  Ignore.
         pass
+
+
+def test_calculate_row_statistics():
+    '''
+        Checking that the statistic is calculated for each row from its partial sums
+    '''
+    input_df = pd.read_csv('./equivalence_testing_bounds.data', sep='\t', header='infer').head(5)
+    stat_values = calculate_row_statistics(input_df, 'me')
+    assert stat_values.shape == (5,)
+    np.testing.assert_allclose(stat_values, input_df['fbar'] - input_df['obar'], atol=1e-5)
@@ -0,0 +1,27 @@
+import os
+import numpy as np
+import test_utils
+from metplotpy.contributed.fv3_physics_tend import physics_tend
+
+
+def test_pts_in_shp_cached(tmp_path):
+    '''
+    Test that the shape file mask is cached and reused for the same grid
+    '''
+    shp = test_utils.get_fv3_shapefiles_dir()
+    lons, lats = np.meshgrid(np.linspace(235, 295, 120), np.linspace(25, 50, 60))
+    mask = physics_tend.pts_in_shp(lats, lons, shp)
+    assert mask.shape == lats.shape
+    assert mask.any() and not mask.all()
+
+    cache_dir = str(tmp_path)
+    cached = physics_tend.pts_in_shp(lats, lons, shp, cache_dir=cache_dir)
+    cache_files = os.listdir(cache_dir)
+    assert len(cache_files) == 1
+    assert np.array_equal(cached, mask)
+    assert np.array_equal(physics_tend.read_cached_mask(os.path.join(cache_dir, cache_files[0])), mask)
+    assert np.array_equal(physics_tend.pts_in_shp(lats, lons, shp, cache_dir=cache_dir), mask)
+
+    # a different grid has its own mask
+    physics_tend.pts_in_shp(lats[:-1], lons[:-1], shp, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 2
@@ -0,0 +1,63 @@
+import datetime
+import numpy as np
+import pandas as pd
+import xarray
+from metplotpy.contributed.fv3_physics_tend import physics_tend
+
+FV3 = {"tendency_varnames": {"tmp": ["dt3dt_pbl", "dt3dt_nophys"], "spfh": ["dq3dt_pbl", "dq3dt_nophys"]},
+       "time0_varname": {"tmp": "tmp_i", "spfh": "qv_i"},
+       "lon_name": "grid_lont", "lat_name": "grid_latt"}
+
+
+def write_files(tmp_path):
+    ny, nx = 3, 4
+    lons, lats = np.meshgrid(np.linspace(260, 270, nx), np.linspace(30, 35, ny))
+    grid = xarray.Dataset({"grid_lont": (("grid_yt", "grid_xt"), lons),
+                           "grid_latt": (("grid_yt", "grid_xt"), lats),
+                           "area": (("grid_yt", "grid_xt"), np.ones((ny, nx)), {"units": "m^2"})})
+    dims = ("time", "pfull", "grid_yt", "grid_xt")
+    shape = (3, 2, ny, nx)
+    data_vars = {"ugrd": (dims, np.zeros(shape), {"units": "m/s", "long_name": "not needed"})}
+    for variable in FV3["tendency_varnames"]:
+        # state variable increases by 1 K per hour, from 10 K at time0
+        state = 11 + np.arange(3)[:, None, None, None] * np.ones(shape)
+        data_vars[variable] = (dims, state, {"units": "K", "long_name": variable})
+        data_vars[FV3["time0_varname"][variable]] = (dims[1:], np.full(shape[1:], 10.), {"units": "K"})
+        pbl, nophys = FV3["tendency_varnames"][variable]
+        data_vars[pbl] = (dims, np.full(shape, 0.5/3600), {"units": "K/s", "long_name": "pbl"})
+        # nophys tendency accumulates
+        data_vars[nophys] = (dims, np.arange(1, 4)[:, None, None, None] * np.full(shape, 0.5/3600),
+                             {"units": "K/s", "long_name": "nophys"})
+    history = xarray.Dataset(data_vars, coords={"time": pd.date_range("2019-05-04T12", periods=3, freq="H"),
+                                                "pfull": ("pfull", [500., 850.], {"units": "mb"})})
+    grid.to_netcdf(tmp_path / "grid_spec.nc")
+    history.to_netcdf(tmp_path / "fv3_history.nc")
+    return str(tmp_path / "fv3_history.nc"), str(tmp_path / "grid_spec.nc")
+
+
+def test_open_history_keeps_needed_variables(tmp_path):
+    historyfile, gridfile = write_files(tmp_path)
+    fv3ds, gds = physics_tend.open_history(historyfile, gridfile, FV3, ["tmp"])
+    assert sorted(fv3ds.data_vars) == ["dt3dt_nophys", "dt3dt_pbl", "tmp", "tmp_i"]
+    assert "lont" in fv3ds.coords and "latt" in fv3ds.coords
+
+    fv3ds, _ = physics_tend.open_history(historyfile, gridfile, FV3, ["tmp", "spfh"], subtract=historyfile)
+    assert "ugrd" not in fv3ds
+    assert float(abs(fv3ds["spfh"]).max()) == 0
+
+
+def test_tendency_budget(tmp_path):
+    historyfile, gridfile = write_files(tmp_path)
+    fv3ds, _ = physics_tend.open_history(historyfile, gridfile, FV3, ["tmp", "spfh"])
+    for variable in ["tmp", "spfh"]:
+        budget = physics_tend.tendency_budget(fv3ds, variable, FV3, datetime.timedelta(hours=2))
+        assert budget.validtime == pd.Timestamp("2019-05-04T14")
+        assert budget.time0 == pd.Timestamp("2019-05-04T12")
+        np.testing.assert_allclose(budget.tendencies_avg.sel({budget.tendency_dim: "pbl"}).metpy.dequantify(), 0.5)
+        np.testing.assert_allclose(budget.tendencies_avg.sel({budget.tendency_dim: "nophys"}).metpy.dequantify(), 0.5)
+        # 1 K/hour of tendencies and 1 K/hour actual change, so no residual
+        np.testing.assert_allclose(budget.dstate_variable.metpy.dequantify(), 2)
+        np.testing.assert_allclose(budget.resid.metpy.dequantify(), 0, atol=1e-12)
+
+        da = physics_tend.all_tendencies(budget)
+        assert list(da[budget.tendency_dim].values) == ["pbl", "nophys", "total", "resid"]
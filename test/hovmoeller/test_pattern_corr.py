@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+import xarray as xr
+
+from metplotpy.contributed.hovmoeller.hovmoeller_calc import lat_avg, pattern_corr, pattern_corr_leads
+
+
+@pytest.fixture
+def fields():
+    rng = np.random.default_rng(1)
+    coords = {'time': np.arange(20), 'lat': np.linspace(-10., 10., 5), 'lon': np.arange(0., 360., 30.)}
+    obs = xr.DataArray(rng.random((20, 5, 12)), dims=('time', 'lat', 'lon'), coords=coords,
+                       attrs={'units': 'mm/day'})
+    fcst = xr.DataArray(obs.values + rng.random((4, 2, 20, 5, 12)),
+                        dims=('fchrs', 'model', 'time', 'lat', 'lon'),
+                        coords=dict(coords, fchrs=[0, 24, 48, 72], model=['a', 'b']),
+                        attrs={'units': 'mm/day'})
+    return fcst, obs
+
+
+def test_same_as_pattern_corr(fields):
+    fcst, obs = fields
+    obs_avg = lat_avg(obs, -5., 5., weighted=True)
+    corr = pattern_corr_leads(fcst, obs, latmin=-5., latmax=5.)
+
+    assert corr.dims == ('fchrs', 'model')
+    for lead in range(4):
+        for model in range(2):
+            fcst_avg = lat_avg(fcst[lead, model], -5., 5., weighted=True)
+            assert corr[lead, model] == pytest.approx(pattern_corr(fcst_avg, obs_avg))
+
+
+def test_weighted_lat_avg(fields):
+    _, obs = fields
+    weights = np.cos(np.deg2rad(obs.lat.values[1:4]))
+    expected = (obs.values[:, 1:4, :] * weights[:, np.newaxis]).sum(axis=1) / weights.sum()
+    weighted = lat_avg(obs, -5., 5., weighted=True)
+    np.testing.assert_allclose(weighted.values, expected)
+    assert weighted.attrs['units'] == 'mm/day'
+
+
+def test_times_must_match(fields):
+    fcst, obs = fields
+    with pytest.raises(ValueError):
+        pattern_corr_leads(fcst.isel(time=slice(1, None)), obs, latmin=-5., latmax=5.)
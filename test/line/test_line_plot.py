@@ -2,6 +2,7 @@
 import pandas as pd
 import pytest
 import os
+import yaml
 from metplotpy.plots.line import line as l
 #from metcalcpy.compare_images import CompareImages
 
@@ -254,3 +255,24 @@ def test_vertical_plot():
         # Typically when files have already been removed or
         # don't exist.  Ignore.
         pass
+
+
+def test_write_outputs(tmp_path):
+    '''
+        Checking that the images of all the formats, the html and the points
+        files are created from the figure in one pass
+    '''
+    os.environ['METPLOTPY_BASE'] = "../../"
+    with open("custom_line.yaml", 'r') as stream:
+        docs = yaml.load(stream, Loader=yaml.FullLoader)
+    docs['plot_filename'] = str(tmp_path / 'line.png')
+    docs['create_html'] = 'True'
+    docs['dump_points_1'] = 'True'
+    docs['points_path'] = str(tmp_path)
+    docs['image_formats'] = ['png', 'svg']
+    plot = l.Line(docs)
+    plot.write_outputs()
+
+    for name in ['line.png', 'line.svg', 'line.html', 'line.points1']:
+        assert os.path.isfile(tmp_path / name)
+    assert 'plotly.min.js' not in os.listdir(tmp_path)
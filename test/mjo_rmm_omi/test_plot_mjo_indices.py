@@ -0,0 +1,49 @@
+import os
+
+import matplotlib
+matplotlib.use('agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib.collections import LineCollection
+
+import metplotpy.contributed.mjo_rmm_omi.plot_mjo_indices as pmi
+
+
+@pytest.fixture
+def index():
+    times = pd.date_range('2000-01-01', periods=3 * 365)
+    rng = np.random.default_rng(0)
+    angle = np.cumsum(rng.normal(0.2, 0.05, times.size))
+    return (2. * np.cos(angle), 2. * np.sin(angle), times.values.astype('datetime64[D]'),
+            times.month.values, times.day.values)
+
+
+def test_phase_diagram(index, tmp_path):
+    pc1, pc2, dates, months, days = index
+    fig = pmi.phase_diagram('RMM', pc1, pc2, dates, months, days, str(tmp_path / 'phase'), max_labels=50)
+    ax = fig.axes[0]
+
+    # one segment per day, colored by month
+    collections = [artist for artist in ax.collections if isinstance(artist, LineCollection)]
+    assert len(collections) == 1
+    assert len(collections[0].get_segments()) == len(pc1) - 1
+    np.testing.assert_allclose(collections[0].get_colors()[31], matplotlib.colors.to_rgba('gold'))
+
+    day_labels = [text for text in ax.texts if text.get_text().isdigit()]
+    assert 0 < len(day_labels) <= 50
+    month_labels = [text for text in ax.texts if text.get_text() in ('Jan', 'Feb', 'Dec')]
+    assert len(month_labels) == 36 // 12 * 3
+    assert os.path.exists(tmp_path / 'phase.png')
+    plt.close(fig)
+
+
+def test_phase_diagrams(index, tmp_path):
+    pc1, pc2, dates, months, days = index
+    seasons = {'DJF2000': (np.datetime64('2000-12-01'), np.datetime64('2001-02-28')),
+               'DJF2001': (np.datetime64('2001-12-01'), np.datetime64('2002-02-28'))}
+    plotname = str(tmp_path / 'phase')
+    assert pmi.phase_diagrams('OMI', pc1, pc2, dates, months, days, seasons, plotname, nprocs=2) == \
+        [plotname + '_DJF2000.png', plotname + '_DJF2001.png']
+    assert all(os.path.exists(plotname + '_' + name + '.png') for name in seasons)
@@ -1,7 +1,9 @@
 
 import pytest
 import os
+import pandas as pd
 from metplotpy.plots.reliability_diagram import reliability as r
+from metplotpy.plots.reliability_diagram.reliability_series import pivot_pstd_stats, _bin_midpoints
 #from metcalcpy.compare_images import CompareImages
 
 
@@ -82,3 +84,21 @@ def test_files_exist(test_input, expected):
         # Typically when files have already been removed or
         # don't exist.  Ignore.
         pass
+
+
+def test_pivot_pstd_stats():
+    '''
+        Checking that the PSTD statistics of each bin are matched into one row
+        and that the bin midpoints are computed
+    '''
+    input_df = pd.read_csv('./reliability.data', sep='\t', header='infer')
+    pstd_data = pivot_pstd_stats(input_df)
+    calibration = input_df.loc[input_df['stat_name'] == 'PSTD_CALIBRATION']
+    n_i = input_df.loc[input_df['stat_name'] == 'PSTD_NI']
+    assert len(pstd_data) == len(calibration)
+    assert pstd_data['stat_value'].tolist() == calibration['stat_value'].tolist()
+    assert pstd_data['n_i'].tolist() == n_i['stat_value'].tolist()
+    assert 'stat_name' not in pstd_data.columns
+
+    midpoints = _bin_midpoints([0.0, 0.25, 0.5, 0.75])
+    assert midpoints.tolist() == [0.125, 0.375, 0.625, 0.875]
@@ -0,0 +1,101 @@
+"""
+   Benchmark of the cached map template used by the series analysis plotters.
+
+   Creates a directory of 100 synthetic series_analysis netcdf files
+   (series_Fxxx_to_Fyyy_TMP_Z2.nc) and times plot_series_by_grouping's
+   create_plots(), which reuses one figure/GeoAxes/colorbar, against building
+   a new figure and GeoAxes for every frame as was previously done.
+
+   Usage: python benchmark_map_template.py [number_of_files]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import cartopy.crs as ccrs
+from netCDF4 import Dataset
+
+from metplotpy.contributed.series_analysis.plot_series_by_grouping import PlotSeriesByGrouping
+from metplotpy.plots.map_template import clear_map_templates
+
+PNG_REGEX = '(.*series_(F[0-9]{3}_to_F[0-9]{3})_([A-Z]{3})_(P|Z)([0-9]{1,3}).png'
+
+
+def create_series_files(input_dir, num_files, nlat=181, nlon=360):
+    """
+        Write num_files netcdf files with lat, lon, series_cnt_FBAR and
+        series_cnt_OBAR variables in the layout produced by series analysis.
+    """
+    lats = np.linspace(-90, 90, nlat)
+    lons = np.linspace(0, 359, nlon)
+    lon_mesh, lat_mesh = np.meshgrid(lons, lats)
+    for idx in range(num_files):
+        fhr_beg = idx * 6
+        filename = 'series_F%03d_to_F%03d_TMP_Z2.nc' % (fhr_beg, fhr_beg + 6)
+        with Dataset(os.path.join(input_dir, filename), mode='w') as nc_file:
+            nc_file.createDimension('lat', nlat)
+            nc_file.createDimension('lon', nlon)
+            nc_file.createVariable('lat', 'f4', ('lat',))[:] = lats
+            nc_file.createVariable('lon', 'f4', ('lon',))[:] = lons
+            obar = 280. + 20. * np.cos(np.radians(lat_mesh)) + \
+                   np.sin(np.radians(lon_mesh + idx))
+            nc_file.createVariable('series_cnt_OBAR', 'f4', ('lat', 'lon'))[:] = obar
+            nc_file.createVariable('series_cnt_FBAR', 'f4', ('lat', 'lon'))[:] = obar + 0.5
+
+
+def render_new_figure_per_frame(input_dir, output_dir):
+    """
+        Reference implementation: a new figure, GeoAxes and colorbar per frame.
+    """
+    cmap = plt.get_cmap('Spectral_r')
+    for nc_filename in sorted(os.listdir(input_dir)):
+        with Dataset(os.path.join(input_dir, nc_filename), mode='r') as nc_file:
+            lons = nc_file.variables['lon'][:]
+            lats = nc_file.variables['lat'][:]
+            fields = {'fbar': nc_file.variables['series_cnt_FBAR'][:],
+                      'obar': nc_file.variables['series_cnt_OBAR'][:]}
+        for key, value in fields.items():
+            plt.figure(figsize=(13, 6.2))
+            geo_ax = plt.axes(projection=ccrs.PlateCarree())
+            plt.contourf(lons, lats, value, 65, transform=ccrs.PlateCarree(), cmap=cmap)
+            scalar_mappable = plt.cm.ScalarMappable(cmap=cmap,
+                                                    norm=plt.Normalize(value.min(), value.max()))
+            scalar_mappable._A = []
+            plt.colorbar(scalar_mappable, ax=geo_ax)
+            plt.title(nc_filename + ' ' + key)
+            plt.savefig(os.path.join(output_dir, nc_filename[:-3] + '_' + key + '.png'))
+            plt.close()
+
+
+def main():
+    num_files = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_dir = os.path.join(work_dir, 'input')
+        os.makedirs(input_dir)
+        create_series_files(input_dir, num_files)
+
+        output_dir = os.path.join(work_dir, 'new_figure')
+        os.makedirs(output_dir)
+        start = time.perf_counter()
+        render_new_figure_per_frame(input_dir, output_dir)
+        new_figure_secs = time.perf_counter() - start
+
+        output_dir = os.path.join(work_dir, 'template')
+        start = time.perf_counter()
+        PlotSeriesByGrouping({}).create_plots(input_dir, output_dir, False, PNG_REGEX)
+        template_secs = time.perf_counter() - start
+        clear_map_templates()
+
+    frames = 2 * num_files
+    print(f"{num_files} files, {frames} frames")
+    print(f"new figure per frame: {new_figure_secs:8.2f} s ({new_figure_secs / frames:.3f} s/frame)")
+    print(f"cached map template:  {template_secs:8.2f} s ({template_secs / frames:.3f} s/frame)")
+
+
+if __name__ == "__main__":
+    main()
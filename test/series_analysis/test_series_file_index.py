@@ -0,0 +1,86 @@
+"""Tests for the SeriesFileIndex used by the series analysis plotting scripts,
+   using small netcdf files written to a temporary directory.
+"""
+
+import os
+import numpy as np
+import pytest
+from netCDF4 import Dataset
+
+import metplotpy.contributed.series_analysis.series_file_index as sfi
+from metplotpy.contributed.series_analysis.series_file_index import SeriesFileIndex
+
+
+def write_series_file(path, offset):
+    with Dataset(path, mode='w') as nc_file:
+        nc_file.createDimension('lat', 3)
+        nc_file.createDimension('lon', 4)
+        nc_file.createVariable('lat', 'f4', ('lat',))[:] = [-10., 0., 10.]
+        nc_file.createVariable('lon', 'f4', ('lon',))[:] = [0., 90., 180., 270.]
+        obar = np.arange(12, dtype=np.float32).reshape(3, 4) + offset
+        nc_file.createVariable('series_cnt_OBAR', 'f4', ('lat', 'lon'))[:] = obar
+        nc_file.createVariable('series_cnt_FBAR', 'f4', ('lat', 'lon'))[:] = obar * 2
+
+
+@pytest.fixture
+def series_dir(tmp_path):
+    for offset, fhr in enumerate(['F012', 'F000', 'F006']):
+        sub_dir = tmp_path / ('series_' + fhr)
+        sub_dir.mkdir()
+        write_series_file(str(sub_dir / ('series_' + fhr + '_to_' + fhr + '_TMP_Z2.nc')),
+                          offset * 100)
+    # not a netcdf file, should be ignored
+    (tmp_path / 'README').write_text('ignored')
+    return str(tmp_path)
+
+
+def test_files_sorted_and_filtered(series_dir):
+    file_index = SeriesFileIndex(series_dir)
+    names = [os.path.basename(path) for path in file_index.files()]
+    assert names == ['series_F000_to_F000_TMP_Z2.nc', 'series_F006_to_F006_TMP_Z2.nc',
+                     'series_F012_to_F012_TMP_Z2.nc']
+    assert len(file_index.files('series_F00[06].*')) == 2
+
+
+def test_metadata_and_slices(series_dir):
+    file_index = SeriesFileIndex(series_dir)
+    path = file_index.files()[0]
+    info = file_index.entries[path].variables['series_cnt_OBAR']
+    assert info.shape == (3, 4)
+    assert info.dimensions == ('lat', 'lon')
+
+    values = file_index.read(path, ['lon', 'series_cnt_OBAR'], (slice(1, 2), slice(None)))
+    assert values['lon'].shape == (4,)
+    np.testing.assert_array_equal(values['series_cnt_OBAR'], [[104., 105., 106., 107.]])
+
+
+def test_value_ranges(series_dir):
+    file_index = SeriesFileIndex(series_dir)
+    files = file_index.files()
+    # F000 was written with offset 100, F006 with 200 and F012 with 0
+    assert file_index.value_range(files[0], 'series_cnt_OBAR') == (100., 111.)
+    assert file_index.series_range('series_cnt_OBAR') == (0., 211.)
+    assert file_index.series_range('series_cnt_FBAR', files[:2]) == (200., 422.)
+
+
+def test_range_values_not_read_again(series_dir, monkeypatch):
+    file_index = SeriesFileIndex(series_dir)
+    files = file_index.files()
+    assert file_index.series_range('series_cnt_OBAR') == (0., 211.)
+
+    # the plots of the series get the values read for the range without opening the files
+    opened = []
+    def dataset(path, mode):
+        opened.append(path)
+        raise OSError(path)
+
+    monkeypatch.setattr(sfi, 'Dataset', dataset)
+    values = file_index.read(files[0], ['series_cnt_OBAR'])
+    assert opened == []
+    assert values['series_cnt_OBAR'].min() == 100.
+    assert file_index.read(files[1], ['series_cnt_OBAR'], (slice(1, 2), slice(None)))['series_cnt_OBAR'].shape == (1, 4)
+    assert opened == []
+    # handed over once, read from the file the next time
+    with pytest.raises(OSError):
+        file_index.read(files[0], ['series_cnt_OBAR'])
+    assert opened == [files[0]]
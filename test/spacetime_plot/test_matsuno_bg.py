@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from scipy.optimize import fsolve
+
+import metcalcpy.contributed.spacetime.matsuno_plot as mp
+import metplotpy.contributed.spacetime_plot.matsuno_bg as mbg
+
+
+def angular_frequencies(he, n, u, max_wn=15, n_wn=500):
+    (beta, perimeter) = mp.beta_parameters(0.)
+    wn, frequency = mbg.er_n_bg_frequencies([he], [n], 0., max_wn, n_wn, u)
+    k = mp.wn2k(wn, perimeter)
+    return beta, wn, k, frequency[0, 0] * 2. * np.pi * mbg.sec2day
+
+
+@pytest.mark.parametrize('he, n, u', [(3000, 1, 30), (7000, 2, 25), (10000, 1, -10)])
+def test_er_n_bg_dispersion_residual(he, n, u):
+    beta, wn, k, angular_frequency = angular_frequencies(he, n, u)
+    # the cubic in the intrinsic frequency is about 0, relative to the size of its terms
+    w = angular_frequency - u * k
+    scale = np.abs(w) ** 3 + mbg.g * he * np.abs(k * beta) + \
+        mbg.g * he * (k ** 2 + beta * (2. * n + 1.) / np.sqrt(mbg.g * he)) * np.abs(w)
+    residual = mbg.dispersion_bg(angular_frequency, k, n, he, beta, u)
+    assert np.all(np.abs(residual) <= 1e-10 * scale)
+
+
+@pytest.mark.parametrize('he, n, u', [(3000, 1, 30), (7000, 2, 25), (10000, 1, -10)])
+def test_er_n_bg_matches_fsolve(he, n, u):
+    beta, wn, k, angular_frequency = angular_frequencies(he, n, u)
+    for i in [10, 120, 260, 400, 480]:
+        # the iterative solution, seeded with the equatorial Rossby wave approximation
+        seed = -beta * k[i] / ((k[i] * k[i]) + (2. * n + 1.) * (beta / np.sqrt(mbg.g * he)))
+        expected = fsolve(mbg.dispersion_bg, seed, args=(k[i], n, he, beta, u))
+        np.testing.assert_allclose(angular_frequency[i], expected[0], rtol=1e-6)
+
+
+def test_matsuno_modes_wk_bg_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('METPLOTPY_MATSUNO_CACHE_DIR', str(tmp_path))
+    mbg._matsuno_frequencies_bg.cache_clear()
+    modes = mbg.matsuno_modes_wk_bg(he=[3000, 7000], n=[1, 2], max_wn=15, u=28)
+    assert list(modes) == [3000, 7000]
+    assert list(modes[7000].columns) == ['ER(n=1,he=7000m)', 'ER(n=2,he=7000m)']
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # changing the returned data doesn't change the cached curves
+    modes[3000].iloc[:, :] = 0.
+    mbg._matsuno_frequencies_bg.cache_clear()
+    cached = mbg.matsuno_modes_wk_bg(he=[3000, 7000], n=[1, 2], max_wn=15, u=28)
+    assert not (cached[3000] == 0.).any().any()
+    np.testing.assert_array_equal(cached[7000].values, modes[7000].values)
@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+import pytest
+import xarray as xr
+import yaml
+
+import metplotpy.contributed.stratosphere_diagnostics.stratosphere_diagnostics as sd
+from metcalcpy.pre_processing.directional_means import zonal_mean
+
+
+@pytest.fixture
+def config(tmp_path):
+    rng = np.random.default_rng(0)
+    shape = (12, 3, 7, 8)
+    dims = ('timeEv60', 'pres', 'lat', 'lon')
+    dataset = xr.Dataset({'uwndFull_TS': (dims, rng.normal(10., 20., shape)),
+                          'vwndFull_TS': (dims, rng.normal(0., 5., shape)),
+                          'tempFull_TS': (dims, rng.normal(240., 20., shape)),
+                          'geopFull_TS': (dims, rng.normal(0., 1., shape))},
+                         coords={'timeEv60': np.arange(12), 'pres': [1., 10., 100.],
+                                 'lat': np.linspace(-90., 90., 7), 'lon': np.arange(0., 360., 45.)})
+    dataset.to_netcdf(tmp_path / 'strat.nc')
+
+    config_file = os.path.join(os.path.dirname(sd.__file__), 'stratosphere_diagnostics.yaml')
+    with open(config_file, 'r') as stream:
+        config = yaml.load(stream, Loader=yaml.FullLoader)
+    config.update(input_data_path=str(tmp_path), input_datafile='strat.nc',
+                  output_plot_path=str(tmp_path / 'plots'),
+                  zonal_mean_wind_contour_time_index=5, zonal_mean_temp_contour_time_index=5)
+    return config
+
+
+def test_chunked_zonal_means(config):
+    dataset = sd.retrieve_data(config)
+    zonal_means = sd.compute_zonal_means(dataset, time_chunk=5)
+    assert list(zonal_means.data_vars) == ['u_wind', 'temperature']
+    xr.testing.assert_allclose(zonal_means.u_wind, zonal_mean(dataset.u_wind))
+    xr.testing.assert_allclose(zonal_means.temperature, zonal_mean(dataset.temperature))
+
+
+def test_plot_diagnostics(config):
+    config.update(zonal_mean_time_chunk=5, num_processes=2,
+                  zonal_mean_wind_contour_time_index=[2, 11])
+    sd.plot_diagnostics(config, sd.retrieve_data(config))
+    assert sorted(os.listdir(config['output_plot_path'])) == [
+        'polar_cap_meridional_mean_temp.png',
+        'zonal_mean_temperature_contour.png',
+        'zonal_mean_wind.png',
+        'zonal_mean_wind_contour_t002.png',
+        'zonal_mean_wind_contour_t011.png']
@@ -1,5 +1,7 @@
 import os
+import pandas as pd
 from metplotpy.plots.taylor_diagram import taylor_diagram as td
+from metplotpy.plots.taylor_diagram.taylor_diagram_series import pivot_taylor_stats
 #from metcalcpy.compare_images import CompareImages
 
 
@@ -99,3 +101,13 @@ def test_custom_plot_exists():
 
     # Clean up
     os.remove(os.path.join(path, plot_file))
+
+
+def test_pivot_taylor_stats():
+    input_df = pd.read_csv("plot_dlwr_sample.data", sep='\t', header='infer')
+    taylor_stats = pivot_taylor_stats(input_df, ['model', 'vx_mask'])
+    row = taylor_stats.loc[('suite3_MEDIAN', 'Bondville')]
+    assert row['fstdev'] == 60.2050119018588
+    assert row['ostdev'] == 59.73588591438
+    assert row['pr_corr'] == 0.833561573982756
+    assert list(taylor_stats.columns) == ['fstdev', 'ostdev', 'pr_corr']
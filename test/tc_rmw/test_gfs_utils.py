@@ -0,0 +1,91 @@
+"""Tests for the GFS grib reader: the cfgrib calls with xr.open_dataset
+   replaced by an in-memory data set, and, if cfgrib is installed, a small
+   grib file of u and v winds written by cfgrib to a temporary directory.
+"""
+
+import os
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from metplotpy.contributed.tc_rmw import gfs_utils
+
+
+@pytest.fixture
+def open_calls(monkeypatch):
+    """ Replaces xr.open_dataset, returns the list of its calls """
+    calls = []
+    dims = ('isobaricInhPa', 'latitude', 'longitude')
+
+    def open_dataset(filename, **kwargs):
+        calls.append((filename, kwargs))
+        short_name = kwargs['backend_kwargs']['filter_by_keys'].get('shortName')
+        data_vars = {}
+        if short_name:
+            data_vars[short_name] = (dims, np.full((2, 3, 4), 1. if short_name == 'u' else 2.))
+        return xr.Dataset(data_vars, coords={'time': np.datetime64('2016-10-05T00'),
+                                             'valid_time': np.datetime64('2016-10-05T06')})
+
+    monkeypatch.setattr(gfs_utils.xr, 'open_dataset', open_dataset)
+    return calls
+
+
+def test_read_winds_filters(open_calls, tmp_path):
+    UGRD, VGRD = gfs_utils.read_gfs_winds(str(tmp_path), 'gfs_06.grb2\n')
+    assert (UGRD == 1.).all() and (VGRD == 2.).all()
+
+    # one opening per component, filtered on its short name, with the same index file
+    assert [kwargs['backend_kwargs']['filter_by_keys'] for filename, kwargs in open_calls] == \
+        [{'typeOfLevel' : 'isobaricInhPa', 'shortName' : 'u'},
+         {'typeOfLevel' : 'isobaricInhPa', 'shortName' : 'v'}]
+    for filename, kwargs in open_calls:
+        assert filename == str(tmp_path / 'gfs_06.grb2')
+        assert kwargs['engine'] == 'cfgrib'
+        assert kwargs['backend_kwargs']['indexpath'] == '{path}.{short_hash}.idx'
+
+
+def test_read_times_one_open_per_file(open_calls, tmp_path):
+    lead_times, valid_times = gfs_utils.read_gfs_times(str(tmp_path), ['gfs_00.grb2', 'gfs_06.grb2'])
+    assert [filename for filename, kwargs in open_calls] == \
+        [str(tmp_path / 'gfs_00.grb2'), str(tmp_path / 'gfs_06.grb2')]
+    assert all(kwargs['backend_kwargs']['filter_by_keys'] == {'typeOfLevel' : 'sigma'}
+               for filename, kwargs in open_calls)
+    assert valid_times == [np.datetime64('2016-10-05T06')] * 2
+    assert len(lead_times) == 2
+
+
+@pytest.fixture
+def grib_dir(tmp_path):
+    pytest.importorskip('cfgrib')
+    from cfgrib.xarray_to_grib import to_grib
+    rng = np.random.default_rng(0)
+    dims = ('isobaricInhPa', 'latitude', 'longitude')
+    coords = {'isobaricInhPa': [850., 500.], 'latitude': [10., 5., 0.],
+              'longitude': [0., 5., 10., 15.]}
+    for hour in (0, 6):
+        ds = xr.Dataset({'u': (dims, rng.normal(size=(2, 3, 4)), {'GRIB_shortName': 'u', 'GRIB_paramId': 131}),
+                         'v': (dims, rng.normal(size=(2, 3, 4)), {'GRIB_shortName': 'v', 'GRIB_paramId': 132})},
+                        coords=coords)
+        to_grib(ds, str(tmp_path / ('gfs_%2.2d.grb2' % hour)), grib_keys={'edition': 2})
+    return tmp_path
+
+
+def test_read_gfs_winds(grib_dir, tmp_path):
+    index_dir = str(tmp_path / 'index')
+    reader = gfs_utils.GFSGribReader(str(grib_dir), index_dir=index_dir, nprocs=2)
+    winds = reader.read_winds(['gfs_00.grb2', 'gfs_06.grb2\n'])
+    assert len(winds) == 2
+    assert winds[0][0].shape == winds[0][1].shape == (2, 3, 4)
+    assert len(os.listdir(index_dir)) == 2
+
+    UGRD, VGRD = gfs_utils.read_gfs_winds(str(grib_dir), 'gfs_06.grb2')
+    np.testing.assert_allclose(UGRD, winds[1][0], rtol=1e-3)
+    np.testing.assert_allclose(VGRD, winds[1][1], rtol=1e-3)
+
+
+def test_indexpath(tmp_path):
+    reader = gfs_utils.GFSGribReader(str(tmp_path), index_dir=str(tmp_path / 'index'))
+    assert reader.indexpath(reader.path('gfs.grb2\n')) == \
+        os.path.join(str(tmp_path / 'index'), 'gfs.grb2.{short_hash}.idx')
+    assert gfs_utils.GFSGribReader(str(tmp_path)).indexpath('gfs.grb2') == '{path}.{short_hash}.idx'
@@ -0,0 +1,53 @@
+"""Tests for the cross-section plots of several track times,
+   using a small data set with the layout of the vertically interpolated TCRMW output.
+"""
+
+import os
+
+import matplotlib.image as mpimg
+import numpy as np
+import pytest
+import xarray as xr
+import yaml
+
+from metplotpy.contributed.tc_rmw import plot_cross_section as pcs
+
+
+@pytest.fixture
+def data_set():
+    rng = np.random.default_rng(0)
+    range_grid = np.arange(0., 20., 0.5)
+    lev = np.arange(0., 6001., 500.)
+    n_track = 4
+    tmp = 300. - 0.0065 * lev[None, None, :, None] + \
+        5. * np.sin(range_grid[:, None, None, None] / 3. + np.arange(n_track)) + \
+        rng.normal(0., 0.5, (range_grid.size, 6, lev.size, n_track))
+    return xr.Dataset({'TMP': (('range', 'azimuth', 'lev', 'track_point'), tmp),
+                       'valid_time': (('track_point',), 2016100500 + 6 * np.arange(n_track))},
+                      coords={'range': range_grid, 'lev': lev})
+
+
+@pytest.fixture
+def config():
+    config_file = os.path.join(os.path.dirname(pcs.__file__), 'plot_cross_section.yaml')
+    with open(config_file, 'r') as stream:
+        return yaml.load(stream, Loader=yaml.FullLoader)
+
+
+def test_time_indices():
+    assert pcs.time_indices(2, 5) == [2]
+    assert pcs.time_indices([0, 3], 5) == [0, 3]
+    assert pcs.time_indices('all', 3) == [0, 1, 2]
+
+
+def test_same_plots_as_single_times(data_set, config, tmp_path):
+    config.update(index_time_slice='all', plot_filename='cross')
+    outfiles = pcs.plot_cross_sections(config, data_set, str(tmp_path), nprocs=2)
+    assert outfiles == [str(tmp_path / ('cross_%d' % valid_time)) for valid_time in data_set['valid_time'].values]
+
+    # the reused figure gives the same image as a new figure per time
+    for itime in (1, 3):
+        single = dict(config, index_time_slice=itime, plot_filename='single_%d' % itime)
+        outfile = pcs.plot_cross_sections(single, data_set, str(tmp_path))[0]
+        assert os.path.exists(outfile + '.pdf')
+        np.testing.assert_array_equal(mpimg.imread(outfile + '.png'), mpimg.imread(outfiles[itime] + '.png'))
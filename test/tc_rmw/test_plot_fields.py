@@ -0,0 +1,94 @@
+"""Tests for the batched rendering of the TCRMW track fields, using a small
+   netcdf file with the layout of the TCRMW tool output written to a temporary directory.
+"""
+
+import os
+import sys
+
+import matplotlib
+matplotlib.use('agg')
+import numpy as np
+import pytest
+import cartopy.crs as ccrs
+from cartopy.mpl.geoaxes import GeoAxes
+from netCDF4 import Dataset
+
+from metplotpy.contributed.tc_rmw import tc_utils
+# plot_fields is run as a script from its directory and imports tc_utils from it
+sys.path.insert(0, os.path.dirname(tc_utils.__file__))
+from metplotpy.contributed.tc_rmw import plot_fields
+
+
+def range_azimuth_grid(n_range, n_azimuth, n_track):
+    """ lon, lat of (range, azimuth, track point) grids moving north west """
+    radius = np.linspace(0., 3., n_range)[:, None, None]
+    azimuth = np.radians(np.arange(n_azimuth) * 360. / n_azimuth)[None, :, None]
+    lat = 20. + np.arange(n_track)[None, None, :] + radius * np.cos(azimuth)
+    lon = -60. - np.arange(n_track)[None, None, :] + radius * np.sin(azimuth)
+    return lon, lat
+
+
+@pytest.fixture
+def tcrmw_dir(tmp_path):
+    n_range, n_azimuth, n_track = 5, 8, 4
+    lon, lat = range_azimuth_grid(n_range, n_azimuth, n_track)
+    with Dataset(str(tmp_path / 'tc_rmw.nc'), mode='w') as nc_file:
+        for dim, size in (('range', n_range), ('azimuth', n_azimuth), ('track_point', n_track)):
+            nc_file.createDimension(dim, size)
+        nc_file.createVariable('valid_time', 'i8', ('track_point',))[:] = \
+            2016100500 + 6 * np.arange(n_track)
+        dims = ('range', 'azimuth', 'track_point')
+        nc_file.createVariable('lat', 'f4', dims)[:] = lat
+        nc_file.createVariable('lon', 'f4', dims)[:] = lon
+        prmsl = 100000. + 100. * np.arange(n_range)[:, None, None] + np.zeros(lat.shape)
+        # a missing value, not masked in the file
+        prmsl[2, 3, 1] = np.nan
+        nc_file.createVariable('PRMSL', 'f4', dims, fill_value=False)[:] = prmsl
+    return tmp_path
+
+
+def test_merge_track_fields():
+    lon, lat = range_azimuth_grid(5, 8, 3)
+    field = np.arange(5 * 8 * 3, dtype=float).reshape(5, 8, 3)
+    field[0, 0, 1] = np.nan
+    merged_lon, merged_lat, merged = plot_fields.merge_track_fields(lon, lat, field)
+    assert merged_lon.shape == merged_lat.shape == merged.shape == (5, 9 * 3 - 1)
+
+    # the gap columns between the track points are masked, and repeat the last azimuth
+    for gap in (8, 17):
+        assert merged.mask[:, gap].all()
+        np.testing.assert_array_equal(merged_lon[:, gap], merged_lon[:, gap - 1])
+    np.testing.assert_array_equal(merged[:, 9:17], np.ma.masked_invalid(field[:, :, 1]))
+    # only the gaps and the NaN are masked
+    assert merged.mask.sum() == 2 * 5 + 1
+    assert np.isfinite(merged.min()) and np.isfinite(merged.max())
+
+
+def test_grid_segments():
+    lon, lat = range_azimuth_grid(5, 8, 3)
+    segments = plot_fields.grid_segments(lon, lat, 2, 4)
+    # range circles 0, 2, 4 and the outer one, azimuth lines 0 and 4, per track point
+    assert len(segments) == 3 * (4 + 2)
+    assert segments[0].shape == (8, 2)
+    assert segments[4].shape == (5, 2)
+
+
+def test_project_grid():
+    lon, lat = range_azimuth_grid(5, 8, 3)
+    x_grid, y_grid = plot_fields.project_grid(ccrs.LambertConformal(), ccrs.PlateCarree(), lon, lat)
+    assert x_grid.shape == y_grid.shape == lon.shape
+    assert np.isfinite(x_grid).all() and np.isfinite(y_grid).all()
+
+
+def test_plot_track_panels(tcrmw_dir, tmp_path, monkeypatch):
+    # no Natural Earth land and ocean
+    monkeypatch.setattr(GeoAxes, 'add_feature', lambda self, *args, **kwargs: None)
+    plotdir = tmp_path / 'plots'
+    plotdir.mkdir()
+    params = {'figsize': 2, 'title': 'PRMSL', 'range_step': 2, 'azimuth_step': 2,
+              'start': 0, 'step': 1, 'scalar_field': 'PRMSL', 'scalar_field_scale': 0.01,
+              'nprocs': 2}
+    outfiles = plot_fields.plot_track_panels(str(tcrmw_dir), str(plotdir), 'tc_rmw.nc', params)
+    assert len(outfiles) == 4
+    assert sorted(os.listdir(str(plotdir))) == \
+        sorted('PRMSL_panel_' + str(2016100500 + 6 * i) + '.png' for i in range(4))
@@ -0,0 +1,65 @@
+"""Tests for the lazy TCRMWFile reader, using a small netcdf file with the
+   layout of the TCRMW tool output written to a temporary directory.
+"""
+
+import numpy as np
+import pytest
+from netCDF4 import Dataset
+
+from metplotpy.contributed.tc_rmw import tc_utils
+
+
+@pytest.fixture
+def tcrmw_file(tmp_path):
+    path = str(tmp_path / 'tc_rmw.nc')
+    n_range, n_azimuth, n_pressure, n_track = 3, 4, 2, 5
+    with Dataset(path, mode='w') as nc_file:
+        for dim, size in (('range', n_range), ('azimuth', n_azimuth),
+                          ('pressure', n_pressure), ('track_point', n_track),
+                          ('track_line', 2)):
+            nc_file.createDimension(dim, size)
+        nc_file.createVariable('valid_time', 'i8', ('track_point',))[:] = \
+            2016100500 + np.arange(n_track)
+        nc_file.createVariable('range', 'f4', ('range',))[:] = np.arange(n_range)
+        nc_file.createVariable('azimuth', 'f4', ('azimuth',))[:] = np.arange(n_azimuth) * 90.
+        nc_file.createVariable('pressure', 'f4', ('pressure',))[:] = [1000., 850.]
+        grid_shape = (n_range, n_azimuth, n_track)
+        nc_file.createVariable('lat', 'f4', ('range', 'azimuth', 'track_point'))[:] = \
+            np.arange(np.prod(grid_shape)).reshape(grid_shape)
+        nc_file.createVariable('lon', 'f4', ('range', 'azimuth', 'track_point'))[:] = \
+            -np.arange(np.prod(grid_shape)).reshape(grid_shape)
+        for var in ('Lat', 'Lon', 'RMW'):
+            nc_file.createVariable(var, 'f4', ('track_point',))[:] = np.arange(n_track)
+        nc_file.createVariable('TrackLines', 'i4', ('track_line',))[:] = [0, 1]
+        shape = (n_range, n_azimuth, n_pressure, n_track)
+        for offset, var in enumerate(('UGRD', 'VGRD', 'TMP')):
+            nc_file.createVariable(var, 'f4', ('range', 'azimuth', 'pressure', 'track_point'))[:] = \
+                np.arange(np.prod(shape)).reshape(shape) + 1000 * offset
+    return path
+
+
+def test_read_track_points(tcrmw_file):
+    with tc_utils.TCRMWFile(tcrmw_file) as tcrmw:
+        assert tcrmw.wind_names() == {'U': 'UGRD', 'V': 'VGRD'}
+        assert tcrmw.scalar_names() == ['TMP']
+        assert 'TMP' in tcrmw
+
+        tmp = tcrmw.read('TMP')
+        np.testing.assert_array_equal(tcrmw.read('TMP', track=slice(1, None, 2)), tmp[..., 1::2])
+        assert tcrmw.read('TMP', track=3).shape == (3, 4, 2)
+        np.testing.assert_array_equal(tcrmw.read('valid_time', track=slice(0, 2)),
+                                      [2016100500, 2016100501])
+
+        lat_track, lon_track = tcrmw.read_track_center()
+        np.testing.assert_array_equal(lat_track, tcrmw.read('lat')[0, 0, :])
+        np.testing.assert_array_equal(lon_track, tcrmw.read('lon')[0, 0, :])
+
+
+def test_read_tcrmw(tcrmw_file):
+    valid_time, lat_grid, lon_grid, range_grid, azimuth_grid, pressure_grid, \
+        track_data, wind_data, scalar_data = tc_utils.read_tcrmw(tcrmw_file)
+    assert lat_grid.shape == (3, 4, 5)
+    assert sorted(wind_data) == ['U', 'V']
+    assert list(scalar_data) == ['TMP']
+    np.testing.assert_allclose(track_data['RMW'], np.arange(5) * tc_utils.nm_to_km)
+    np.testing.assert_array_equal(wind_data['V'] - wind_data['U'], 1000)
@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+import pytest
+import xarray as xr
+from cartopy.mpl.geoaxes import GeoAxes
+
+import metplotpy.contributed.tc_s2s_panel.plot_tc_s2s_panel as tcp
+
+
+@pytest.fixture(autouse=True)
+def no_coastlines(monkeypatch):
+    # the Natural Earth coastlines may not be available offline
+    monkeypatch.setattr(GeoAxes, 'coastlines', lambda self, *args, **kwargs: None)
+
+
+def density(seed, lat_name='lat'):
+    rng = np.random.default_rng(seed)
+    lat = np.arange(-90., 90.1, 5.)
+    lon = np.arange(0., 360., 5.)
+    names = ['OBS_DENS', 'FCST_DENS', 'OTRK_DENS', 'FTRK_DENS']
+    return xr.Dataset({name: ((lat_name, 'lon'), rng.gamma(1., 2., (lat.size, lon.size))) for name in names},
+                      coords={lat_name: lat, 'lon': lon})
+
+
+@pytest.mark.parametrize('lat_name', ['lat', 'latitude'])
+def test_clip_to_extent(lat_name):
+    field = density(0, lat_name)['OBS_DENS']
+    clipped = tcp.clip_to_extent(field)
+    np.testing.assert_array_equal(clipped[lat_name], np.arange(-50., 50.1, 5.))
+
+    descending = tcp.clip_to_extent(field.isel({lat_name: slice(None, None, -1)}))
+    np.testing.assert_array_equal(descending[lat_name], np.arange(50., -50.1, -5.))
+
+
+def test_plot_panels(tmp_path):
+    jobs = []
+    for seed in range(3):
+        data_file = str(tmp_path / f'density_{seed}.nc')
+        density(seed).to_netcdf(data_file)
+        jobs.append(tcp.PanelJob('GDF', data_file, str(tmp_path / f'season_{seed}')))
+        jobs.append(tcp.PanelJob('TDF', data_file, str(tmp_path / f'season_{seed}')))
+
+    outfiles = tcp.plot_panels(jobs, nprocs=2)
+    assert outfiles == [os.path.join(job.outdir, job.kind + '.png') for job in jobs]
+    assert all(os.path.exists(outfile) for outfile in outfiles)
+
+
+def test_reused_figure(tmp_path):
+    tcp.plot_gdf(density(1), str(tmp_path / 'first'))
+    fig = tcp._PANEL_PLOTS['GDF'].fig
+    tcp.plot_gdf(density(2), str(tmp_path / 'second'))
+    assert tcp._PANEL_PLOTS['GDF'].fig is fig
+    mesh = tcp._PANEL_PLOTS['GDF'].meshes[0]
+    expected = tcp.clip_to_extent(density(2)['OBS_DENS'])
+    np.testing.assert_array_equal(mesh.get_array(), np.ma.masked_less_equal(expected.values, 0.))
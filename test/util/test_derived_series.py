@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from metplotpy.plots.derived_series import derive_series_data, typed_indy_vals
+
+
+def series_frame(model, values, leads=(0, 6), dates=('2024-01-01', '2024-01-02')):
+    rows = [{'model': model, 'fcst_lead': lead, 'fcst_valid_beg': date, 'stat_name': 'ME'}
+            for lead in leads for date in dates]
+    frame = pd.DataFrame(rows)
+    frame['stat_value'] = values
+    frame['stat_bcl'] = np.asarray(values) - 1
+    return frame
+
+
+def test_typed_indy_vals():
+    assert typed_indy_vals(['6', '1.5', 'P500']) == [6, 1.5, 'P500']
+
+
+def test_diff_in_indy_order():
+    series_1 = series_frame('a', [1., 2., 3., 4.])
+    series_2 = series_frame('b', [0.5, 0.5, 1., 1.])
+    derived = derive_series_data(series_1, series_2, 'DIFF', 'fcst_lead', [6, 0],
+                                 ('stat_value', 'stat_bcl', 'stat_bcu'))
+    assert list(derived.columns) == list(series_1.columns)
+    assert derived['fcst_lead'].tolist() == [6, 6, 0, 0]
+    assert derived['stat_value'].tolist() == [2., 3., 0.5, 1.5]
+    assert derived['stat_bcl'].tolist() == [2., 3., 0.5, 1.5]
+
+
+def test_missing_rows_and_zero_denominator():
+    series_1 = series_frame('a', [1., 2., 3., 4.])
+    # no 2nd date for lead 6
+    series_2 = series_frame('b', [0., 1., 1., 1.]).drop(index=3)
+    ratio = derive_series_data(series_1, series_2, 'RATIO', 'fcst_lead', [0, 6])
+    # lead 0 has a zero denominator, lead 6 has a missing date
+    assert ratio['stat_value'].isna().all()
+
+    diff = derive_series_data(series_1, series_2, 'DIFF', 'fcst_lead', [0, 6])
+    assert diff['stat_value'].tolist()[:2] == [1., 1.]
+    assert diff['stat_value'].iloc[2:].isna().all()
+
+
+def test_duplicate_dates():
+    series_1 = series_frame('a', [1., 2., 3., 4.], dates=('2024-01-01', '2024-01-01'))
+    series_2 = series_frame('b', [1., 2., 3., 4.])
+    with pytest.raises(ValueError):
+        derive_series_data(series_1, series_2, 'DIFF', 'fcst_lead', [0, 6])
+
+
+def test_date_indy_var():
+    series_1 = series_frame('a', [1., 2., 3., 4.], dates=('2024-01-01', '2024-01-02'))
+    series_2 = series_frame('b', [0.5, 0.5, 1., 1.], dates=('2024-01-01', '2024-01-02'))
+    derived = derive_series_data(series_1, series_2, 'DIFF', 'fcst_valid_beg',
+                                 ['2024-01-02', '2024-01-01'])
+    assert derived['fcst_valid_beg'].tolist() == ['2024-01-02', '2024-01-02', '2024-01-01', '2024-01-01']
+    assert derived['fcst_lead'].tolist() == [0, 6, 0, 6]
+    assert derived['stat_value'].tolist() == [1.5, 3., 0.5, 2.]
@@ -0,0 +1,44 @@
+import plotly.graph_objects as go
+import pytest
+
+from metplotpy.plots import export
+
+
+def make_figure(i):
+    return go.Figure(go.Scatter(x=[1, 2, 3], y=[i, i + 1, i - 1]))
+
+
+def test_image_format():
+    assert export.image_format('plot.PNG') == 'png'
+    assert export.image_format('plot.png', 'svg') == 'svg'
+    assert export.image_format('plot') == 'png'
+
+
+def test_export_batch(tmp_path):
+    jobs = [export.ExportJob(make_figure(i), str(tmp_path / f'plot_{i}.png'), width=200, height=100)
+            for i in range(3)]
+    jobs.append(export.ExportJob(make_figure(3), str(tmp_path / 'plot_3.svg')))
+    jobs.append(export.ExportJob(make_figure(4), str(tmp_path / 'missing' / 'plot_4.png')))
+    jobs.append(export.ExportJob(make_figure(5), str(tmp_path / 'plot_5.txt')))
+
+    with export.ImageExporter(pool_size=2) as exporter:
+        exporter.warm(block=True)
+        results = exporter.export(jobs)
+
+    assert [result.path for result in results] == [job.path for job in jobs]
+    for result in results[:3]:
+        assert result.error is None
+        assert result.secs >= 0
+        with open(result.path, 'rb') as image_file:
+            assert image_file.read(8) == b'\x89PNG\r\n\x1a\n'
+    assert (tmp_path / 'plot_3.svg').read_text().startswith('<svg')
+    assert isinstance(results[4].error, FileNotFoundError)
+    assert isinstance(results[5].error, ValueError)
+
+
+def test_write_image_raises(tmp_path):
+    exporter = export.ImageExporter()
+    with pytest.raises(FileNotFoundError):
+        exporter.write_image(make_figure(0), str(tmp_path / 'missing' / 'plot.png'))
+    assert exporter.write_image(make_figure(0), str(tmp_path / 'plot.png')) >= 0
+    exporter.close()
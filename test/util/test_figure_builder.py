@@ -0,0 +1,45 @@
+import plotly.graph_objects as go
+import pytest
+from plotly.subplots import make_subplots
+
+from metplotpy.plots.figure_builder import FigureBuilder
+
+
+def draw(fig, trace_type):
+    fig.update_layout(width=800, height=600, title={'text': 'title'})
+    fig.update_xaxes(title_text='x', title_font={'size': 11}, ticks='inside')
+    fig.update_yaxes(title_text='y', secondary_y=False)
+    fig.update_yaxes(title_text='y2', secondary_y=True)
+    fig.add_trace(trace_type(x=[1, 2], y=[3, 4], name='a', marker_symbol='circle',
+                             line={'color': 'red', 'dash': None}), secondary_y=False)
+    fig.add_trace(trace_type(x=[1, 2], y=[5, None], name='b', marker_size=4), secondary_y=True)
+    fig.update_layout(xaxis2={'title_text': 'NStats', 'overlaying': 'x', 'side': 'top'})
+    fig.add_trace(trace_type(x=[1, 2], y=[None, None], xaxis='x2', showlegend=False))
+    fig.update_xaxes(range=[0, 3])
+    fig.add_annotation(text='note', x=0, y=1, showarrow=False)
+
+
+def test_same_figure_as_make_subplots():
+    expected = make_subplots(specs=[[{"secondary_y": True}]])
+    draw(expected, go.Scatter)
+
+    builder = FigureBuilder(secondary_y=True)
+    draw(builder, lambda **kwargs: dict(type='scatter', **kwargs))
+    figure = builder.build()
+
+    assert isinstance(figure, go.Figure)
+    assert figure.to_dict() == expected.to_dict()
+
+
+def test_trace_objects():
+    builder = FigureBuilder()
+    builder.add_traces([go.Bar(x=[1], y=[2]), {'type': 'bar', 'x': [1], 'y': [3]}])
+    assert [trace.type for trace in builder.build().data] == ['bar', 'bar']
+
+
+def test_no_secondary_y():
+    builder = FigureBuilder(secondary_y=False)
+    assert builder.layout.xaxis.domain == (0.0, 1.0)
+    assert 'yaxis2' not in builder.layout.to_plotly_json()
+    with pytest.raises(ValueError):
+        builder.add_trace({'type': 'scatter'}, secondary_y=True)
@@ -0,0 +1,51 @@
+import os
+
+import matplotlib
+matplotlib.use('agg')
+import matplotlib.image as mpimg
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+
+from metplotpy.contributed.output_policy import OutputPolicy, resolve_policy, save_figure
+
+
+def line_figure():
+    fig = plt.figure()
+    plt.plot(np.arange(10.), np.arange(10.) ** 2, label='line')
+    plt.title('title')
+    plt.ylabel('IBL Frequency')
+    plt.legend()
+    return fig
+
+
+def test_same_png_as_savefig(tmp_path):
+    fig = line_figure()
+    fig.savefig(tmp_path / 'expected.png', format='png', dpi=100, bbox_inches='tight')
+    outfiles = save_figure(fig, str(tmp_path / 'plot'), formats=('pdf', 'png'), policy=OutputPolicy(dpi=100))
+
+    assert outfiles == [str(tmp_path / 'plot.pdf'), str(tmp_path / 'plot.png')]
+    assert os.path.getsize(outfiles[0]) > 0
+    np.testing.assert_array_equal(mpimg.imread(outfiles[1]), mpimg.imread(tmp_path / 'expected.png'))
+    assert not plt.fignum_exists(fig.number)
+
+
+def test_optimized_png(tmp_path):
+    outfiles = save_figure(line_figure(), str(tmp_path / 'plot'),
+                           policy=OutputPolicy(dpi=50, tight=False, optimize_png=True))
+    with Image.open(outfiles[0]) as image:
+        assert image.mode == 'P'
+        assert image.size == (320, 240)
+
+
+def test_policy_from_environment(monkeypatch):
+    assert resolve_policy(formats=('pdf', 'png')) == OutputPolicy(['pdf', 'png'], 400, True, False)
+
+    monkeypatch.setenv('METPLOTPY_PLOT_FORMATS', 'PNG')
+    monkeypatch.setenv('METPLOTPY_PLOT_DPI', '150')
+    monkeypatch.setenv('METPLOTPY_PLOT_OPTIMIZE_PNG', 'true')
+    assert resolve_policy(formats=('pdf', 'png')) == OutputPolicy(['png'], 150., True, True)
+
+    # the fields set in the policy override the environment
+    assert resolve_policy(OutputPolicy(formats='svg', dpi=72, optimize_png=False)) == \
+        OutputPolicy(['svg'], 72, True, False)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+import metplotpy.plots.pairs_analytics as pairs_analytics
+
+
+def test_trend_line_matches_polyfit():
+    rng = np.random.default_rng(3)
+    fcst = rng.normal(10, 3, 500)
+    obs = 0.8 * fcst + 2 + rng.normal(0, 1, 500)
+    slope, intercept = pairs_analytics.trend_line(pd.Series(fcst), pd.Series(obs))
+    expected = np.polyfit(fcst, obs, 1)
+    np.testing.assert_allclose([slope, intercept], expected)
+
+    # missing pairs are ignored, a constant x gives a flat line
+    slope_nan, intercept_nan = pairs_analytics.trend_line(np.append(fcst, np.nan),
+                                                          np.append(obs, 1.))
+    np.testing.assert_allclose([slope_nan, intercept_nan], expected)
+    assert pairs_analytics.trend_line([2., 2., 2.], [1., 2., 3.]) == (0.0, 2.0)
+
+
+def test_sorted_quantiles():
+    x_values = [3., 1., 2., np.nan]
+    y_values = [6., 4., 5., 7.]
+    qq_x, qq_y = pairs_analytics.sorted_quantiles(x_values, y_values)
+    np.testing.assert_array_equal(qq_x, [1., 2., 3.])
+    np.testing.assert_array_equal(qq_y, [4., 5.5, 7.])
+
+    qq_x, qq_y = pairs_analytics.sorted_quantiles(np.arange(101.), np.arange(101.) * 2,
+                                                  max_points=11)
+    np.testing.assert_allclose(qq_x, np.arange(0., 101., 10.))
+    np.testing.assert_allclose(qq_y, np.arange(0., 201., 20.))
+
+
+def test_scatter_trace_type_and_density():
+    x_values = np.arange(100.)
+    trace = pairs_analytics.scatter_trace(x_values, x_values, gl_threshold=1000, mode='markers')
+    assert isinstance(trace, go.Scatter)
+    assert len(trace.x) == 100
+    trace = pairs_analytics.scatter_trace(x_values, x_values, gl_threshold=50, mode='markers')
+    assert isinstance(trace, go.Scattergl)
+
+    # 100 points on the diagonal of a 5x5 grid, 20 points per cell
+    trace = pairs_analytics.scatter_trace(x_values, x_values, gl_threshold=1000,
+                                          density_bins=5, marker=dict(color='red'))
+    assert isinstance(trace, go.Scatter)
+    np.testing.assert_array_equal(trace.customdata, [20] * 5)
+    np.testing.assert_allclose(trace.x, trace.y)
+    assert trace.marker.color == 'red'
+    assert np.all(np.asarray(trace.marker.size) == pairs_analytics.DENSITY_MAX_MARKER_SIZE)
@@ -0,0 +1,42 @@
+import json
+
+import metplotpy.plots.util as util
+from metplotpy.plots.context_filter import ContextFilter
+from metplotpy.plots.timing import PlotTimer, timed_stage
+
+
+class TimedPlot:
+    def __init__(self, timer):
+        self.timer = timer
+
+    @timed_stage('series')
+    def create_series(self, value):
+        return value * 2
+
+
+def test_plot_timer_json(tmp_path):
+    timing_file = tmp_path / 'timing.json'
+    timer = PlotTimer('Line', output_file=str(timing_file))
+    plot = TimedPlot(timer)
+    with timer.stage('read'):
+        pass
+    assert plot.create_series(2) == 4
+    assert plot.create_series(3) == 6
+
+    timings = json.loads(timing_file.read_text())
+    assert timings['plot'] == 'Line'
+    assert [stage['name'] for stage in timings['stages']] == ['read', 'series']
+    assert timings['stages'][1]['calls'] == 2
+    assert all(stage['secs'] >= 0 for stage in timings['stages'])
+
+    # without a timer the method is called as is
+    assert TimedPlot(None).create_series(1) == 2
+
+
+def test_common_logger_is_configured_once():
+    logger = util.get_common_logger('info', 'stdout')
+    for _ in range(5):
+        assert util.get_common_logger('INFO', 'stdout') is logger
+    filters = [log_filter for log_filter in logger.filters
+               if isinstance(log_filter, ContextFilter)]
+    assert len(filters) == 1